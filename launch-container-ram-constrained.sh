@@ -11,6 +11,9 @@ set -e
 # Parse arguments
 TEST_MODE=false
 NO_NUMA=false
+NUMA_NODE=0
+ALL_NODES=false
+SKIP_OOM_CHECK=false
 SERVICE_NAME=""
 DATASET_NAME=""
 RAM_SPEC=""
@@ -24,13 +27,16 @@ Usage: ./launch-container-ram-constrained.sh [OPTIONS] <service_name> <dataset_n
 Options:
   --test              Run in test mode with limited CPUs (0-27)
   --no_numa           Disable NUMA pinning
+  --numa_node N       Pin to the CPUs and memory of NUMA node N (default: 0)
+  --all_nodes         Give the container the CPUs and memory of all NUMA nodes
+  --skip_oom_check    Launch even if the cost model predicts an OOM
   --help              Show this help message
 
 Arguments:
   service_name        OOC system: blaze, graphchi, xstream, lumos, planar
   dataset_name        Dataset: dota_league, graph500_26, graph500_28, etc.
   ram_spec            RAM allocation - either:
-                        Percentage: 50, 75, 100, 125 (as % of estimated working memory)
+                        Percentage: 1-1000, e.g. 50, 75, 100, 125 (as % of estimated working memory)
                         Absolute: 50G, 50M (with G or M suffix)
 
 Examples:
@@ -52,6 +58,18 @@ while [[ $# -gt 0 ]]; do
             NO_NUMA=true
             shift
             ;;
+        --numa_node)
+            NUMA_NODE="$2"
+            shift 2
+            ;;
+        --all_nodes)
+            ALL_NODES=true
+            shift
+            ;;
+        --skip_oom_check)
+            SKIP_OOM_CHECK=true
+            shift
+            ;;
         --help)
             usage
             ;;
@@ -91,8 +109,8 @@ if [[ "$RAM_SPEC" =~ ^([0-9]+)(G|M)$ ]]; then
     RAM_PERCENT="absolute"
 elif [[ "$RAM_SPEC" =~ ^[0-9]+$ ]]; then
     # Percentage specification (e.g., 50, 75, 100)
-    if ! echo "$RAM_SPEC" | grep -qE '^(50|75|100|125|500)$'; then
-        echo "Error: RAM percentage must be 50, 75, 100, 125, or 500"
+    if [ "$RAM_SPEC" -lt 1 ] || [ "$RAM_SPEC" -gt 1000 ]; then
+        echo "Error: RAM percentage must be between 1 and 1000"
         exit 1
     fi
     RAM_PERCENT="$RAM_SPEC"
@@ -120,7 +138,7 @@ try:
         total_memory_mb = int($RAM_ABSOLUTE_GB) * 1024
         print(total_memory_mb)
     else:
-        # Use percentage of graph_size_disk (following get_mem_estimates.py pattern)
+        # Use percentage of the graph size (following get_mem_estimates.py pattern)
         with open('$MEMORY_ESTIMATES') as f:
             estimates = json.load(f)
 
@@ -128,11 +146,15 @@ try:
             print(f"Error: Dataset '$DATASET_NAME' not found in memory_estimates.json", file=sys.stderr)
             sys.exit(1)
 
-        # Get graph size in MB from disk size
-        graph_size_mb = estimates['$DATASET_NAME'].get('graph_size_disk')
+        # Get graph size in MB: in-memory CSR footprint, or the disk size for entries
+        # not yet regenerated by update_memory_estimates.py
+        entry = estimates['$DATASET_NAME']
+        graph_size_mb = entry.get('graph_size_memory')
+        if graph_size_mb is None:
+            graph_size_mb = entry.get('graph_size_disk')
 
         if graph_size_mb is None:
-            print(f"Error: graph_size_disk not available for dataset '$DATASET_NAME'", file=sys.stderr)
+            print(f"Error: graph size not available for dataset '$DATASET_NAME'", file=sys.stderr)
             sys.exit(1)
 
         # Calculate memory budget as percentage of graph size (in MB)
@@ -155,18 +177,42 @@ if [ $? -ne 0 ]; then
     exit 1
 fi
 
-# NUMA settings based on flags
+# Refuse runs that the cost model (scripts/cost_model.py) predicts will not fit in the limit
+COST_MODEL="results/cost_model.json"
+if [ "$SKIP_OOM_CHECK" = false ] && [ -f "$COST_MODEL" ]; then
+    OOM_STATUS=0
+    python3 scripts/cost_model.py --model "$COST_MODEL" --profiles results/graph_profiles.json \
+        --estimates "$MEMORY_ESTIMATES" check "$SERVICE_NAME" "$DATASET_NAME" --mem-mb "$WORKING_MEMORY_MB" \
+        || OOM_STATUS=$?
+    if [ $OOM_STATUS -eq 2 ]; then
+        echo "Error: predicted peak memory exceeds ${WORKING_MEMORY_MB}MB (use --skip_oom_check to launch anyway)"
+        exit 1
+    fi
+fi
+
+# NUMA settings based on flags; the CPUs of a node are read from sysfs
+# (what scripts/numa_topology.py reports)
+NODE_SYSFS=/sys/devices/system/node
+NUMA_MEMS="$NUMA_NODE"
 if [ "$NO_NUMA" = true ]; then
-    NUMA_NODE_0_CPUS=""
+    NUMA_CPUS=""
     echo "Running with NUMA settings disabled"
 elif [ "$TEST_MODE" = true ]; then
     # Test mode: use CPUs 0-27
-    NUMA_NODE_0_CPUS="0-27"
+    NUMA_CPUS="0-27"
     echo "Running in TEST mode with CPUs 0-27"
+elif [ "$ALL_NODES" = true ]; then
+    NUMA_CPUS=$(cat /sys/devices/system/cpu/online)
+    NUMA_MEMS=$(cat "$NODE_SYSFS/online" 2>/dev/null || echo 0)
+    echo "Running on all NUMA nodes ($NUMA_MEMS) with CPUs $NUMA_CPUS"
 else
-    # Production mode: NUMA node 0 physical cores and hyperthreads
-    NUMA_NODE_0_CPUS="0-47,96-143"
-    echo "Running in PRODUCTION mode with CPUs 0-47,96-143"
+    # Production mode: physical cores and hyperthreads of one NUMA node
+    if [ ! -f "$NODE_SYSFS/node${NUMA_NODE}/cpulist" ]; then
+        echo "Error: NUMA node ${NUMA_NODE} not found in $NODE_SYSFS"
+        exit 1
+    fi
+    NUMA_CPUS=$(cat "$NODE_SYSFS/node${NUMA_NODE}/cpulist")
+    echo "Running in PRODUCTION mode on NUMA node ${NUMA_NODE} with CPUs $NUMA_CPUS"
 fi
 
 # Get project name and verify image exists
@@ -186,7 +232,8 @@ else
 fi
 echo "Allocated Memory:  ${WORKING_MEMORY_MB}MB ($((WORKING_MEMORY_MB / 1024))GB)"
 echo "Image:             $IMAGE_NAME"
-echo "NUMA CPUs:         ${NUMA_NODE_0_CPUS:-disabled}"
+echo "NUMA CPUs:         ${NUMA_CPUS:-disabled}"
+echo "NUMA memory nodes: ${NUMA_CPUS:+$NUMA_MEMS}"
 echo "═══════════════════════════════════════════════════════════════════"
 echo ""
 
@@ -262,8 +309,8 @@ else
         --memory "${WORKING_MEMORY_MB}m" \
         --memory-swap "${WORKING_MEMORY_MB}m" \
         --privileged \
-        --cpuset-cpus="$NUMA_NODE_0_CPUS" \
-        --cpuset-mems="0" \
+        --cpuset-cpus="$NUMA_CPUS" \
+        --cpuset-mems="$NUMA_MEMS" \
         -v "$(pwd)/datasets":/datasets \
         -v "$(pwd)/systems":/systems \
         -v "$(pwd)/results":/results \
@@ -276,7 +323,7 @@ else
             echo '============================================='
             echo 'Dataset: $DATASET_NAME'
             echo 'RAM Allocation: ${WORKING_MEMORY_MB}MB ($((WORKING_MEMORY_MB / 1024))GB) (${RAM_PERCENT}%)'
-            echo 'NUMA CPUs: $NUMA_NODE_0_CPUS'
+            echo 'NUMA CPUs: $NUMA_CPUS (memory nodes $NUMA_MEMS)'
             echo ''
             echo 'Memory Limit (cgroup):'
             if [ -f /sys/fs/cgroup/memory.max ]; then
@@ -3,6 +3,8 @@
 # Parse arguments
 TEST_MODE=false
 NO_NUMA=false
+NUMA_NODE=0
+ALL_NODES=false
 SERVICE_NAME=""
 
 while [[ $# -gt 0 ]]; do
@@ -15,6 +17,14 @@ while [[ $# -gt 0 ]]; do
       NO_NUMA=true
       shift
       ;;
+    --numa_node)
+      NUMA_NODE="$2"
+      shift 2
+      ;;
+    --all_nodes)
+      ALL_NODES=true
+      shift
+      ;;
     *)
       SERVICE_NAME="$1"
       shift
@@ -24,26 +34,38 @@ done
 
 # Check if service name is provided
 if [ -z "$SERVICE_NAME" ]; then
-  echo "Usage: $0 [--test] [--no_numa] <service_name>"
+  echo "Usage: $0 [--test] [--no_numa] [--numa_node N | --all_nodes] <service_name>"
   echo "Example: $0 gapbs"
   echo "Example: $0 --test gapbs"
   echo "Example: $0 --no_numa gapbs"
+  echo "Example: $0 --numa_node 1 gapbs      (CPUs and memory of NUMA node 1)"
+  echo "Example: $0 --all_nodes gemini       (all sockets, for the --numa placement policies)"
   echo "Available services: gapbs, gemini, ligra, galois, blaze, graphchi, xstream, lumos, gridgraph, margraphita"
   exit 1
 fi
 
-# NUMA settings based on test mode and no_numa flag
+# NUMA settings based on test mode and no_numa flag; the CPUs of a node are read
+# from sysfs (what scripts/numa_topology.py reports)
+NODE_SYSFS=/sys/devices/system/node
+NUMA_MEMS="$NUMA_NODE"
 if [ "$NO_NUMA" = true ]; then
-  NUMA_NODE_0_CPUS=""
+  NUMA_CPUS=""
   echo "Running with NUMA settings disabled"
 elif [ "$TEST_MODE" = true ]; then
   # Test mode: use CPUs 0-27
-  NUMA_NODE_0_CPUS="0-27"
+  NUMA_CPUS="0-27"
   echo "Running in TEST mode with CPUs 0-27"
+elif [ "$ALL_NODES" = true ]; then
+  # All sockets: the placement inside the container is chosen per run (--numa)
+  NUMA_CPUS=$(cat /sys/devices/system/cpu/online)
+  NUMA_MEMS=$(cat "$NODE_SYSFS/online" 2>/dev/null || echo 0)
 else
-  # Production mode: NUMA node 0 physical cores and hyperthreads
-  # Adjust these based on Kitkat's NUMA topology
-  NUMA_NODE_0_CPUS="0-47,96-143"
+  # Production mode: physical cores and hyperthreads of one NUMA node
+  if [ ! -f "$NODE_SYSFS/node${NUMA_NODE}/cpulist" ]; then
+    echo "Error: NUMA node ${NUMA_NODE} not found in $NODE_SYSFS"
+    exit 1
+  fi
+  NUMA_CPUS=$(cat "$NODE_SYSFS/node${NUMA_NODE}/cpulist")
 fi
 
 # Verify that the service exists in docker-compose.yml
@@ -80,7 +102,7 @@ echo "Using image: ${IMAGE_NAME}"
 if [ "$NO_NUMA" = true ]; then
   echo "NUMA settings: Disabled"
 else
-  echo "NUMA settings: CPUs=${NUMA_NODE_0_CPUS}, Memory node=0"
+  echo "NUMA settings: CPUs=${NUMA_CPUS}, Memory nodes=${NUMA_MEMS}"
 fi
 echo ""
 
@@ -107,8 +129,8 @@ else
   docker run -d \
     --name "${SERVICE_NAME}" \
     --privileged \
-    --cpuset-mems="0" \
-    --cpuset-cpus="$NUMA_NODE_0_CPUS" \
+    --cpuset-mems="$NUMA_MEMS" \
+    --cpuset-cpus="$NUMA_CPUS" \
     -v "$(pwd)/datasets":/datasets \
     -v "$(pwd)/systems":/systems \
     -v "$(pwd)/results":/results \
@@ -28,9 +28,8 @@ if [ "$TEST_MODE" = true ]; then
   NUMA_NODE_0_CPUS="0-27"
   echo "Running in TEST mode with CPUs 0-27"
 else
-  # Production mode: NUMA node 0 physical cores and hyperthreads
-  # Adjust these based on Kitkat's NUMA topology
-  NUMA_NODE_0_CPUS="0-47,96-143"
+  # Production mode: NUMA node 0 physical cores and hyperthreads, read from sysfs
+  NUMA_NODE_0_CPUS=$(cat /sys/devices/system/node/node0/cpulist)
 fi
 
 # Verify that the service exists in docker-compose.yml
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Time-to-first-result and amortization of preprocessing across systems.
+
+Kernel times alone favour the systems that do the most work up front:
+GridGraph's convert2bin + preprocess, or Galois' edgelist2gr + gr2sgr, only
+pay off after enough queries. This module combines the preprocessing ledger
+(preprocessing_ledger.py) with the per-trial times of the results store
+(results_store.py) into the cost of answering k queries of one algorithm on
+one dataset:
+
+    C_s(k) = P_s + k * q_s
+
+    P_s - wall time of the preprocessing steps system s needs on the dataset
+          for the algorithm (e.g. galois.tgr only for PageRank), shared steps
+          (e.g. galois.gr for Blaze) counted once
+    q_s - median trial time of the algorithm on system s
+
+Two systems cross over at k* = (P_a - P_b) / (q_b - q_a): below k* the one
+with the cheaper preprocessing wins, above it the one with the faster
+kernel. A query mix (e.g. 100 BFS + 5 PageRank per day) costs
+P_s + sum(count * q_s(algo)), with P_s covering the steps of all algorithms
+of the mix once, and is only defined for systems that ran every algorithm of
+the mix.
+
+Systems are matched by their lower-case name and algorithms by the names of
+the properties files (bfs, pr, wcc, sssp, triangle, bc), so that Ligra's
+PageRank, Galois' pagerank and GAPBS' pr compare. Runs with extra parameters
+(e.g. GraphChi memory budgets) are separate contenders, named system:params.
+Systems without ledger steps (GraphChi, GAPBS, runs predating the ledger)
+count as no preprocessing and are flagged in the reports.
+
+Usage:
+    python amortization.py breakeven [--datasets twitter_mpi] [--algos bfs pr] [--plot-dir DIR]
+    python amortization.py mix twitter_mpi --mix bfs=100 pr=5 --results /results/campaigns/2026-10.jsonl --plot mix.png
+"""
+
+import os
+import sys
+import csv
+import argparse
+import statistics
+from collections import defaultdict
+
+import matplotlib
+matplotlib.use('Agg')  # Use non-interactive backend
+import matplotlib.pyplot as plt
+import numpy as np
+
+from paths import RESULTS_ROOT
+from results_store import load_campaign
+from preprocessing_ledger import LEDGER_PATH, load_ledger, latest_steps, preprocessing_s, canonical_algo
+
+# Queries on the x axis of the crossover plots, beyond the last crossover
+PLOT_MARGIN = 10
+MIN_PLOT_QUERIES = 100
+
+
+def contender_name(system, params):
+    return f"{system}:{params}" if params else system
+
+
+def query_costs(records, steps):
+    """
+    Preprocessing and per-query cost of every contender.
+
+    Args:
+        records: Per-trial records (results_store)
+        steps: latest_steps() of the preprocessing ledger
+
+    Returns:
+        dict: (dataset, algo) -> {contender: {'system', 'params', 'preprocessing_s', 'query_s',
+              'trials', 'steps', 'step_s'}}, with canonical algorithm names; step_s maps the
+              steps the algorithm needs to their wall times
+    """
+    times = defaultdict(list)
+    for record in records:
+        if record.get('time_s') is None:
+            continue
+        key = (record['system'].lower(), record['dataset'], canonical_algo(record['algo']), record['params'])
+        times[key].append(record['time_s'])
+    costs = defaultdict(dict)
+    for (system, dataset, algo, params), values in sorted(times.items()):
+        prep_s, needed = preprocessing_s(steps, system, dataset, algo)
+        costs[(dataset, algo)][contender_name(system, params)] = {
+            'system': system, 'params': params, 'preprocessing_s': prep_s,
+            'query_s': statistics.median(values), 'trials': len(values), 'steps': needed,
+            'step_s': {step: steps[(dataset, step)]['wall_s'] for step in needed}}
+    return dict(costs)
+
+
+def break_even(prep_a, query_a, prep_b, query_b):
+    """
+    Number of queries after which contender a (preprocessing and per-query seconds) becomes cheaper than b.
+
+    Returns:
+        float or None: k* > 0, 0.0 if a is never more expensive, None if a never catches up
+    """
+    prep_gap = prep_a - prep_b
+    query_gap = query_b - query_a
+    if prep_gap <= 0 and query_gap >= 0:
+        return 0.0
+    if query_gap <= 0:
+        return None
+    return prep_gap / query_gap
+
+
+def break_even_table(costs):
+    """
+    Pairwise crossovers of all contenders of every (dataset, algo).
+
+    Returns:
+        list: dicts with dataset, algo, fast (faster kernel), slow, break_even_queries and the
+              preprocessing and query times of both; pairs where one contender dominates have
+              break_even_queries 0
+    """
+    rows = []
+    for (dataset, algo), contenders in sorted(costs.items()):
+        names = sorted(contenders, key=lambda name: contenders[name]['query_s'])
+        for i, fast in enumerate(names):
+            for slow in names[i + 1:]:
+                a, b = contenders[fast], contenders[slow]
+                rows.append({'dataset': dataset, 'algo': algo, 'fast': fast, 'slow': slow,
+                             'break_even_queries': break_even(a['preprocessing_s'], a['query_s'],
+                                                              b['preprocessing_s'], b['query_s']),
+                             'fast_preprocessing_s': a['preprocessing_s'], 'fast_query_s': a['query_s'],
+                             'slow_preprocessing_s': b['preprocessing_s'], 'slow_query_s': b['query_s']})
+    return rows
+
+
+def mix_costs(costs, dataset, mix):
+    """
+    End-to-end cost of a query mix on a dataset, per contender that ran every algorithm of the mix.
+
+    Args:
+        costs: query_costs()
+        dataset: Dataset name
+        mix: dict mapping algorithm names to query counts
+
+    Returns:
+        list: dicts with contender, preprocessing_s, queries_s (all queries of the mix) and total_s,
+              cheapest first
+    """
+    mix = {canonical_algo(algo): count for algo, count in mix.items()}
+    per_contender = defaultdict(dict)
+    for algo in mix:
+        for name, cost in costs.get((dataset, algo), {}).items():
+            per_contender[name][algo] = cost
+    rows = []
+    for name, by_algo in per_contender.items():
+        missing = sorted(set(mix) - set(by_algo))
+        if missing:
+            print(f"Skipping {name} on {dataset}: no trials of {', '.join(missing)}")
+            continue
+        # Steps shared by several algorithms of the mix are paid once
+        step_s = {}
+        for cost in by_algo.values():
+            step_s.update(cost['step_s'])
+        prep_s = sum(step_s.values())
+        queries_s = sum(count * by_algo[algo]['query_s'] for algo, count in mix.items())
+        rows.append({'contender': name, 'preprocessing_s': prep_s, 'queries_s': queries_s,
+                     'total_s': prep_s + queries_s})
+    return sorted(rows, key=lambda row: row['total_s'])
+
+
+def plot_crossover(lines, output_file, title, xlabel='Queries'):
+    """
+    Plot cost = preprocessing + k * per-query cost of every contender against k, marking the crossovers.
+
+    Args:
+        lines: dict mapping contender names to (preprocessing_s, query_s)
+    """
+    ordered = sorted(lines.values(), key=lambda line: line[1])
+    crossovers = [break_even(*a, *b) for i, a in enumerate(ordered) for b in ordered[i + 1:]]
+    finite = [k for k in crossovers if k]
+    k_max = max([MIN_PLOT_QUERIES] + [k * PLOT_MARGIN for k in finite])
+    ks = np.logspace(0, np.log10(k_max), 200)
+    fig, ax = plt.subplots(figsize=(7, 4.5))
+    for name, (prep_s, query_s) in sorted(lines.items()):
+        ax.plot(ks, prep_s + ks * query_s, label=name)
+    for k in finite:
+        ax.axvline(k, color='grey', linestyle=':', linewidth=1)
+    ax.set_xscale('log')
+    ax.set_yscale('log')
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel('End-to-end time (s)')
+    ax.set_title(title)
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+    fig.savefig(output_file, dpi=150)
+    plt.close(fig)
+
+
+def _flag(contender):
+    return '' if contender['steps'] else ' (no ledger steps)'
+
+
+def print_break_even(rows, costs):
+    print(f"{'dataset':18s} {'algo':9s} {'faster kernel':26s} {'cheaper preprocessing':26s} {'break-even':>12s}")
+    for row in rows:
+        k = row['break_even_queries']
+        verdict = 'dominates' if k == 0 else ('never' if k is None else f"{k:12.1f}")
+        fast = costs[(row['dataset'], row['algo'])][row['fast']]
+        slow = costs[(row['dataset'], row['algo'])][row['slow']]
+        print(f"{row['dataset']:18s} {row['algo']:9s} {row['fast'] + _flag(fast):26s} "
+              f"{row['slow'] + _flag(slow):26s} {verdict:>12s}")
+
+
+def parse_mix(items):
+    mix = {}
+    for item in items:
+        algo, _, count = item.partition('=')
+        mix[algo] = float(count) if count else 1.0
+    return mix
+
+
+def write_csv(path, rows):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"Report written to {path}")
+
+
+def main():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--results', default=RESULTS_ROOT, help='results directory or .jsonl snapshot')
+    common.add_argument('--ledger', default=LEDGER_PATH, help='preprocessing ledger')
+    common.add_argument('--systems', nargs='+', help='restrict to these systems')
+    parser = argparse.ArgumentParser(description='Break-even query counts and query-mix costs including preprocessing')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    be_parser = subparsers.add_parser('breakeven', parents=[common],
+                                      help='pairwise break-even query counts per dataset and algorithm')
+    be_parser.add_argument('--datasets', nargs='+', help='restrict to these datasets')
+    be_parser.add_argument('--algos', nargs='+', help='restrict to these algorithms')
+    be_parser.add_argument('--output', help='write the table to this CSV file')
+    be_parser.add_argument('--plot-dir', help='write a crossover plot per dataset and algorithm to this directory')
+    mix_parser = subparsers.add_parser('mix', parents=[common], help='end-to-end cost of a query mix on a dataset')
+    mix_parser.add_argument('dataset', help='dataset name')
+    mix_parser.add_argument('--mix', nargs='+', required=True, help='algo=count pairs, e.g. bfs=100 pr=5')
+    mix_parser.add_argument('--plot', help='plot the cost against repetitions of the mix to this file')
+    args = parser.parse_args()
+
+    records = load_campaign(args.results)
+    if args.systems:
+        systems = {system.lower() for system in args.systems}
+        records = [r for r in records if r['system'].lower() in systems]
+    costs = query_costs(records, latest_steps(load_ledger(args.ledger)))
+    if not costs:
+        print(f"No trials in {args.results}")
+        return 1
+
+    if args.command == 'breakeven':
+        algos = {canonical_algo(algo) for algo in args.algos} if args.algos else None
+        costs = {key: value for key, value in costs.items()
+                 if (not args.datasets or key[0] in args.datasets) and (not algos or key[1] in algos)}
+        rows = break_even_table(costs)
+        if not rows:
+            print("No (dataset, algo) with more than one system")
+            return 1
+        print_break_even(rows, costs)
+        if args.output:
+            write_csv(args.output, rows)
+        if args.plot_dir:
+            os.makedirs(args.plot_dir, exist_ok=True)
+            for (dataset, algo), contenders in costs.items():
+                if len(contenders) < 2:
+                    continue
+                plot_crossover({name: (c['preprocessing_s'], c['query_s']) for name, c in contenders.items()},
+                               os.path.join(args.plot_dir, f"{dataset}_{algo}_crossover.png"), f"{algo} on {dataset}")
+            print(f"Crossover plots written to {args.plot_dir}")
+    else:
+        mix = parse_mix(args.mix)
+        rows = mix_costs(costs, args.dataset, mix)
+        if not rows:
+            print(f"No system ran every algorithm of the mix on {args.dataset}")
+            return 1
+        print(f"{'contender':26s} {'preprocessing(s)':>16s} {'queries(s)':>12s} {'total(s)':>12s}")
+        for row in rows:
+            print(f"{row['contender']:26s} {row['preprocessing_s']:16.2f} {row['queries_s']:12.2f} {row['total_s']:12.2f}")
+        if args.plot:
+            lines = {row['contender']: (row['preprocessing_s'], row['queries_s']) for row in rows}
+            plot_crossover(lines, args.plot, f"Query mix on {args.dataset}", xlabel='Repetitions of the mix')
+            print(f"Plot written to {args.plot}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
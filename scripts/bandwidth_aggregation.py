@@ -0,0 +1,251 @@
+"""
+Align and aggregate the I/O bandwidth of repeated runs.
+
+compute_average_bandwidth() in the plot scripts truncates all iterations to
+the shortest one and averages them second by second. Longer runs lose their
+tails, and runs whose phases start at different offsets are averaged out of
+phase. This module aligns the runs before aggregating them:
+
+    progress: every run's time axis is rescaled to 0-100% of its duration
+    phases:   every run is split into load / compute / writeback phases
+              (detect_phases) and each phase is rescaled separately, so phase
+              boundaries line up across runs
+
+All runs are resampled at once: they are stacked in a NaN-padded matrix
+(runs x seconds) and interpolated with vectorized gathers, so hundreds of runs
+are aggregated in one pass. Across runs the median and percentile bands are
+computed, and phase_totals() reports the MB read/written and the duration of
+every phase of every run.
+"""
+
+import os
+import re
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from iostat_utils import read_iostat
+
+PHASES = ['load', 'compute', 'writeback']
+DEFAULT_POINTS = 101
+DEFAULT_PERCENTILES = (10, 25, 75, 90)
+# A second counts as I/O-active above this fraction of the run's peak bandwidth
+ACTIVE_FRACTION = 0.1
+# The load burst is the first stretch reading at more than this fraction of the peak read bandwidth
+LOAD_FRACTION = 0.5
+
+
+def load_runs(iostat_files, device):
+    """
+    Load the per-second bandwidth of one device from several iostat logs.
+
+    Report 0 of each log (iostat's averages since boot) is dropped, like in
+    io_phases.phase_io; missing seconds are filled with 0.
+
+    Returns:
+        list: One dict per run with keys file, iteration, read_mb_s, write_mb_s (numpy arrays)
+    """
+    runs = []
+    for file_path in sorted(iostat_files):
+        frame = read_iostat(file_path)
+        frame = frame[(frame['device'] == device) & (frame['timestamp'] > 0)]
+        if frame.empty:
+            continue
+        seconds = frame['timestamp'].to_numpy()
+        seconds = seconds - seconds.min()
+        length = int(seconds.max()) + 1
+        read = np.zeros(length)
+        write = np.zeros(length)
+        read[seconds] = frame['read_mb_s'].to_numpy()
+        write[seconds] = frame['write_mb_s'].to_numpy()
+        iter_match = re.search(r'_iter(\d+)_', os.path.basename(file_path))
+        runs.append({'file': file_path, 'iteration': int(iter_match.group(1)) if iter_match else len(runs),
+                     'read_mb_s': read, 'write_mb_s': write})
+    return runs
+
+
+def pad_runs(series):
+    """
+    Stack 1-D arrays of different length into a NaN-padded matrix.
+
+    Returns:
+        tuple: (matrix runs x max_length, lengths array)
+    """
+    lengths = np.array([len(s) for s in series], dtype=np.int64)
+    matrix = np.full((len(series), int(lengths.max()) if len(series) else 0), np.nan)
+    for i, s in enumerate(series):
+        matrix[i, :len(s)] = s
+    return matrix, lengths
+
+
+def resample(matrix, positions):
+    """
+    Linearly interpolate every row of matrix at fractional positions.
+
+    Args:
+        matrix: runs x seconds array (NaN-padded)
+        positions: runs x points array of fractional indices into each row (NaN = no sample)
+
+    Returns:
+        numpy.ndarray: runs x points array
+    """
+    valid = np.isfinite(positions)
+    pos = np.where(valid, positions, 0.0)
+    lower = np.floor(pos).astype(np.int64)
+    upper = np.minimum(lower + 1, matrix.shape[1] - 1)
+    weight = pos - lower
+    rows = np.arange(matrix.shape[0])[:, None]
+    below = matrix[rows, lower]
+    above = matrix[rows, upper]
+    # Past the end of a row only the lower sample is valid
+    above = np.where(np.isnan(above), below, above)
+    values = below * (1.0 - weight) + above * weight
+    return np.where(valid, values, np.nan)
+
+
+def progress_positions(lengths, num_points=DEFAULT_POINTS):
+    """
+    Sample positions mapping 0-100% progress onto each run's own duration.
+    """
+    grid = np.linspace(0.0, 1.0, num_points)
+    return grid[None, :] * (lengths[:, None] - 1)
+
+
+def detect_phases(read, write, active_fraction=ACTIVE_FRACTION, load_fraction=LOAD_FRACTION):
+    """
+    Split a run into load, compute and writeback phases from its I/O mix.
+
+    load ends with the first burst reading at more than load_fraction of the
+    run's peak read bandwidth (out-of-core systems keep reading during compute,
+    but below the initial burst), writeback is the trailing stretch of
+    write-dominated active seconds, and compute is everything in between.
+
+    Returns:
+        numpy.ndarray: Phase boundaries [0, load_end, writeback_start, length]
+    """
+    length = len(read)
+    total = read + write
+    if length == 0 or total.max() <= 0:
+        return np.array([0, 0, length, length])
+    active = total > active_fraction * total.max()
+    write_heavy = active & (write > read)
+
+    load_end = 0
+    burst = read > load_fraction * read.max() if read.max() > 0 else np.zeros(length, dtype=bool)
+    first_burst = np.flatnonzero(burst)
+    if len(first_burst):
+        # End of the first contiguous burst
+        after = np.flatnonzero(~burst[first_burst[0]:])
+        load_end = int(first_burst[0] + (after[0] if len(after) else length - first_burst[0]))
+
+    writeback_start = length
+    active_idx = np.flatnonzero(active)
+    if len(active_idx) and write_heavy[active_idx[-1]]:
+        # Walk back over the trailing write-heavy active seconds
+        tail = active_idx[::-1]
+        not_write = np.flatnonzero(~write_heavy[tail])
+        first_tail = tail[not_write[0] - 1] if len(not_write) else tail[-1]
+        writeback_start = max(int(first_tail), load_end)
+    return np.array([0, load_end, writeback_start, length])
+
+
+def phase_positions(boundaries, points_per_phase):
+    """
+    Sample positions that stretch every phase of every run to points_per_phase samples.
+
+    Args:
+        boundaries: runs x (num_phases + 1) array of phase boundaries (seconds)
+        points_per_phase: Samples per phase
+
+    Returns:
+        numpy.ndarray: runs x (num_phases * points_per_phase) positions (NaN for empty phases)
+    """
+    grid = np.linspace(0.0, 1.0, points_per_phase)
+    starts = boundaries[:, :-1].astype(np.float64)
+    spans = (boundaries[:, 1:] - boundaries[:, :-1]).astype(np.float64)
+    positions = starts[:, :, None] + grid[None, None, :] * np.maximum(spans - 1, 0)[:, :, None]
+    positions[np.broadcast_to((spans <= 0)[:, :, None], positions.shape)] = np.nan
+    return positions.reshape(len(boundaries), -1)
+
+
+def percentile_bands(matrix, percentiles=DEFAULT_PERCENTILES):
+    """
+    Median, mean and percentiles across runs (rows), ignoring NaNs.
+
+    Returns:
+        dict: name -> 1-D array ('median', 'mean', 'p10', ...)
+    """
+    # Columns where no run has a sample (e.g. a phase absent from every run) stay NaN
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        bands = {'median': np.nanmedian(matrix, axis=0), 'mean': np.nanmean(matrix, axis=0),
+                 'std': np.nanstd(matrix, axis=0)}
+        values = np.nanpercentile(matrix, percentiles, axis=0)
+    for p, row in zip(percentiles, values):
+        bands[f"p{p}"] = row
+    return bands
+
+
+def phase_totals(runs, boundaries):
+    """
+    MB read/written and duration of every phase of every run.
+
+    Returns:
+        pandas.DataFrame: One row per (run, phase)
+    """
+    rows = []
+    for run, bounds in zip(runs, boundaries):
+        cum_read = np.concatenate([[0.0], np.cumsum(run['read_mb_s'])])
+        cum_write = np.concatenate([[0.0], np.cumsum(run['write_mb_s'])])
+        read_mb = cum_read[bounds[1:]] - cum_read[bounds[:-1]]
+        write_mb = cum_write[bounds[1:]] - cum_write[bounds[:-1]]
+        for phase, start, end, r, w in zip(PHASES, bounds[:-1], bounds[1:], read_mb, write_mb):
+            rows.append({'file': os.path.basename(run['file']), 'iteration': run['iteration'], 'phase': phase,
+                         'start_s': int(start), 'duration_s': int(end - start), 'read_mb': r, 'write_mb': w})
+    return pd.DataFrame(rows)
+
+
+def aggregate_runs(iostat_files, device, align='progress', num_points=DEFAULT_POINTS,
+                   percentiles=DEFAULT_PERCENTILES):
+    """
+    Align the runs of one benchmark and aggregate their bandwidth.
+
+    Args:
+        iostat_files: iostat logs of the repeats of one benchmark
+        device: Device to analyze
+        align: 'progress' or 'phases'
+        num_points: Number of samples on the aligned axis
+        percentiles: Percentile bands to compute
+
+    Returns:
+        tuple: (DataFrame with 'progress' (0-100), optionally 'phase', and per metric
+                <metric>_median/_mean/_std/_pN columns; per-phase totals DataFrame), or (None, None)
+    """
+    runs = load_runs(iostat_files, device)
+    if not runs:
+        return None, None
+    read, lengths = pad_runs([r['read_mb_s'] for r in runs])
+    write, _ = pad_runs([r['write_mb_s'] for r in runs])
+    matrices = {'read_mb_s': read, 'write_mb_s': write, 'total_mb_s': read + write}
+    boundaries = np.array([detect_phases(r['read_mb_s'], r['write_mb_s']) for r in runs])
+
+    if align == 'phases':
+        points_per_phase = max(num_points // len(PHASES), 2)
+        positions = phase_positions(boundaries, points_per_phase)
+        progress = np.linspace(0.0, 100.0, positions.shape[1])
+        phase_labels = np.repeat(PHASES, points_per_phase)
+    else:
+        positions = progress_positions(lengths, num_points)
+        progress = np.linspace(0.0, 100.0, num_points)
+        phase_labels = None
+
+    aggregated = pd.DataFrame({'progress': progress})
+    if phase_labels is not None:
+        aggregated['phase'] = phase_labels
+    for metric, matrix in matrices.items():
+        for name, values in percentile_bands(resample(matrix, positions), percentiles).items():
+            aggregated[f"{metric}_{name}"] = values
+    aggregated['num_runs'] = len(runs)
+    aggregated['median_duration_s'] = float(np.median(lengths))
+    return aggregated, phase_totals(runs, boundaries)
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Render all figures of a campaign in parallel.
+
+consolidated_bandwidth_plots.py and the plot_io_bandwidth.py scripts draw one
+matplotlib figure after the other in a single process. This renderer first
+builds a list of plot specifications from the results root, then renders them
+in a process pool with the Agg backend:
+
+    runtime     - per (dataset, algo): trial times of every system (results_store records)
+    timeseries  - per iostat log: read/write bandwidth over time of one device
+    bandwidth   - per benchmark: aligned median read/write bandwidth of every system
+                  with a p25-p75 band (bandwidth_aggregation.py)
+
+Each specification carries a hash of its input data and parameters. Figures
+whose hash matches the one recorded in <output_dir>/plot_manifest.json are not
+rendered again. Time series longer than --max-points are downsampled with
+Largest-Triangle-Three-Buckets before plotting.
+
+Usage:
+    python batch_plots.py --results-dir /results --output-dir /results/plots --device nvme0n1 -j 16
+"""
+
+import os
+import sys
+import json
+import glob
+import hashlib
+import argparse
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import matplotlib
+matplotlib.use('Agg')  # Use non-interactive backend
+import matplotlib.pyplot as plt
+import numpy as np
+
+from results_store import RESULTS_ROOT, load_results_dir, group_trials
+from iostat_utils import read_iostat
+from bandwidth_aggregation import aggregate_runs
+
+MANIFEST_NAME = "plot_manifest.json"
+DEFAULT_MAX_POINTS = 2000
+# Bump when the rendering code changes so that all figures are redrawn
+RENDER_VERSION = 1
+
+
+def lttb(x, y, threshold):
+    """
+    Downsample a series with Largest-Triangle-Three-Buckets.
+
+    Keeps the first and last point and, per bucket, the point forming the largest
+    triangle with the previously kept point and the average of the next bucket.
+
+    Args:
+        x, y: 1-D arrays of equal length (x increasing)
+        threshold: Number of points to keep
+
+    Returns:
+        tuple: (x, y) downsampled arrays
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return x, y
+
+    # Bucket edges over the points between the first and the last one
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    keep = np.empty(threshold, dtype=np.int64)
+    keep[0] = 0
+    keep[-1] = n - 1
+    previous = 0
+    for b in range(threshold - 2):
+        start, end = edges[b], max(edges[b + 1], edges[b] + 1)
+        next_start, next_end = edges[b + 1], edges[b + 2] if b + 2 < len(edges) else n
+        avg_x = x[next_start:max(next_end, next_start + 1)].mean()
+        avg_y = y[next_start:max(next_end, next_start + 1)].mean()
+        area = np.abs((x[previous] - avg_x) * (y[start:end] - y[previous]) -
+                      (x[previous] - x[start:end]) * (avg_y - y[previous]))
+        previous = start + int(np.argmax(area))
+        keep[b + 1] = previous
+    return x[keep], y[keep]
+
+
+def _hash_files(paths):
+    digest = hashlib.sha256()
+    for path in sorted(paths):
+        digest.update(path.encode())
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _spec_hash(spec, data_hash):
+    params = {k: v for k, v in spec.items() if k not in ('inputs', 'data')}
+    digest = hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode())
+    digest.update(data_hash.encode())
+    digest.update(str(RENDER_VERSION).encode())
+    return digest.hexdigest()
+
+
+def build_specs(results_dir, output_dir, device, systems=None, pattern='*_iostat.log', max_points=DEFAULT_MAX_POINTS):
+    """
+    Build the plot specifications of a campaign.
+
+    Returns:
+        list: Plot specifications (dicts with kind, output, inputs or data, and parameters)
+    """
+    specs = []
+
+    # Runtime figures from the per-trial records
+    groups = defaultdict(dict)
+    for (system, dataset, algo, params), times in group_trials(load_results_dir(results_dir, systems)).items():
+        label = f"{system} ({params})" if params else system
+        groups[(dataset, algo)][label] = sorted(times)
+    for (dataset, algo), data in sorted(groups.items()):
+        specs.append({'kind': 'runtime', 'title': f"{algo} on {dataset}",
+                      'output': os.path.join(output_dir, 'runtime', f"{dataset}_{algo}_runtime.png"),
+                      'data': data})
+
+    # Bandwidth figures from the iostat logs
+    benchmarks = defaultdict(dict)
+    system_dirs = systems or sorted(d for d in os.listdir(results_dir) if os.path.isdir(os.path.join(results_dir, d)))
+    for system in system_dirs:
+        for iostat_file in sorted(glob.glob(os.path.join(results_dir, system, pattern))):
+            name = os.path.basename(iostat_file)[:-len('.log')]
+            specs.append({'kind': 'timeseries', 'device': device, 'max_points': max_points,
+                          'title': f"{system}: {name}",
+                          'output': os.path.join(output_dir, 'timeseries', system, f"{name}_{device}.png"),
+                          'inputs': [iostat_file]})
+            benchmark = os.path.basename(iostat_file).split('_iter')[0]
+            benchmarks[benchmark].setdefault(system, []).append(iostat_file)
+    for benchmark, per_system in sorted(benchmarks.items()):
+        specs.append({'kind': 'bandwidth', 'device': device, 'title': benchmark,
+                      'output': os.path.join(output_dir, 'bandwidth', f"{benchmark}_{device}.png"),
+                      'inputs': [f for files in per_system.values() for f in files],
+                      'systems': per_system})
+    return specs
+
+
+def render_runtime(spec):
+    data = spec['data']
+    fig, ax = plt.subplots(figsize=(max(6, 1.2 * len(data)), 5))
+    labels = list(data.keys())
+    ax.boxplot([data[label] for label in labels], showfliers=True)
+    ax.set_xticks(range(1, len(labels) + 1))
+    ax.set_xticklabels(labels, rotation=30, ha='right')
+    ax.set_ylabel('Time (s)')
+    ax.set_yscale('log')
+    ax.set_title(spec['title'])
+    ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+    fig.savefig(spec['output'], dpi=150)
+    plt.close(fig)
+
+
+def render_timeseries(spec):
+    frame = read_iostat(spec['inputs'][0])
+    frame = frame[frame['device'] == spec['device']].sort_values('timestamp')
+    if frame.empty:
+        return False
+    fig, ax = plt.subplots(figsize=(12, 5))
+    for column, label, color in (('read_mb_s', 'Read MB/s', 'b'), ('write_mb_s', 'Write MB/s', 'r')):
+        x, y = lttb(frame['timestamp'].to_numpy(), frame[column].to_numpy(), spec['max_points'])
+        ax.plot(x, y, color=color, label=label, linewidth=1.2)
+    ax.set_xlabel('Time (seconds)')
+    ax.set_ylabel('Bandwidth (MB/s)')
+    ax.set_title(spec['title'])
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+    fig.savefig(spec['output'], dpi=150)
+    plt.close(fig)
+    return True
+
+
+def render_bandwidth(spec):
+    fig, axes = plt.subplots(2, 1, figsize=(12, 9), sharex=True)
+    plotted = False
+    for system, files in sorted(spec['systems'].items()):
+        aggregated, _ = aggregate_runs(files, spec['device'])
+        if aggregated is None:
+            continue
+        plotted = True
+        for ax, metric in zip(axes, ('read_mb_s', 'write_mb_s')):
+            line, = ax.plot(aggregated['progress'], aggregated[f'{metric}_median'], label=system, linewidth=1.8)
+            ax.fill_between(aggregated['progress'], aggregated[f'{metric}_p25'], aggregated[f'{metric}_p75'],
+                            color=line.get_color(), alpha=0.2)
+    if not plotted:
+        plt.close(fig)
+        return False
+    axes[0].set_ylabel('Read Bandwidth (MB/s)')
+    axes[1].set_ylabel('Write Bandwidth (MB/s)')
+    axes[1].set_xlabel('Progress (%)')
+    axes[0].set_title(f"{spec['title']} - Device: {spec['device']}")
+    for ax in axes:
+        ax.legend()
+        ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+    fig.savefig(spec['output'], dpi=150)
+    plt.close(fig)
+    return True
+
+
+RENDERERS = {'runtime': render_runtime, 'timeseries': render_timeseries, 'bandwidth': render_bandwidth}
+
+
+def render_spec(spec):
+    """
+    Render one specification (runs in a worker process).
+
+    Returns:
+        tuple: (output path, True if a figure was written)
+    """
+    os.makedirs(os.path.dirname(spec['output']), exist_ok=True)
+    written = RENDERERS[spec['kind']](spec)
+    return spec['output'], written is not False
+
+
+def render_all(specs, output_dir, jobs=None, force=False):
+    """
+    Render the specifications whose input hash changed, in a process pool.
+
+    Returns:
+        tuple: (number rendered, number skipped as unchanged)
+    """
+    manifest_file = os.path.join(output_dir, MANIFEST_NAME)
+    manifest = {}
+    if os.path.exists(manifest_file) and not force:
+        with open(manifest_file, 'r') as f:
+            manifest = json.load(f)
+
+    todo = []
+    for spec in specs:
+        data_hash = _hash_files(spec['inputs']) if 'inputs' in spec else \
+            hashlib.sha256(json.dumps(spec['data'], sort_keys=True).encode()).hexdigest()
+        spec_hash = _spec_hash(spec, data_hash)
+        if manifest.get(spec['output']) == spec_hash and os.path.exists(spec['output']):
+            continue
+        todo.append((spec, spec_hash))
+
+    skipped = len(specs) - len(todo)
+    print(f"{len(specs)} figures: {len(todo)} to render, {skipped} unchanged")
+    rendered = 0
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {pool.submit(render_spec, spec): spec_hash for spec, spec_hash in todo}
+        for future in as_completed(futures):
+            try:
+                output, written = future.result()
+            except Exception as e:
+                print(f"Warning: rendering failed: {e}")
+                continue
+            if written:
+                manifest[output] = futures[future]
+                rendered += 1
+
+    os.makedirs(output_dir, exist_ok=True)
+    with open(manifest_file, 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    return rendered, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Render all campaign figures in parallel')
+    parser.add_argument('--results-dir', default=RESULTS_ROOT, help='results root with one directory per system')
+    parser.add_argument('--output-dir', required=True, help='directory for the figures and the manifest')
+    parser.add_argument('--device', required=True, help='device of the bandwidth figures (e.g. nvme0n1)')
+    parser.add_argument('--systems', nargs='+', help='restrict to these systems')
+    parser.add_argument('--pattern', default='*_iostat.log', help='iostat file pattern')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(), help='worker processes')
+    parser.add_argument('--max-points', type=int, default=DEFAULT_MAX_POINTS,
+                        help='downsample time series longer than this (LTTB)')
+    parser.add_argument('--force', action='store_true', help='render everything, ignoring the manifest')
+    args = parser.parse_args()
+
+    specs = build_specs(args.results_dir, args.output_dir, args.device, args.systems, args.pattern, args.max_points)
+    rendered, skipped = render_all(specs, args.output_dir, args.jobs, args.force)
+    print(f"Rendered {rendered} figures, skipped {skipped} unchanged, output in {args.output_dir}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
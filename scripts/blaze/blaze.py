@@ -6,14 +6,17 @@ import argparse
 from pathlib import Path
 
 # Add parent directory to path to import shared utilities
-sys.path.insert(0, '/scripts')
+sys.path.insert(0, os.environ.get('BENCH_SCRIPTS_DIR', '/scripts'))
+from paths import DATASET_DIR, SYSTEMS_DIR, RESULTS_ROOT, EXTRA_SPACE_DIR
 from dataset_properties import get_available_cpus
+from preprocessing_ledger import run_step
 
-SRC_DIR = "/systems/ooc/blaze"
-BUILD_DIR = "/systems/ooc/blaze/build"
-DATASET_DIR = "/datasets"
-RESULTS_DIR = "/results/blaze"
-TEMP_DIR = "/extra_space"
+SRC_DIR = f"{SYSTEMS_DIR}/ooc/blaze"
+BUILD_DIR = f"{SYSTEMS_DIR}/ooc/blaze/build"
+RESULTS_DIR = f"{RESULTS_ROOT}/blaze"
+TEMP_DIR = EXTRA_SPACE_DIR
+# Where galois.py writes the .gr it records as "galois.gr" in the preprocessing ledger
+GALOIS_DIR = f"{EXTRA_SPACE_DIR}/galois"
 
 REPEATS = 5
 PR_MAX_ITERS = 20
@@ -28,19 +31,19 @@ def convert_galois_to_blaze(args, dataset):
   # Create the output directory
   os.makedirs(f"{DATASET_DIR}/blaze", exist_ok=True)
 
-  galois_file = f"{DATASET_DIR}/galois/{dataset}.gr"
+  galois_file = f"{GALOIS_DIR}/{dataset}.gr"
   blaze_index_file = f"{DATASET_DIR}/blaze/{dataset}.gr.index"
   blaze_adj_file = f"{DATASET_DIR}/blaze/{dataset}.gr.adj.1.0" # <dataset>.adj.<num_disks>.<partition_id>
 
   # Run the conversion command
   cmd = [f"{BUILD_DIR}/bin/convert", f"{galois_file}", f"{blaze_index_file}" ,f"{blaze_adj_file}"]
-  result = subprocess.run(["/usr/bin/time", "-p"] + cmd, stderr=subprocess.PIPE, universal_newlines=True)
-  gal2blaze_time = float(re.search(r'user\s+(\d+\.\d+)', result.stderr).group(1))
+  # Wall time, like every other conversion in the preprocessing ledger (this used to report user time)
+  gal2blaze_time = run_step("blaze", dataset, "blaze.index", cmd, depends_on=["galois.gr"]).wall_s
   print(f"Gal2Blaze time: {gal2blaze_time}")
 
   # find time to convert from edge list to galois format by reading the log file
   el2galois_time = 0
-  with open(f"/results/galois/conv_time_{dataset}.txt", "r") as f:
+  with open(f"{RESULTS_ROOT}/galois/conv_time_{dataset}.txt", "r") as f:
     el2galois_time = float(f.read().strip())
   print(f"EL2Galois time: {el2galois_time}")
 
@@ -88,13 +91,13 @@ def parse_log(buffer, algo):
 
 def do_bfs(blaze_index_file, blaze_adj_file, dataset):
   # Read random start nodes from .bfsver file
-  bfsver_path = Path(f"/datasets/{dataset}/{dataset}").with_suffix(".bfsver")
+  bfsver_path = Path(f"{DATASET_DIR}/{dataset}/{dataset}").with_suffix(".bfsver")
   with open(bfsver_path, "r") as f:
     random_starts = f.read().splitlines()
     print(random_starts)
 
-  outfile_csv = f"/results/blaze/{dataset}_bfs.csv"
-  outfile_log = f"/results/blaze/{dataset}_bfs.log"
+  outfile_csv = f"{RESULTS_ROOT}/blaze/{dataset}_bfs.csv"
+  outfile_log = f"{RESULTS_ROOT}/blaze/{dataset}_bfs.log"
   # Run serial BFS
   with open(outfile_csv, "w") as f:
     f.write("read_time(ms),algo_time(ms),mem_used(MB),start_node,num_threads, maj_flt, min_flt, blk_in, blk_out\n")
@@ -110,8 +113,8 @@ def do_bfs(blaze_index_file, blaze_adj_file, dataset):
 
 
 def do_pagerank(blaze_index_file, blaze_adj_file, dataset):
-  outfile_csv = f"/results/blaze/{dataset}_pagerank.csv"
-  outfile_log = f"/results/blaze/{dataset}_pagerank.log"
+  outfile_csv = f"{RESULTS_ROOT}/blaze/{dataset}_pagerank.csv"
+  outfile_log = f"{RESULTS_ROOT}/blaze/{dataset}_pagerank.log"
 
   with open(outfile_csv, "w") as f:
     f.write("read_time(ms),algo_time(ms),mem_used(MB),num_threads, maj_flt, min_flt, blk_in, blk_out\n")
@@ -139,14 +142,14 @@ def main():
   # No need to build the project -- done in dockerfile
   datasets = ["graph500_23", "road_asia", "road_usa", "livejournal", "orkut", "dota_league", "graph500_26", "graph500_28", "twitter_mpi"]#, "graph500_30"]
 
-  # Blaze needs the galois format to begin with. Galois stores the graph in a binary .gr format in /datasets/galois directory.
+  # Blaze needs the galois format to begin with. Galois stores the graph in a binary .gr format in GALOIS_DIR.
   # We need to convert this to blaze format. Once we are done, we can delete the galois format and the blaze format.
   for dataset in datasets:
-    galois_file = f"{DATASET_DIR}/galois/{dataset}.gr"
+    galois_file = f"{GALOIS_DIR}/{dataset}.gr"
     blaze_index_file = f"{TEMP_DIR}/{dataset}.gr.index" # <dataset>.adj.<num_disks>.<partition_id>
     blaze_adj_file = f"{TEMP_DIR}/{dataset}.gr.adj.1.0"
     el2gal_time, gal2blaze_time = convert_galois_to_blaze(args, dataset)
-    with open(f"/results/blaze/conv_time_{dataset}.txt", "w") as f:
+    with open(f"{RESULTS_ROOT}/blaze/conv_time_{dataset}.txt", "w") as f:
       f.write("e2gal, gal2blaze, total\n")
       f.write( f"{round(el2gal_time, 2)}, {round(gal2blaze_time, 2)}, {round(el2gal_time + gal2blaze_time, 2)}\n")
 
@@ -0,0 +1,230 @@
+"""
+Build-artifact cache keyed by a hash of the system's source tree.
+
+The runners used to rebuild their system on every invocation (make clean && make -j,
+or cmake plus one make per target). cached_build() hashes the source files, the
+build commands/flags, the compiler environment (CXX, CXXFLAGS, ...) and the
+compiler version, and only runs the build when that
+key has not been built before. Built binaries are stored under
+BUILD_CACHE_DIR/<system>/<key>/ and copied back into the source tree on a hit, so
+repeated campaigns run bit-identical binaries.
+
+Usage from a runner:
+
+    from build_cache import cached_build
+    cached_build("gemini", SRC_DIR, ["make clean && make -j"],
+                 artifacts=["toolkits/bfs", "toolkits/pagerank"], cwd=SRC_DIR)
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import subprocess
+
+from paths import EXTRA_SPACE_DIR
+
+BUILD_CACHE_DIR = f"{EXTRA_SPACE_DIR}/build_cache"
+
+# Files that influence the build output
+SOURCE_EXTENSIONS = ('.c', '.cc', '.cpp', '.cxx', '.h', '.hh', '.hpp', '.hxx', '.inl', '.cu',
+                     '.cmake', '.mk', '.in', '.S', '.s')
+SOURCE_NAMES = ('Makefile', 'makefile', 'GNUmakefile', 'CMakeLists.txt', 'configure')
+# Directories that never contain inputs of the build
+SKIP_DIRS = ('.git', 'build', 'bin', '__pycache__', 'CMakeFiles')
+
+# Compiler variables read by the Makefiles and CMake, with the compiler they default to
+COMPILERS = {'CXX': 'c++', 'CC': 'cc'}
+BUILD_ENV_VARS = ('CXX', 'CC', 'CXXFLAGS', 'CFLAGS', 'CPPFLAGS', 'LDFLAGS')
+
+
+def _is_source_file(filename):
+    return filename in SOURCE_NAMES or filename.endswith(SOURCE_EXTENSIONS)
+
+
+def _file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _build_env():
+    """
+    Return the compiler variables of the environment the build runs in (part of the cache key).
+    """
+    return {var: os.environ.get(var, '') for var in BUILD_ENV_VARS}
+
+
+def _compiler_versions():
+    """
+    Return the version banners of the compilers the build uses ($CXX and $CC, or their defaults).
+    """
+    versions = []
+    for var, default in COMPILERS.items():
+        compiler = os.environ.get(var) or default
+        try:
+            result = subprocess.run(compiler.split() + ['--version'], stdout=subprocess.PIPE,
+                                    stderr=subprocess.DEVNULL, text=True)
+            versions.append(result.stdout.splitlines()[0] if result.stdout else '')
+        except OSError:
+            versions.append('')
+    return versions
+
+
+def hash_source_tree(src_dir, exclude=(), index_file=None):
+    """
+    Hash all build inputs below src_dir.
+
+    File digests are memoised in index_file keyed by (size, mtime), so an unchanged
+    tree is re-hashed with one stat() per file instead of reading every source.
+
+    Args:
+        src_dir: Root of the system's source tree
+        exclude: Relative paths (files or directories) to leave out, e.g. the artifacts
+        index_file: Optional JSON file used to memoise per-file digests
+
+    Returns:
+        str: Hex digest of the tree
+    """
+    index = {}
+    if index_file and os.path.exists(index_file):
+        try:
+            with open(index_file, 'r') as f:
+                index = json.load(f)
+        except (IOError, ValueError):
+            index = {}
+
+    exclude = tuple(os.path.normpath(e) for e in exclude)
+    new_index = {}
+    tree_digest = hashlib.sha256()
+    for root, dirs, files in os.walk(src_dir):
+        rel_root = os.path.relpath(root, src_dir)
+        dirs[:] = sorted(d for d in dirs if d not in SKIP_DIRS and
+                         os.path.normpath(os.path.join(rel_root, d)) not in exclude)
+        for filename in sorted(files):
+            rel_path = os.path.normpath(os.path.join(rel_root, filename))
+            if not _is_source_file(filename) or rel_path in exclude:
+                continue
+            path = os.path.join(root, filename)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            cached = index.get(rel_path)
+            if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+                digest = cached[2]
+            else:
+                digest = _file_digest(path)
+            new_index[rel_path] = [st.st_size, st.st_mtime_ns, digest]
+            tree_digest.update(rel_path.encode())
+            tree_digest.update(digest.encode())
+
+    if index_file:
+        os.makedirs(os.path.dirname(index_file), exist_ok=True)
+        with open(index_file, 'w') as f:
+            json.dump(new_index, f)
+    return tree_digest.hexdigest()
+
+
+def compute_build_key(system, src_dir, build_cmds, artifacts, flags=''):
+    """
+    Compute the cache key of a build: source tree + commands + flags + compiler environment + compiler.
+
+    Returns:
+        str: Short hex key
+    """
+    index_file = os.path.join(BUILD_CACHE_DIR, system, 'source_index.json')
+    key = hashlib.sha256()
+    key.update(hash_source_tree(src_dir, exclude=artifacts, index_file=index_file).encode())
+    key.update(json.dumps([str(c) for c in build_cmds]).encode())
+    key.update(flags.encode())
+    key.update(json.dumps(_build_env(), sort_keys=True).encode())
+    for version in _compiler_versions():
+        key.update(version.encode())
+    return key.hexdigest()[:16]
+
+
+def _copy_artifact(src, dst):
+    if os.path.isdir(src):
+        if os.path.exists(dst):
+            shutil.rmtree(dst)
+        shutil.copytree(src, dst, symlinks=True)
+    else:
+        os.makedirs(os.path.dirname(dst) or '.', exist_ok=True)
+        shutil.copy2(src, dst)
+
+
+def _run_build(build_cmds, cwd):
+    for cmd in build_cmds:
+        print(f"Command: {cmd if isinstance(cmd, str) else ' '.join(cmd)}")
+        subprocess.run(cmd, shell=isinstance(cmd, str), cwd=cwd, check=True)
+
+
+def cached_build(system, src_dir, build_cmds, artifacts, flags='', cwd=None, dry_run=False):
+    """
+    Build a system, or restore its binaries from the cache if nothing changed.
+
+    Args:
+        system: Name of the system, used as the cache namespace
+        src_dir: Root of the system's source tree (artifact paths are relative to it)
+        build_cmds: List of commands to run on a miss (shell strings or argv lists)
+        artifacts: Relative paths of the files/directories the build produces
+        flags: Extra compiler/build flags that are not part of build_cmds
+        cwd: Working directory of the build commands (default: src_dir)
+        dry_run: Only print what would happen
+
+    Returns:
+        bool: True if the binaries came from the cache, False if a build ran
+    """
+    key = compute_build_key(system, src_dir, build_cmds, artifacts, flags)
+    entry_dir = os.path.join(BUILD_CACHE_DIR, system, key)
+    manifest_file = os.path.join(entry_dir, 'manifest.json')
+    # Key of the binaries currently installed in src_dir (kept out of the source tree)
+    stamp_file = os.path.join(BUILD_CACHE_DIR, system, 'installed_key')
+
+    if os.path.exists(manifest_file):
+        with open(manifest_file, 'r') as f:
+            manifest = json.load(f)
+        current_stamp = None
+        if os.path.exists(stamp_file):
+            with open(stamp_file, 'r') as f:
+                current_stamp = f.read().strip()
+        stored = manifest['artifacts']
+        if current_stamp == key and all(os.path.exists(os.path.join(src_dir, a)) for a in stored):
+            print(f"Build cache hit for {system} ({key}), binaries already in place")
+            return True
+        print(f"Build cache hit for {system} ({key}), restoring {len(stored)} artifacts")
+        if not dry_run:
+            for artifact in stored:
+                _copy_artifact(os.path.join(entry_dir, 'artifacts', artifact), os.path.join(src_dir, artifact))
+            with open(stamp_file, 'w') as f:
+                f.write(key + "\n")
+        return True
+
+    print(f"Build cache miss for {system} ({key}), building")
+    if dry_run:
+        for cmd in build_cmds:
+            print(f"Command: {cmd if isinstance(cmd, str) else ' '.join(cmd)}")
+        return False
+
+    _run_build(build_cmds, cwd or src_dir)
+
+    stored = []
+    for artifact in artifacts:
+        path = os.path.join(src_dir, artifact)
+        if not os.path.exists(path):
+            print(f"Warning: expected build artifact {path} was not produced, not caching it")
+            continue
+        _copy_artifact(path, os.path.join(entry_dir, 'artifacts', artifact))
+        stored.append(artifact)
+
+    os.makedirs(entry_dir, exist_ok=True)
+    with open(manifest_file, 'w') as f:
+        json.dump({'system': system, 'key': key, 'flags': flags, 'env': _build_env(),
+                   'build_cmds': [str(c) for c in build_cmds], 'artifacts': stored}, f, indent=2)
+    with open(stamp_file, 'w') as f:
+        f.write(key + "\n")
+    print(f"Cached {len(stored)} artifacts for {system} in {entry_dir}")
+    return False
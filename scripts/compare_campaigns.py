@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Detect performance regressions between two benchmark campaigns.
+
+Both campaigns are loaded with results_store (either a results directory or a
+.jsonl snapshot). Trials are matched on (system, dataset, algo, params) and the
+per-trial times of every matched group are compared with a Mann-Whitney U test
+or a bootstrap test on the ratio of medians. p-values are corrected for the
+number of groups with Benjamini-Hochberg, and the significant changes are
+reported ranked by effect size.
+
+Usage:
+    python compare_campaigns.py BASELINE CANDIDATE [--test mwu|bootstrap] [--alpha 0.05] [--output report.csv]
+
+Example:
+    python compare_campaigns.py /results/campaigns/before_rebuild.jsonl /results --systems gemini galois
+"""
+
+import math
+import random
+import argparse
+import csv
+
+from results_store import load_campaign, group_trials
+
+# Exact Mann-Whitney p-values are computed up to this many trials per side
+EXACT_MWU_MAX_N = 25
+BOOTSTRAP_SAMPLES = 10000
+
+
+def _median(values):
+    ordered = sorted(values)
+    mid = len(ordered) // 2
+    if len(ordered) % 2:
+        return ordered[mid]
+    return (ordered[mid - 1] + ordered[mid]) / 2.0
+
+
+def _ranks(values):
+    """
+    Return average ranks (1-based) of values, plus the tie-group sizes.
+    """
+    order = sorted(range(len(values)), key=lambda i: values[i])
+    ranks = [0.0] * len(values)
+    ties = []
+    i = 0
+    while i < len(order):
+        j = i
+        while j + 1 < len(order) and values[order[j + 1]] == values[order[i]]:
+            j += 1
+        avg_rank = (i + j) / 2.0 + 1
+        for k in range(i, j + 1):
+            ranks[order[k]] = avg_rank
+        ties.append(j - i + 1)
+        i = j + 1
+    return ranks, ties
+
+
+def _exact_mwu_counts(n, m):
+    """
+    Distribution of the U statistic for samples of size n and m without ties.
+
+    Returns:
+        list: counts[u] = number of orderings that give U == u
+    """
+    # table[i][j] holds the distribution for sample sizes (i, j); the largest of the
+    # i + j values is either an x (it beats all j y's) or a y (it adds nothing to U)
+    table = [[[1] for _ in range(m + 1)] for _ in range(n + 1)]
+    for i in range(1, n + 1):
+        for j in range(1, m + 1):
+            counts = [0] * (i * j + 1)
+            for u, c in enumerate(table[i - 1][j]):
+                counts[u + j] += c
+            for u, c in enumerate(table[i][j - 1]):
+                counts[u] += c
+            table[i][j] = counts
+    return table[n][m]
+
+
+def mann_whitney_u(x, y):
+    """
+    Two-sided Mann-Whitney U test.
+
+    Uses the exact distribution for small samples without ties and the normal
+    approximation with tie and continuity correction otherwise.
+
+    Args:
+        x: Sample of the baseline campaign
+        y: Sample of the candidate campaign
+
+    Returns:
+        tuple: (U statistic of x, two-sided p-value)
+    """
+    n, m = len(x), len(y)
+    ranks, ties = _ranks(list(x) + list(y))
+    rank_sum_x = sum(ranks[:n])
+    u_x = rank_sum_x - n * (n + 1) / 2.0
+    u_min = min(u_x, n * m - u_x)
+
+    has_ties = any(t > 1 for t in ties)
+    if not has_ties and n <= EXACT_MWU_MAX_N and m <= EXACT_MWU_MAX_N:
+        counts = _exact_mwu_counts(n, m)
+        total = sum(counts)
+        tail = sum(counts[:int(u_min) + 1])
+        return u_x, min(1.0, 2.0 * tail / total)
+
+    mean_u = n * m / 2.0
+    tie_term = sum(t ** 3 - t for t in ties) / ((n + m) * (n + m - 1)) if n + m > 1 else 0.0
+    var_u = n * m / 12.0 * ((n + m + 1) - tie_term)
+    if var_u <= 0:
+        return u_x, 1.0
+    z = (abs(u_x - mean_u) - 0.5) / math.sqrt(var_u)
+    p = math.erfc(max(z, 0.0) / math.sqrt(2.0))
+    return u_x, min(1.0, p)
+
+
+def cliffs_delta(x, y):
+    """
+    Cliff's delta effect size: P(x > y) - P(x < y).
+
+    Positive values mean the baseline times are larger, i.e. the candidate is faster.
+    """
+    greater = sum(1 for a in x for b in y if a > b)
+    less = sum(1 for a in x for b in y if a < b)
+    return (greater - less) / float(len(x) * len(y))
+
+
+def bootstrap_median_ratio(x, y, samples=BOOTSTRAP_SAMPLES, seed=0):
+    """
+    Bootstrap test on the ratio median(x) / median(y).
+
+    Args:
+        x: Baseline times
+        y: Candidate times
+        samples: Number of bootstrap resamples
+        seed: Seed of the resampling RNG so that reports are reproducible
+
+    Returns:
+        tuple: (two-sided p-value, (ci_low, ci_high) 95% interval of the ratio)
+    """
+    rng = random.Random(seed)
+    log_ratios = []
+    for _ in range(samples):
+        bx = [x[rng.randrange(len(x))] for _ in range(len(x))]
+        by = [y[rng.randrange(len(y))] for _ in range(len(y))]
+        mx, my = _median(bx), _median(by)
+        if mx > 0 and my > 0:
+            log_ratios.append(math.log(mx / my))
+    if not log_ratios:
+        return 1.0, (float('nan'), float('nan'))
+    log_ratios.sort()
+    below = sum(1 for r in log_ratios if r <= 0)
+    above = len(log_ratios) - below
+    p = min(1.0, 2.0 * min(below, above) / len(log_ratios))
+    low = math.exp(log_ratios[int(0.025 * (len(log_ratios) - 1))])
+    high = math.exp(log_ratios[int(0.975 * (len(log_ratios) - 1))])
+    return p, (low, high)
+
+
+def benjamini_hochberg(p_values):
+    """
+    Benjamini-Hochberg adjusted p-values (q-values), in input order.
+    """
+    count = len(p_values)
+    order = sorted(range(count), key=lambda i: p_values[i])
+    q_values = [1.0] * count
+    running_min = 1.0
+    for rank in range(count, 0, -1):
+        i = order[rank - 1]
+        running_min = min(running_min, p_values[i] * count / rank)
+        q_values[i] = running_min
+    return q_values
+
+
+def min_mwu_p_value(n, m):
+    """
+    Smallest two-sided p-value the exact Mann-Whitney test can give for samples of size n and m.
+
+    It is reached when the samples do not overlap: 2 of the C(n+m, n) orderings are as extreme.
+    """
+    return min(1.0, 2.0 / math.comb(n + m, n))
+
+
+def compare_campaigns(baseline_records, candidate_records, test='mwu', alpha=0.05, min_change=0.0, min_trials=4):
+    """
+    Compare two campaigns group by group.
+
+    Args:
+        baseline_records: Per-trial records of the reference campaign
+        candidate_records: Per-trial records of the new campaign
+        test: 'mwu' (Mann-Whitney U) or 'bootstrap' (ratio of medians)
+        alpha: Significance level applied to the BH-adjusted p-values
+        min_change: Minimum relative change of the median (e.g. 0.05 = 5%) to report a change
+        min_trials: Groups with fewer trials on either side are skipped (3 vs 3 trials
+                    cannot go below p=0.1, see min_mwu_p_value)
+
+    Returns:
+        list: One dict per matched group, ranked with significant changes first,
+              largest effect first
+    """
+    baseline = group_trials(baseline_records)
+    candidate = group_trials(candidate_records)
+    matched = sorted(set(baseline) & set(candidate))
+
+    rows = []
+    skipped = 0
+    underpowered = 0
+    for key in matched:
+        x, y = baseline[key], candidate[key]
+        if len(x) < min_trials or len(y) < min_trials:
+            skipped += 1
+            continue
+        if test == 'mwu' and min_mwu_p_value(len(x), len(y)) >= alpha:
+            underpowered += 1
+        median_x, median_y = _median(x), _median(y)
+        speedup = median_x / median_y if median_y > 0 else float('inf')
+        if test == 'bootstrap':
+            p, (ci_low, ci_high) = bootstrap_median_ratio(x, y)
+        else:
+            _, p = mann_whitney_u(x, y)
+            ci_low, ci_high = float('nan'), float('nan')
+        system, dataset, algo, params = key
+        rows.append({
+            'system': system,
+            'dataset': dataset,
+            'algo': algo,
+            'params': params,
+            'n_baseline': len(x),
+            'n_candidate': len(y),
+            'median_baseline_s': median_x,
+            'median_candidate_s': median_y,
+            'speedup': speedup,
+            'speedup_ci_low': ci_low,
+            'speedup_ci_high': ci_high,
+            'cliffs_delta': cliffs_delta(x, y),
+            'p_value': p,
+        })
+
+    if skipped:
+        print(f"Warning: skipped {skipped} matched groups with fewer than {min_trials} trials on a side")
+    if underpowered:
+        print(f"Warning: {underpowered} of {len(rows)} groups have too few trials to ever reach alpha={alpha}; "
+              f"their changes cannot be flagged")
+
+    q_values = benjamini_hochberg([row['p_value'] for row in rows])
+    for row, q in zip(rows, q_values):
+        row['q_value'] = q
+        relative_change = abs(row['speedup'] - 1.0)
+        if q < alpha and relative_change >= min_change:
+            row['verdict'] = 'speedup' if row['speedup'] > 1.0 else 'slowdown'
+        else:
+            row['verdict'] = 'unchanged'
+
+    def rank_key(row):
+        effect = abs(math.log(row['speedup'])) if 0 < row['speedup'] < float('inf') else float('inf')
+        return (row['verdict'] == 'unchanged', -effect)
+
+    rows.sort(key=rank_key)
+    return rows
+
+
+def print_report(rows, only_significant=False):
+    """
+    Print the ranked comparison as a table.
+    """
+    print(f"{'verdict':10s} {'system':10s} {'dataset':18s} {'algo':20s} {'params':12s} "
+          f"{'base(s)':>10s} {'new(s)':>10s} {'speedup':>8s} {'delta':>6s} {'q':>8s}")
+    for row in rows:
+        if only_significant and row['verdict'] == 'unchanged':
+            continue
+        print(f"{row['verdict']:10s} {row['system']:10s} {row['dataset']:18s} {row['algo']:20s} {row['params']:12s} "
+              f"{row['median_baseline_s']:10.4f} {row['median_candidate_s']:10.4f} {row['speedup']:8.3f} "
+              f"{row['cliffs_delta']:6.2f} {row['q_value']:8.4f}")
+    speedups = sum(1 for r in rows if r['verdict'] == 'speedup')
+    slowdowns = sum(1 for r in rows if r['verdict'] == 'slowdown')
+    print(f"\n{len(rows)} matched groups: {speedups} significant speedups, {slowdowns} significant slowdowns")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare per-trial times of two benchmark campaigns')
+    parser.add_argument('baseline', help='baseline results directory or .jsonl snapshot')
+    parser.add_argument('candidate', help='candidate results directory or .jsonl snapshot')
+    parser.add_argument('--test', choices=['mwu', 'bootstrap'], default='mwu', help='statistical test (default: mwu)')
+    parser.add_argument('--alpha', type=float, default=0.05, help='significance level after BH correction (default: 0.05)')
+    parser.add_argument('--min-change', type=float, default=0.05,
+                        help='minimum relative change of the median to flag (default: 0.05)')
+    parser.add_argument('--min-trials', type=int, default=4,
+                        help='minimum trials per side (default: 4; 3 vs 3 trials can never reach p < 0.1)')
+    parser.add_argument('--systems', nargs='+', help='restrict to these systems')
+    parser.add_argument('--significant-only', action='store_true', help='only print significant changes')
+    parser.add_argument('--output', help='write the full report to this CSV file')
+    args = parser.parse_args()
+
+    baseline_records = load_campaign(args.baseline, args.systems)
+    candidate_records = load_campaign(args.candidate, args.systems)
+    print(f"Baseline:  {len(baseline_records)} trials from {args.baseline}")
+    print(f"Candidate: {len(candidate_records)} trials from {args.candidate}\n")
+
+    rows = compare_campaigns(baseline_records, candidate_records, args.test, args.alpha,
+                             args.min_change, args.min_trials)
+    if not rows:
+        print("No matching (system, dataset, algo, params) groups with enough trials")
+        return 1
+
+    print_report(rows, args.significant_only)
+
+    if args.output:
+        with open(args.output, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+            writer.writeheader()
+            writer.writerows(rows)
+        print(f"Report written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
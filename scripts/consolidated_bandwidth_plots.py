@@ -11,62 +11,13 @@ from datetime import datetime
 from collections import defaultdict
 import seaborn as sns
 
+from iostat_utils import parse_iostat_log
+from bandwidth_aggregation import aggregate_runs
+
 # Set style for prettier plots
 plt.style.use('seaborn-v0_8')
 sns.set_palette("husl")
 
-def parse_iostat_log(filename):
-    """
-    Parse iostat log file and extract read/write bandwidth data.
-    Expected format from 'iostat -d -x 1 | grep -v loop':
-    
-    Device            r/s     rMB/s   rrqm/s  %rrqm r_await rareq-sz     w/s     wMB/s   wrqm/s  %wrqm w_await wareq-sz     d/s     dMB/s   drqm/s  %drqm d_await dareq-sz     f/s f_await  aqu-sz  %util
-    """
-    data = []
-    current_timestamp = 0  # Use sequential timestamps since iostat outputs every second
-    
-    with open(filename, 'r') as f:
-        lines = f.readlines()
-    
-    i = 0
-    while i < len(lines):
-        line = lines[i].strip()
-        
-        # Skip header lines and empty lines
-        if not line or 'Device' in line or 'Linux' in line or '_x86_64_' in line:
-            i += 1
-            continue
-        
-        # Look for device lines with stats
-        # Split by whitespace and expect at least 23 columns
-        parts = line.split()
-        if len(parts) >= 23:
-            device = parts[0]
-            try:
-                read_kb_s = float(parts[2])   # rkB/s (column 2)
-                write_kb_s = float(parts[7])  # wkB/s (column 7)
-                read_mb_s = read_kb_s / 1024  # Convert kB/s to MB/s
-                write_mb_s = write_kb_s / 1024  # Convert kB/s to MB/s
-                
-                data.append({
-                    'timestamp': current_timestamp,
-                    'device': device,
-                    'read_mb_s': read_mb_s,
-                    'write_mb_s': write_mb_s,
-                    'total_mb_s': read_mb_s + write_mb_s
-                })
-                
-            except (ValueError, IndexError):
-                pass
-        
-        # Check if this looks like the end of a time interval (empty line or new header)
-        if i + 1 < len(lines) and (not lines[i + 1].strip() or 'Device' in lines[i + 1]):
-            current_timestamp += 1
-        
-        i += 1
-    
-    return data
-
 def group_iostat_files_by_benchmark(iostat_files):
     """
     Group iostat files by benchmark (algorithm and dataset).
@@ -93,9 +44,8 @@ def compute_average_bandwidth(iostat_files, target_device):
     
     # Parse all files and collect data
     for file_path in iostat_files:
-        data = parse_iostat_log(file_path)
-        if data:
-            df = pd.DataFrame(data)
+        df = parse_iostat_log(file_path)
+        if not df.empty:
             device_data = df[df['device'] == target_device]
             if not device_data.empty:
                 # Add iteration identifier
@@ -142,7 +92,7 @@ def compute_average_bandwidth(iostat_files, target_device):
     
     return avg_data
 
-def create_bandwidth_plots(systems, input_dir, output_dir, device, pattern='*_iostat.log'):
+def create_bandwidth_plots(systems, input_dir, output_dir, device, pattern='*_iostat.log', align='progress'):
     """
     Create read and write bandwidth plots for specified systems.
     
@@ -152,6 +102,8 @@ def create_bandwidth_plots(systems, input_dir, output_dir, device, pattern='*_io
         output_dir: Directory to save plots and CSV files
         device: Target device name (e.g., 'sda', 'nvme0n1')
         pattern: File pattern to match iostat files
+        align: 'truncate' (average per second up to the shortest run), 'progress'
+               or 'phases' (see bandwidth_aggregation.py)
     """
     os.makedirs(output_dir, exist_ok=True)
     
@@ -176,7 +128,14 @@ def create_bandwidth_plots(systems, input_dir, output_dir, device, pattern='*_io
         
         for benchmark_name, files in benchmark_groups.items():
             # Compute average bandwidth for this benchmark
-            avg_data = compute_average_bandwidth(files, device)
+            if align == 'truncate':
+                avg_data = compute_average_bandwidth(files, device)
+            else:
+                avg_data, totals = aggregate_runs(files, device, align)
+                if totals is not None:
+                    totals_filename = f"{output_dir}/{system}_{benchmark_name}_{device}_phase_totals.csv"
+                    totals.to_csv(totals_filename, index=False)
+                    print(f"Saved CSV: {totals_filename}")
             if avg_data is not None and not avg_data.empty:
                 algorithm_data[benchmark_name][system] = avg_data
                 
@@ -192,6 +151,14 @@ def create_bandwidth_plots(systems, input_dir, output_dir, device, pattern='*_io
             create_write_bandwidth_plot_per_algorithm(algorithm_data[algorithm], algorithm, output_dir, device)
         print(f"Algorithm-specific plots saved to {output_dir}")
 
+def _plot_columns(data, metric):
+    '''
+    x values, x label and y column of an aggregated frame, plus the band columns if present.
+    '''
+    if 'progress' in data.columns:
+        return data['progress'], 'Progress (%)', f'{metric}_median', (f'{metric}_p25', f'{metric}_p75')
+    return data['timestamp'], 'Time (seconds)', f'{metric}_mean', None
+
 def create_read_bandwidth_plot_per_algorithm(systems_data, algorithm, output_dir, device):
     """
     Create a read bandwidth plot for one algorithm showing different systems as lines.
@@ -207,20 +174,24 @@ def create_read_bandwidth_plot_per_algorithm(systems_data, algorithm, output_dir
     colors = plt.cm.Set3(np.linspace(0, 1, len(systems_data)))
     
     # Track data ranges for tight axis limits
+    xlabel = 'Time (seconds)'
     all_times = []
     all_reads = []
     
     for (system, color) in zip(systems_data.keys(), colors):
         data = systems_data[system]
         if data is not None and not data.empty:
+            x, xlabel, y_column, band = _plot_columns(data, 'read_mb_s')
             # Plot with some transparency for overlapping lines
-            plt.plot(data['timestamp'], data['read_mb_s_mean'], 
+            plt.plot(x, data[y_column], 
                     label=system, linewidth=2.5, alpha=0.85, color=color, marker='o', markersize=2)
+            if band:
+                plt.fill_between(x, data[band[0]], data[band[1]], color=color, alpha=0.2)
             
-            all_times.extend(data['timestamp'].tolist())
-            all_reads.extend(data['read_mb_s_mean'].tolist())
+            all_times.extend(x.tolist())
+            all_reads.extend(data[y_column].dropna().tolist())
     
-    plt.xlabel('Time (seconds)', fontsize=14, fontweight='bold')
+    plt.xlabel(xlabel, fontsize=14, fontweight='bold')
     plt.ylabel('Read Bandwidth (MB/s)', fontsize=14, fontweight='bold')
     plt.title(f'Read Bandwidth - {algorithm} - Device: {device}', fontsize=16, fontweight='bold', pad=20)
     
@@ -261,20 +232,24 @@ def create_write_bandwidth_plot_per_algorithm(systems_data, algorithm, output_di
     colors = plt.cm.Set3(np.linspace(0, 1, len(systems_data)))
     
     # Track data ranges for tight axis limits
+    xlabel = 'Time (seconds)'
     all_times = []
     all_writes = []
     
     for (system, color) in zip(systems_data.keys(), colors):
         data = systems_data[system]
         if data is not None and not data.empty:
+            x, xlabel, y_column, band = _plot_columns(data, 'write_mb_s')
             # Plot with some transparency for overlapping lines
-            plt.plot(data['timestamp'], data['write_mb_s_mean'], 
+            plt.plot(x, data[y_column], 
                     label=system, linewidth=2.5, alpha=0.85, color=color, marker='s', markersize=2)
+            if band:
+                plt.fill_between(x, data[band[0]], data[band[1]], color=color, alpha=0.2)
             
-            all_times.extend(data['timestamp'].tolist())
-            all_writes.extend(data['write_mb_s_mean'].tolist())
+            all_times.extend(x.tolist())
+            all_writes.extend(data[y_column].dropna().tolist())
     
-    plt.xlabel('Time (seconds)', fontsize=14, fontweight='bold')
+    plt.xlabel(xlabel, fontsize=14, fontweight='bold')
     plt.ylabel('Write Bandwidth (MB/s)', fontsize=14, fontweight='bold')
     plt.title(f'Write Bandwidth - {algorithm} - Device: {device}', fontsize=16, fontweight='bold', pad=20)
     
@@ -309,6 +284,8 @@ def main():
                        default=['xstream', 'graphchi', 'blaze', 'gridgraph', 'lumos'],
                        help='List of system names to process')
     parser.add_argument('--pattern', default='*_iostat.log', help='File pattern to match')
+    parser.add_argument('--align', choices=['truncate', 'progress', 'phases'], default='progress',
+                       help='How repeats are aligned before aggregating (default: progress)')
     
     args = parser.parse_args()
     
@@ -322,7 +299,8 @@ def main():
         input_dir=args.input_dir,
         output_dir=args.output_dir,
         device=args.device,
-        pattern=args.pattern
+        pattern=args.pattern,
+        align=args.align
     )
 
 if __name__ == "__main__":
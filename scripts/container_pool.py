@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Pool of warm, long-lived containers, one per system image.
+
+launch-container.sh builds the image and starts a fresh container for every
+service, and launch-container-ram-constrained.sh starts (and leaves behind) a
+new container for every (dataset, RAM%) combination, so each point of a memory
+sweep pays for the image check and the container start-up. The pool keeps one
+container per image running ("pool_<service>", same bind mounts and
+--privileged as the launch scripts) and reuses it for every job:
+
+    - the container is started on first use (or restarted if it was stopped);
+      the image is looked up once per pool, never rebuilt
+    - before every job the memory limit (swap disabled), CPU list and memory
+      nodes are changed in place with docker update; unchanged limits cost
+      nothing, and the runners read the limit from the cgroup as before
+    - the job itself runs with docker exec (execution_backend.DockerExecBackend)
+
+The RAM budget of a dataset is computed as in launch-container-ram-constrained.sh:
+the in-memory footprint from memory_estimates.json times the percentage,
+plus MEMORY_OVERHEAD for the OS, buffers and runtime structures.
+
+Runs on the host, next to docker. Usage:
+    python container_pool.py start graphchi xstream
+    python container_pool.py sweep graphchi_1by1 --datasets dota_league graph500_26 --ram-percents 50 75 100
+    python container_pool.py exec blaze --memory-mb 32000 -- python3 /scripts/blaze/blaze.py -d
+    python container_pool.py stop
+"""
+
+import os
+import re
+import sys
+import argparse
+import subprocess
+
+from execution_backend import DockerExecBackend, runner_command
+from get_mem_estimates import get_memory_footprint_mb
+
+# Checkout with the datasets/, systems/, results/, extra_space/ and scripts/ directories
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+POOL_PREFIX = "pool"
+MOUNTS = ['datasets', 'systems', 'results', 'extra_space', 'scripts']
+# Same overhead as launch-container-ram-constrained.sh
+MEMORY_OVERHEAD = 1.25
+# Runners that can be restricted to one sweep point, and the arguments that do it; the
+# others benchmark their whole hard-coded dataset list, so a per-dataset RAM budget
+# would not apply to them. graphchi_1by1 also runs only the point's budget, so its
+# <dataset>_<bench>_mem<pct>pct results match the container limit
+DATASET_ARGS = {
+    'galois': "--datasets {dataset}",
+    'graphchi_1by1': "--dataset {dataset} --ram-percent {ram_percent}",
+}
+
+
+def _docker(*args, check=True):
+    return subprocess.run(['docker'] + list(args), capture_output=True, text=True, check=check)
+
+
+def image_name(service, project_dir=PROJECT_DIR):
+    """
+    Image of a compose service, following the docker compose naming of the launch scripts.
+    """
+    project = re.sub(r'[^a-z0-9-]', '', os.path.basename(os.path.abspath(project_dir)).lower())
+    return f"{project}-{service}"
+
+
+def container_state(name):
+    """
+    State of a container ('running', 'exited', ...), or None if it does not exist.
+    """
+    result = _docker('inspect', '-f', '{{.State.Status}}', name, check=False)
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def host_memory_mb():
+    """
+    Total memory of the host in MB, the limit of a container that is not constrained.
+    """
+    with open('/proc/meminfo', 'r') as f:
+        for line in f:
+            if line.startswith('MemTotal:'):
+                return int(line.split()[1]) // 1024
+    raise RuntimeError("MemTotal not found in /proc/meminfo")
+
+
+def container_budget_mb(dataset, ram_percent):
+    """
+    Container memory limit of a RAM-constrained run, as in launch-container-ram-constrained.sh.
+
+    Args:
+        dataset: Dataset name in memory_estimates.json
+        ram_percent: Percentage of the in-memory graph footprint
+
+    Returns:
+        int: Limit in MB
+    """
+    footprint_mb = get_memory_footprint_mb(dataset)
+    if footprint_mb is None:
+        raise ValueError(f"graph size not available for dataset '{dataset}'")
+    return int(int(footprint_mb * ram_percent / 100.0) * MEMORY_OVERHEAD)
+
+
+def service_of(system):
+    """
+    Compose service whose image runs a system's runner (graphchi_1by1 -> graphchi).
+    """
+    return system.split('_')[0]
+
+
+class ContainerPool:
+    """
+    Warm containers keyed by compose service, with limits changed per job.
+    """
+
+    def __init__(self, project_dir=PROJECT_DIR, cpus=None, mems=None):
+        """
+        Args:
+            project_dir: Checkout whose directories are bind-mounted
+            cpus: Default CPU list of the jobs (None: all CPUs)
+            mems: Default NUMA memory nodes of the jobs (None: all nodes)
+        """
+        self.project_dir = os.path.abspath(project_dir)
+        self.cpus = cpus
+        self.mems = mems
+        self.host_mb = host_memory_mb()
+        self._backends = {}
+
+    def container_name(self, service):
+        return f"{POOL_PREFIX}_{service}"
+
+    def _start(self, service):
+        name = self.container_name(service)
+        state = container_state(name)
+        if state == 'running':
+            return
+        if state is not None:
+            print(f"Restarting pool container {name} ({state})")
+            _docker('start', name)
+            return
+
+        image = image_name(service, self.project_dir)
+        if _docker('image', 'inspect', image, check=False).returncode != 0:
+            raise RuntimeError(f"Docker image '{image}' not found, build it first with: docker compose build {service}")
+        print(f"Starting pool container {name} from {image}")
+        cmd = ['run', '-d', '--name', name, '--privileged',
+               '--memory', f"{self.host_mb}m", '--memory-swap', f"{self.host_mb}m"]
+        for mount in MOUNTS:
+            cmd += ['-v', f"{self.project_dir}/{mount}:/{mount}"]
+        _docker(*cmd, image, 'sleep', 'infinity')
+
+    def acquire(self, service):
+        """
+        Backend of the warm container of a service, starting the container if needed.
+
+        Returns:
+            DockerExecBackend
+        """
+        if service not in self._backends:
+            self._start(service)
+            self._backends[service] = DockerExecBackend(self.container_name(service))
+        return self._backends[service]
+
+    def dispatch(self, service, cmd, log_file, memory_mb=None, cpus=None, mems=None, cwd=None, timeout=None):
+        """
+        Run a shell command in the container of a service under the given limits.
+
+        Args:
+            service: Compose service (image) to run in
+            cmd: Shell command, with the container paths (/datasets, /scripts, ...)
+            log_file: Host file for the stdout and stderr of the command
+            memory_mb: Memory limit (None: the memory of the host)
+            cpus: CPU list (None: the pool default)
+            mems: NUMA memory nodes (None: the pool default)
+
+        Returns:
+            dict: returncode, wall_s, oom, timed_out, peak_mb (see DockerExecBackend.run)
+        """
+        backend = self.acquire(service)
+        backend.update_limits(memory_mb or self.host_mb, cpus or self.cpus, mems or self.mems)
+        return backend.run(cmd, log_file, cwd=cwd, timeout=timeout)
+
+    def dispatch_runner(self, system, log_file, args=(), memory_mb=None, cpus=None, mems=None, timeout=None):
+        """
+        Run the runner script of a system in the container of its service.
+        """
+        service = service_of(system)
+        cmd, cwd = runner_command(system, args, self.acquire(service).scripts_dir)
+        return self.dispatch(service, cmd, log_file, memory_mb, cpus, mems, cwd, timeout)
+
+    def stop(self, services=None, remove=True):
+        """
+        Stop (and remove) pool containers; all containers of the pool by default.
+        """
+        if services is None:
+            result = _docker('ps', '-a', '--filter', f"name=^{POOL_PREFIX}_", '--format', '{{.Names}}')
+            names = result.stdout.split()
+        else:
+            names = [self.container_name(service) for service in services]
+        for name in names:
+            if remove:
+                _docker('rm', '-f', name, check=False)
+                print(f"Removed pool container {name}")
+            else:
+                _docker('stop', name, check=False)
+                print(f"Stopped pool container {name}")
+        self._backends.clear()
+
+
+def memory_sweep(pool, system, datasets, ram_percents, runner_args="", timeout=None, log_dir=None):
+    """
+    Run a runner for every (dataset, RAM%) in one warm container, changing its memory limit per point.
+
+    Args:
+        pool: ContainerPool
+        system: Key of DATASET_ARGS (a runner that can be restricted to one dataset)
+        datasets: Dataset names
+        ram_percents: Percentages of the in-memory footprint (see container_budget_mb)
+        runner_args: Extra runner arguments after the dataset selection, a template with the
+                     fields {dataset}, {ram_percent} and {memory_mb}
+        log_dir: Host directory of the logs (default: <project>/results/<service>/pool)
+
+    Returns:
+        list: One dict per point with dataset, ram_percent, memory_mb and the run result
+    """
+    if system not in DATASET_ARGS:
+        raise ValueError(f"{system} cannot be restricted to one dataset, sweepable runners: {sorted(DATASET_ARGS)}")
+    log_dir = log_dir or os.path.join(pool.project_dir, 'results', service_of(system), 'pool')
+    os.makedirs(log_dir, exist_ok=True)
+    points = []
+    for dataset in datasets:
+        for ram_percent in ram_percents:
+            try:
+                memory_mb = container_budget_mb(dataset, ram_percent)
+            except ValueError as e:
+                print(f"Warning: skipping {dataset}: {e}")
+                break
+            fields = {'dataset': dataset, 'ram_percent': ram_percent, 'memory_mb': memory_mb}
+            log_file = os.path.join(log_dir, f"{system}_{dataset}_{ram_percent}pct.log")
+            args = f"{DATASET_ARGS[system]} {runner_args}".format(**fields).split()
+            result = pool.dispatch_runner(system, log_file, args,
+                                          memory_mb=memory_mb, timeout=timeout)
+            status = 'timed out' if result['timed_out'] else 'OOM' if result['oom'] else f"exit {result['returncode']}"
+            print(f"{system} {dataset} {ram_percent}% ({memory_mb} MB): {status} after {result['wall_s']:.1f} s")
+            points.append(dict(fields, **result))
+    return points
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Keep warm containers per system image and dispatch jobs to them')
+    parser.add_argument('--project-dir', default=PROJECT_DIR, help='checkout whose directories are bind-mounted')
+    parser.add_argument('--cpus', help='CPU list of the jobs, e.g. 0-23 (default: all CPUs)')
+    parser.add_argument('--mems', help='NUMA memory nodes of the jobs, e.g. 0 (default: all nodes)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    start_parser = subparsers.add_parser('start', help='start the containers of some services')
+    start_parser.add_argument('services', nargs='+')
+
+    exec_parser = subparsers.add_parser('exec', help='run a command in the container of a service')
+    exec_parser.add_argument('service')
+    exec_parser.add_argument('cmd', nargs='+', help='command (after --)')
+    exec_parser.add_argument('--memory-mb', type=int, help='memory limit in MB (default: host memory)')
+    exec_parser.add_argument('--timeout', type=int, help='timeout in seconds')
+    exec_parser.add_argument('--log', default='/dev/stdout', help='log file')
+
+    sweep_parser = subparsers.add_parser('sweep', help='run a runner over datasets and RAM percentages')
+    sweep_parser.add_argument('system', choices=sorted(DATASET_ARGS))
+    sweep_parser.add_argument('--datasets', nargs='+', required=True)
+    sweep_parser.add_argument('--ram-percents', nargs='+', type=int, default=[50, 75, 100, 125, 150])
+    sweep_parser.add_argument('--runner-args', default="",
+                              help='extra runner arguments after the dataset selection; fields {dataset}, '
+                                   '{ram_percent}, {memory_mb}')
+    sweep_parser.add_argument('--timeout', type=int, help='timeout of every point in seconds')
+
+    stop_parser = subparsers.add_parser('stop', help='remove pool containers (all by default)')
+    stop_parser.add_argument('services', nargs='*')
+    args = parser.parse_args()
+
+    pool = ContainerPool(args.project_dir, args.cpus, args.mems)
+    try:
+        if args.command == 'start':
+            for service in args.services:
+                pool.acquire(service)
+        elif args.command == 'exec':
+            result = pool.dispatch(args.service, ' '.join(args.cmd), args.log, memory_mb=args.memory_mb,
+                                   timeout=args.timeout)
+            return 0 if result['returncode'] == 0 else 1
+        elif args.command == 'sweep':
+            memory_sweep(pool, args.system, args.datasets, args.ram_percents, args.runner_args, args.timeout)
+        elif args.command == 'stop':
+            pool.stop(args.services or None)
+    except (RuntimeError, ValueError, subprocess.CalledProcessError) as e:
+        stderr = getattr(e, 'stderr', None)
+        print(f"Error: {stderr.strip() if stderr else e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
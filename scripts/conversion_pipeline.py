@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Convert the next datasets while the benchmarks of the current one run.
+
+The runners convert dataset N+1 only after every benchmark of dataset N is
+done, so the converters (mostly single-threaded) and the benchmarks never
+overlap. ConversionPipeline runs the conversions of the next `lookahead`
+datasets in a worker thread and hands the datasets to the runner in order:
+
+    - the CPUs of the process are split: the last `convert_cpus` CPUs go to the
+      conversion worker (the converters it starts inherit the pinning) and the
+      others to the runner's main thread, i.e. to the benchmarks it starts;
+      runners size their thread counts with len(pipeline.bench_cpus)
+    - back-pressure: a conversion only starts once the staging directory
+      (normally /extra_space) has room for its estimated output plus
+      reserve_gb. Until then it waits for the runner to release a dataset (and
+      delete its converted files). If the runner holds nothing and there is
+      still no room, it starts anyway, as the sequential loop would have.
+    - conversions read the raw edge lists from the dataset root and write to
+      the staging directory, while the benchmarks read converted graphs; put
+      the staging directory on another disk (BENCH_EXTRA_SPACE_DIR, see
+      paths.py) to keep the conversion I/O away from the benchmark inputs.
+      Runners whose benchmarks do I/O while they run (out-of-core systems)
+      pass that directory as bench_dir: if it shares a device with the
+      staging directory or the dataset root, lookahead is refused, since the
+      conversions would be measured as part of the benchmark's I/O
+    - runners that keep their converted files as a cache across campaigns
+      (reclaim=False) free no space on release; their conversions never wait
+      for one and start with a warning when space is short
+
+With lookahead=0 every dataset is converted inline right before it is handed
+out, which is the old sequential behaviour. Conversion times measured while a
+benchmark runs include the contention with it.
+
+Usage:
+    pipeline = ConversionPipeline(prepare_dataset, lookahead=1)
+    num_threads = len(pipeline.bench_cpus)
+    for dataset, prepared in pipeline.run(datasets):
+        ...  # benchmarks on prepared, then delete its files
+"""
+
+import os
+import time
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from paths import DATASET_DIR, EXTRA_SPACE_DIR
+from numa_topology import format_cpu_list
+
+# Free space left untouched in the staging directory
+RESERVE_GB = 10
+# Seconds between free-space checks of a waiting conversion
+POLL_S = 30
+# Output size of a conversion relative to the dataset directory, without a runner estimate
+OUTPUT_FACTOR = 1.0
+
+
+def dataset_bytes(dataset, dataset_dir=DATASET_DIR):
+    """
+    Size of the files of a dataset directory (edge lists, properties, ...).
+    """
+    root = os.path.join(dataset_dir, dataset)
+    if not os.path.isdir(root):
+        return 0
+    return sum(entry.stat().st_size for entry in os.scandir(root) if entry.is_file())
+
+
+def shared_device(path, others):
+    """
+    The first of others that is on the same device as path (None if none is).
+    """
+    device = os.stat(path).st_dev
+    for other in others:
+        if os.path.exists(other) and os.stat(other).st_dev == device:
+            return other
+    return None
+
+
+def split_cpus(cpus, convert_cpus):
+    """
+    Split a CPU set into (benchmark CPUs, conversion CPUs); with too few CPUs both share all of them.
+    """
+    cpus = sorted(cpus)
+    if convert_cpus <= 0 or len(cpus) <= convert_cpus:
+        return cpus, cpus
+    return cpus[:-convert_cpus], cpus[-convert_cpus:]
+
+
+class ConversionPipeline:
+    """
+    Converts datasets ahead of the runner, bounded by lookahead and by the free space of the staging directory.
+    """
+
+    def __init__(self, convert, lookahead=1, staging_dir=EXTRA_SPACE_DIR, reserve_gb=RESERVE_GB, convert_cpus=1,
+                 estimate_bytes=None, bench_dir=None, reclaim=True):
+        """
+        Args:
+            convert: Callable converting one dataset; returns what the runner needs to benchmark it,
+                     or None to skip the dataset
+            lookahead: Datasets converted ahead of the one being benchmarked (0: sequential)
+            staging_dir: Directory receiving the converted files
+            reserve_gb: Free space left untouched in staging_dir
+            convert_cpus: CPUs reserved for the conversions
+            estimate_bytes: Callable giving the output size of a dataset's conversion
+                            (default: OUTPUT_FACTOR times the size of its dataset directory)
+            bench_dir: Directory the benchmarks read while they run; lookahead is refused when it is
+                       on the device of staging_dir or of the dataset root
+            reclaim: Whether the runner deletes a dataset's converted files before moving on
+        """
+        if lookahead > 0 and bench_dir is not None:
+            shared = shared_device(bench_dir, [staging_dir, DATASET_DIR])
+            if shared:
+                print(f"Warning: benchmark inputs in {bench_dir} are on the same device as {shared}, "
+                      f"converting sequentially instead of {lookahead} dataset(s) ahead")
+                lookahead = 0
+        self.convert = convert
+        self.lookahead = lookahead
+        self.staging_dir = staging_dir
+        self.reserve_bytes = int(reserve_gb * 1024 ** 3)
+        self.estimate_bytes = estimate_bytes or (lambda dataset: int(dataset_bytes(dataset) * OUTPUT_FACTOR))
+        self.reclaim = reclaim
+        self.cpus = sorted(os.sched_getaffinity(0))
+        if lookahead > 0:
+            self.bench_cpus, self.convert_cpus = split_cpus(self.cpus, convert_cpus)
+        else:
+            self.bench_cpus = self.convert_cpus = self.cpus
+        self._held = set()
+        self._pending_bytes = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def _wait_for_space(self, dataset, needed):
+        with self._cond:
+            while True:
+                if self._closed:
+                    return False
+                free = shutil.disk_usage(self.staging_dir).free - self.reserve_bytes - self._pending_bytes
+                if free >= needed:
+                    break
+                if not self._held:
+                    print(f"Warning: converting {dataset} with {free / 1024 ** 3:.1f} GB free in {self.staging_dir}, "
+                          f"{needed / 1024 ** 3:.1f} GB estimated")
+                    break
+                print(f"Waiting for space in {self.staging_dir} to convert {dataset} "
+                      f"({needed / 1024 ** 3:.1f} GB estimated, {free / 1024 ** 3:.1f} GB free)")
+                self._cond.wait(POLL_S)
+            self._pending_bytes += needed
+            return True
+
+    def _convert(self, dataset):
+        needed = self.estimate_bytes(dataset)
+        if not self._wait_for_space(dataset, needed):
+            return None
+        start = time.time()
+        try:
+            result = self.convert(dataset)
+        finally:
+            with self._cond:
+                self._pending_bytes -= needed
+        if result is not None and self.reclaim:
+            with self._cond:
+                self._held.add(dataset)
+        print(f"Prepared {dataset} in {time.time() - start:.1f} s")
+        return result
+
+    def release(self, dataset):
+        """
+        Mark a dataset as done, so that waiting conversions can re-check the free space.
+        """
+        with self._cond:
+            self._held.discard(dataset)
+            self._cond.notify_all()
+
+    def run(self, datasets):
+        """
+        Yield (dataset, convert(dataset)) in order, converting up to lookahead datasets ahead.
+
+        A dataset is released when the runner asks for the next one, so the runner
+        should delete its converted files before moving on.
+        """
+        datasets = list(datasets)
+        if self.lookahead <= 0:
+            for dataset in datasets:
+                result = self.convert(dataset)
+                if result is not None:
+                    yield dataset, result
+            return
+
+        print(f"Benchmarks on CPUs {format_cpu_list(self.bench_cpus)}, conversions on CPUs "
+              f"{format_cpu_list(self.convert_cpus)}, converting {self.lookahead} dataset(s) ahead")
+        os.sched_setaffinity(0, self.bench_cpus)
+        executor = ThreadPoolExecutor(1, initializer=os.sched_setaffinity, initargs=(0, self.convert_cpus))
+        futures = {}
+        try:
+            for i, dataset in enumerate(datasets):
+                for j in range(i, min(i + self.lookahead + 1, len(datasets))):
+                    if j not in futures:
+                        futures[j] = executor.submit(self._convert, datasets[j])
+                result = futures.pop(i).result()
+                if result is None:
+                    continue
+                yield dataset, result
+                self.release(dataset)
+        finally:
+            # Drop the conversions that have not started if the runner stopped early
+            with self._cond:
+                self._closed = True
+                self._cond.notify_all()
+            for future in futures.values():
+                future.cancel()
+            executor.shutdown(wait=True)
+            os.sched_setaffinity(0, self.cpus)
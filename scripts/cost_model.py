@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+"""
+Predict runtime, peak memory and I/O volume of a run before launching it.
+
+get_memory_budgets() picks budgets as fixed percentages of the edge list size,
+whatever the system or algorithm. This model is fitted on the per-trial
+records of results_store.py joined with the dataset features of
+graph_profiler.py (falling back to the counts in memory_estimates.json for
+datasets that have not been profiled):
+
+    log |V|, log |E|, degree Gini, log(1 + degree CV), log(1 + diameter estimate),
+    log iterations and log memory budget fraction (parsed from the run params),
+    plus one-hot intercepts for the system, the algorithm and the system/algorithm pair
+
+Each target (time_s, mem_mb, io_mb = block I/O of the trial) is fitted in log
+space with ridge-regularized least squares, so the graph-feature slopes are
+shared across systems while every (system, algo) keeps its own offset and
+unseen pairs fall back to the system and algorithm offsets. Predictions come
+with a prediction interval from the residual variance and the parameter
+covariance (Student t), returned in the original units.
+
+The fitted model is stored as JSON and used to:
+    check   - flag (system, dataset, algo) runs whose predicted peak memory is above
+              a memory limit even at the lower end of the interval (obvious OOM);
+              launch-container-ram-constrained.sh runs this before starting a container
+    budgets - memory budgets as percentages of the predicted peak memory
+    order   - order jobs shortest-predicted-first, obvious OOMs dropped
+
+Usage:
+    python cost_model.py fit /results -o /results/cost_model.json
+    python cost_model.py predict graphchi graph500_26 pagerank --params mem75pct
+    python cost_model.py check graphchi graph500_26 --mem-mb 16000
+    python cost_model.py order jobs.txt --mem-mb 64000
+"""
+
+import os
+import re
+import sys
+import json
+import math
+import argparse
+
+import numpy as np
+from scipy import stats
+
+from paths import RESULTS_ROOT
+from results_store import load_campaign
+from graph_profiler import PROFILES_PATH, load_profiles
+from get_mem_estimates import MEMORY_ESTIMATES_PATH
+
+MODEL_PATH = f"{RESULTS_ROOT}/cost_model.json"
+DEFAULT_RIDGE = 1e-2
+DEFAULT_LEVEL = 0.9
+BLOCK_SIZE = 512  # getrusage block I/O counts 512-byte blocks
+
+# Target -> offset added before taking the log (io_mb can be 0)
+TARGETS = {'time_s': 1e-3, 'mem_mb': 1.0, 'io_mb': 1.0}
+
+NUMERIC_FEATURES = ['log_vertices', 'log_edges', 'degree_gini', 'log_degree_cv', 'log_diameter',
+                    'log_iterations', 'log_budget_fraction']
+
+ITERATIONS_REGEX = re.compile(r"iters?=?(\d+)")
+BUDGET_REGEX = re.compile(r"mem=?(\d+)pct")
+
+
+def load_dataset_features(profiles_path=PROFILES_PATH, estimates_path=MEMORY_ESTIMATES_PATH):
+    """
+    Graph features of every known dataset.
+
+    Profiled datasets get all features; datasets only listed in memory_estimates.json
+    get |V| and |E| (the other features are imputed by the model).
+
+    Returns:
+        dict: Dataset name -> dict of raw graph features (None where unknown)
+    """
+    features = {}
+    if os.path.exists(estimates_path):
+        with open(estimates_path, 'r') as f:
+            for name, entry in json.load(f).items():
+                if entry.get('num_nodes') and entry.get('num_edges'):
+                    features[name] = {'log_vertices': math.log(entry['num_nodes']),
+                                      'log_edges': math.log(entry['num_edges']),
+                                      'degree_gini': None, 'log_degree_cv': None, 'log_diameter': None}
+    for name, profile in load_profiles(profiles_path).items():
+        if profile.get('num_vertices') and profile.get('num_edges'):
+            features[name] = {'log_vertices': math.log(profile['num_vertices']),
+                              'log_edges': math.log(profile['num_edges']),
+                              'degree_gini': profile.get('degree_gini'),
+                              'log_degree_cv': math.log1p(profile.get('degree_cv', 0.0)),
+                              'log_diameter': math.log1p(profile.get('diameter_estimate', 0))}
+    return features
+
+
+def run_features(params):
+    """
+    Features parsed from the run params ('iter10', 'mem75pct', 'iters=20', ...).
+    """
+    params = params or ''
+    iters = ITERATIONS_REGEX.search(params)
+    budget = BUDGET_REGEX.search(params)
+    return {'log_iterations': math.log(int(iters.group(1))) if iters and int(iters.group(1)) > 0 else 0.0,
+            'log_budget_fraction': math.log(int(budget.group(1)) / 100.0) if budget and int(budget.group(1)) > 0
+            else 0.0}
+
+
+def record_targets(record):
+    """
+    Target values of one trial (None where not recorded).
+    """
+    io_mb = None
+    if record.get('block_input') is not None and record.get('block_output') is not None:
+        io_mb = (record['block_input'] + record['block_output']) * BLOCK_SIZE / (1024 * 1024)
+    return {'time_s': record.get('time_s'), 'mem_mb': record.get('mem_mb'), 'io_mb': io_mb}
+
+
+class CostModel:
+    """
+    Log-linear ridge model of runtime, peak memory and I/O volume.
+
+    Attributes:
+        columns: Names of the design matrix columns
+        means, scales: Standardization of the numeric features (means also impute missing ones)
+        fits: Target -> dict with coef, cov (unscaled parameter covariance), sigma2, dof, n
+    """
+
+    def __init__(self, columns, means, scales, fits):
+        self.columns = columns
+        self.means = means
+        self.scales = scales
+        self.fits = fits
+
+    def design_row(self, system, algo, features):
+        index = {c: i for i, c in enumerate(self.columns)}
+        row = np.zeros(len(self.columns))
+        row[index['intercept']] = 1.0
+        for name in NUMERIC_FEATURES:
+            value = features.get(name)
+            if value is None:
+                value = self.means[name]
+            row[index[name]] = (value - self.means[name]) / self.scales[name]
+        for column in (f"system:{system}", f"algo:{algo}", f"pair:{system}/{algo}"):
+            if column in index:
+                row[index[column]] = 1.0
+        return row
+
+    def predict(self, system, algo, features, level=DEFAULT_LEVEL):
+        """
+        Predict every fitted target.
+
+        Args:
+            system, algo: System and algorithm names as in the results store
+            features: Graph features (load_dataset_features) merged with run_features()
+            level: Coverage of the prediction interval
+
+        Returns:
+            dict: Target -> {'pred', 'low', 'high'} in the target's units
+        """
+        x = self.design_row(system, algo, features)
+        predictions = {}
+        for target, fit in self.fits.items():
+            mean = float(x @ np.asarray(fit['coef']))
+            spread = math.sqrt(fit['sigma2'] * (1.0 + float(x @ np.asarray(fit['cov']) @ x)))
+            t = stats.t.ppf(0.5 + level / 2.0, fit['dof'])
+            offset = TARGETS[target]
+            predictions[target] = {'pred': max(math.exp(mean) - offset, 0.0),
+                                   'low': max(math.exp(mean - t * spread) - offset, 0.0),
+                                   'high': max(math.exp(mean + t * spread) - offset, 0.0)}
+        return predictions
+
+    def known_algos(self, system):
+        prefix = f"pair:{system}/"
+        return sorted(c[len(prefix):] for c in self.columns if c.startswith(prefix))
+
+    def to_dict(self):
+        return {'columns': self.columns, 'means': self.means, 'scales': self.scales, 'fits': self.fits}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['columns'], data['means'], data['scales'], data['fits'])
+
+
+def fit_model(records, dataset_features, ridge=DEFAULT_RIDGE):
+    """
+    Fit the cost model on per-trial records.
+
+    Args:
+        records: Per-trial records (results_store)
+        dataset_features: Output of load_dataset_features()
+        ridge: L2 penalty on all coefficients except the intercept
+
+    Returns:
+        CostModel, or None if no record has known dataset features
+    """
+    rows = []
+    skipped = set()
+    for record in records:
+        features = dataset_features.get(record['dataset'])
+        if features is None:
+            skipped.add(record['dataset'])
+            continue
+        rows.append((record, {**features, **run_features(record['params'])}))
+    if skipped:
+        print(f"Warning: no features for datasets {', '.join(sorted(skipped))} (run graph_profiler.py)")
+    if not rows:
+        return None
+
+    means, scales = {}, {}
+    for name in NUMERIC_FEATURES:
+        values = np.array([f[name] for _, f in rows if f.get(name) is not None], dtype=np.float64)
+        means[name] = float(values.mean()) if len(values) else 0.0
+        scales[name] = float(values.std()) if len(values) and values.std() > 0 else 1.0
+    categorical = sorted({c for r, _ in rows for c in (f"system:{r['system']}", f"algo:{r['algo']}",
+                                                       f"pair:{r['system']}/{r['algo']}")})
+    model = CostModel(['intercept'] + NUMERIC_FEATURES + categorical, means, scales, {})
+    X = np.array([model.design_row(r['system'], r['algo'], f) for r, f in rows])
+    targets = [record_targets(r) for r, _ in rows]
+
+    penalty = np.full(X.shape[1], ridge)
+    penalty[0] = 0.0
+    for target, offset in TARGETS.items():
+        mask = np.array([t[target] is not None and t[target] >= 0 for t in targets])
+        n = int(mask.sum())
+        if n < 2:
+            continue
+        Xt = X[mask]
+        y = np.log(np.array([t[target] for t, m in zip(targets, mask) if m], dtype=np.float64) + offset)
+        cov = np.linalg.pinv(Xt.T @ Xt + np.diag(penalty))
+        coef = cov @ Xt.T @ y
+        residuals = y - Xt @ coef
+        effective_params = float(np.trace(Xt @ cov @ Xt.T))
+        dof = max(n - effective_params, 1.0)
+        model.fits[target] = {'coef': coef.tolist(), 'cov': cov.tolist(),
+                              'sigma2': float(residuals @ residuals / dof), 'dof': dof, 'n': n,
+                              'rmse_log': float(np.sqrt(np.mean(residuals ** 2)))}
+    return model
+
+
+def save_model(model, model_path=MODEL_PATH):
+    os.makedirs(os.path.dirname(os.path.abspath(model_path)), exist_ok=True)
+    with open(model_path, 'w') as f:
+        json.dump(model.to_dict(), f)
+
+
+def load_model(model_path=MODEL_PATH):
+    """
+    Load a fitted model, or None if there is none.
+    """
+    if not os.path.exists(model_path):
+        return None
+    with open(model_path, 'r') as f:
+        return CostModel.from_dict(json.load(f))
+
+
+def predict_run(model, system, dataset, algo, params='', dataset_features=None, level=DEFAULT_LEVEL):
+    """
+    Predict one run, or None if the dataset has no features.
+    """
+    if dataset_features is None:
+        dataset_features = load_dataset_features()
+    features = dataset_features.get(dataset)
+    if features is None:
+        return None
+    return model.predict(system, algo, {**features, **run_features(params)}, level)
+
+
+def check_oom(model, system, dataset, mem_limit_mb, algos=None, params='', dataset_features=None,
+              level=DEFAULT_LEVEL):
+    """
+    Flag the runs of a system on a dataset that will not fit in a memory limit.
+
+    Returns:
+        list: (algo, verdict, prediction) with verdict 'oom' when even the lower bound of
+              the peak memory exceeds the limit, 'risk' when the point prediction does
+    """
+    if 'mem_mb' not in model.fits:
+        return []
+    flagged = []
+    for algo in algos or model.known_algos(system):
+        prediction = predict_run(model, system, dataset, algo, params, dataset_features, level)
+        if prediction is None:
+            continue
+        memory = prediction['mem_mb']
+        if memory['low'] > mem_limit_mb:
+            flagged.append((algo, 'oom', prediction))
+        elif memory['pred'] > mem_limit_mb:
+            flagged.append((algo, 'risk', prediction))
+    return flagged
+
+
+def suggest_budgets(prediction, percentages=(50, 75, 100, 125)):
+    """
+    Memory budgets as percentages of the predicted peak memory (upper bound of the interval).
+
+    Returns:
+        list: (percentage, budget_mb) tuples, like get_mem_estimates.get_memory_budgets()
+    """
+    base = prediction['mem_mb']['high']
+    return [(pct, int(base * pct / 100.0)) for pct in percentages]
+
+
+def order_jobs(model, jobs, mem_limit_mb=None, dataset_features=None, level=DEFAULT_LEVEL):
+    """
+    Order jobs shortest-predicted-runtime first.
+
+    Args:
+        jobs: List of (system, dataset, algo, params) tuples
+        mem_limit_mb: Drop jobs whose predicted memory lower bound exceeds this limit
+
+    Returns:
+        tuple: (ordered list of (job, prediction), list of dropped jobs); jobs without a
+               prediction are kept at the end
+    """
+    if dataset_features is None:
+        dataset_features = load_dataset_features()
+    predicted, unknown, dropped = [], [], []
+    for job in jobs:
+        prediction = predict_run(model, *job, dataset_features=dataset_features, level=level)
+        if prediction is None or 'time_s' not in prediction:
+            unknown.append((job, prediction))
+        elif mem_limit_mb is not None and 'mem_mb' in prediction and prediction['mem_mb']['low'] > mem_limit_mb:
+            dropped.append(job)
+        else:
+            predicted.append((job, prediction))
+    predicted.sort(key=lambda item: item[1]['time_s']['pred'])
+    return predicted + unknown, dropped
+
+
+def _format_prediction(prediction):
+    units = {'time_s': 's', 'mem_mb': 'MB', 'io_mb': 'MB'}
+    return "  ".join(f"{target}={p['pred']:.1f}{units[target]} [{p['low']:.1f}, {p['high']:.1f}]"
+                     for target, p in prediction.items())
+
+
+def read_jobs(jobs_file):
+    """
+    Read jobs (one 'system dataset algo [params]' per line, # comments).
+    """
+    jobs = []
+    with open(jobs_file, 'r') as f:
+        for line in f:
+            parts = line.split('#', 1)[0].split()
+            if len(parts) >= 3:
+                jobs.append((parts[0], parts[1], parts[2], parts[3] if len(parts) > 3 else ''))
+    return jobs
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fit and query the runtime/memory/I/O cost model')
+    parser.add_argument('--model', default=MODEL_PATH, help='model file')
+    parser.add_argument('--profiles', default=PROFILES_PATH, help='graph_profiles.json')
+    parser.add_argument('--estimates', default=MEMORY_ESTIMATES_PATH, help='memory_estimates.json')
+    parser.add_argument('--level', type=float, default=DEFAULT_LEVEL, help='prediction interval coverage')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    fit_parser = subparsers.add_parser('fit', help='fit the model on a campaign')
+    fit_parser.add_argument('location', nargs='?', default=RESULTS_ROOT, help='results directory or .jsonl snapshot')
+    fit_parser.add_argument('-o', '--output', help='model file to write (default: --model)')
+    fit_parser.add_argument('--systems', nargs='+', help='restrict to these systems')
+    fit_parser.add_argument('--ridge', type=float, default=DEFAULT_RIDGE, help='L2 penalty')
+
+    predict_parser = subparsers.add_parser('predict', help='predict one run')
+    predict_parser.add_argument('system')
+    predict_parser.add_argument('dataset')
+    predict_parser.add_argument('algo')
+    predict_parser.add_argument('--params', default='', help="run params, e.g. 'mem75pct' or 'iter10'")
+    predict_parser.add_argument('--budgets', nargs='+', type=int, help='also print budgets at these percentages')
+
+    check_parser = subparsers.add_parser('check', help='flag runs that will not fit in a memory limit')
+    check_parser.add_argument('system')
+    check_parser.add_argument('dataset')
+    check_parser.add_argument('--algos', nargs='+', help='algorithms to check (default: all seen for the system)')
+    check_parser.add_argument('--params', default='')
+    check_parser.add_argument('--mem-mb', type=float, required=True, help='memory limit in MB')
+
+    order_parser = subparsers.add_parser('order', help='order jobs shortest-predicted-first')
+    order_parser.add_argument('jobs_file', help="file with one 'system dataset algo [params]' per line")
+    order_parser.add_argument('--mem-mb', type=float, help='drop jobs that will not fit in this limit')
+
+    args = parser.parse_args()
+    dataset_features = load_dataset_features(args.profiles, args.estimates)
+
+    if args.command == 'fit':
+        records = load_campaign(args.location, args.systems)
+        model = fit_model(records, dataset_features, args.ridge)
+        if model is None:
+            print("No trials with known dataset features, nothing to fit")
+            return 1
+        output = args.output or args.model
+        save_model(model, output)
+        for target, fit in model.fits.items():
+            print(f"{target:8s} n={fit['n']:5d} rmse(log)={fit['rmse_log']:.3f}")
+        print(f"Model written to {output}")
+        return 0
+
+    model = load_model(args.model)
+    if model is None:
+        print(f"No cost model at {args.model}, run 'cost_model.py fit' first")
+        return 1
+
+    if args.command == 'predict':
+        prediction = predict_run(model, args.system, args.dataset, args.algo, args.params, dataset_features,
+                                 args.level)
+        if prediction is None:
+            print(f"No features for dataset {args.dataset}")
+            return 1
+        print(f"{args.system} {args.dataset} {args.algo} {args.params}: {_format_prediction(prediction)}")
+        if args.budgets and 'mem_mb' in prediction:
+            for pct, budget in suggest_budgets(prediction, args.budgets):
+                print(f"  {pct}%: {budget} MB")
+    elif args.command == 'check':
+        flagged = check_oom(model, args.system, args.dataset, args.mem_mb, args.algos, args.params,
+                            dataset_features, args.level)
+        for algo, verdict, prediction in flagged:
+            label = 'WILL OOM' if verdict == 'oom' else 'may OOM '
+            print(f"{label} {args.system} {args.dataset} {algo}: mem {prediction['mem_mb']['pred']:.0f} MB "
+                  f"[{prediction['mem_mb']['low']:.0f}, {prediction['mem_mb']['high']:.0f}] "
+                  f"> limit {args.mem_mb:.0f} MB")
+        if not flagged:
+            print(f"No predicted OOM for {args.system} on {args.dataset} within {args.mem_mb:.0f} MB")
+        # Exit code 2 lets launch scripts refuse runs that will obviously fail
+        return 2 if any(verdict == 'oom' for _, verdict, _ in flagged) else 0
+    else:
+        ordered, dropped = order_jobs(model, read_jobs(args.jobs_file), args.mem_mb, dataset_features, args.level)
+        for job, prediction in ordered:
+            print(f"{' '.join(j for j in job if j)}: "
+                  f"{_format_prediction(prediction) if prediction else 'no prediction'}")
+        for job in dropped:
+            print(f"# dropped (predicted OOM): {' '.join(j for j in job if j)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
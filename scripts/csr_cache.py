@@ -0,0 +1,318 @@
+"""
+Binary CSR cache for the text edge lists in /datasets.
+
+Parsing a multi-GB edge list in Python is by far the slowest part of any analysis
+script (graph_utils.py iterates edge by edge). This module converts the edge list
+of a dataset once into a CSR stored as .npy files under CSR_CACHE_DIR/<dataset>/,
+and every later load is a memory map of those files.
+
+The conversion streams the edge list in chunks and builds the CSR with a two-pass
+counting sort, so its memory footprint is the size of the CSR itself.
+
+Layout of a cache entry:
+    meta.json    - num_vertices, num_edges, weighted, and the size/mtime of the source file
+    indptr.npy   - int64[num_vertices + 1]
+    indices.npy  - int32 or int64[num_edges] (int32 if all vertex ids fit)
+    weights.npy  - float32[num_edges], only for weighted graphs
+
+Usage:
+    python csr_cache.py <dataset> [--edge-file FILE]
+"""
+
+import os
+import sys
+import json
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from paths import DATASET_DIR, EXTRA_SPACE_DIR
+from dataset_properties import PropertiesReader
+
+CSR_CACHE_DIR = f"{EXTRA_SPACE_DIR}/csr_cache"
+
+# Number of edges parsed per chunk while streaming the text file
+CHUNK_EDGES = 1 << 24
+
+
+class CSRGraph:
+    """
+    A directed graph in CSR form (out-edges), backed by memory-mapped arrays.
+
+    Attributes:
+        indptr: Offsets into indices, one per vertex plus one
+        indices: Destination vertex of every edge, grouped by source
+        weights: Edge weights aligned with indices, or None
+        num_vertices: Number of vertices (max vertex id + 1)
+        num_edges: Number of edges
+    """
+
+    def __init__(self, indptr, indices, weights=None):
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        self.num_vertices = len(indptr) - 1
+        self.num_edges = len(indices)
+
+    def out_degrees(self):
+        return np.diff(self.indptr)
+
+    def in_degrees(self):
+        return np.bincount(self.indices, minlength=self.num_vertices)
+
+    def to_scipy(self):
+        """
+        Return the graph as a scipy.sparse.csr_matrix (weights, or ones if unweighted).
+        """
+        from scipy.sparse import csr_matrix
+        data = self.weights if self.weights is not None else np.ones(self.num_edges, dtype=np.float32)
+        return csr_matrix((data, self.indices, self.indptr), shape=(self.num_vertices, self.num_vertices))
+
+    def transpose(self):
+        """
+        Return the reverse graph (in-edges) as an in-memory CSRGraph.
+        """
+        matrix = self.to_scipy().T.tocsr()
+        weights = matrix.data.astype(np.float32) if self.weights is not None else None
+        return CSRGraph(matrix.indptr.astype(np.int64), matrix.indices, weights)
+
+
+def _count_columns(edge_file):
+    with open(edge_file, 'r') as f:
+        for line in f:
+            if line.strip() and not line.startswith('#'):
+                return len(line.split())
+    return 2
+
+
+def iter_edge_chunks(edge_file, chunk_edges=CHUNK_EDGES):
+    """
+    Stream an edge list as NumPy arrays.
+
+    Yields:
+        tuple: (src int64 array, dst int64 array, weight float32 array or None)
+    """
+    columns = _count_columns(edge_file)
+    weighted = columns >= 3
+    usecols = [0, 1, 2] if weighted else [0, 1]
+    dtype = {0: np.int64, 1: np.int64, 2: np.float32} if weighted else {0: np.int64, 1: np.int64}
+    reader = pd.read_csv(edge_file, sep=r'\s+', header=None, comment='#', usecols=usecols,
+                         dtype=dtype, chunksize=chunk_edges, engine='c')
+    for chunk in reader:
+        src = chunk[0].to_numpy()
+        dst = chunk[1].to_numpy()
+        weight = chunk[2].to_numpy() if weighted else None
+        yield src, dst, weight
+
+
+def build_csr_from_chunks(make_chunks, out_dir, num_vertices=None):
+    """
+    Write a CSR cache entry from a stream of edge chunks with a two-pass counting sort.
+
+    Args:
+        make_chunks: Callable returning a fresh iterator of (src, dst, weight or None) chunks;
+                     it is called twice and must yield the same edges both times
+        out_dir: Directory to write indptr.npy, indices.npy and weights.npy to
+        num_vertices: Number of vertices (default: max vertex id + 1)
+
+    Returns:
+        tuple: (num_vertices, num_edges, weighted)
+    """
+    os.makedirs(out_dir, exist_ok=True)
+
+    # Pass 1: out-degrees, vertex count and edge count
+    degrees = np.zeros(0, dtype=np.int64)
+    num_edges = 0
+    max_vertex = -1
+    weighted = False
+    for src, dst, weight in make_chunks():
+        if len(src) == 0:
+            continue
+        weighted = weight is not None
+        max_vertex = max(max_vertex, int(src.max()), int(dst.max()))
+        counts = np.bincount(src)
+        if len(counts) > len(degrees):
+            degrees = np.concatenate([degrees, np.zeros(len(counts) - len(degrees), dtype=np.int64)])
+        degrees[:len(counts)] += counts
+        num_edges += len(src)
+
+    if num_vertices is None:
+        num_vertices = max_vertex + 1
+    degrees = np.concatenate([degrees, np.zeros(num_vertices - len(degrees), dtype=np.int64)])
+    indptr = np.zeros(num_vertices + 1, dtype=np.int64)
+    np.cumsum(degrees, out=indptr[1:])
+
+    index_dtype = np.int32 if num_vertices < np.iinfo(np.int32).max else np.int64
+    indices = np.lib.format.open_memmap(os.path.join(out_dir, 'indices.npy'), mode='w+',
+                                        dtype=index_dtype, shape=(num_edges,))
+    weights = None
+    if weighted:
+        weights = np.lib.format.open_memmap(os.path.join(out_dir, 'weights.npy'), mode='w+',
+                                            dtype=np.float32, shape=(num_edges,))
+    elif os.path.exists(os.path.join(out_dir, 'weights.npy')):
+        os.remove(os.path.join(out_dir, 'weights.npy'))
+
+    # Pass 2: scatter every chunk to its slots; next_slot[v] is the next free slot of v
+    next_slot = indptr[:-1].copy()
+    for src, dst, weight in make_chunks():
+        if len(src) == 0:
+            continue
+        order = np.argsort(src, kind='stable')
+        src_sorted = src[order]
+        # Rank of each edge among the edges of the same source within this chunk
+        group_start = np.flatnonzero(np.r_[True, src_sorted[1:] != src_sorted[:-1]])
+        group_sizes = np.diff(np.r_[group_start, len(src_sorted)])
+        rank = np.arange(len(src_sorted)) - np.repeat(group_start, group_sizes)
+        slots = next_slot[src_sorted] + rank
+        indices[slots] = dst[order]
+        if weights is not None:
+            weights[slots] = weight[order]
+        next_slot[src_sorted[group_start]] += group_sizes
+
+    indices.flush()
+    if weights is not None:
+        weights.flush()
+    np.save(os.path.join(out_dir, 'indptr.npy'), indptr)
+    return int(num_vertices), int(num_edges), weighted
+
+
+def build_csr(edge_file, out_dir, chunk_edges=CHUNK_EDGES):
+    """
+    Convert a text edge list into a CSR cache entry with a two-pass counting sort.
+
+    Args:
+        edge_file: Path to the text edge list ('src dst [weight]' per line)
+        out_dir: Directory to write the cache entry to
+        chunk_edges: Number of edges parsed per chunk
+
+    Returns:
+        dict: The metadata written to meta.json
+    """
+    num_vertices, num_edges, weighted = build_csr_from_chunks(
+        lambda: iter_edge_chunks(edge_file, chunk_edges), out_dir)
+
+    st = os.stat(edge_file)
+    meta = {
+        'edge_file': os.path.abspath(edge_file),
+        'source_size': st.st_size,
+        'source_mtime': st.st_mtime,
+        'num_vertices': num_vertices,
+        'num_edges': num_edges,
+        'weighted': weighted,
+    }
+    with open(os.path.join(out_dir, 'meta.json'), 'w') as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+def _is_fresh(meta_file, edge_file):
+    if not os.path.exists(meta_file):
+        return False
+    with open(meta_file, 'r') as f:
+        meta = json.load(f)
+    st = os.stat(edge_file)
+    return meta.get('source_size') == st.st_size and meta.get('source_mtime') == st.st_mtime
+
+
+def find_edge_file(dataset_name, dataset_dir=DATASET_DIR):
+    """
+    Locate the edge list of a dataset via its properties file, falling back to <dataset>.e.
+    """
+    dataset_path = f"{dataset_dir}/{dataset_name}"
+    edge_file = PropertiesReader(dataset_name, dataset_path).get_edge_file()
+    if edge_file is None:
+        edge_file = f"{dataset_name}.e"
+    return os.path.join(dataset_path, edge_file)
+
+
+def cache_dir_for(dataset_name):
+    return os.path.join(CSR_CACHE_DIR, dataset_name)
+
+
+def load_csr(dataset_name, edge_file=None, rebuild=False):
+    """
+    Load the CSR of a dataset, building the cache entry first if it is missing or stale.
+
+    Args:
+        dataset_name: Name of the dataset (e.g. 'graph500_26')
+        edge_file: Optional explicit edge list path (default: from the properties file)
+        rebuild: Force a rebuild of the cache entry
+
+    Returns:
+        CSRGraph: Memory-mapped graph
+    """
+    if edge_file is None:
+        edge_file = find_edge_file(dataset_name)
+    out_dir = cache_dir_for(dataset_name)
+    meta_file = os.path.join(out_dir, 'meta.json')
+    # Graphs generated straight into the cache (graph_generators.py) have no edge list
+    generated_only = not os.path.exists(edge_file) and os.path.exists(meta_file)
+    if not generated_only and (rebuild or not _is_fresh(meta_file, edge_file)):
+        print(f"Building CSR cache for {dataset_name} from {edge_file}")
+        build_csr(edge_file, out_dir)
+
+    indptr = np.load(os.path.join(out_dir, 'indptr.npy'), mmap_mode='r')
+    indices = np.load(os.path.join(out_dir, 'indices.npy'), mmap_mode='r')
+    weights = None
+    if os.path.exists(os.path.join(out_dir, 'weights.npy')):
+        weights = np.load(os.path.join(out_dir, 'weights.npy'), mmap_mode='r')
+    return CSRGraph(indptr, indices, weights)
+
+
+def gather_neighbors(indptr, indices, frontier):
+    """
+    Concatenate the adjacency lists of all vertices in frontier (vectorized).
+
+    Returns:
+        numpy.ndarray: Positions into indices of every edge leaving the frontier
+    """
+    starts = indptr[frontier]
+    counts = indptr[frontier + 1] - starts
+    total = int(counts.sum())
+    if total == 0:
+        return np.zeros(0, dtype=np.int64)
+    # positions = starts[i] + (0 .. counts[i]-1) for every frontier vertex i
+    offsets = np.repeat(starts - np.r_[0, np.cumsum(counts)[:-1]], counts)
+    return offsets + np.arange(total, dtype=np.int64)
+
+
+def bfs_levels(graph, source):
+    """
+    Frontier-based BFS over out-edges.
+
+    Args:
+        graph: CSRGraph
+        source: Source vertex id
+
+    Returns:
+        numpy.ndarray: int32 level of every vertex, -1 for unreached vertices
+    """
+    levels = np.full(graph.num_vertices, -1, dtype=np.int32)
+    levels[source] = 0
+    frontier = np.array([source], dtype=np.int64)
+    depth = 0
+    while len(frontier):
+        depth += 1
+        neighbors = np.asarray(graph.indices[gather_neighbors(graph.indptr, graph.indices, frontier)])
+        neighbors = neighbors[levels[neighbors] < 0]
+        frontier = np.unique(neighbors).astype(np.int64)
+        levels[frontier] = depth
+    return levels
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the binary CSR cache of a dataset')
+    parser.add_argument('dataset', help='dataset name (directory under /datasets)')
+    parser.add_argument('--edge-file', help='explicit edge list path (default: from the properties file)')
+    parser.add_argument('--rebuild', action='store_true', help='rebuild even if the cache entry is fresh')
+    args = parser.parse_args()
+
+    graph = load_csr(args.dataset, args.edge_file, args.rebuild)
+    print(f"{args.dataset}: {graph.num_vertices} vertices, {graph.num_edges} edges, "
+          f"weighted={graph.weights is not None}, cache={cache_dir_for(args.dataset)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,10 +4,27 @@ Shared utility module for reading and parsing dataset properties files.
 This module provides a PropertiesReader class that can be used across different
 graph processing system benchmarking scripts to read dataset properties files
 and extract relevant information like supported algorithms, source vertices, etc.
+
+Parsed properties are kept in a process-wide index keyed by properties file
+and persisted as JSON (PROPERTIES_INDEX_PATH), so a file is only parsed again
+when its mtime or size changes. build_properties_index() indexes every
+/datasets/*/*.properties file at once and get_dataset_descriptors() returns
+typed DatasetDescriptor objects for a batch of datasets.
 """
 
 import os
+import sys
+import json
+import argparse
 import configparser
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from paths import DATASET_DIR, EXTRA_SPACE_DIR
+
+PROPERTIES_INDEX_PATH = f"{EXTRA_SPACE_DIR}/properties_index.json"
+# Bump when the parsed layout changes so that persisted entries are re-parsed
+PROPERTIES_INDEX_VERSION = 1
 
 
 def get_available_cpus():
@@ -40,6 +57,210 @@ def get_available_cpus():
     return os.cpu_count()
 
 
+def _load_config(properties_file):
+    config = configparser.ConfigParser()
+    # Properties files don't have section headers, so we add a DEFAULT section
+    with open(properties_file, 'r') as f:
+        config.read_string('[DEFAULT]\n' + f.read())
+    return config
+
+
+def match_dataset_key(dataset_name, config_keys):
+    """
+    Find the dataset key (the <key> in graph.<key>.*) of a dataset among property keys.
+
+    The key must equal the dataset name, with underscores and hyphens treated alike
+    (graph500_23 matches graph500-23, but graph500_2 does not match graph500-26).
+    A file that describes a single dataset matches whatever its key is.
+
+    Args:
+        dataset_name: Name of the dataset
+        config_keys: Keys of the properties file (configparser lower-cases them)
+
+    Returns:
+        str: Dataset key, or None
+    """
+    candidates = {key.split('.')[1] for key in config_keys
+                  if key.startswith('graph.') and key.count('.') >= 2}
+    wanted = dataset_name.lower()
+    for variant in (wanted, wanted.replace('_', '-'), wanted.replace('-', '_')):
+        if variant in candidates:
+            return variant
+    normalized = {key.replace('_', '-'): key for key in candidates}
+    if wanted.replace('_', '-') in normalized:
+        return normalized[wanted.replace('_', '-')]
+    if len(candidates) == 1:
+        return candidates.pop()
+    return None
+
+
+def parse_properties(dataset_name, config):
+    """
+    Extract the properties of one dataset from a parsed properties file.
+
+    Returns:
+        dict: JSON-serializable properties (see PropertiesReader.read, without raw_config,
+              plus 'dataset_key', 'edge_file' and 'raw' with the dataset's key/value pairs),
+              or None if the file has no key for the dataset
+    """
+    defaults = config['DEFAULT']
+    dataset_key = match_dataset_key(dataset_name, list(defaults.keys()))
+    if not dataset_key:
+        return None
+    prefix = f"graph.{dataset_key}."
+
+    def value(name):
+        key = prefix + name
+        return defaults[key].strip() if key in defaults else None
+
+    algorithms = [algo.strip() for algo in value('algorithms').split(',')] if value('algorithms') else []
+    # Every system implicitly supports triangles and bc.
+    algorithms += ['triangle', 'bc']
+    edge_props = value('edge-properties.names')
+    vertices = value('meta.vertices')
+    edges = value('meta.edges')
+    return {
+        'algorithms': algorithms,
+        'bfs_source': value('bfs.source-vertex'),
+        'sssp_source': value('sssp.source-vertex'),
+        'directed': (value('directed') or '').lower() == 'true',
+        # Weighted if the comma-separated list of edge properties contains 'weight'
+        'weighted': edge_props is not None and 'weight' in [prop.strip() for prop in edge_props.split(',')],
+        'vertices': int(vertices) if vertices else None,
+        'edges': int(edges) if edges else None,
+        'dataset_key': dataset_key,
+        'edge_file': value('edge-file'),
+        'raw': {key: defaults[key] for key in defaults if key.startswith(prefix)},
+    }
+
+
+class PropertiesIndex:
+    """
+    Parsed properties files, keyed by file path, invalidated by mtime and size.
+
+    Attributes:
+        index_path: JSON file the index is persisted to (None to keep it in memory only)
+        entries: Properties file path -> {'dataset', 'mtime_ns', 'size', 'properties'}
+    """
+
+    def __init__(self, index_path=PROPERTIES_INDEX_PATH):
+        self.index_path = index_path
+        self.entries = {}
+        self._dirty = False
+        self._save_warning_printed = False
+        if index_path and os.path.exists(index_path):
+            try:
+                with open(index_path, 'r') as f:
+                    data = json.load(f)
+                if data.get('version') == PROPERTIES_INDEX_VERSION:
+                    self.entries = data.get('entries', {})
+            except (OSError, ValueError) as e:
+                print(f"Warning: ignoring unreadable properties index {index_path}: {e}")
+
+    def lookup(self, dataset_name, properties_file, save=True):
+        """
+        Properties of a dataset, parsing its file only if it changed since it was indexed.
+
+        Returns:
+            dict: See parse_properties(), or None if the file is missing or has no key for the dataset
+        """
+        try:
+            stat = os.stat(properties_file)
+        except OSError:
+            return None
+        entry = self.entries.get(properties_file)
+        if entry is None or entry['mtime_ns'] != stat.st_mtime_ns or entry['size'] != stat.st_size \
+                or entry['dataset'] != dataset_name:
+            entry = {'dataset': dataset_name, 'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size,
+                     'properties': parse_properties(dataset_name, _load_config(properties_file))}
+            self.entries[properties_file] = entry
+            self._dirty = True
+            if save:
+                self.save()
+        return entry['properties']
+
+    def refresh(self, dataset_dir=DATASET_DIR):
+        """
+        Index every <dataset_dir>/<name>/<name>.properties file and drop entries of removed files.
+
+        Returns:
+            list: Names of the indexed datasets
+        """
+        names = []
+        seen = set()
+        for directory in sorted(os.scandir(dataset_dir), key=lambda d: d.name) if os.path.isdir(dataset_dir) else []:
+            properties_file = os.path.join(directory.path, f"{directory.name}.properties")
+            if directory.is_dir() and os.path.exists(properties_file):
+                seen.add(properties_file)
+                if self.lookup(directory.name, properties_file, save=False) is not None:
+                    names.append(directory.name)
+        prefix = os.path.join(dataset_dir, '')
+        for stale in [f for f in self.entries if f.startswith(prefix) and f not in seen]:
+            del self.entries[stale]
+            self._dirty = True
+        self.save()
+        return names
+
+    def save(self):
+        if not self._dirty or not self.index_path:
+            return
+        try:
+            tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump({'version': PROPERTIES_INDEX_VERSION, 'entries': self.entries}, f)
+            os.replace(tmp_path, self.index_path)
+            self._dirty = False
+        except OSError as e:
+            if not self._save_warning_printed:
+                print(f"Warning: could not persist properties index to {self.index_path}: {e}")
+                self._save_warning_printed = True
+
+
+_properties_index = None
+
+
+def get_properties_index():
+    """
+    The process-wide PropertiesIndex (loaded from PROPERTIES_INDEX_PATH on first use).
+    """
+    global _properties_index
+    if _properties_index is None:
+        _properties_index = PropertiesIndex()
+    return _properties_index
+
+
+def resolve_edge_file(dataset_path, edge_file):
+    """
+    Resolve the edge file name of a properties file against the filesystem.
+
+    Returns the name as given if it exists, else with hyphens converted to underscores
+    if that exists, else the name as given (let the calling code handle the error).
+    """
+    if edge_file is None:
+        return None
+    if os.path.exists(os.path.join(dataset_path, edge_file)):
+        return edge_file
+    converted_file = edge_file.replace('-', '_')
+    if os.path.exists(os.path.join(dataset_path, converted_file)):
+        return converted_file
+    return edge_file
+
+
+def map_algorithms(algorithms, mapping):
+    """
+    Map property-level algorithm names to system-specific ones (unsupported ones are dropped).
+    """
+    if not mapping:
+        return list(algorithms)
+    mapped_algorithms = []
+    for algo in algorithms:
+        if algo in mapping and mapping[algo] is not None:
+            system_algo = mapping[algo]
+            if system_algo not in mapped_algorithms:
+                mapped_algorithms.append(system_algo)
+    return mapped_algorithms
+
+
 class PropertiesReader:
     """
     A class to read and parse dataset properties files.
@@ -110,6 +331,7 @@ class PropertiesReader:
         self.system_name = system_name
         self.properties_file = f"{dataset_path}/{dataset_name}.properties"
         self._properties = None
+        self._parsed = None
 
     def read(self):
         """
@@ -131,78 +353,24 @@ class PropertiesReader:
             print(f"Properties file not found: {self.properties_file}")
             return None
 
-        config = configparser.ConfigParser()
-        # Properties files don't have section headers, so we add a DEFAULT section
-        with open(self.properties_file, 'r') as f:
-            config_string = '[DEFAULT]\n' + f.read()
-
-        config.read_string(config_string)
-
-        # Initialize properties dictionary
-        properties = {
-            'algorithms': [],
-            'bfs_source': None,
-            'sssp_source': None,
-            'directed': False,
-            'weighted': False,
-            'vertices': None,
-            'edges': None,
-            'raw_config': config,
-        }
-
-        # Extract dataset key from properties (handle both formats: graph500-23 or graph500_23)
-        dataset_key = self._find_dataset_key(config)
-
-        if not dataset_key:
+        parsed = get_properties_index().lookup(self.dataset_name, self.properties_file)
+        if parsed is None:
             print(f"Could not find dataset key in properties file for {self.dataset_name}")
             return None
 
-        # Get algorithms list
-        algo_key = f"graph.{dataset_key}.algorithms"
-        if algo_key in config['DEFAULT']:
-            algos_str = config['DEFAULT'][algo_key]
-            properties['algorithms'] = [algo.strip() for algo in algos_str.split(',')]
-        # Every system implicitly supports triangles and bc.
-        properties['algorithms'].append('triangle')
-        properties['algorithms'].append('bc')
-
-        # Get BFS source vertex
-        bfs_key = f"graph.{dataset_key}.bfs.source-vertex"
-        if bfs_key in config['DEFAULT']:
-            properties['bfs_source'] = config['DEFAULT'][bfs_key].strip()
-
-        # Get SSSP source vertex
-        sssp_key = f"graph.{dataset_key}.sssp.source-vertex"
-        if sssp_key in config['DEFAULT']:
-            properties['sssp_source'] = config['DEFAULT'][sssp_key].strip()
-
-        # Get directed property
-        directed_key = f"graph.{dataset_key}.directed"
-        if directed_key in config['DEFAULT']:
-            properties['directed'] = config['DEFAULT'][directed_key].strip().lower() == 'true'
-
-        # Get weighted property (check if edge-properties.names contains 'weight')
-        edge_props_key = f"graph.{dataset_key}.edge-properties.names"
-        if edge_props_key in config['DEFAULT']:
-            edge_props = config['DEFAULT'][edge_props_key].strip()
-            # Check if 'weight' is in the comma-separated list of edge properties
-            properties['weighted'] = 'weight' in [prop.strip() for prop in edge_props.split(',')]
-
-        # Get metadata (vertices and edges)
-        vertices_key = f"graph.{dataset_key}.meta.vertices"
-        if vertices_key in config['DEFAULT']:
-            properties['vertices'] = int(config['DEFAULT'][vertices_key].strip())
-
-        edges_key = f"graph.{dataset_key}.meta.edges"
-        if edges_key in config['DEFAULT']:
-            properties['edges'] = int(config['DEFAULT'][edges_key].strip())
-
+        properties = {key: parsed[key] for key in ('algorithms', 'bfs_source', 'sssp_source', 'directed',
+                                                   'weighted', 'vertices', 'edges')}
+        properties['algorithms'] = list(properties['algorithms'])
+        config = configparser.ConfigParser()
+        config.read_dict({'DEFAULT': parsed['raw']})
+        properties['raw_config'] = config
+        self._parsed = parsed
         self._properties = properties
         return properties
 
     def _find_dataset_key(self, config):
         """
-        Find the dataset key in the config by searching for matching keys.
+        Find the dataset key in the config (see match_dataset_key).
         Handles both underscore and hyphen formats (e.g., graph500_23 vs graph500-23).
 
         Args:
@@ -211,12 +379,7 @@ class PropertiesReader:
         Returns:
             str: Dataset key found in properties, or None
         """
-        dataset_key = None
-        for key in config['DEFAULT']:
-            if self.dataset_name.replace('_', '-') in key or self.dataset_name in key:
-                dataset_key = key.split('.')[1]
-                break
-        return dataset_key
+        return match_dataset_key(self.dataset_name, list(config['DEFAULT'].keys()))
 
     def get_mapped_algorithms(self, custom_mapping=None):
         """
@@ -241,19 +404,8 @@ class PropertiesReader:
         if mapping is None and self.system_name:
             mapping = self.ALGORITHM_MAPPINGS.get(self.system_name, {})
 
-        if not mapping:
-            # No mapping available, return algorithms as-is
-            return self._properties['algorithms']
-
-        # Map algorithms
-        mapped_algorithms = []
-        for algo in self._properties['algorithms']:
-            if algo in mapping and mapping[algo] is not None:
-                system_algo = mapping[algo]
-                if system_algo not in mapped_algorithms:
-                    mapped_algorithms.append(system_algo)
-
-        return mapped_algorithms
+        # No mapping available: algorithms are returned as-is
+        return map_algorithms(self._properties['algorithms'], mapping)
 
     def get_source_vertex(self):
         """
@@ -314,34 +466,10 @@ class PropertiesReader:
         if self._properties is None:
             self.read()
 
-        if self._properties is None or 'raw_config' not in self._properties:
-            return None
-
-        config = self._properties['raw_config']
-        dataset_key = self._find_dataset_key(config)
-
-        if not dataset_key:
+        if self._properties is None:
             return None
 
-        edge_file_key = f"graph.{dataset_key}.edge-file"
-        if edge_file_key in config['DEFAULT']:
-            edge_file = config['DEFAULT'][edge_file_key].strip()
-
-            # Check if file exists with the original name (as specified in properties)
-            original_path = os.path.join(self.dataset_path, edge_file)
-            if os.path.exists(original_path):
-                return edge_file
-
-            # If not, try with hyphens converted to underscores
-            converted_file = edge_file.replace('-', '_')
-            converted_path = os.path.join(self.dataset_path, converted_file)
-            if os.path.exists(converted_path):
-                return converted_file
-
-            # If neither exists, return the original name (let the calling code handle the error)
-            return edge_file
-
-        return None
+        return resolve_edge_file(self.dataset_path, self._parsed['edge_file'])
 
     def get_property(self, key):
         """
@@ -459,3 +587,81 @@ class PropertiesReader:
             list: List of system names
         """
         return list(PropertiesReader.ALGORITHM_MAPPINGS.keys())
+
+
+@dataclass(frozen=True)
+class DatasetDescriptor:
+    """
+    Typed properties of one dataset, as returned by get_dataset_descriptors().
+    """
+    name: str
+    path: str
+    properties_file: str
+    algorithms: Tuple[str, ...]
+    bfs_source: Optional[str]
+    sssp_source: Optional[str]
+    directed: bool
+    weighted: bool
+    vertices: Optional[int]
+    edges: Optional[int]
+    edge_file: Optional[str]
+
+    def mapped_algorithms(self, system_name):
+        """
+        Algorithms of the dataset under the names used by a system (see PropertiesReader.ALGORITHM_MAPPINGS).
+        """
+        return map_algorithms(self.algorithms, PropertiesReader.ALGORITHM_MAPPINGS.get(system_name, {}))
+
+
+def get_dataset_descriptors(dataset_names=None, dataset_dir=DATASET_DIR):
+    """
+    Descriptors of a batch of datasets from the properties index.
+
+    Args:
+        dataset_names: Datasets to describe (default: every dataset with a properties file)
+        dataset_dir: Directory containing the dataset directories
+
+    Returns:
+        dict: Dataset name -> DatasetDescriptor, in the order of dataset_names
+              (datasets without readable properties are left out with a warning)
+    """
+    index = get_properties_index()
+    if dataset_names is None:
+        dataset_names = index.refresh(dataset_dir)
+
+    descriptors = {}
+    for name in dataset_names:
+        path = os.path.join(dataset_dir, name)
+        properties_file = os.path.join(path, f"{name}.properties")
+        parsed = index.lookup(name, properties_file, save=False)
+        if parsed is None:
+            print(f"Warning: no properties for dataset {name} in {properties_file}")
+            continue
+        descriptors[name] = DatasetDescriptor(
+            name=name, path=path, properties_file=properties_file,
+            algorithms=tuple(parsed['algorithms']), bfs_source=parsed['bfs_source'],
+            sssp_source=parsed['sssp_source'], directed=parsed['directed'], weighted=parsed['weighted'],
+            vertices=parsed['vertices'], edges=parsed['edges'],
+            edge_file=resolve_edge_file(path, parsed['edge_file']))
+    index.save()
+    return descriptors
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the properties index of the datasets and list them')
+    parser.add_argument('datasets', nargs='*', help='datasets to list (default: all under --dataset-dir)')
+    parser.add_argument('--dataset-dir', default=DATASET_DIR, help='directory containing the datasets')
+    parser.add_argument('--system', help='show algorithm names as used by this system')
+    args = parser.parse_args()
+
+    descriptors = get_dataset_descriptors(args.datasets or None, args.dataset_dir)
+    for d in descriptors.values():
+        algorithms = d.mapped_algorithms(args.system) if args.system else list(d.algorithms)
+        print(f"{d.name}: |V|={d.vertices} |E|={d.edges} directed={d.directed} weighted={d.weighted} "
+              f"edge_file={d.edge_file} algorithms={','.join(algorithms)}")
+    print(f"\n{len(descriptors)} datasets indexed in {get_properties_index().index_path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
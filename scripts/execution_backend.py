@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Execution backends for the runner scripts.
+
+The runners used to execute only inside the Docker image of their system,
+started by launch-container.sh with the benchmark layout bind-mounted at fixed
+paths. A backend runs a shell command (usually a runner script) somewhere and
+reports how it ended:
+
+    LocalBackend      - a process on this machine, against the path roots of
+                        paths.py (env or BENCH_PATHS_CONFIG); an optional memory
+                        limit is enforced with a child cgroup (memory_sweep.run_limited)
+                        and an optional CPU list with taskset. Meant for smoke
+                        campaigns on small graphs on a dev box, where container
+                        start-up dominates the run time.
+    DockerExecBackend - docker exec into an already running container of the
+                        system image; the limits are applied to the container
+                        with docker update, so no container is started per run.
+
+Both return the same result dict as memory_sweep.run_limited(): returncode,
+wall_s, oom, timed_out and peak_mb (None where the backend cannot tell).
+
+Usage:
+    python execution_backend.py local gapbs                        # run gapbs.py locally
+    python execution_backend.py local galois --memory-mb 4000 -- --dry_run
+    python execution_backend.py docker ligra --container ligra_run --cpus 0-15
+"""
+
+import os
+import sys
+import time
+import shlex
+import signal
+import argparse
+import subprocess
+
+from paths import ROOTS, DEFAULT_ROOTS, SCRIPTS_DIR, roots_env
+from memory_sweep import prepare_cgroups, run_limited
+
+# Runner script of every system, relative to the scripts root
+RUNNERS = {
+    'gapbs': "gapbs/gapbs.py",
+    'gapbs_fixed': "gapbs/gapbs_fixed.py",
+    'ligra': "ligra/ligra.py",
+    'galois': "galois/galois.py",
+    'gemini': "gemini/gemini.py",
+    'blaze': "blaze/blaze.py",
+    'lumos': "lumos/lumos.py",
+    'gridgraph': "gridgraph/gridgraph.py",
+    'graphchi': "graphchi/graphchi.py",
+    'graphchi_1by1': "graphchi/graphchi_1by1.py",
+    'xstream': "xstream/xstream.py",
+    'flexograph': "flexograph.py",
+}
+BACKENDS = ['local', 'docker']
+
+
+def runner_command(system, args=(), scripts_dir=SCRIPTS_DIR, python='python3'):
+    """
+    Shell command that runs the runner script of a system.
+
+    Args:
+        system: Key of RUNNERS
+        args: Extra command line arguments of the runner
+        scripts_dir: Scripts root as seen by the backend
+        python: Interpreter that runs the script
+
+    Returns:
+        tuple: (command, working directory)
+    """
+    if system not in RUNNERS:
+        raise ValueError(f"unknown system {system}, expected one of {sorted(RUNNERS)}")
+    script = os.path.join(scripts_dir, RUNNERS[system])
+    cmd = ' '.join(shlex.quote(part) for part in [python, script] + list(args))
+    return cmd, os.path.dirname(script)
+
+
+class LocalBackend:
+    """
+    Runs commands as local processes against the path roots of paths.py.
+    """
+
+    name = 'local'
+
+    def __init__(self, roots=None, memory_mb=None, cpus=None):
+        """
+        Args:
+            roots: Path roots handed to the commands (default: paths.ROOTS)
+            memory_mb: Memory limit of every command, enforced with a child cgroup (None: no limit)
+            cpus: CPU list the commands are pinned to with taskset, e.g. "0-7" (None: all CPUs)
+        """
+        self.roots = dict(roots or ROOTS)
+        self.memory_mb = memory_mb
+        self.cpus = cpus
+        self._cgroup_parent = prepare_cgroups() if memory_mb else None
+
+    @property
+    def scripts_dir(self):
+        return self.roots['scripts']
+
+    def environment(self, env=None):
+        """
+        Environment of a command: the current one plus the path roots, with the
+        scripts root on PYTHONPATH so that the shared modules import.
+        """
+        environ = dict(os.environ)
+        environ.update(roots_env(self.roots))
+        pythonpath = environ.get('PYTHONPATH')
+        environ['PYTHONPATH'] = f"{self.scripts_dir}:{pythonpath}" if pythonpath else self.scripts_dir
+        environ.update(env or {})
+        return environ
+
+    def run(self, cmd, log_file, cwd=None, timeout=None, env=None):
+        """
+        Run a shell command, writing its stdout and stderr to log_file.
+
+        Returns:
+            dict: returncode, wall_s, oom, timed_out, peak_mb
+        """
+        if self.cpus:
+            cmd = f"taskset -c {self.cpus} sh -c {shlex.quote(cmd)}"
+        environ = self.environment(env)
+        if self._cgroup_parent:
+            return run_limited(cmd, self.memory_mb, self._cgroup_parent, log_file, timeout, cwd, environ)
+
+        timed_out = False
+        with open(log_file, 'w') as log:
+            start = time.time()
+            # New session so that a timeout kills the whole process group, not just the shell
+            process = subprocess.Popen(cmd, shell=True, cwd=cwd, env=environ, stdout=log,
+                                       stderr=subprocess.STDOUT, start_new_session=True)
+            try:
+                returncode = process.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                timed_out = True
+                os.killpg(process.pid, signal.SIGKILL)
+                returncode = process.wait()
+            wall_s = time.time() - start
+        return {'returncode': returncode, 'wall_s': wall_s, 'oom': False, 'timed_out': timed_out,
+                'peak_mb': None}
+
+    def run_runner(self, system, log_file, args=(), timeout=None):
+        """
+        Run the runner script of a system.
+        """
+        cmd, cwd = runner_command(system, args, self.scripts_dir, sys.executable)
+        return self.run(cmd, log_file, cwd=cwd, timeout=timeout)
+
+
+class DockerExecBackend:
+    """
+    Runs commands with docker exec in a long-lived container of a system image.
+
+    The container keeps the bind mounts of launch-container.sh, so the commands
+    see the default (container) path roots.
+    """
+
+    name = 'docker'
+
+    def __init__(self, container, memory_mb=None, cpus=None, mems=None):
+        """
+        Args:
+            container: Name or id of a running container
+            memory_mb: Memory limit applied to the container with docker update (None: unchanged)
+            cpus: CPU list applied to the container with docker update (None: unchanged)
+            mems: NUMA memory nodes applied to the container with docker update (None: unchanged)
+        """
+        self.container = container
+        self.memory_mb = None
+        self.cpus = None
+        self.mems = None
+        self.roots = dict(DEFAULT_ROOTS)
+        self.update_limits(memory_mb, cpus, mems)
+
+    @property
+    def scripts_dir(self):
+        return self.roots['scripts']
+
+    def update_limits(self, memory_mb=None, cpus=None, mems=None):
+        """
+        Change the memory limit (swap disabled), the CPU list and the memory nodes of the
+        running container. Limits that are None or already in place are left alone, so
+        that repeated jobs with the same limits do not call docker at all.
+        """
+        cmd = ['docker', 'update']
+        if memory_mb and int(memory_mb) != self.memory_mb:
+            cmd += ['--memory', f"{int(memory_mb)}m", '--memory-swap', f"{int(memory_mb)}m"]
+        if cpus and cpus != self.cpus:
+            cmd += ['--cpuset-cpus', cpus]
+        if mems and mems != self.mems:
+            cmd += ['--cpuset-mems', mems]
+        if len(cmd) == 2:
+            return
+        subprocess.run(cmd + [self.container], check=True, stdout=subprocess.DEVNULL)
+        self.memory_mb = int(memory_mb) if memory_mb else self.memory_mb
+        self.cpus = cpus or self.cpus
+        self.mems = mems or self.mems
+
+    def run(self, cmd, log_file, cwd=None, timeout=None, env=None):
+        """
+        Run a shell command in the container, writing its stdout and stderr to log_file.
+
+        The timeout is enforced inside the container (coreutils timeout), since killing
+        the docker exec client would leave the command running. The OOMKilled flag of
+        the container is only set for its main process, so an exec'd command that
+        was SIGKILLed (exit status 137) before the timeout is reported as OOM.
+
+        Returns:
+            dict: returncode, wall_s, oom, timed_out, peak_mb
+        """
+        exec_cmd = ['docker', 'exec']
+        if cwd:
+            exec_cmd += ['-w', cwd]
+        for key, value in (env or {}).items():
+            exec_cmd += ['-e', f"{key}={value}"]
+        if timeout:
+            cmd = f"timeout --signal=KILL {int(timeout)} sh -c {shlex.quote(cmd)}"
+        exec_cmd += [self.container, 'sh', '-c', cmd]
+
+        with open(log_file, 'w') as log:
+            start = time.time()
+            returncode = subprocess.run(exec_cmd, stdout=log, stderr=subprocess.STDOUT).returncode
+            wall_s = time.time() - start
+        timed_out = bool(timeout) and returncode == 137 and wall_s >= timeout
+        oom = returncode == 137 and not timed_out
+        return {'returncode': returncode, 'wall_s': wall_s, 'oom': oom, 'timed_out': timed_out,
+                'peak_mb': None}
+
+    def run_runner(self, system, log_file, args=(), timeout=None):
+        """
+        Run the runner script of a system in the container.
+        """
+        cmd, cwd = runner_command(system, args, self.scripts_dir)
+        return self.run(cmd, log_file, cwd=cwd, timeout=timeout)
+
+
+def get_backend(name, container=None, memory_mb=None, cpus=None, roots=None):
+    """
+    Create a backend by name.
+
+    Args:
+        name: One of BACKENDS
+        container: Container of the docker backend
+        memory_mb: Memory limit of the commands (None: no limit)
+        cpus: CPU list of the commands (None: all CPUs)
+        roots: Path roots of the local backend (default: paths.ROOTS)
+    """
+    if name == 'local':
+        return LocalBackend(roots, memory_mb, cpus)
+    if name == 'docker':
+        if not container:
+            raise ValueError("the docker backend needs a container")
+        return DockerExecBackend(container, memory_mb, cpus)
+    raise ValueError(f"unknown backend {name}, expected one of {BACKENDS}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a system runner locally or in a running container')
+    parser.add_argument('backend', choices=BACKENDS, help='execution backend')
+    parser.add_argument('system', choices=sorted(RUNNERS), help='system whose runner to run')
+    parser.add_argument('runner_args', nargs='*', help='arguments of the runner (after --)')
+    parser.add_argument('--container', help='running container of the docker backend')
+    parser.add_argument('--memory-mb', type=int, help='memory limit in MB')
+    parser.add_argument('--cpus', help='CPU list, e.g. 0-15')
+    parser.add_argument('--timeout', type=int, help='timeout in seconds')
+    parser.add_argument('--log', help='log file (default: <results>/<system>/runner_<backend>.log)')
+    args = parser.parse_args()
+
+    try:
+        backend = get_backend(args.backend, args.container, args.memory_mb, args.cpus)
+    except (ValueError, RuntimeError, subprocess.CalledProcessError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    log_file = args.log or os.path.join(ROOTS['results'], args.system, f"runner_{args.backend}.log")
+    os.makedirs(os.path.dirname(os.path.abspath(log_file)), exist_ok=True)
+
+    result = backend.run_runner(args.system, log_file, args.runner_args, args.timeout)
+    status = 'timed out' if result['timed_out'] else 'OOM' if result['oom'] else f"exit {result['returncode']}"
+    print(f"{args.system} ({backend.name}): {status} after {result['wall_s']:.1f} s, log: {log_file}")
+    return 0 if result['returncode'] == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
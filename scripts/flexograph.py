@@ -3,11 +3,13 @@ import sys
 import json
 import re
 
-SRC_DIR = "/systems/FlexoGraph"
-BUILD_DIR = "/systems/FlexoGraph/build/release"
-DB_DIR = "/systems/FlexoGraph/db"
-RESULTS_DIR = "/results/flexograph"
-BENCHMARK_DIR = "/systems/FlexoGraph/build/release/benchmark"
+from paths import SYSTEMS_DIR, RESULTS_ROOT
+
+SRC_DIR = f"{SYSTEMS_DIR}/FlexoGraph"
+BUILD_DIR = f"{SYSTEMS_DIR}/FlexoGraph/build/release"
+DB_DIR = f"{SYSTEMS_DIR}/FlexoGraph/db"
+RESULTS_DIR = f"{RESULTS_ROOT}/flexograph"
+BENCHMARK_DIR = f"{SYSTEMS_DIR}/FlexoGraph/build/release/benchmark"
 
 NUM_ITERATIONS = 25 # Number of iterations for PageRank
 
@@ -17,10 +19,10 @@ def main(self):
   #We need to edit config.json to match the values we want.
   with open(f'{SRC_DIR}/config.json', 'r+') as f:
     data = json.load(f)
-    data['GRAPH_PROJECT_DIR'] = "/systems/FlexoGraph"
-    data['GRAPH_DB_DIR'] = "/systems/FlexoGraph/db"
+    data['GRAPH_PROJECT_DIR'] = f"{SYSTEMS_DIR}/FlexoGraph"
+    data['GRAPH_DB_DIR'] = f"{SYSTEMS_DIR}/FlexoGraph/db"
     data['num_threads'] = 25
-    data['LOG_DIR'] = "/results/flexograph"
+    data['LOG_DIR'] = f"{RESULTS_ROOT}/flexograph"
     f.seek(0)        # <--- should reset file position to the beginning.
     json.dump(data, f, indent=4)
     f.truncate()
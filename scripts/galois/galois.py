@@ -7,49 +7,95 @@ from os import readv
 from pathlib import Path
 
 # Add parent directory to path to import shared utilities
-sys.path.insert(0, '/scripts')
+sys.path.insert(0, os.environ.get('BENCH_SCRIPTS_DIR', '/scripts'))
+from paths import DATASET_DIR, SYSTEMS_DIR, RESULTS_ROOT, EXTRA_SPACE_DIR
 from dataset_properties import PropertiesReader, get_available_cpus
-
-SRC_DIR = "/systems/in-mem/Galois"
-BUILD_DIR = "/systems/in-mem/Galois/build"
+from build_cache import cached_build
+from process_runner import LineCollector, run_streaming
+from watchdog import Watchdog, time_budget_s, record_timeout
+from conversion_pipeline import ConversionPipeline
+from preprocessing_ledger import run_step
+
+SRC_DIR = f"{SYSTEMS_DIR}/in-mem/Galois"
+BUILD_DIR = f"{SYSTEMS_DIR}/in-mem/Galois/build"
 ITERATIONS = 5
+# Binaries produced by the build, relative to SRC_DIR
+BUILD_ARTIFACTS = [
+    "build/lonestar/bfs/bfs",
+    "build/lonestar/connectedcomponents/connectedcomponents",
+    "build/lonestar/pagerank/pagerank-pull",
+    "build/lonestar/triangles/triangles",
+    "build/lonestar/sssp/sssp",
+    "build/lonestar/betweennesscentrality/bc-async",
+    "build/tools/graph-convert/graph-convert",
+]
 THREADS = get_available_cpus()
+# Set by --validate: one extra untimed run per benchmark dumps its output for diffing
+VALIDATE = False
+# Algorithm names in the results store (results_store.GALOIS_ALGOS), used for budgets and timeout records
+RESULT_ALGOS = {"BFS": "bfs", "PAGERANK": "pagerank", "LABELPROP": "cc", "ORDEREDCOUNT": "tc", "BC": "bc", "SSSP": "sssp"}
+# Trial budget when the cost model has no prediction; BC used to run forever on some graphs
+DEFAULT_BUDGETS_S = {"BC": 2 * 3600}
+# Seconds without output, CPU time or I/O before a trial counts as hung
+STALL_S = 900
+# algo_time of a trial ended by the watchdog; such trials are recorded in timeouts.jsonl instead of the CSV
+TIMEOUT = "timeout"
+DATASETS = ["uk-2007", "com-friendster", "graph500_26", "graph500_28", "graph500_30", "uniform_26", "twitter_mpi"]  #"dota_league",
 print(f"Using {THREADS} threads based on available CPUs")
 
-def parse_log(buffer, algo):
-    '''Read the log file line by line and match the regex to get the required values:
-    the lines look like:
+def log_patterns(algo):
+    '''Fields parsed from the benchmark output while it runs; the lines look like:
     STAT, {ALGO}_MAIN, Time, TMAX, \d+
     STAT, ReadGraph, Time, TMAX, \d+
     '''
-    regex_algo = re.compile(fr"STAT, {algo}_MAIN, Time, TMAX, (\d+)")
-    regex_read = re.compile(r"STAT, ReadGraph, Time, TMAX, (\d+)")
-    regex_mem = re.compile(r"MemoryCounter:\s+\d+\s+MB\s->\s+\d+\s+MB,\s+(\d+)\s+MB\s+total")
-    regex_faults = re.compile(r"MemoryCounter:\s+(\d+)\s+major\s+faults,\s+(\d+)\s+minor\s+faults")
-    regex_blockIO = re.compile(r"MemoryCounter:\s+(\d+)\s+block\s+input operations,\s+(\d+)\s+block\s+output\s+operations")
-    algo_time =0
-    read_time =0
-    mem = 0
-    major_faults = 0
-    minor_faults = 0
-    block_input = 0
-    block_output = 0
-    for line in buffer.splitlines():
-        if "ReadGraph" in line:
-            read_time = regex_read.search(line).group(1)
-        elif f"{algo}_MAIN" in line:
-            algo_time = regex_algo.search(line).group(1)
-        elif "MB total" in line:
-            mem = regex_mem.search(line).group(1)
-        elif "faults" in line:
-            major_faults = regex_faults.search(line).group(1)
-            minor_faults = regex_faults.search(line).group(2)
-        elif "output operations" in line:
-            block_input = regex_blockIO.search(line).group(1)
-            block_output = regex_blockIO.search(line).group(2)
+    return {
+        'algo': fr"STAT, {algo}_MAIN, Time, TMAX, (\d+)",
+        'read': r"STAT, ReadGraph, Time, TMAX, (\d+)",
+        'mem': r"MemoryCounter:\s+\d+\s+MB\s->\s+\d+\s+MB,\s+(\d+)\s+MB\s+total",
+        'faults': r"MemoryCounter:\s+(\d+)\s+major\s+faults,\s+(\d+)\s+minor\s+faults",
+        'blockIO': r"MemoryCounter:\s+(\d+)\s+block\s+input operations,\s+(\d+)\s+block\s+output\s+operations",
+    }
+
+def parse_log(collector):
+    '''Last value of every field collected while the benchmark ran (0 if it never appeared).'''
+    read_time = collector.last('read')
+    algo_time = collector.last('algo')
+    mem = collector.last('mem')
+    major_faults = collector.last('faults', 0)
+    minor_faults = collector.last('faults', 1)
+    block_input = collector.last('blockIO', 0)
+    block_output = collector.last('blockIO', 1)
 
     return read_time, algo_time, mem, major_faults, minor_faults, block_input, block_output
 
+def run_trial(command, outfile_stats, algo, params=''):
+    '''Run one trial under the watchdog, streaming its output into the stats log, and parse it.
+    A trial that is over budget or hung is recorded as a timeout, under the params its CSV rows
+    have in the results store (e.g. 'start=<v>' for BFS), and returned with algo_time TIMEOUT.'''
+    dataset = Path(command[-1]).stem
+    collector = LineCollector(log_patterns(algo))
+    budget_s = time_budget_s("galois", dataset, RESULT_ALGOS[algo], default_s=DEFAULT_BUDGETS_S.get(algo))
+    result = run_streaming(command, outfile_stats, parsers=[collector.feed], append=True,
+                           watchdog=Watchdog(budget_s, STALL_S))
+    with open(outfile_stats, "a") as fout:
+        fout.write("\n----------------\n")
+    values = parse_log(collector)
+    if result.timed_out:
+        record_timeout("galois", dataset, RESULT_ALGOS[algo], result, params=params, metrics=collector.matches)
+        return values[:1] + (TIMEOUT,) + values[2:]
+    return values
+
+def validate_output(command, gr_path, algo, source_vertex=None):
+    '''Re-run command once with the output dump enabled and diff the dump against the reference.'''
+    # Imported here so that plain benchmark runs do not need numpy/scipy
+    from output_validation import dump_args, output_dir_for, validate_run
+    dataset = Path(gr_path).stem
+    out_dir = output_dir_for("galois", dataset, algo)
+    dump_command = command[:-1] + dump_args("galois", out_dir) + command[-1:]
+    print(f"Command: {' '.join(dump_command)}")
+    subprocess.run(dump_command, stdout=subprocess.DEVNULL)
+    validate_run("galois", dataset, algo, out_dir, int(source_vertex) if source_vertex is not None else None)
+
 def do_bfs(gr_path, output_path, source_vertex, num_threads, conv_time, dry_run=False):
     dataset = gr_path
     outfile = f"{output_path}_synctile_parallel_time.csv"
@@ -63,12 +109,15 @@ def do_bfs(gr_path, output_path, source_vertex, num_threads, conv_time, dry_run=
     print(f"Command: {' '.join(command)}")
 
     if not dry_run:
-        with open(outfile_stats, "a") as fout, open(outfile, "a") as f:
+        with open(outfile, "a") as f:
             for i in range(ITERATIONS):
-                process = subprocess.run(command, stdout=subprocess.PIPE, text=True)
-                fout.write(f"{process.stdout}\n----------------\n")
-                read_time, algo_time, mem, maj_flt, min_flt, blck_in, blck_out = parse_log(process.stdout, "BFS")
+                read_time, algo_time, mem, maj_flt, min_flt, blck_in, blck_out = run_trial(
+                    command, outfile_stats, "BFS", params=f"start={source_vertex}")
+                if algo_time == TIMEOUT:
+                    break  # recorded in timeouts.jsonl, not in the CSV
                 f.write(f"{conv_time},{read_time},{algo_time},{source_vertex},{mem},{num_threads},{maj_flt},{min_flt},{blck_in},{blck_out}\n")
+            if VALIDATE:
+                validate_output(command, gr_path, "bfs", source_vertex)
 
 
 def do_pagerank(gr_path, output_path, num_threads, conv_time, dry_run=False):
@@ -83,12 +132,14 @@ def do_pagerank(gr_path, output_path, num_threads, conv_time, dry_run=False):
     command = [f"{BUILD_DIR}/lonestar/pagerank/pagerank-pull", f"-t={num_threads}", "-tolerance=0.0001", "-algo=Residual", "-noverify", f"{dataset}"]
     print(f"Command: {' '.join(command)}")
     if not dry_run:
-        with open(outfile_stats, "a") as fout, open(outfile, "a") as f:
+        with open(outfile, "a") as f:
             for i in range(ITERATIONS):
-                process = subprocess.run(command, stdout=subprocess.PIPE, text=True)
-                fout.write(f"{process.stdout}\n----------------\n")
-                read_time, algo_time, mem, maj_flt, min_flt, blck_in, blck_out= parse_log(process.stdout, "PAGERANK")
+                read_time, algo_time, mem, maj_flt, min_flt, blck_in, blck_out = run_trial(command, outfile_stats, "PAGERANK")
+                if algo_time == TIMEOUT:
+                    break  # recorded in timeouts.jsonl, not in the CSV
                 f.write(f"{conv_time},{read_time},{algo_time},{mem},{num_threads},{maj_flt},{min_flt},{blck_in},{blck_out}\n")
+            if VALIDATE:
+                validate_output(command, gr_path, "pagerank")
 
 def do_connectedcomponents(gr_path, output_path, num_threads, conv_time, dry_run=False):
     dataset = gr_path
@@ -101,12 +152,14 @@ def do_connectedcomponents(gr_path, output_path, num_threads, conv_time, dry_run
     command = [f"{BUILD_DIR}/lonestar/connectedcomponents/connectedcomponents", f"-t={num_threads}", "-algo=LabelProp", "-noverify", f"{dataset}"]
     print(f"Command: {' '.join(command)}")
     if not dry_run:
-        with open(outfile_stats, "a") as fout, open(outfile, "a") as f:
+        with open(outfile, "a") as f:
             for i in range(ITERATIONS):
-                process = subprocess.run(command, stdout=subprocess.PIPE, text=True)
-                fout.write(f"{process.stdout}\n----------------\n")
-                read_time, algo_time, mem, maj_flt, min_flt, blck_in, blck_out  = parse_log(process.stdout, "LABELPROP")
+                read_time, algo_time, mem, maj_flt, min_flt, blck_in, blck_out = run_trial(command, outfile_stats, "LABELPROP")
+                if algo_time == TIMEOUT:
+                    break  # recorded in timeouts.jsonl, not in the CSV
                 f.write(f"{conv_time},{read_time},{algo_time},{mem},{num_threads},{maj_flt},{min_flt},{blck_in},{blck_out}\n")
+            if VALIDATE:
+                validate_output(command, gr_path, "connectedcomponents")
 
 def do_triangles(gr_path, output_path, num_threads, conv_time, dry_run=False):
     dataset = gr_path
@@ -119,11 +172,11 @@ def do_triangles(gr_path, output_path, num_threads, conv_time, dry_run=False):
     command = [f"{BUILD_DIR}/lonestar/triangles/triangles", f"-t={num_threads}", "-algo=orderedCount", "-noverify", f"{dataset}"]
     print(f"Command: {' '.join(command)}")
     if not dry_run:
-        with open(outfile_stats, "a") as fout, open(outfile, "a") as f:
+        with open(outfile, "a") as f:
             for i in range(ITERATIONS):
-                process = subprocess.run(command, stdout=subprocess.PIPE, text=True)
-                fout.write(f"{process.stdout}\n----------------\n")
-                read_time, algo_time, mem, maj_flt, min_flt, blck_in, blck_out  = parse_log(process.stdout, "ORDEREDCOUNT")
+                read_time, algo_time, mem, maj_flt, min_flt, blck_in, blck_out = run_trial(command, outfile_stats, "ORDEREDCOUNT")
+                if algo_time == TIMEOUT:
+                    break  # recorded in timeouts.jsonl, not in the CSV
                 f.write(f"{conv_time},{read_time},{algo_time},{mem},{num_threads},{maj_flt},{min_flt},{blck_in},{blck_out}\n")
 
 def do_bc(gr_path, output_path, source_vertex, num_threads, conv_time, dry_run=False):
@@ -137,11 +190,11 @@ def do_bc(gr_path, output_path, source_vertex, num_threads, conv_time, dry_run=F
     command = [f"{BUILD_DIR}/lonestar/betweennesscentrality/bc-async", f"-t={num_threads}", f"-sourcesToUse={source_vertex}", "-numOfSources=1", "-noverify", f"{dataset}"]
     print(f"Command: {' '.join(command)}")
     if not dry_run:
-        with open(outfile_stats, "a") as fout, open(outfile, "a") as f:
+        with open(outfile, "a") as f:
             for i in range(ITERATIONS):
-                process = subprocess.run(command, stdout=subprocess.PIPE, text=True)
-                fout.write(f"{process.stdout}\n----------------\n")
-                read_time, algo_time, mem, maj_flt, min_flt, blck_in, blck_out  = parse_log(process.stdout, "BC")
+                read_time, algo_time, mem, maj_flt, min_flt, blck_in, blck_out = run_trial(command, outfile_stats, "BC")
+                if algo_time == TIMEOUT:
+                    break  # recorded in timeouts.jsonl, not in the CSV
                 f.write(f"{conv_time},{read_time},{algo_time},{mem},{num_threads},{maj_flt},{min_flt},{blck_in},{blck_out}\n")
 
 def do_sssp(gr_path, output_path, source_vertex, num_threads, conv_time, dry_run=False):
@@ -155,263 +208,248 @@ def do_sssp(gr_path, output_path, source_vertex, num_threads, conv_time, dry_run
     command = [f"{BUILD_DIR}/lonestar/sssp/sssp", f"-t={num_threads}", f"-startNode={source_vertex}", "-algo=deltaStep", "-noverify", f"{dataset}"]
     print(f"Command: {' '.join(command)}")
     if not dry_run:
-        with open(outfile_stats, "a") as fout, open(outfile, "a") as f:
+        with open(outfile, "a") as f:
             for i in range(ITERATIONS):
-                process = subprocess.run(command, stdout=subprocess.PIPE, text=True)
-                fout.write(f"{process.stdout}\n----------------\n")
-                read_time, algo_time, mem, maj_flt, min_flt, blck_in, blck_out  = parse_log(process.stdout, "SSSP")
+                read_time, algo_time, mem, maj_flt, min_flt, blck_in, blck_out = run_trial(command, outfile_stats, "SSSP")
+                if algo_time == TIMEOUT:
+                    break  # recorded in timeouts.jsonl, not in the CSV
                 f.write(f"{conv_time},{read_time},{algo_time},{mem},{num_threads},{maj_flt},{min_flt},{blck_in},{blck_out}\n")
+            if VALIDATE:
+                validate_output(command, gr_path, "sssp", source_vertex)
+
+
+def prepare_dataset(dataset, dry_run=False):
+    '''Read the properties of a dataset and convert it to the graph formats its benchmarks need.
+    Returns None if the dataset cannot be benchmarked.'''
+    dataset_dir = f"{DATASET_DIR}/{dataset}"
+    gr_path = Path(f"{EXTRA_SPACE_DIR}/galois/{dataset}.gr")
+    conv_time_file = Path(f"{RESULTS_ROOT}/galois/conv_time_{dataset}.txt")
+
+    # Read properties file using PropertiesReader
+    props_reader = PropertiesReader(dataset, dataset_dir, system_name='galois')
+    properties = props_reader.read()
+
+    if properties is None:
+        print(f"Could not read properties for {dataset}, skipping")
+        return None
+
+    # Get the correct edge file name from properties
+    edge_file = props_reader.get_edge_file()
+    if edge_file is None:
+        print(f"Could not determine edge file for {dataset}, skipping")
+        return None
+
+    dataset_path = Path(f"{DATASET_DIR}/{dataset}/{edge_file}")
+    print(f"Using edge file: {edge_file}")
+
+    # Get mapped algorithms for Galois
+    supported_benchmarks = props_reader.get_mapped_algorithms()
+
+    if not supported_benchmarks:
+        print(f"No supported Galois algorithms found for {dataset}, skipping")
+        return None
+
+    print(f"Dataset: {dataset}")
+    print(f"  Supported algorithms from properties: {properties['algorithms']}")
+    print(f"  Galois benchmarks to run: {supported_benchmarks}")
+    print(f"  Directed: {props_reader.is_directed()}")
+    print(f"  Weighted: {props_reader.is_weighted()}")
+
+    # Determine graph format requirements
+    graph_format_notes = []
+    if not props_reader.is_directed():
+        graph_format_notes.append("Will convert to .sgr (symmetric)")
+    if 'pagerank' in supported_benchmarks and props_reader.is_directed():
+        graph_format_notes.append("Will generate .tgr (transpose) for PageRank")
+
+    if graph_format_notes:
+        print(f"  Graph conversions: {', '.join(graph_format_notes)}")
+
+    # Convert to .gr format if needed
+    if not gr_path.exists() or not conv_time_file.exists():
+        command = [
+            f"{BUILD_DIR}/tools/graph-convert/graph-convert", "-edgelist2gr"]
+        if props_reader.is_weighted():
+            command.append("-edgeType=float64")
+
+        command.extend([str(dataset_path), str(gr_path)])
+        print(f"Command: {' '.join(command)}")
+        if not dry_run:
+            step = run_step("galois", dataset, "galois.gr", command)
+            time_taken = f"{step.wall_s:.2f}"
+            with open(conv_time_file, "w") as f:
+                f.write(time_taken + "\n")
+            print(f"Time to convert {dataset} to gr: {time_taken}")
+        else:
+            time_taken = "0.0"  # Dummy value for dry run
+    else:
+        print(f"Dataset {dataset} already exists in .gr format")
+        with open(conv_time_file, "r") as f:
+            time_taken = f.read().strip()
+
+    # After initial .gr conversion, handle undirected graphs
+    if not props_reader.is_directed():
+        sgr_path = Path(f"{EXTRA_SPACE_DIR}/galois/{dataset}.sgr")
+        sgr_conv_time_file = Path(f"{RESULTS_ROOT}/galois/conv_time_{dataset}_sgr.txt")
+
+        if not sgr_path.exists() or not sgr_conv_time_file.exists():
+            print(f"Converting {dataset} to symmetric graph format (.sgr)")
+            command = [
+                f"{BUILD_DIR}/tools/graph-convert/graph-convert",
+                "-gr2sgr",
+                str(gr_path),
+                str(sgr_path)
+            ]
+
+            print(f"Command: {' '.join(command)}")
+            if not dry_run:
+                step = run_step("galois", dataset, "galois.sgr", command, depends_on=["galois.gr"], check=True)
+                time_taken_sgr = f"{step.wall_s:.2f}"
+            else:
+                time_taken_sgr = "0.0"  # Dummy value for dry run
+
+            if not dry_run:
+                with open(sgr_conv_time_file, "w") as f:
+                    f.write(time_taken_sgr + "\n")
+                print(f"Time to convert {dataset} to .sgr: {time_taken_sgr}")
+        else:
+            print(f"Dataset {dataset} already exists in .sgr format")
+            with open(sgr_conv_time_file, "r") as f:
+                time_taken_sgr = f.read().strip()
+
+        # Use symmetric graph for all subsequent algorithms
+        gr_path = sgr_path
+
+    # Calculate base conversion time for most algorithms
+    # For undirected graphs: base time = .gr + .sgr
+    # For directed graphs: base time = .gr only
+    if not props_reader.is_directed():
+        base_conv_time = float(time_taken) + float(time_taken_sgr)
+    else:
+        base_conv_time = float(time_taken)
+
+    # PageRank-pull requires transpose graph for directed graphs
+    tgr_path = gr_path
+    pagerank_conv_time = base_conv_time
+    if 'pagerank' in supported_benchmarks and props_reader.is_directed():
+        tgr_path = Path(f"{EXTRA_SPACE_DIR}/galois/{dataset}.tgr")
+        tgr_conv_time_file = Path(f"{RESULTS_ROOT}/galois/conv_time_{dataset}_tgr.txt")
+
+        if not tgr_path.exists() or not tgr_conv_time_file.exists():
+            print(f"Generating transpose graph (.tgr) for PageRank-pull")
+            command = [
+                f"{BUILD_DIR}/tools/graph-convert/graph-convert",
+                "-gr2tgr",
+                str(gr_path),
+                str(tgr_path)
+            ]
+
+            step = run_step("galois", dataset, "galois.tgr", command, depends_on=["galois.gr"], algos=["pr"],
+                            check=True)
+            time_taken_tgr = f"{step.wall_s:.2f}"
+
+            with open(tgr_conv_time_file, "w") as f:
+                f.write(time_taken_tgr + "\n")
+            print(f"Time to convert {dataset} to .tgr: {time_taken_tgr}")
+        else:
+            print(f"Transpose graph {dataset}.tgr already exists")
+            with open(tgr_conv_time_file, "r") as f:
+                time_taken_tgr = f.read().strip()
+
+        # For directed graphs with PageRank: conv_time = .gr + .tgr
+        pagerank_conv_time = float(time_taken) + float(time_taken_tgr)
+
+    return {'props_reader': props_reader, 'supported_benchmarks': supported_benchmarks, 'gr_path': gr_path,
+            'base_conv_time': base_conv_time, 'tgr_path': tgr_path, 'pagerank_conv_time': pagerank_conv_time}
+
+
+def run_benchmarks(dataset, prepared, num_threads, dry_run=False):
+    '''Run the supported benchmarks of a dataset prepared by prepare_dataset().'''
+    props_reader = prepared['props_reader']
+    supported_benchmarks = prepared['supported_benchmarks']
+    gr_path = prepared['gr_path']
+    base_conv_time = prepared['base_conv_time']
+
+    # Run benchmarks based on supported algorithms from properties
+    print( "Supported benchmarks: ", supported_benchmarks)
+    if 'bfs' in supported_benchmarks:
+        # Get source vertex from properties
+        source_vertex = props_reader.get_source_vertex()
+        if source_vertex is None:
+            print(f"  No source vertex found in properties for BFS, skipping")
+        else:
+            print(f"  Using BFS source vertex: {source_vertex}")
+            do_bfs(gr_path, f"{RESULTS_ROOT}/galois/{dataset}_bfs", source_vertex, num_threads, base_conv_time, dry_run)
+
+    if 'pagerank' in supported_benchmarks:
+        # Transpose graph for directed graphs, symmetric .sgr (already in gr_path) for undirected ones
+        do_pagerank(prepared['tgr_path'], f"{RESULTS_ROOT}/galois/{dataset}_pagerank-pull", num_threads, prepared['pagerank_conv_time'], dry_run)
+
+    if 'connectedcomponents' in supported_benchmarks:
+        if props_reader.is_directed():
+            print(f"  Skipping Connected Components - requires undirected graph (graph is directed)")
+        else:
+            do_connectedcomponents(gr_path, f"{RESULTS_ROOT}/galois/{dataset}_connectedcomponents", num_threads, base_conv_time, dry_run)
+
+    if 'triangles' in supported_benchmarks:
+        if props_reader.is_directed():
+            print(f"  Skipping Triangle Counting - requires undirected graph (graph is directed)")
+        else:
+            do_triangles(gr_path, f"{RESULTS_ROOT}/galois/{dataset}_triangle", num_threads, base_conv_time, dry_run)
+
+    if 'betweennesscentrality' in supported_benchmarks:
+        # Get source vertex from properties
+        source_vertex = props_reader.get_source_vertex()
+        if source_vertex is None:
+            print(f"  No source vertex found in properties for BC, skipping")
+        else:
+            print(f"  Using BFS source vertex for BC: {source_vertex}")
+            do_bc(gr_path, f"{RESULTS_ROOT}/galois/{dataset}_bc", source_vertex, num_threads, base_conv_time, dry_run)
+
+    if 'sssp' in supported_benchmarks:
+        # Get source vertex from properties
+        source_vertex = props_reader.get_source_vertex()
+        if source_vertex is None:
+            print(f"  No source vertex found in properties for SSSP, skipping")
+        else:
+            print(f"  Using SSSP source vertex: {source_vertex}")
+            do_sssp(gr_path, f"{RESULTS_ROOT}/galois/{dataset}_sssp", source_vertex, num_threads, base_conv_time, dry_run)
 
 
 def main():
     parser = argparse.ArgumentParser(description="run galois benchmarks")
     parser.add_argument("-d", "--dry_run", action="store_true", default=False, help="print commands without executing them")
+    parser.add_argument("--validate", action="store_true", default=False, help="dump outputs once per benchmark and diff them against the reference")
+    parser.add_argument("--lookahead", type=int, default=0, help="datasets converted ahead while the current one is benchmarked (0: sequential)")
+    parser.add_argument("--datasets", nargs="+", default=DATASETS, help="datasets to benchmark (default: %(default)s)")
     args = parser.parse_args()
+    global VALIDATE
+    VALIDATE = args.validate
 
     # Ensure build directory exists
     os.makedirs(BUILD_DIR, exist_ok=True)
 
-    # Run CMake
-    cmake_cmd = ["cmake", "-S", SRC_DIR, "-B", BUILD_DIR, "-DCMAKE_BUILD_TYPE=Release"]
-    print(f"Command: {' '.join(cmake_cmd)}")
-    if not args.dry_run:
-        subprocess.run(cmake_cmd, check=True)
-
-    # Build necessary targets
+    # CMake configure, the necessary benchmark targets and the graph-convert tool.
+    # The whole build is skipped when the build cache has binaries for this source tree.
     benchmarks = ["bfs", "connectedcomponents", "pagerank", "triangles", "sssp", "betweennesscentrality"]
+    build_cmds = [["cmake", "-S", SRC_DIR, "-B", BUILD_DIR, "-DCMAKE_BUILD_TYPE=Release"]]
     for benchmark in benchmarks:
-        make_cmd = ["make", "-C", f"{BUILD_DIR}/lonestar/{benchmark}", "-j"]
-        print(f"Command: {' '.join(make_cmd)}")
-        if not args.dry_run:
-            subprocess.run(make_cmd, check=True)
-
-    # Build graph-convert tool
-    convert_cmd = ["make", "-C", BUILD_DIR, "graph-convert", "-j"]
-    print(f"Command: {' '.join(convert_cmd)}")
-    if not args.dry_run:
-        subprocess.run(convert_cmd, check=True)
+        build_cmds.append(["make", "-C", f"{BUILD_DIR}/lonestar/{benchmark}", "-j"])
+    build_cmds.append(["make", "-C", BUILD_DIR, "graph-convert", "-j"])
+    cached_build("galois", SRC_DIR, build_cmds, BUILD_ARTIFACTS, dry_run=args.dry_run)
 
     # Ensure results and datasets directories exist
-    os.makedirs("/results/galois", exist_ok=True)
-    os.makedirs("/datasets/galois", exist_ok=True)
-    os.makedirs("/extra_space/galois", exist_ok=True)
-
-    datasets = ["uk-2007", "com-friendster", "graph500_26", "graph500_28", "graph500_30", "uniform_26", "twitter_mpi"]  #"dota_league",
-
-    for dataset in datasets:
-        dataset_dir = f"/datasets/{dataset}"
-        gr_path = Path(f"/extra_space/galois/{dataset}.gr")
-        conv_time_file = Path(f"/results/galois/conv_time_{dataset}.txt")
-
-        # Read properties file using PropertiesReader
-        props_reader = PropertiesReader(dataset, dataset_dir, system_name='galois')
-        properties = props_reader.read()
-
-        if properties is None:
-            print(f"Could not read properties for {dataset}, skipping")
-            continue
-
-        # Get the correct edge file name from properties
-        edge_file = props_reader.get_edge_file()
-        if edge_file is None:
-            print(f"Could not determine edge file for {dataset}, skipping")
-            continue
-
-        dataset_path = Path(f"/datasets/{dataset}/{edge_file}")
-        print(f"Using edge file: {edge_file}")
-
-        # Get mapped algorithms for Galois
-        supported_benchmarks = props_reader.get_mapped_algorithms()
-
-        if not supported_benchmarks:
-            print(f"No supported Galois algorithms found for {dataset}, skipping")
-            continue
-
-        print(f"Dataset: {dataset}")
-        print(f"  Supported algorithms from properties: {properties['algorithms']}")
-        print(f"  Galois benchmarks to run: {supported_benchmarks}")
-        print(f"  Directed: {props_reader.is_directed()}")
-        print(f"  Weighted: {props_reader.is_weighted()}")
-
-        # Determine graph format requirements
-        graph_format_notes = []
-        if not props_reader.is_directed():
-            graph_format_notes.append("Will convert to .sgr (symmetric)")
-        if 'pagerank' in supported_benchmarks and props_reader.is_directed():
-            graph_format_notes.append("Will generate .tgr (transpose) for PageRank")
-
-        if graph_format_notes:
-            print(f"  Graph conversions: {', '.join(graph_format_notes)}")
-
-        # Convert to .gr format if needed
-        if not gr_path.exists() or not conv_time_file.exists():
-            command = [
-                f"{BUILD_DIR}/tools/graph-convert/graph-convert", "-edgelist2gr"]
-            if props_reader.is_weighted():
-                command.append("-edgeType=float64")
-
-            command.extend([str(dataset_path), str(gr_path)])
-            full_command = ["/usr/bin/time", "-p"] + command
-            print(f"Command: {' '.join(full_command)}")
-            if not args.dry_run:
-                result = subprocess.run(full_command, stderr=subprocess.PIPE, universal_newlines=True)
-            else:
-                result = None
-
-            time_taken = ""
-            if not args.dry_run:
-                for line in result.stderr.splitlines():
-                    if line.startswith("real"):
-                        time_taken = line.split()[1]
-
-                with open(conv_time_file, "w") as f:
-                    f.write(time_taken + "\n")
-                print(f"Time to convert {dataset} to gr: {time_taken}")
-            else:
-                time_taken = "0.0"  # Dummy value for dry run
-        else:
-            print(f"Dataset {dataset} already exists in .gr format")
-            with open(conv_time_file, "r") as f:
-                time_taken = f.read().strip()
-
-        # After initial .gr conversion, handle undirected graphs
-        if not props_reader.is_directed():
-            sgr_path = Path(f"/extra_space/galois/{dataset}.sgr")
-            sgr_conv_time_file = Path(f"/results/galois/conv_time_{dataset}_sgr.txt")
-
-            if not sgr_path.exists() or not sgr_conv_time_file.exists():
-                print(f"Converting {dataset} to symmetric graph format (.sgr)")
-                command = [
-                    f"{BUILD_DIR}/tools/graph-convert/graph-convert",
-                    "-gr2sgr",
-                    str(gr_path),
-                    str(sgr_path)
-                ]
-
-                full_command = ["/usr/bin/time", "-p"] + command
-                print(f"Command: {' '.join(full_command)}")
-                if not args.dry_run:
-                    result = subprocess.run(
-                        full_command,
-                        stderr=subprocess.PIPE,
-                        universal_newlines=True,
-                        check=True
-                    )
-                else:
-                    result = None
-
-                time_taken_sgr = ""
-                if not args.dry_run:
-                    for line in result.stderr.splitlines():
-                        if line.startswith("real"):
-                            time_taken_sgr = line.split()[1]
-                else:
-                    time_taken_sgr = "0.0"  # Dummy value for dry run
-
-                if not args.dry_run:
-                    with open(sgr_conv_time_file, "w") as f:
-                        f.write(time_taken_sgr + "\n")
-                    print(f"Time to convert {dataset} to .sgr: {time_taken_sgr}")
-            else:
-                print(f"Dataset {dataset} already exists in .sgr format")
-                with open(sgr_conv_time_file, "r") as f:
-                    time_taken_sgr = f.read().strip()
-
-            # Use symmetric graph for all subsequent algorithms
-            gr_path = sgr_path
-
-        # Calculate base conversion time for most algorithms
-        # For undirected graphs: base time = .gr + .sgr
-        # For directed graphs: base time = .gr only
-        if not props_reader.is_directed():
-            base_conv_time = float(time_taken) + float(time_taken_sgr)
-        else:
-            base_conv_time = float(time_taken)
-
-        # Run benchmarks based on supported algorithms from properties
-        print( "Supported benchmarks: ", supported_benchmarks)
-        if 'bfs' in supported_benchmarks:
-            # Get source vertex from properties
-            source_vertex = props_reader.get_source_vertex()
-            if source_vertex is None:
-                print(f"  No source vertex found in properties for BFS, skipping")
-            else:
-                print(f"  Using BFS source vertex: {source_vertex}")
-                do_bfs(gr_path, f"/results/galois/{dataset}_bfs", source_vertex, THREADS, base_conv_time, args.dry_run)
-
-        if 'pagerank' in supported_benchmarks:
-            # PageRank-pull requires transpose graph for directed graphs
-            if props_reader.is_directed():
-                tgr_path = Path(f"/extra_space/galois/{dataset}.tgr")
-                tgr_conv_time_file = Path(f"/results/galois/conv_time_{dataset}_tgr.txt")
-
-                if not tgr_path.exists() or not tgr_conv_time_file.exists():
-                    print(f"Generating transpose graph (.tgr) for PageRank-pull")
-                    command = [
-                        f"{BUILD_DIR}/tools/graph-convert/graph-convert",
-                        "-gr2tgr",
-                        str(gr_path),
-                        str(tgr_path)
-                    ]
-
-                    result = subprocess.run(
-                        ["/usr/bin/time", "-p"] + command,
-                        stderr=subprocess.PIPE,
-                        universal_newlines=True,
-                        check=True
-                    )
-
-                    time_taken_tgr = ""
-                    for line in result.stderr.splitlines():
-                        if line.startswith("real"):
-                            time_taken_tgr = line.split()[1]
-
-                    with open(tgr_conv_time_file, "w") as f:
-                        f.write(time_taken_tgr + "\n")
-                    print(f"Time to convert {dataset} to .tgr: {time_taken_tgr}")
-                else:
-                    print(f"Transpose graph {dataset}.tgr already exists")
-                    with open(tgr_conv_time_file, "r") as f:
-                        time_taken_tgr = f.read().strip()
-
-                # For directed graphs with PageRank: conv_time = .gr + .tgr
-                pagerank_conv_time = float(time_taken) + float(time_taken_tgr)
-                do_pagerank(tgr_path, f"/results/galois/{dataset}_pagerank-pull", THREADS, pagerank_conv_time, args.dry_run)
-            else:
-                # For undirected graphs, use symmetric .sgr (which is already in gr_path)
-                # conv_time = .gr + .sgr (which is base_conv_time)
-                do_pagerank(gr_path, f"/results/galois/{dataset}_pagerank-pull", THREADS, base_conv_time, args.dry_run)
-
-        if 'connectedcomponents' in supported_benchmarks:
-            if props_reader.is_directed():
-                print(f"  Skipping Connected Components - requires undirected graph (graph is directed)")
-            else:
-                do_connectedcomponents(gr_path, f"/results/galois/{dataset}_connectedcomponents", THREADS, base_conv_time, args.dry_run)
-
-        if 'triangles' in supported_benchmarks:
-            if props_reader.is_directed():
-                print(f"  Skipping Triangle Counting - requires undirected graph (graph is directed)")
-            else:
-                do_triangles(gr_path, f"/results/galois/{dataset}_triangle", THREADS, base_conv_time, args.dry_run)
-
-        if 'betweennesscentrality' in supported_benchmarks:
-            # Get source vertex from properties
-            source_vertex = props_reader.get_source_vertex()
-            if source_vertex is None:
-                print(f"  No source vertex found in properties for BC, skipping")
-            else:
-                print(f"  Using BFS source vertex for BC: {source_vertex}")
-                print(f"Skipping BC -- it never finishes")
-                #do_bc(gr_path, f"/results/galois/{dataset}_bc", source_vertex, THREADS, base_conv_time, args.dry_run)
-
-        if 'sssp' in supported_benchmarks:
-            # Get source vertex from properties
-            source_vertex = props_reader.get_source_vertex()
-            if source_vertex is None:
-                print(f"  No source vertex found in properties for SSSP, skipping")
-            else:
-                print(f"  Using SSSP source vertex: {source_vertex}")
-                do_sssp(gr_path, f"/results/galois/{dataset}_sssp", source_vertex, THREADS, base_conv_time, args.dry_run)
+    os.makedirs(f"{RESULTS_ROOT}/galois", exist_ok=True)
+    os.makedirs(f"{DATASET_DIR}/galois", exist_ok=True)
+    os.makedirs(f"{EXTRA_SPACE_DIR}/galois", exist_ok=True)
+
+    # Convert the next datasets while the current one is benchmarked (--lookahead)
+    # The converted graphs are kept as a cache across campaigns, so releasing a dataset frees no space
+    pipeline = ConversionPipeline(lambda dataset: prepare_dataset(dataset, args.dry_run), lookahead=args.lookahead,
+                                  staging_dir=f"{EXTRA_SPACE_DIR}/galois", reclaim=False)
+    num_threads = len(pipeline.bench_cpus) if args.lookahead else THREADS
+    for dataset, prepared in pipeline.run(args.datasets):
+        run_benchmarks(dataset, prepared, num_threads, args.dry_run)
 
 if __name__ == "__main__":
     main()
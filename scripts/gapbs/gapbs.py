@@ -1,30 +1,37 @@
-import subprocess
-import re
 import os
 import sys
 
 # Add parent directory to path to import shared utilities
-sys.path.insert(0, '/scripts')
+sys.path.insert(0, os.environ.get('BENCH_SCRIPTS_DIR', '/scripts'))
+from paths import DATASET_DIR, RESULTS_ROOT, EXTRA_SPACE_DIR
 from dataset_properties import PropertiesReader, get_available_cpus
+from staging import stage_file, record_staging
+from process_runner import LineCollector, run_streaming
 
 datasets = ["dota_league","graph500_26", "graph500_28", "graph500_30", "uniform_26", "twitter_mpi","uk-2007", "com-friendster"]
-dataset_dir = "/datasets"
-tempdir = "/extra_space"
+dataset_dir = DATASET_DIR
+tempdir = EXTRA_SPACE_DIR
 num_threads = 1
 
-def parse_log(buffer):
+# Fields parsed from the benchmark output while it runs (see process_runner.LineCollector)
+LOG_PATTERNS = {
+    'time': r"^(Read|Build|Trial)\sTime:\s+(\d+\.\d+)",
+    'mem': r"MemoryCounter:\s+\d+\s+MB\s->\s+\d+\s+MB,\s+(\d+)\s+MB\s+total",
+    'faults': r"MemoryCounter:\s+(\d+)\s+major\s+faults,\s+(\d+)\s+minor\s+faults",
+    'blockIO': r"MemoryCounter:\s+(\d+)\s+block\s+input operations,\s+(\d+)\s+block\s+output\s+operations",
+}
+# One line per trial, reported as progress
+PROGRESS_REGEX = r"^Trial\sTime:"
+
+def parse_log(collector):
     '''
     Returns the average preprocessing time (average read time + average build time),
-    average trial time, and memory usage from the log file
+    average trial time, and memory usage from the lines collected while the benchmark ran
     '''
-    regex = r"^(Read|Build|Trial)\sTime:\s+(\d+\.\d+)"
-    regex_mem = r"MemoryCounter:\s+\d+\s+MB\s->\s+\d+\s+MB,\s+(\d+)\s+MB\s+total"
-    regex_faults = r"MemoryCounter:\s+(\d+)\s+major\s+faults,\s+(\d+)\s+minor\s+faults"
-    regex_blockIO = r"MemoryCounter:\s+(\d+)\s+block\s+input operations,\s+(\d+)\s+block\s+output\s+operations"
-    matches_time = re.finditer(regex, buffer, re.MULTILINE)
-    matches_mem = re.finditer(regex_mem, buffer, re.MULTILINE)
-    matches_faults = re.finditer(regex_faults, buffer, re.MULTILINE)
-    matches_blockIO = re.finditer(regex_blockIO, buffer, re.MULTILINE)
+    matches_time = collector.matches['time']
+    matches_mem = collector.matches['mem']
+    matches_faults = collector.matches['faults']
+    matches_blockIO = collector.matches['blockIO']
     # Print the matches
     read_time = []
     build_time = []
@@ -34,22 +41,22 @@ def parse_log(buffer):
     minor_faults = []
     block_in = []
     block_out = []
-    for match in matches_time:
+    for kind, value in matches_time:
         #we want to print the sum of times if the first element of the tuple is 'Read' or 'Build'
-        if match.group(1) == 'Read':
-            read_time.append(float(match.group(2)))
-        elif match.group(1) == 'Build':
-            build_time.append(float(match.group(2)))
+        if kind == 'Read':
+            read_time.append(float(value))
+        elif kind == 'Build':
+            build_time.append(float(value))
         else:
-            trial_times.append(float(match.group(2)))
-    for matches in matches_mem:
-        mem.append(int(matches.group(1)))
-    for matches in matches_faults:
-        major_faults.append(int(matches.group(1)))
-        minor_faults.append(int(matches.group(2)))
-    for matches in matches_blockIO:
-        block_in.append(int(matches.group(1)))
-        block_out.append(int(matches.group(2)))
+            trial_times.append(float(value))
+    for (value,) in matches_mem:
+        mem.append(int(value))
+    for major, minor in matches_faults:
+        major_faults.append(int(major))
+        minor_faults.append(int(minor))
+    for block_input, block_output in matches_blockIO:
+        block_in.append(int(block_input))
+        block_out.append(int(block_output))
 
     # print(f"Read times: {read_time}\nBuild times: {build_time}\nTrial times: {trial_times}\nMemory: {mem}\n")
     if len(read_time) == 0:
@@ -98,7 +105,7 @@ def main():
     num_threads = get_available_cpus()
     print(f"Using {num_threads} threads based on available CPUs")
     for dataset in datasets:
-        dataset_path = f"/datasets/{dataset}"
+        dataset_path = f"{DATASET_DIR}/{dataset}"
         src = f"{dataset_path}/{dataset}.e"
         if not os.path.exists(src):
             print(f"Dataset {dataset} does not exist")
@@ -128,32 +135,31 @@ def main():
             dst = f"{tempdir}/{dataset}.wel"
         else:
             dst = f"{tempdir}/{dataset}.el"
-        print(f"Copying {src} to {dst}")
-        os.system(f"cp {src} {dst}")
+        # Link (or copy) the edge list under the extension GAPBS expects; the staging
+        # time is recorded on its own, not as part of the preprocessing time
+        record_staging("gapbs", dataset, stage_file(src, dst))
 
         # Run benchmarks that don't need source vertex
         for benchmark in props_reader.get_benchmarks_no_source():
             print(f"Running {benchmark} on {dataset}")
-            result_file = f"/results/gapbs/{dataset}_{benchmark}.csv"
-            log_file = f"/results/gapbs/{dataset}_{benchmark}.log"
-            with open(result_file, "w") as f, open(log_file, "w") as flout:
+            result_file = f"{RESULTS_ROOT}/gapbs/{dataset}_{benchmark}.csv"
+            log_file = f"{RESULTS_ROOT}/gapbs/{dataset}_{benchmark}.log"
+            with open(result_file, "w") as f:
                 f.write("pp_time(s),algo_time(s),mem(MB),num_threads, maj_flt, min_flt, blk_in, blk_out\n")
-                process = 0
+                command = [f"./{benchmark}", "-f", f"{dst}", "-n", "5"]
                 if not props_reader.is_directed(): # undirected graphs use -s flag
-                    print(f"./{benchmark} -f {dst} -n 5 -s")
-                    process = subprocess.run([f"./{benchmark}", "-f", f"{dst}", "-n", "5", "-s"], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-                else:
-                    print(f"./{benchmark} -f {dst} -n 5")
-                    process = subprocess.run([f"./{benchmark}", "-f", f"{dst}", "-n", "5"], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-                pp_time, algo_time, mem, maj_flt, min_flt, blk_in, blk_out = parse_log(process.stdout.decode("ASCII"))
-                flout.write(process.stdout.decode("ASCII"))
+                    command.append("-s")
+                print(" ".join(command))
+                collector = LineCollector(LOG_PATTERNS)
+                run_streaming(command, log_file, parsers=[collector.feed], progress_regex=PROGRESS_REGEX)
+                pp_time, algo_time, mem, maj_flt, min_flt, blk_in, blk_out = parse_log(collector)
                 f.write(f"{pp_time},{algo_time},{mem},{num_threads}, {maj_flt}, {min_flt}, {blk_in}, {blk_out}\n")
 
         # Run benchmarks that need source vertex (BFS, BC, and SSSP)
         for benchmark in props_reader.get_benchmarks_requiring_source():
             print(f"Running {benchmark} on {dataset}")
-            result_file = f"/results/gapbs/{dataset}_{benchmark}.csv"
-            log_file = f"/results/gapbs/{dataset}_{benchmark}.log"
+            result_file = f"{RESULTS_ROOT}/gapbs/{dataset}_{benchmark}.csv"
+            log_file = f"{RESULTS_ROOT}/gapbs/{dataset}_{benchmark}.log"
 
             # Get source vertex from properties using the reader
             source_vertex = props_reader.get_source_vertex()
@@ -164,17 +170,15 @@ def main():
 
             print(f"  Using source vertex: {source_vertex}")
 
-            with open(result_file, "w") as f, open(log_file, "w") as flout:
+            with open(result_file, "w") as f:
                 f.write("pp_time(s),algo_time(s),start_node,mem_used(MB),num_threads, maj_flt, min_flt, blk_in, blk_out\n")
-                process = 0
+                command = [f"./{benchmark}", "-f", f"{dst}", "-r", f"{source_vertex}", "-n", "5"]
                 if not props_reader.is_directed(): # undirected graphs use -s flag
-                    print(f"./{benchmark} -f {dst} -r {source_vertex} -n 5 -s")
-                    process = subprocess.run([f"./{benchmark}", "-f", f"{dst}", "-r", f"{source_vertex}", "-n", "5", "-s"], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-                else:
-                    print(f"./{benchmark} -f {dst} -r {source_vertex} -n 5")
-                    process = subprocess.run([f"./{benchmark}", "-f", f"{dst}", "-r", f"{source_vertex}", "-n", "5"], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-                flout.write(process.stdout.decode("ASCII"))
-                pp_time, algo_time, mem, maj_flt, min_flt, blk_in, blk_out = parse_log(process.stdout.decode("ASCII"))
+                    command.append("-s")
+                print(" ".join(command))
+                collector = LineCollector(LOG_PATTERNS)
+                run_streaming(command, log_file, parsers=[collector.feed], progress_regex=PROGRESS_REGEX)
+                pp_time, algo_time, mem, maj_flt, min_flt, blk_in, blk_out = parse_log(collector)
                 f.write(f"{pp_time}, {algo_time}, {source_vertex}, {mem}, {num_threads}, {maj_flt}, {min_flt}, {blk_in}, {blk_out}\n")
 
         os.remove(dst)
@@ -5,41 +5,57 @@ import json
 import re
 
 # Add parent directory to path to import shared utilities
-sys.path.insert(0, '/scripts')
-from dataset_properties import PropertiesReader
-
-SRC_DIR = "/systems/in-mem/GeminiGraph"
-TOOLS_DIR = "/systems/in-mem/GeminiGraph/toolkits"
-DATASET_DIR = "/datasets"
-RESULTS_DIR = "/results/gemini"
+sys.path.insert(0, os.environ.get('BENCH_SCRIPTS_DIR', '/scripts'))
+from paths import DATASET_DIR, SYSTEMS_DIR, RESULTS_ROOT
+from dataset_properties import PropertiesReader, get_dataset_descriptors
+from build_cache import cached_build
+from preprocessing_ledger import run_step
+from process_runner import run_streaming
+from numa_topology import PLACEMENT_POLICIES, numactl_prefix, read_numastat, numastat_delta, format_numastat
+
+SRC_DIR = f"{SYSTEMS_DIR}/in-mem/GeminiGraph"
+TOOLS_DIR = f"{SYSTEMS_DIR}/in-mem/GeminiGraph/toolkits"
+RESULTS_DIR = f"{RESULTS_ROOT}/gemini"
 
 REPEATS = 5
 PR_MAX_ITERS = 20
 
-# NUMA control settings
-NUMA_CPU_NODE = 0
-NUMA_MEM_NODE = 0
+# Binaries produced by `make`, restored from the build cache when the sources are unchanged
+BUILD_ARTIFACTS = ["toolkits/bfs", "toolkits/cc", "toolkits/pagerank", "toolkits/sssp", "toolkits/bc"]
+
+# NUMA placement (see numa_topology.PLACEMENT_POLICIES); the logs and CSVs of other
+# policies than the default are named <dataset>_<algo>_numa-<policy>, which
+# results_store reads as the params of the trials
+NUMA_POLICY = "single"
+NUMA_NODE = 0
+LOG_SUFFIX = ""
 
-def make_numactl_prefix():
+def make_numactl_prefix(policy=None, node=None):
   """
-  Create numactl command prefix to restrict GeminiGraph to specific NUMA node.
-  This prevents the segfault when container only has access to node 0 but
-  GeminiGraph tries to use all detected NUMA nodes.
+  Create the numactl command prefix of a NUMA placement policy.
+  The default binds GeminiGraph to one node, which prevents the segfault when the
+  container only has access to node 0 but GeminiGraph tries to use all detected
+  NUMA nodes. 'multisocket' leaves the placement to Gemini's own NUMA partitioning
+  and needs a container with access to all nodes.
   """
-  if NUMA_CPU_NODE is None and NUMA_MEM_NODE is None:
-    return ""
+  policy = NUMA_POLICY if policy is None else policy
+  node = NUMA_NODE if node is None else node
+  return numactl_prefix(policy, node)
 
-  numa_cmd = "numactl"
-  if NUMA_CPU_NODE is not None:
-    numa_cmd += f" --cpunodebind={NUMA_CPU_NODE}"
-  if NUMA_MEM_NODE is not None:
-    numa_cmd += f" --membind={NUMA_MEM_NODE}"
-
-  return numa_cmd + " "
+def run_recording_numa(cmd, log_file):
+  """
+  Run a shell command, streaming its output to the end of its log, and append the
+  NUMA hits/misses it caused.
+  """
+  before = read_numastat()
+  run_streaming(cmd, log_file, append=True)
+  delta = numastat_delta(before, read_numastat())
+  with open(log_file, "a") as f:
+    f.write(format_numastat(delta) + "\n")
 
 def parse_log_single(dataset_name, benchmark_name):
   convert_log_file = f"{RESULTS_DIR}/{dataset_name}_gemini_convert.log"
-  input_file = f"{RESULTS_DIR}/{dataset_name}_{benchmark_name}.log"
+  input_file = f"{RESULTS_DIR}/{dataset_name}_{benchmark_name}{LOG_SUFFIX}.log"
   regex_threads = r"^(\d+)\s(\d+)$"
   regex_exectime = r"exec_time=(\d+.\d+)\(s\)"
   regex_readtime = r"read_time=(\d+.\d+)\(s\)"
@@ -102,12 +118,12 @@ def parse_log_single(dataset_name, benchmark_name):
   return threads, sockets, convert_time, read_time, times, mem, maj_faults, min_faults, blkio_in, blkio_out
 
 def parse_log(datasets, benchmarks):
-  csv_file = f"{RESULTS_DIR}/gemini_runs.csv"
+  csv_file = f"{RESULTS_DIR}/gemini_runs{LOG_SUFFIX}.csv"
   with (open (csv_file, 'w') as fmain):
     fmain.write(f"dataset_name, benchmark_name, runs, max_iterations, threads, sockets, convert_time, read_time(s), exec_time(s), mem_used(MB)\n")
     for dataset_name in datasets:
       for benchmark_name in benchmarks:
-        with open (f"{RESULTS_DIR}/{dataset_name}_{benchmark_name}.csv", 'w') as frun:
+        with open (f"{RESULTS_DIR}/{dataset_name}_{benchmark_name}{LOG_SUFFIX}.csv", 'w') as frun:
           frun.write("convert_time(s),read_time(s),algo_time(s),mem(MB),num_threads, maj_flt, min_flt, blk_in, blk_out\n")
           if(benchmark_name == "pagerank"):
             max_iters = PR_MAX_ITERS
@@ -161,20 +177,25 @@ def main(self):
   parser = argparse.ArgumentParser(description="run gemini benchmarks")
   parser.add_argument("-d", "--dry_run",action="store_true",default=False, help="don't delete prior logs or run any commands.")
   parser.add_argument("-p","--parse",action="store_true",default=False, help="parse the logs to make the csv")
+  parser.add_argument("--numa", choices=PLACEMENT_POLICIES, default=NUMA_POLICY, help="NUMA placement policy")
+  parser.add_argument("--numa_node", type=int, default=NUMA_NODE, help="NUMA node of the single policy")
   args = parser.parse_args()
 
+  global LOG_SUFFIX
+  if args.numa != NUMA_POLICY:
+    LOG_SUFFIX = f"_numa-{args.numa}"
+  os.makedirs(RESULTS_DIR, exist_ok=True)
+
   # Get numactl prefix
-  numactl_prefix = make_numactl_prefix()
+  numactl_prefix = make_numactl_prefix(args.numa, args.numa_node)
   if numactl_prefix:
-    print(f"Using NUMA control: {numactl_prefix.strip()}")
-    print(f"  CPU node: {NUMA_CPU_NODE}")
-    print(f"  Memory node: {NUMA_MEM_NODE}")
+    print(f"Using NUMA control ({args.numa}): {numactl_prefix.strip()}")
   else:
-    print("NUMA control disabled - using all available nodes")
+    print("NUMA control disabled - Gemini places its partitions on all available nodes")
 
   os.chdir(SRC_DIR)
-  #run make here
-  os.system("make clean && make -j")
+  #run make here, unless the build cache already holds binaries for this source tree
+  cached_build("gemini", SRC_DIR, ["make clean && make -j"], BUILD_ARTIFACTS, dry_run=args.dry_run)
 
   os.chdir(TOOLS_DIR)
 
@@ -232,7 +253,7 @@ def main(self):
     cmd = f"{numactl_prefix}{TOOLS_DIR}/convert {DATASET_DIR}/{dataset_name}/{edge_file} >> {RESULTS_DIR}/{dataset_name}_gemini_convert.log"
     print(cmd)
     if not args.dry_run:
-      os.system(cmd)
+      run_step("gemini", dataset_name, "gemini.bin", cmd)
 
     #now find the max_vertex_id in the convert.log file
     max_vertex_id = 0
@@ -246,9 +267,10 @@ def main(self):
     #Now we can run each benchmark based on properties
     for benchmark in supported_benchmarks:
       print(f"{benchmark}...")
+      log_file = f"{RESULTS_DIR}/{dataset_name}_{benchmark}{LOG_SUFFIX}.log"
       #delete the previous log file
-      if not args.dry_run and os.path.exists(f"{RESULTS_DIR}/{dataset_name}_{benchmark}.log"):
-        os.remove(f"{RESULTS_DIR}/{dataset_name}_{benchmark}.log")
+      if not args.dry_run and os.path.exists(log_file):
+        os.remove(log_file)
 
       # Check if this benchmark needs a source vertex
       if benchmark in ['bfs', 'sssp', 'bc']: #BC in Gemini needs a source vertex
@@ -260,34 +282,29 @@ def main(self):
 
         print(f"  Using source vertex: {source_vertex}")
         # Add numactl prefix to command
-        cmd = f"{numactl_prefix}{TOOLS_DIR}/{benchmark} {DATASET_DIR}/{dataset_name}/{edge_file}.bin {num_vertices} {source_vertex} >> {RESULTS_DIR}/{dataset_name}_{benchmark}.log"
+        cmd = f"{numactl_prefix}{TOOLS_DIR}/{benchmark} {DATASET_DIR}/{dataset_name}/{edge_file}.bin {num_vertices} {source_vertex}"
         print(cmd)
         for iter in range(REPEATS):
           if not args.dry_run:
-            os.system(cmd)
+            run_recording_numa(cmd, log_file)
       else:
         # Benchmarks that don't need source vertex (pagerank, cc)
         if benchmark == "pagerank":
           max_iters = PR_MAX_ITERS
-          cmd = f"{numactl_prefix}{TOOLS_DIR}/{benchmark} {DATASET_DIR}/{dataset_name}/{edge_file}.bin {num_vertices} {max_iters} >> {RESULTS_DIR}/{dataset_name}_{benchmark}.log"
+          cmd = f"{numactl_prefix}{TOOLS_DIR}/{benchmark} {DATASET_DIR}/{dataset_name}/{edge_file}.bin {num_vertices} {max_iters}"
         else:
-          cmd = f"{numactl_prefix}{TOOLS_DIR}/{benchmark} {DATASET_DIR}/{dataset_name}/{edge_file}.bin {num_vertices} >> {RESULTS_DIR}/{dataset_name}_{benchmark}.log"
+          cmd = f"{numactl_prefix}{TOOLS_DIR}/{benchmark} {DATASET_DIR}/{dataset_name}/{edge_file}.bin {num_vertices}"
 
         print(cmd)
         for iter in range(REPEATS):
           if not args.dry_run:
-            os.system(cmd)
+            run_recording_numa(cmd, log_file)
 
   if args.parse:
     # Collect all benchmarks that were run
     all_benchmarks = set()
-    for dataset_name in datasets:
-      dataset_path = f"{DATASET_DIR}/{dataset_name}"
-      props_reader = PropertiesReader(dataset_name, dataset_path, system_name='gemini')
-      properties = props_reader.read()
-      if properties:
-        benchmarks = props_reader.get_mapped_algorithms()
-        all_benchmarks.update(benchmarks)
+    for descriptor in get_dataset_descriptors(datasets, DATASET_DIR).values():
+      all_benchmarks.update(descriptor.mapped_algorithms('gemini'))
 
     parse_log(datasets, list(all_benchmarks))
 
@@ -5,14 +5,17 @@ Utility for reading memory estimates from memory_estimates.json
 import json
 import os
 
-MEMORY_ESTIMATES_PATH = "/scripts/memory_estimates.json"
+from paths import SCRIPTS_DIR
+
+MEMORY_ESTIMATES_PATH = f"{SCRIPTS_DIR}/memory_estimates.json"
 
 def get_memory_estimates():
     """
     Read memory estimates from the JSON file.
 
     Returns:
-        dict: Dictionary mapping dataset names to their properties (num_nodes, num_edges, graph_size_disk)
+        dict: Dictionary mapping dataset names to their properties (num_nodes, num_edges, graph_size_disk,
+              graph_size_memory, artifacts)
     """
     if not os.path.exists(MEMORY_ESTIMATES_PATH):
         raise FileNotFoundError(f"Memory estimates file not found at {MEMORY_ESTIMATES_PATH}")
@@ -37,9 +40,31 @@ def get_graph_size_mb(dataset_name):
 
     return estimates[dataset_name].get('graph_size_disk')
 
+def get_memory_footprint_mb(dataset_name):
+    """
+    Get the in-memory footprint in MB of a dataset: the size of its binary CSR
+    (graph_size_memory, written by update_memory_estimates.py), falling back to
+    the size of the edge list on disk for entries that have not been regenerated.
+
+    Args:
+        dataset_name (str): Name of the dataset
+
+    Returns:
+        float: Footprint in MB, or None if not available
+    """
+    estimates = get_memory_estimates()
+
+    if dataset_name not in estimates:
+        raise ValueError(f"Dataset '{dataset_name}' not found in memory estimates")
+
+    entry = estimates[dataset_name]
+    if entry.get('graph_size_memory') is not None:
+        return entry['graph_size_memory']
+    return entry.get('graph_size_disk')
+
 def get_memory_budgets(dataset_name, percentages=[50, 75, 100, 125, 150]):
     """
-    Calculate memory budgets as percentages of the graph size.
+    Calculate memory budgets as percentages of the in-memory graph footprint.
 
     Args:
         dataset_name (str): Name of the dataset
@@ -47,12 +72,12 @@ def get_memory_budgets(dataset_name, percentages=[50, 75, 100, 125, 150]):
 
     Returns:
         list: List of tuples (percentage, memory_budget_mb)
-              Returns empty list if graph_size_disk is not available
+              Returns empty list if no graph size is available
     """
-    graph_size_mb = get_graph_size_mb(dataset_name)
+    graph_size_mb = get_memory_footprint_mb(dataset_name)
 
     if graph_size_mb is None:
-        print(f"Warning: graph_size_disk not available for dataset '{dataset_name}'")
+        print(f"Warning: graph size not available for dataset '{dataset_name}'")
         return []
 
     budgets = []
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+Synthetic graph generators for controlled scaling studies.
+
+graph_utils.graph_info() reports the RMAT scale/edge factor matching a dataset
+(RMATSMALL_S/E, RMATBIG_S/E); this module generates such graphs offline,
+together with uniform, power-law and grid graphs:
+
+    rmat      - RMAT / Graph500 Kronecker graph with 2^scale vertices and
+                edge_factor * 2^scale edges (initiator a, b, c, d)
+    uniform   - Erdos-Renyi G(n, m): both endpoints uniform over the vertices
+    powerlaw  - Chung-Lu graph whose expected degrees follow a power law with
+                exponent gamma (endpoints drawn by inverse transform sampling)
+    grid      - rows x cols 2-D lattice with edges to the right and lower
+                neighbour, optionally thinned (drop probability) to look road-like
+
+Edges are generated in fixed-size chunks, each from its own generator seeded
+with (seed, chunk index), so the output only depends on the seed and not on
+the number of worker processes. Vertex ids of rmat, uniform and powerlaw are
+shuffled with a keyed bijection on the id space instead of a permutation
+array, so generation needs memory proportional to a chunk, not to the graph,
+up to 2^30 vertices and beyond.
+
+Output goes to a text edge list ('src dst [weight]' per line) in
+/datasets/<name>/ together with a properties file, or straight into the
+binary CSR cache (csr_cache.py) without a text copy, or both.
+
+Usage:
+    python graph_generators.py rmat --scale 26 --edge-factor 16 --name rmat_26
+    python graph_generators.py uniform --vertices 67108864 --edges 1073741824 --name uniform_26 --format csr
+    python graph_generators.py powerlaw --vertices 1000000 --edges 20000000 --gamma 2.2 --name plaw_1m
+    python graph_generators.py grid --rows 4000 --cols 4000 --drop 0.2 --weighted --name grid_4k
+"""
+
+import os
+import sys
+import json
+import argparse
+from functools import partial
+from multiprocessing import Pool
+
+import numpy as np
+import pandas as pd
+
+from csr_cache import DATASET_DIR, CHUNK_EDGES, build_csr_from_chunks, cache_dir_for
+
+# Graph500 initiator probabilities (a, b, c); d = 1 - a - b - c
+GRAPH500_INITIATOR = (0.57, 0.19, 0.19)
+DEFAULT_MAX_WEIGHT = 255
+GENERATOR_KINDS = ['rmat', 'uniform', 'powerlaw', 'grid']
+
+
+def _keys(seed, width):
+    """
+    Xor key, odd multipliers and xor-shift amount of the id bijection for a seed and bit width.
+    """
+    rng = np.random.default_rng([seed, 0x5eed])
+    xor_key, k1, k2 = (int(k) for k in rng.integers(1, 1 << 62, size=3))
+    return xor_key, (k1 | 1, k2 | 1), max(1, (width + 1) // 2)
+
+
+def _mix(ids, width, seed):
+    # Xor with a key, multiplication by an odd number and v ^ (v >> s) are bijections modulo 2^width
+    mask = np.uint64((1 << width) - 1)
+    xor_key, (k1, k2), shift = _keys(seed, width)
+    v = ids.astype(np.uint64) ^ (np.uint64(xor_key) & mask)
+    with np.errstate(over='ignore'):
+        v = (v * np.uint64(k1)) & mask
+        v ^= v >> np.uint64(shift)
+        v = (v * np.uint64(k2)) & mask
+        v ^= v >> np.uint64(shift)
+    return v
+
+
+def permute_ids(ids, num_vertices, seed):
+    """
+    Apply a pseudo-random permutation of [0, num_vertices) to vertex ids.
+
+    The permutation is a keyed bijection on the next power of two, restricted to
+    [0, num_vertices) by cycle walking, so no permutation array is stored.
+
+    Args:
+        ids: Integer array of vertex ids in [0, num_vertices)
+        num_vertices: Size of the id space
+        seed: Key of the permutation
+
+    Returns:
+        numpy.ndarray: int64 permuted ids
+    """
+    width = max(1, int(num_vertices - 1).bit_length())
+    result = _mix(np.asarray(ids), width, seed)
+    outside = np.flatnonzero(result >= np.uint64(num_vertices))
+    while len(outside):
+        result[outside] = _mix(result[outside], width, seed)
+        outside = outside[result[outside] >= np.uint64(num_vertices)]
+    return result.astype(np.int64)
+
+
+def _rmat_edges(spec, rng, count):
+    a, b, c = spec['initiator']
+    src = np.zeros(count, dtype=np.int64)
+    dst = np.zeros(count, dtype=np.int64)
+    for level in range(spec['scale']):
+        r = rng.random(count)
+        # Quadrants: a = (0, 0), b = (0, 1), c = (1, 0), d = (1, 1)
+        src_bit = r >= a + b
+        dst_bit = ((r >= a) & (r < a + b)) | (r >= a + b + c)
+        src |= src_bit.astype(np.int64) << level
+        dst |= dst_bit.astype(np.int64) << level
+    n = spec['num_vertices']
+    return permute_ids(src, n, spec['seed']), permute_ids(dst, n, spec['seed'])
+
+
+def _uniform_edges(spec, rng, count):
+    n = spec['num_vertices']
+    return rng.integers(0, n, size=count), rng.integers(0, n, size=count)
+
+
+def _powerlaw_endpoints(spec, rng, count):
+    # Vertex i has expected degree proportional to (i + 1)^(-alpha), alpha = 1 / (gamma - 1);
+    # sample from the continuous density on [1, n + 1) and round down
+    n = spec['num_vertices']
+    alpha = 1.0 / (spec['gamma'] - 1.0)
+    u = rng.random(count)
+    if abs(1.0 - alpha) < 1e-9:
+        x = np.exp(u * np.log(n + 1.0))
+    else:
+        beta = 1.0 - alpha
+        x = (1.0 + u * ((n + 1.0) ** beta - 1.0)) ** (1.0 / beta)
+    ids = np.minimum(np.floor(x).astype(np.int64) - 1, n - 1)
+    return permute_ids(np.maximum(ids, 0), n, spec['seed'])
+
+
+def _powerlaw_edges(spec, rng, count):
+    return _powerlaw_endpoints(spec, rng, count), _powerlaw_endpoints(spec, rng, count)
+
+
+def _grid_edges(spec, rng, index):
+    rows, cols = spec['rows'], spec['cols']
+    first = index * spec['rows_per_chunk']
+    last = min(rows, first + spec['rows_per_chunk'])
+    r, c = np.meshgrid(np.arange(first, last, dtype=np.int64), np.arange(cols, dtype=np.int64), indexing='ij')
+    r, c = r.ravel(), c.ravel()
+    vertex = r * cols + c
+    right = c < cols - 1
+    down = r < rows - 1
+    src = np.concatenate([vertex[right], vertex[down]])
+    dst = np.concatenate([vertex[right] + 1, vertex[down] + cols])
+    if spec['drop'] > 0:
+        keep = rng.random(len(src)) >= spec['drop']
+        src, dst = src[keep], dst[keep]
+    return src, dst
+
+
+def make_spec(kind, seed=0, weighted=False, max_weight=DEFAULT_MAX_WEIGHT, no_self_loops=False,
+              chunk_edges=CHUNK_EDGES, scale=None, edge_factor=16, initiator=GRAPH500_INITIATOR,
+              vertices=None, edges=None, gamma=2.5, rows=None, cols=None, drop=0.0):
+    """
+    Describe a synthetic graph; the spec is all a worker needs to generate any chunk.
+
+    Args:
+        kind: One of GENERATOR_KINDS
+        seed: Seed of the edges, the weights and the vertex permutation
+        weighted: Attach integer weights uniform in [1, max_weight]
+        no_self_loops: Drop edges whose endpoints are equal
+        chunk_edges: Edges per chunk (rmat, uniform, powerlaw) or approximate edges per chunk (grid)
+        scale, edge_factor, initiator: rmat parameters
+        vertices, edges: Vertex and edge counts of uniform and powerlaw
+        gamma: Degree exponent of powerlaw (> 1; real-world graphs are around 2 to 3)
+        rows, cols, drop: grid dimensions and the probability of dropping a lattice edge
+
+    Returns:
+        dict: JSON-serializable spec
+    """
+    spec = {'kind': kind, 'seed': int(seed), 'weighted': bool(weighted), 'max_weight': int(max_weight),
+            'no_self_loops': bool(no_self_loops), 'chunk_edges': int(chunk_edges)}
+    if kind == 'rmat':
+        if scale is None:
+            raise ValueError("rmat needs a scale")
+        if not 0 < sum(initiator) < 1:
+            raise ValueError(f"initiator probabilities {initiator} must sum to less than 1")
+        spec.update({'scale': int(scale), 'edge_factor': int(edge_factor), 'initiator': list(initiator),
+                     'num_vertices': 1 << int(scale), 'num_edges': int(edge_factor) << int(scale)})
+    elif kind in ('uniform', 'powerlaw'):
+        if not vertices or edges is None:
+            raise ValueError(f"{kind} needs a vertex and an edge count")
+        spec.update({'num_vertices': int(vertices), 'num_edges': int(edges)})
+        if kind == 'powerlaw':
+            if gamma <= 1:
+                raise ValueError(f"gamma must be > 1, got {gamma}")
+            spec['gamma'] = float(gamma)
+    elif kind == 'grid':
+        if not rows or not cols:
+            raise ValueError("grid needs rows and cols")
+        spec.update({'rows': int(rows), 'cols': int(cols), 'drop': float(drop),
+                     'num_vertices': int(rows) * int(cols),
+                     'num_edges': int(rows) * (int(cols) - 1) + (int(rows) - 1) * int(cols),
+                     'rows_per_chunk': max(1, int(chunk_edges) // max(1, 2 * int(cols)))})
+    else:
+        raise ValueError(f"unknown generator {kind}, expected one of {GENERATOR_KINDS}")
+    return spec
+
+
+def num_chunks(spec):
+    if spec['kind'] == 'grid':
+        return -(-spec['rows'] // spec['rows_per_chunk'])
+    return -(-spec['num_edges'] // spec['chunk_edges'])
+
+
+def generate_chunk(spec, index):
+    """
+    Generate one chunk of edges.
+
+    Returns:
+        tuple: (src int64 array, dst int64 array, weight float32 array or None)
+    """
+    rng = np.random.default_rng([spec['seed'], index])
+    if spec['kind'] == 'grid':
+        src, dst = _grid_edges(spec, rng, index)
+    else:
+        count = min(spec['chunk_edges'], spec['num_edges'] - index * spec['chunk_edges'])
+        edges = {'rmat': _rmat_edges, 'uniform': _uniform_edges, 'powerlaw': _powerlaw_edges}[spec['kind']]
+        src, dst = edges(spec, rng, count)
+    if spec['no_self_loops']:
+        keep = src != dst
+        src, dst = src[keep], dst[keep]
+    weight = None
+    if spec['weighted']:
+        weight = rng.integers(1, spec['max_weight'] + 1, size=len(src)).astype(np.float32)
+    return src.astype(np.int64), dst.astype(np.int64), weight
+
+
+def iter_chunks(spec, workers=None):
+    """
+    Generate all chunks of a graph in order, using a pool of worker processes.
+
+    Args:
+        spec: Spec from make_spec()
+        workers: Number of processes (default: all CPUs; 1 generates in this process)
+
+    Yields:
+        tuple: (src, dst, weight or None) as returned by generate_chunk()
+    """
+    indices = range(num_chunks(spec))
+    if workers == 1:
+        for index in indices:
+            yield generate_chunk(spec, index)
+        return
+    with Pool(workers) as pool:
+        yield from pool.imap(partial(generate_chunk, spec), indices)
+
+
+def _format_chunk(spec, index):
+    src, dst, weight = generate_chunk(spec, index)
+    columns = {'src': src, 'dst': dst}
+    if weight is not None:
+        columns['weight'] = weight.astype(np.int64)
+    text = pd.DataFrame(columns).to_csv(sep=' ', header=False, index=False)
+    return len(src), text.encode()
+
+
+def write_edge_list(spec, path, workers=None):
+    """
+    Stream a graph to a text edge list; chunks are formatted in the worker processes.
+
+    Returns:
+        int: Number of edges written
+    """
+    num_edges = 0
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        if workers == 1:
+            results = (_format_chunk(spec, index) for index in range(num_chunks(spec)))
+            for count, data in results:
+                f.write(data)
+                num_edges += count
+        else:
+            with Pool(workers) as pool:
+                for count, data in pool.imap(partial(_format_chunk, spec), range(num_chunks(spec))):
+                    f.write(data)
+                    num_edges += count
+    os.replace(tmp_path, path)
+    return num_edges
+
+
+def write_csr(spec, dataset_name, workers=None):
+    """
+    Generate a graph straight into the binary CSR cache of a dataset (two generation passes).
+
+    Returns:
+        dict: The metadata written to meta.json
+    """
+    out_dir = cache_dir_for(dataset_name)
+    num_vertices, num_edges, weighted = build_csr_from_chunks(lambda: iter_chunks(spec, workers), out_dir,
+                                                              spec['num_vertices'])
+    meta = {'edge_file': None, 'generator': spec, 'num_vertices': num_vertices,
+            'num_edges': num_edges, 'weighted': weighted}
+    with open(os.path.join(out_dir, 'meta.json'), 'w') as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+def source_vertex(spec):
+    """
+    A vertex to start BFS/SSSP from: the highest expected degree vertex of rmat and powerlaw.
+    """
+    if spec['kind'] == 'grid':
+        return 0
+    return int(permute_ids(np.array([0]), spec['num_vertices'], spec['seed'])[0])
+
+
+def write_properties(dataset_path, dataset_name, spec, num_edges, edge_file, directed=True):
+    """
+    Write the Graphalytics-style properties file that the runners read (see dataset_properties.py).
+    """
+    key = f"graph.{dataset_name}"
+    algorithms = ['bfs', 'cdlp', 'pr', 'wcc'] + (['sssp'] if spec['weighted'] else [])
+    source = source_vertex(spec)
+    lines = [f"{key}.algorithms = {', '.join(algorithms)}",
+             f"{key}.directed = {str(directed).lower()}",
+             f"{key}.edge-file = {edge_file}",
+             f"{key}.meta.vertices = {spec['num_vertices']}",
+             f"{key}.meta.edges = {num_edges}",
+             f"{key}.bfs.source-vertex = {source}",
+             f"{key}.generator = {json.dumps(spec, sort_keys=True)}"]
+    if spec['weighted']:
+        lines += [f"{key}.edge-properties.names = weight",
+                  f"{key}.sssp.source-vertex = {source}"]
+    with open(os.path.join(dataset_path, f"{dataset_name}.properties"), 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+
+
+def generate_dataset(spec, dataset_name, dataset_dir=DATASET_DIR, output_format='text', directed=True,
+                     workers=None):
+    """
+    Generate a dataset directory (<dataset_dir>/<name>/<name>.e and .properties) and/or its CSR cache.
+
+    Args:
+        spec: Spec from make_spec()
+        dataset_name: Name of the dataset
+        dataset_dir: Directory containing the dataset directories
+        output_format: 'text', 'csr' or 'both'
+        directed: Value of the directed property
+        workers: Number of generator processes
+
+    Returns:
+        int: Number of edges generated
+    """
+    dataset_path = os.path.join(dataset_dir, dataset_name)
+    os.makedirs(dataset_path, exist_ok=True)
+    edge_file = f"{dataset_name}.e"
+    num_edges = None
+    if output_format in ('text', 'both'):
+        num_edges = write_edge_list(spec, os.path.join(dataset_path, edge_file), workers)
+    if output_format in ('csr', 'both'):
+        num_edges = write_csr(spec, dataset_name, workers)['num_edges']
+    write_properties(dataset_path, dataset_name, spec, num_edges, edge_file, directed)
+    return num_edges
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate synthetic graphs for scaling studies')
+    parser.add_argument('kind', choices=GENERATOR_KINDS, help='graph model')
+    parser.add_argument('--name', required=True, help='dataset name (directory under --dataset-dir)')
+    parser.add_argument('--dataset-dir', default=DATASET_DIR, help='directory containing the datasets')
+    parser.add_argument('--format', choices=['text', 'csr', 'both'], default='text',
+                        help='text edge list, binary CSR cache, or both')
+    parser.add_argument('--seed', type=int, default=0, help='seed (output is identical for any --workers)')
+    parser.add_argument('--workers', type=int, default=None, help='generator processes (default: all CPUs)')
+    parser.add_argument('--chunk-edges', type=int, default=CHUNK_EDGES, help='edges generated per chunk')
+    parser.add_argument('--undirected', action='store_true', help='mark the dataset as undirected')
+    parser.add_argument('--weighted', action='store_true', help='attach integer edge weights')
+    parser.add_argument('--max-weight', type=int, default=DEFAULT_MAX_WEIGHT, help='largest edge weight')
+    parser.add_argument('--no-self-loops', action='store_true', help='drop self loops')
+    parser.add_argument('--scale', type=int, help='rmat: log2 of the number of vertices')
+    parser.add_argument('--edge-factor', type=int, default=16, help='rmat: edges per vertex')
+    parser.add_argument('--initiator', type=float, nargs=3, default=list(GRAPH500_INITIATOR),
+                        metavar=('A', 'B', 'C'), help='rmat: initiator probabilities (d = 1 - a - b - c)')
+    parser.add_argument('--vertices', type=int, help='uniform/powerlaw: number of vertices')
+    parser.add_argument('--edges', type=int, help='uniform/powerlaw: number of edges')
+    parser.add_argument('--gamma', type=float, default=2.5, help='powerlaw: degree exponent')
+    parser.add_argument('--rows', type=int, help='grid: number of rows')
+    parser.add_argument('--cols', type=int, help='grid: number of columns')
+    parser.add_argument('--drop', type=float, default=0.0, help='grid: probability of dropping an edge')
+    args = parser.parse_args()
+
+    try:
+        spec = make_spec(args.kind, args.seed, args.weighted, args.max_weight, args.no_self_loops,
+                         args.chunk_edges, args.scale, args.edge_factor, args.initiator, args.vertices,
+                         args.edges, args.gamma, args.rows, args.cols, args.drop)
+    except ValueError as e:
+        parser.error(str(e))
+
+    print(f"Generating {args.name}: {args.kind} with {spec['num_vertices']} vertices, "
+          f"~{spec['num_edges']} edges in {num_chunks(spec)} chunks")
+    num_edges = generate_dataset(spec, args.name, args.dataset_dir, args.format, not args.undirected,
+                                 args.workers)
+    print(f"{args.name}: {num_edges} edges written to {os.path.join(args.dataset_dir, args.name)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Structural profiles of the datasets, used as features by cost_model.py.
+
+memory_estimates.json only records vertex/edge counts and the on-disk size.
+Runtime and memory of the systems also depend on the shape of the graph, so
+this profiler computes from the CSR cache (csr_cache.py):
+
+    num_vertices, num_edges, avg_degree
+    max_out_degree, max_in_degree
+    degree_cv     - coefficient of variation of the out-degrees
+    degree_gini   - Gini coefficient of the out-degrees (0 = regular, ->1 = star-like)
+    diameter_estimate - lower bound from iterated double-sweep BFS on the
+                        undirected graph, starting in the largest component
+    graph_size_disk   - size of the edge list in MB
+
+Profiles are stored in graph_profiles.json in the results directory,
+together with the size and mtime of the edge list they were computed from;
+a profile is recomputed only when the edge list changed.
+
+Usage:
+    python graph_profiler.py graph500_26 road_asia --sweeps 4
+    python graph_profiler.py --all
+"""
+
+import os
+import sys
+import json
+import argparse
+
+import numpy as np
+from scipy.sparse.csgraph import connected_components
+
+from paths import RESULTS_ROOT
+from dataset_properties import PropertiesReader
+from csr_cache import DATASET_DIR, load_csr, find_edge_file, bfs_levels
+from reference_algos import symmetrize
+
+PROFILES_PATH = f"{RESULTS_ROOT}/graph_profiles.json"
+DEFAULT_SWEEPS = 4
+
+
+def load_profiles(profiles_path=PROFILES_PATH):
+    """
+    Read all stored profiles.
+
+    Returns:
+        dict: Dataset name -> profile dict (empty if the file does not exist)
+    """
+    if not os.path.exists(profiles_path):
+        return {}
+    with open(profiles_path, 'r') as f:
+        return json.load(f)
+
+
+def save_profiles(profiles, profiles_path=PROFILES_PATH):
+    os.makedirs(os.path.dirname(os.path.abspath(profiles_path)), exist_ok=True)
+    with open(profiles_path, 'w') as f:
+        json.dump(profiles, f, indent=2, sort_keys=True)
+
+
+def get_profile(dataset_name, profiles_path=PROFILES_PATH):
+    """
+    Stored profile of one dataset, or None if it has not been profiled.
+    """
+    return load_profiles(profiles_path).get(dataset_name)
+
+
+def degree_gini(degrees):
+    """
+    Gini coefficient of a degree sequence.
+    """
+    values = np.sort(np.asarray(degrees, dtype=np.float64))
+    n = len(values)
+    total = values.sum()
+    if n == 0 or total == 0:
+        return 0.0
+    ranks = np.arange(1, n + 1, dtype=np.float64)
+    return float(2.0 * (ranks @ values) / (n * total) - (n + 1.0) / n)
+
+
+def estimate_diameter(undirected, sweeps=DEFAULT_SWEEPS, seed=0):
+    """
+    Lower bound on the diameter by iterated double-sweep BFS.
+
+    The first BFS starts at the highest-degree vertex of the largest component,
+    every following one at the farthest vertex reached by the previous BFS.
+
+    Args:
+        undirected: Symmetrized CSRGraph
+        sweeps: Number of BFS runs
+        seed: Seed for tie-breaking among the farthest vertices
+
+    Returns:
+        int: Largest eccentricity found
+    """
+    if undirected.num_edges == 0:
+        return 0
+    rng = np.random.default_rng(seed)
+    _, labels = connected_components(undirected.to_scipy(), directed=False)
+    largest = labels == np.argmax(np.bincount(labels))
+    degrees = np.where(largest, undirected.out_degrees(), -1)
+    source = int(np.argmax(degrees))
+    best = 0
+    for _ in range(sweeps):
+        levels = bfs_levels(undirected, source)
+        eccentricity = int(levels.max())
+        best = max(best, eccentricity)
+        farthest = np.flatnonzero(levels == eccentricity)
+        source = int(rng.choice(farthest))
+    return best
+
+
+def profile_graph(graph, directed=True, sweeps=DEFAULT_SWEEPS, seed=0):
+    """
+    Compute the structural profile of a graph.
+
+    Args:
+        graph: CSRGraph as stored in the cache
+        directed: Whether the dataset is directed (undirected graphs are symmetrized first)
+        sweeps: BFS runs of the diameter estimate
+        seed: Seed of the diameter estimate
+
+    Returns:
+        dict: Profile fields (see module docstring)
+    """
+    undirected = symmetrize(graph)
+    if not directed:
+        graph = undirected
+    out_degrees = np.asarray(graph.out_degrees())
+    in_degrees = graph.in_degrees()
+    mean = float(out_degrees.mean()) if len(out_degrees) else 0.0
+    return {
+        'num_vertices': int(graph.num_vertices),
+        'num_edges': int(graph.num_edges),
+        'directed': bool(directed),
+        'avg_degree': round(mean, 4),
+        'max_out_degree': int(out_degrees.max()) if len(out_degrees) else 0,
+        'max_in_degree': int(in_degrees.max()) if len(in_degrees) else 0,
+        'degree_cv': round(float(out_degrees.std()) / mean, 4) if mean > 0 else 0.0,
+        'degree_gini': round(degree_gini(out_degrees), 4),
+        'diameter_estimate': estimate_diameter(undirected, sweeps, seed),
+    }
+
+
+def profile_dataset(dataset_name, sweeps=DEFAULT_SWEEPS, force=False, profiles_path=PROFILES_PATH):
+    """
+    Profile a dataset and store the result, unless a profile of the same edge list exists.
+
+    Returns:
+        dict: Profile of the dataset
+    """
+    edge_file = find_edge_file(dataset_name)
+    stat = os.stat(edge_file)
+    profiles = load_profiles(profiles_path)
+    existing = profiles.get(dataset_name)
+    if not force and existing and existing.get('source_size') == stat.st_size \
+            and existing.get('source_mtime') == int(stat.st_mtime):
+        return existing
+
+    props = PropertiesReader(dataset_name, f"{DATASET_DIR}/{dataset_name}")
+    directed = props.is_directed() if props.read() is not None else True
+    print(f"Profiling {dataset_name} ({edge_file})")
+    profile = profile_graph(load_csr(dataset_name, edge_file), directed, sweeps)
+    profile.update({'graph_size_disk': round(stat.st_size / (1024 * 1024), 2),
+                    'source_size': stat.st_size, 'source_mtime': int(stat.st_mtime)})
+
+    # Re-read before writing so that concurrent profilers of other datasets are kept
+    profiles = load_profiles(profiles_path)
+    profiles[dataset_name] = profile
+    save_profiles(profiles, profiles_path)
+    return profile
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compute structural profiles of datasets')
+    parser.add_argument('datasets', nargs='*', help='dataset names (directories under /datasets)')
+    parser.add_argument('--all', action='store_true', help='profile every dataset under /datasets')
+    parser.add_argument('--sweeps', type=int, default=DEFAULT_SWEEPS, help='BFS runs of the diameter estimate')
+    parser.add_argument('--force', action='store_true', help='recompute even if the edge list did not change')
+    args = parser.parse_args()
+
+    datasets = args.datasets
+    if args.all:
+        datasets = sorted(d for d in os.listdir(DATASET_DIR) if os.path.isdir(os.path.join(DATASET_DIR, d)))
+    if not datasets:
+        parser.error('give dataset names or --all')
+
+    failed = 0
+    for dataset in datasets:
+        try:
+            profile = profile_dataset(dataset, args.sweeps, args.force)
+        except (OSError, ValueError) as e:
+            print(f"Warning: could not profile {dataset}: {e}")
+            failed += 1
+            continue
+        print(f"{dataset}: |V|={profile['num_vertices']} |E|={profile['num_edges']} "
+              f"avg_deg={profile['avg_degree']} gini={profile['degree_gini']} "
+              f"diameter>={profile['diameter_estimate']}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -152,8 +152,9 @@ def bfs_random_starts(infile, outfile):
 			bfs_random_start_nodes += [i] # Add a zero degree node for representation
 			break
 
+	candidates = list(degs) # Build the candidate list once, not once per draw
 	for i in range(20):
-		choice = random.choice(list(degs))
+		choice = random.choice(candidates)
 		bfs_random_start_nodes += [choice] # Select a random start node from one of the nodes that has at least 1 outgoing edge
 	with open(outfile, 'w') as outf:
 		for node in bfs_random_start_nodes:
@@ -182,9 +183,22 @@ def make_bfs_starts(infile, outfile):
 			for start in random_starts:
 				outf.write(str(start) + "\n")
 
+'''
+Vectorized replacement for bfs_random_starts/make_bfs_starts: picks sources from the largest
+weakly connected component, stratified by degree, that reach a large part of the graph.
+Writes /datasets/<dataset>/<dataset>.bfsver. See source_sampler.py for the options.
+'''
+def sample_bfs_starts(dataset, seed=0):
+	from source_sampler import sample_sources, write_bfsver
+	from csr_cache import load_csr
+	graph = load_csr(dataset)
+	sources, reaches = sample_sources(graph, seed=seed)
+	path = write_bfsver(dataset, sources, reaches, {'seed': seed})
+	print("Wrote", len(sources), "sources to", path)
+
 if __name__ == '__main__':
 	if len(sys.argv) < 3:
-		print("Usage: python graph_utils.py [info|degree|zero|edgedeg|maxver|bfsver|dup_edges|make_bfs_starts] <filename> <optional: bfsver output file>")
+		print("Usage: python graph_utils.py [info|degree|zero|edgedeg|maxver|bfsver|dup_edges|make_bfs_starts|sample_starts] <filename> <optional: bfsver output file>")
 		sys.exit(1)
 	option = sys.argv[1]
 	if option == 'info':
@@ -203,7 +217,9 @@ if __name__ == '__main__':
 		duplicate_edges(sys.argv[2])
 	elif option == 'make_bfs_starts':
 		make_bfs_starts(sys.argv[2], sys.argv[3])
+	elif option == 'sample_starts':
+		sample_bfs_starts(sys.argv[2], int(sys.argv[3]) if len(sys.argv) > 3 else 0)
 	else:
-		print("Usage: python graph_utils.py [info|degree|zero|edgedeg|maxver|bfsver|dup_edges|make_bfs_starts] <filename> <optional: bfsver output file>")
+		print("Usage: python graph_utils.py [info|degree|zero|edgedeg|maxver|bfsver|dup_edges|make_bfs_starts|sample_starts] <filename> <optional: bfsver output file>")
 		sys.exit(1)
 
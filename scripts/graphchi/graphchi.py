@@ -5,19 +5,24 @@ import re
 import time
 import threading
 import signal
+import shutil
+import argparse
 from datetime import datetime
 
 # Add parent directory to path to import shared utilities
-sys.path.insert(0, '/scripts')
+sys.path.insert(0, os.environ.get('BENCH_SCRIPTS_DIR', '/scripts'))
+from paths import DATASET_DIR, SYSTEMS_DIR, RESULTS_ROOT, EXTRA_SPACE_DIR
 from dataset_properties import get_available_cpus
 from get_mem_estimates import get_memory_budgets
+from staging import stage_file, record_staging
+from io_phases import run_timestamped, mark_iostat_start
 
-src_dir = "/systems/ooc/graphchi-cpp"
-app_dir = "/systems/ooc/graphchi-cpp/bin/example_apps"
+src_dir = f"{SYSTEMS_DIR}/ooc/graphchi-cpp"
+app_dir = f"{SYSTEMS_DIR}/ooc/graphchi-cpp/bin/example_apps"
 graphchi_root = src_dir
-dataset_dir = "/datasets"
-dataset_cpy = "/extra_space/graphchi_datasets"
-results_dir = "/results/graphchi"
+dataset_dir = DATASET_DIR
+dataset_cpy = f"{EXTRA_SPACE_DIR}/graphchi_datasets"
+results_dir = f"{RESULTS_ROOT}/graphchi"
 pr_iters= 10
 repeats = 5
 # Note: membudget_mb and cachesize_mb are now set dynamically based on memory_estimates.json
@@ -28,6 +33,9 @@ datasets = ["graph500_26"] #dota-league"] #,"graph500_26", "graph500_28", "graph
 benchmarks = ["pagerank_functional"]#trianglecounting"] #, #, "connectedcomponents"]
 
 iostat_process = None
+# Set by --validate: the vertex values (.vout) of the first completed run per benchmark are diffed
+# against the reference
+VALIDATE = False
 
 def get_device_for_path(path):
   """Get the block device for a given path"""
@@ -49,7 +57,7 @@ def get_device_for_path(path):
 def start_iostat_monitoring(output_file):
   global iostat_process
   # Get the device where /extra_space is mounted
-  device = get_device_for_path("/extra_space")
+  device = get_device_for_path(EXTRA_SPACE_DIR)
   if device:
     cmd = f"iostat -d -x {device} 1"
     print(f"Monitoring I/O for device: {device}")
@@ -57,6 +65,7 @@ def start_iostat_monitoring(output_file):
     # Fallback to monitoring all devices
     cmd = "iostat -d -x 1 | grep -v 'loop'"
   iostat_process = subprocess.Popen(cmd, shell=True, stdout=open(output_file, 'w'), stderr=subprocess.PIPE)
+  mark_iostat_start(output_file)
   return iostat_process
 
 def stop_iostat_monitoring():
@@ -130,14 +139,12 @@ def parse_log(filename):
   return extracted_data
 
 def copy_dataset(dataset):
-  # Copy the dataset to the graphchi directory
+  # Stage the dataset in the graphchi directory: linked when possible, copied otherwise
   if not os.path.exists(f"{dataset_cpy}/{dataset}"):
-    cmd = f"cp {dataset_dir}/{dataset}/{dataset}.e {dataset_cpy}/{dataset}"
-    print(f"running command: {cmd}")
-    os.system(cmd)
-    #check if copy was successful
-    if not os.path.exists(f"{dataset_cpy}/{dataset}"):
-      print(f"Error: Dataset copy failed for {dataset}")
+    try:
+      record_staging("graphchi", dataset, stage_file(f"{dataset_dir}/{dataset}/{dataset}.e", f"{dataset_cpy}/{dataset}"))
+    except OSError as e:
+      print(f"Error: Dataset copy failed for {dataset}: {e}")
   else:
     print(f"Dataset {dataset} already exists in {dataset_cpy}, skipping copy")
 
@@ -177,6 +184,21 @@ def update_graphchi_config(membudget_mb, cachesize_mb):
 
   print(f"Updated GraphChi config: membudget_mb={membudget_mb}, cachesize_mb={cachesize_mb}")
 
+def write_line(f):
+  """
+  Output parser (see process_runner.run_streaming) that appends every line to an open file.
+  """
+  return lambda line: f.write(line + "\n")
+
+def validate_output(dataset, benchmark):
+  '''Diff the vertex values the last run left next to the graph against the reference.'''
+  # Imported here so that plain benchmark runs do not need numpy/scipy
+  from output_validation import ALGO_ALIASES, validate_run
+  if benchmark not in ALGO_ALIASES:
+    print(f"Warning: no reference for {benchmark}, its output cannot be validated")
+    return
+  validate_run("graphchi", dataset, benchmark, f"{dataset_cpy}/{dataset}")
+
 def exec_benchmarks():
   for dataset in datasets:
     print(f"\n{'='*80}")
@@ -224,6 +246,7 @@ def exec_benchmarks():
         result_base = f"{results_dir}/{dataset}_{benchmark}_mem{mem_pct}pct"
 
         with open(f"{result_base}.out", "w") as fout, open(f"{result_base}.err", "w") as ferr:
+          validated = False
           for i in range(repeats):
             print(f"  Running iteration {i}")
 
@@ -233,18 +256,19 @@ def exec_benchmarks():
 
             start = time.time()
             cmd = globals()[f"make_{benchmark}_cmd"](dataset, benchmark, membudget_mb, cachesize_mb)
-            process = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, cwd=app_dir, shell=True)
+            fout.write(f"command: {cmd}\n")
+            # Per-iteration log; its timestamped lines (<log>.ts) let io_phases.py split the run into phases.
+            # stdout and stderr also go to the .out and .err files as they arrive
+            iter_log = f"{result_base}_iter{i}.log"
+            process = run_timestamped(cmd, iter_log, append=False, cwd=app_dir,
+                                      stream_parsers={'stdout': [write_line(fout)], 'stderr': [write_line(ferr)]})
             end = time.time()
 
             # Stop I/O monitoring
             stop_iostat_monitoring()
 
             fout.write(f"Time taken: {end - start}s\n")
-            fout.write(f"command: {process.args}\n")
             fout.write(f"return_code: {process.returncode}\n")
-            # Parse the output
-            fout.write(process.stdout.decode("ASCII"))
-            ferr.write(process.stderr.decode("ASCII"))
 
             # Check if process was killed or failed
             if process.returncode == -9:
@@ -268,17 +292,29 @@ def exec_benchmarks():
               print(f"Skipping remaining iterations for {dataset}_{benchmark}_mem{mem_pct}pct")
               break
 
+            if VALIDATE and not validated and process.returncode == 0:
+              validate_output(dataset, benchmark)
+              validated = True
+
             # Iter 0 is the preprocessing time
             if i == 0:
               preprocess_log = open(f"{results_dir}/preprocess_{dataset}_{benchmark}_mem{mem_pct}pct.log", "w")
               preprocess_log.write(f"Time for preprocessing: {end - start}s\n")
               preprocess_log.write(f"Return code: {process.returncode}\n")
-              preprocess_log.write(process.stdout.decode("ASCII"))
+              with open(iter_log, "r", errors="replace") as f:
+                shutil.copyfileobj(f, preprocess_log)
               preprocess_log.close()
 
     # Cleanup the dataset after all memory budgets are tested
     cleanup(dataset)
 def main():
+  parser = argparse.ArgumentParser(description='Run the GraphChi benchmarks')
+  parser.add_argument('--validate', action='store_true', default=False,
+                      help='Diff the output of the first completed run per benchmark against the reference')
+  args = parser.parse_args()
+  global VALIDATE
+  VALIDATE = args.validate
+
   # build GraphChi if not already built
   if not os.path.exists(f"{src_dir}/bin/example_apps/pagerank_functional"):
     os.system(f"cd {src_dir} && make -j apps")
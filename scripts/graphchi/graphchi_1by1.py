@@ -9,16 +9,19 @@ import argparse
 from datetime import datetime
 
 # Add parent directory to path to import shared utilities
-sys.path.insert(0, '/scripts')
+sys.path.insert(0, os.environ.get('BENCH_SCRIPTS_DIR', '/scripts'))
+from paths import DATASET_DIR, SYSTEMS_DIR, RESULTS_ROOT, EXTRA_SPACE_DIR
 from dataset_properties import get_available_cpus
 from get_mem_estimates import get_memory_budgets
+from staging import stage_file, record_staging
+from process_runner import run_streaming
 
-src_dir = "/systems/ooc/graphchi-cpp"
-app_dir = "/systems/ooc/graphchi-cpp/bin/example_apps"
+src_dir = f"{SYSTEMS_DIR}/ooc/graphchi-cpp"
+app_dir = f"{SYSTEMS_DIR}/ooc/graphchi-cpp/bin/example_apps"
 graphchi_root = src_dir
-dataset_dir = "/datasets"
-dataset_cpy = "/extra_space/graphchi_datasets"
-results_dir = "/results/graphchi"
+dataset_dir = DATASET_DIR
+dataset_cpy = f"{EXTRA_SPACE_DIR}/graphchi_datasets"
+results_dir = f"{RESULTS_ROOT}/graphchi"
 pr_iters= 10
 repeats = 5
 # Note: membudget_mb and cachesize_mb are now set dynamically based on memory_estimates.json
@@ -29,6 +32,9 @@ all_datasets = ["dota_league","graph500_26", "graph500_28", "graph500_30", "unif
 benchmarks = ["trianglecounting", "pagerank_functional"]#, "connectedcomponents"]
 
 iostat_process = None
+# Set by --validate: the vertex values (.vout) of the first completed run per benchmark are diffed
+# against the reference
+VALIDATE = False
 
 def get_container_ram_limit_mb():
   """
@@ -157,9 +163,9 @@ def parse_log(filename):
   return extracted_data
 
 def copy_dataset(dataset):
-  # Copy the dataset to the graphchi directory
+  # Stage the dataset in the graphchi directory: linked when possible, copied otherwise
   if not os.path.exists(f"{dataset_cpy}/{dataset}"):
-    os.system(f"cp {dataset_dir}/{dataset}/{dataset}.e {dataset_cpy}/{dataset}")
+    record_staging("graphchi", dataset, stage_file(f"{dataset_dir}/{dataset}/{dataset}.e", f"{dataset_cpy}/{dataset}"))
 
 def cleanup(dataset):
   os.system(f"rm -rf {dataset_cpy}/*")
@@ -194,13 +200,29 @@ def update_graphchi_config(membudget_mb, cachesize_mb):
 
   print(f"Updated GraphChi config: membudget_mb={membudget_mb}, cachesize_mb={cachesize_mb}")
 
-def exec_benchmarks(dataset, container_ram_mb=None):
+def write_line(f):
+  """
+  Output parser (see process_runner.run_streaming) that appends every line to an open file.
+  """
+  return lambda line: f.write(line + "\n")
+
+def validate_output(dataset, benchmark):
+  '''Diff the vertex values the last run left next to the graph against the reference.'''
+  # Imported here so that plain benchmark runs do not need numpy/scipy
+  from output_validation import ALGO_ALIASES, validate_run
+  if benchmark not in ALGO_ALIASES:
+    print(f"Warning: no reference for {benchmark}, its output cannot be validated")
+    return
+  validate_run("graphchi", dataset, benchmark, f"{dataset_cpy}/{dataset}")
+
+def exec_benchmarks(dataset, container_ram_mb=None, percentages=None):
   """
   Execute benchmarks for a single dataset with RAM validation.
 
   Args:
     dataset: Name of the dataset to benchmark
     container_ram_mb: Container RAM limit in MB (optional, will be auto-detected if None)
+    percentages: Memory budget percentages to run (default: memory_percentages)
   """
   print(f"\n{'='*80}")
   print(f"Processing dataset: {dataset}")
@@ -209,7 +231,7 @@ def exec_benchmarks(dataset, container_ram_mb=None):
   print(f"{'='*80}")
 
   # Get memory budgets for this dataset
-  memory_budgets = get_memory_budgets(dataset, memory_percentages)
+  memory_budgets = get_memory_budgets(dataset, percentages or memory_percentages)
 
   if not memory_budgets:
     print(f"Error: No memory estimates available for {dataset}")
@@ -249,6 +271,7 @@ def exec_benchmarks(dataset, container_ram_mb=None):
       result_base = f"{results_dir}/{dataset}_{benchmark}_mem{mem_pct}pct"
 
       with open(f"{result_base}.out", "w") as fout, open(f"{result_base}.err", "w") as ferr:
+        validated = False
         for i in range(repeats):
           print(f"  Running iteration {i}")
 
@@ -258,18 +281,20 @@ def exec_benchmarks(dataset, container_ram_mb=None):
 
           start = time.time()
           cmd = globals()[f"make_{benchmark}_cmd"](dataset, benchmark, membudget_mb, cachesize_mb)
-          process = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, cwd=app_dir, shell=True)
+          fout.write(f"command: {cmd}\n")
+          # stdout and stderr go to the .out and .err files as they arrive; the stdout of
+          # iteration 0 is also kept for the preprocessing log
+          preprocess_lines = []
+          stdout_parsers = [write_line(fout)] + ([preprocess_lines.append] if i == 0 else [])
+          process = run_streaming(cmd, cwd=app_dir,
+                                  stream_parsers={'stdout': stdout_parsers, 'stderr': [write_line(ferr)]})
           end = time.time()
 
           # Stop I/O monitoring
           stop_iostat_monitoring()
 
           fout.write(f"Time taken: {end - start}s\n")
-          fout.write(f"command: {process.args}\n")
           fout.write(f"return_code: {process.returncode}\n")
-          # Parse the output
-          fout.write(process.stdout.decode("ASCII"))
-          ferr.write(process.stderr.decode("ASCII"))
 
           # Check if process was killed
           if process.returncode == -9:
@@ -292,12 +317,16 @@ def exec_benchmarks(dataset, container_ram_mb=None):
             # Continue with next iteration to see if it's transient
             print(f"Continuing to next iteration...")
 
+          if VALIDATE and not validated and process.returncode == 0:
+            validate_output(dataset, benchmark)
+            validated = True
+
           # Iter 0 is the preprocessing time
           if i == 0:
             preprocess_log = open(f"{results_dir}/preprocess_{dataset}_{benchmark}_mem{mem_pct}pct.log", "w")
             preprocess_log.write(f"Time for preprocessing: {end - start}s\n")
             preprocess_log.write(f"Return code: {process.returncode}\n")
-            preprocess_log.write(process.stdout.decode("ASCII"))
+            preprocess_log.writelines(line + "\n" for line in preprocess_lines)
             preprocess_log.close()
 
   # Cleanup the dataset after all memory budgets are tested
@@ -315,6 +344,12 @@ Examples:
   # Run with explicit RAM limit override (in MB)
   python graphchi_1by1.py --dataset graph500_26 --ram-limit 32000
 
+  # Run only the 75% budget (in a container sized for it)
+  python graphchi_1by1.py --dataset graph500_26 --ram-percent 75
+
+  # Also check the PageRank/CC results against the reference
+  python graphchi_1by1.py --dataset graph500_26 --validate
+
 Available datasets:
   ''' + ', '.join(all_datasets)
   )
@@ -323,9 +358,16 @@ Available datasets:
                       help='Dataset to benchmark (required)')
   parser.add_argument('--ram-limit', type=float, default=None,
                       help='Container RAM limit in MB (auto-detected from cgroups if not specified)')
+  parser.add_argument('--ram-percent', type=int, default=None,
+                      help='Only run this memory budget percentage (default: all of ' + str(memory_percentages) + ')')
+  parser.add_argument('--validate', action='store_true', default=False,
+                      help='Diff the output of the first completed run per benchmark against the reference')
 
   args = parser.parse_args()
+  global VALIDATE
+  VALIDATE = args.validate
   dataset = args.dataset
+  percentages = [args.ram_percent] if args.ram_percent else memory_percentages
 
   # Detect or use provided container RAM limit
   container_ram_mb = args.ram_limit if args.ram_limit else get_container_ram_limit_mb()
@@ -338,7 +380,7 @@ Available datasets:
     print(f"Container RAM Limit: {container_ram_mb:.0f} MB")
   else:
     print(f"Container RAM Limit: Not detected (will run without validation)")
-  print(f"Memory Percentages: {memory_percentages}")
+  print(f"Memory Percentages: {percentages}")
   print(f"Benchmarks: {benchmarks}")
   print(f"Repeats per benchmark: {repeats}")
   print(f"{'='*80}\n")
@@ -355,7 +397,7 @@ Available datasets:
   # in the exec_benchmarks() function
 
   # Run the benchmarks for the specified dataset
-  exec_benchmarks(dataset, container_ram_mb)
+  exec_benchmarks(dataset, container_ram_mb, percentages)
 
   # Now parse the logs for the dataset
   print(f"\n{'='*80}")
@@ -363,7 +405,7 @@ Available datasets:
   print(f"{'='*80}\n")
 
   # Get memory budgets for this dataset
-  memory_budgets = get_memory_budgets(dataset, memory_percentages)
+  memory_budgets = get_memory_budgets(dataset, percentages)
 
   if not memory_budgets:
     print(f"Error: No memory estimates available for {dataset}")
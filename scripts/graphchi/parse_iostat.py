@@ -3,14 +3,19 @@
 Parse iostat log files and extract read/write bandwidth data to CSV.
 """
 
-import re
+import os
 import sys
-import csv
 import argparse
+import numpy as np
+import pandas as pd
 import matplotlib.pyplot as plt
 import matplotlib
 matplotlib.use('Agg')  # Use non-interactive backend
 
+# iostat_utils lives in the parent scripts directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from iostat_utils import read_iostat
+
 def parse_iostat_log(log_file, output_csv):
     """
     Parse iostat log file and extract bandwidth data.
@@ -18,97 +23,47 @@ def parse_iostat_log(log_file, output_csv):
     Args:
         log_file: Path to iostat log file
         output_csv: Path to output CSV file
-    """
 
-    # Pattern to match iostat data lines (not the header)
-    # The data line has the device name followed by numeric values
-    data_pattern = re.compile(r'^(\S+)\s+' +  # Device name
-                              r'(\d+\.?\d*)\s+' +  # r/s
-                              r'(\d+\.?\d*)\s+' +  # rkB/s
-                              r'.*?' +  # skip to w/s and wkB/s
-                              r'\s+(\d+\.?\d*)\s+' +  # w/s (7th column)
-                              r'(\d+\.?\d*)\s+')  # wkB/s (8th column)
-
-    samples = []
-    sample_number = 0
-
-    with open(log_file, 'r') as f:
-        for line in f:
-            # Skip header lines and empty lines
-            if line.startswith('Device') or line.strip() == '' or line.startswith('Linux'):
-                continue
-
-            # Try to parse the data line
-            # Split the line and extract relevant fields
-            fields = line.split()
-            if len(fields) >= 8:
-                try:
-                    device = fields[0]
-                    r_per_s = float(fields[1])
-                    rkB_per_s = float(fields[2])
-                    w_per_s = float(fields[6])
-                    wkB_per_s = float(fields[7])
-
-                    # Convert KB/s to MB/s for easier reading
-                    read_MB_per_s = rkB_per_s / 1024.0
-                    write_MB_per_s = wkB_per_s / 1024.0
-
-                    # Convert to GB/s as well
-                    read_GB_per_s = read_MB_per_s / 1024.0
-                    write_GB_per_s = write_MB_per_s / 1024.0
-
-                    sample_number += 1
-
-                    samples.append({
-                        'sample': sample_number,
-                        'device': device,
-                        'r_per_s': r_per_s,
-                        'read_kB_per_s': rkB_per_s,
-                        'read_MB_per_s': read_MB_per_s,
-                        'read_GB_per_s': read_GB_per_s,
-                        'w_per_s': w_per_s,
-                        'write_kB_per_s': wkB_per_s,
-                        'write_MB_per_s': write_MB_per_s,
-                        'write_GB_per_s': write_GB_per_s,
-                        'total_kB_per_s': rkB_per_s + wkB_per_s,
-                        'total_MB_per_s': read_MB_per_s + write_MB_per_s,
-                        'total_GB_per_s': read_GB_per_s + write_GB_per_s
-                    })
-                except (ValueError, IndexError):
-                    # Skip lines that don't parse correctly
-                    continue
-
-    # Write to CSV
-    if samples:
-        fieldnames = ['sample', 'device', 'r_per_s', 'read_kB_per_s', 'read_MB_per_s',
-                      'read_GB_per_s', 'w_per_s', 'write_kB_per_s', 'write_MB_per_s',
-                      'write_GB_per_s', 'total_kB_per_s', 'total_MB_per_s', 'total_GB_per_s']
-
-        with open(output_csv, 'w', newline='') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(samples)
-
-        print(f"Parsed {len(samples)} samples from {log_file}")
-        print(f"Output written to {output_csv}")
-
-        # Print summary statistics
-        if len(samples) > 0:
-            total_read_MB = sum(s['read_MB_per_s'] for s in samples)
-            total_write_MB = sum(s['write_MB_per_s'] for s in samples)
-            avg_read_MB = total_read_MB / len(samples)
-            avg_write_MB = total_write_MB / len(samples)
-            max_read_MB = max(s['read_MB_per_s'] for s in samples)
-            max_write_MB = max(s['write_MB_per_s'] for s in samples)
-
-            print(f"\nSummary Statistics:")
-            print(f"  Total samples: {len(samples)}")
-            print(f"  Average read bandwidth:  {avg_read_MB:.2f} MB/s ({avg_read_MB/1024:.2f} GB/s)")
-            print(f"  Average write bandwidth: {avg_write_MB:.2f} MB/s ({avg_write_MB/1024:.2f} GB/s)")
-            print(f"  Peak read bandwidth:     {max_read_MB:.2f} MB/s ({max_read_MB/1024:.2f} GB/s)")
-            print(f"  Peak write bandwidth:    {max_write_MB:.2f} MB/s ({max_write_MB/1024:.2f} GB/s)")
-    else:
+    Returns:
+        pandas.DataFrame: One row per sample (see iostat_utils.read_iostat)
+    """
+    frame = read_iostat(log_file)
+    if frame.empty:
         print(f"No data samples found in {log_file}")
+        return frame
+
+    samples = pd.DataFrame({
+        'sample': np.arange(1, len(frame) + 1),
+        'device': frame['device'],
+        'r_per_s': frame['r_s'],
+        'read_kB_per_s': frame['read_mb_s'] * 1024.0,
+        'read_MB_per_s': frame['read_mb_s'],
+        'read_GB_per_s': frame['read_mb_s'] / 1024.0,
+        'w_per_s': frame['w_s'],
+        'write_kB_per_s': frame['write_mb_s'] * 1024.0,
+        'write_MB_per_s': frame['write_mb_s'],
+        'write_GB_per_s': frame['write_mb_s'] / 1024.0,
+    })
+    samples['total_kB_per_s'] = samples['read_kB_per_s'] + samples['write_kB_per_s']
+    samples['total_MB_per_s'] = samples['read_MB_per_s'] + samples['write_MB_per_s']
+    samples['total_GB_per_s'] = samples['read_GB_per_s'] + samples['write_GB_per_s']
+    samples.to_csv(output_csv, index=False)
+
+    print(f"Parsed {len(samples)} samples from {log_file}")
+    print(f"Output written to {output_csv}")
+
+    # Print summary statistics
+    avg_read_MB = samples['read_MB_per_s'].mean()
+    avg_write_MB = samples['write_MB_per_s'].mean()
+    max_read_MB = samples['read_MB_per_s'].max()
+    max_write_MB = samples['write_MB_per_s'].max()
+
+    print(f"\nSummary Statistics:")
+    print(f"  Total samples: {len(samples)}")
+    print(f"  Average read bandwidth:  {avg_read_MB:.2f} MB/s ({avg_read_MB/1024:.2f} GB/s)")
+    print(f"  Average write bandwidth: {avg_write_MB:.2f} MB/s ({avg_write_MB/1024:.2f} GB/s)")
+    print(f"  Peak read bandwidth:     {max_read_MB:.2f} MB/s ({max_read_MB/1024:.2f} GB/s)")
+    print(f"  Peak write bandwidth:    {max_write_MB:.2f} MB/s ({max_write_MB/1024:.2f} GB/s)")
 
     return samples
 
@@ -117,18 +72,18 @@ def plot_bandwidth(samples, output_plot):
     Plot bandwidth over time.
 
     Args:
-        samples: List of sample dictionaries
+        samples: DataFrame returned by parse_iostat_log
         output_plot: Path to output plot file
     """
-    if not samples:
+    if samples.empty:
         print("No data to plot")
         return
 
     # Extract time in minutes (each sample is 1 second apart)
-    time_minutes = [s['sample'] / 60.0 for s in samples]
-    read_MB = [s['read_MB_per_s'] for s in samples]
-    write_MB = [s['write_MB_per_s'] for s in samples]
-    total_MB = [s['total_MB_per_s'] for s in samples]
+    time_minutes = samples['sample'] / 60.0
+    read_MB = samples['read_MB_per_s']
+    write_MB = samples['write_MB_per_s']
+    total_MB = samples['total_MB_per_s']
 
     # Create figure with higher DPI for better quality
     fig, ax = plt.subplots(figsize=(12, 6), dpi=100)
@@ -192,7 +147,7 @@ Examples:
     samples = parse_iostat_log(log_file, output_csv)
 
     # Generate plot if requested
-    if args.plot and samples:
+    if args.plot and not samples.empty:
         # Generate plot filename from CSV filename
         if output_csv.endswith('.csv'):
             output_plot = output_csv[:-4] + '.png'
@@ -6,20 +6,31 @@ import re
 import time
 import subprocess
 
-SRC_DIR = "/systems/ooc/GridGraph"
-TOOLS_DIR = "/systems/in-mem/GridGraph/tools"
-DATASET_DIR = "/datasets"
-RESULTS_DIR = "/results/GridGraph"
+# Add parent directory to path to import shared utilities
+sys.path.insert(0, os.environ.get('BENCH_SCRIPTS_DIR', '/scripts'))
+from paths import DATASET_DIR, SYSTEMS_DIR, RESULTS_ROOT
+from build_cache import cached_build
+from io_phases import run_timestamped, mark_iostat_start
+from conversion_pipeline import ConversionPipeline
+from preprocessing_ledger import run_step
+
+SRC_DIR = f"{SYSTEMS_DIR}/ooc/GridGraph"
+TOOLS_DIR = f"{SYSTEMS_DIR}/in-mem/GridGraph/tools"
+RESULTS_DIR = f"{RESULTS_ROOT}/GridGraph"
 
 REPEATS = 5
 PR_MAX_ITERS = 20
 
+# Binaries produced by `make`, restored from the build cache when the sources are unchanged
+BUILD_ARTIFACTS = ["bin"]
+
 iostat_process = None
 
 def start_iostat_monitoring(output_file):
   global iostat_process
   cmd = "iostat -d -x 1 | grep -v 'loop'"
   iostat_process = subprocess.Popen(cmd, shell=True, stdout=open(output_file, 'w'), stderr=subprocess.PIPE)
+  mark_iostat_start(output_file)
   return iostat_process
 
 def stop_iostat_monitoring():
@@ -242,10 +253,9 @@ def convert_to_binary(dataset_path, dry_run=False):
   
   conversion_time = 0.0
   if not dry_run:
-    start_time = time.time()
-    result = os.system(convert_cmd)
-    end_time = time.time()
-    conversion_time = end_time - start_time
+    step = run_step("gridgraph", os.path.basename(dataset_path), "gridgraph.bin", convert_cmd)
+    result = step.returncode
+    conversion_time = step.wall_s
     
     if result != 0:
       print(f"Error: Conversion failed with exit code {result}")
@@ -304,10 +314,9 @@ def run_preprocessing(dataset_name, bin_file, num_vertices, dry_run=False):
   
   preprocessing_time = 0.0
   if not dry_run:
-    start_time = time.time()
-    result = os.system(preprocess_cmd)
-    end_time = time.time()
-    preprocessing_time = end_time - start_time
+    step = run_step("gridgraph", dataset_name, "gridgraph.grid", preprocess_cmd, depends_on=["gridgraph.bin"])
+    result = step.returncode
+    preprocessing_time = step.wall_s
     
     if result != 0:
       print(f"Error: Preprocessing failed with exit code {result}")
@@ -324,6 +333,37 @@ def run_preprocessing(dataset_name, bin_file, num_vertices, dry_run=False):
   
   return True, preprocessing_time
 
+def prepare_dataset(dataset_name, dry_run=False):
+  """Convert a dataset to binary and preprocess it into its grid partitions.
+  Returns (conversion_time, preprocessing_time), or None if the dataset cannot be benchmarked."""
+  print(f"Processing dataset: {dataset_name}")
+  dataset_path = f"{DATASET_DIR}/{dataset_name}/{dataset_name}"
+  
+  # Check if dataset file exists
+  if not os.path.exists(dataset_path):
+    print(f"Warning: Dataset file {dataset_path} not found, skipping")
+    return None
+  
+  # Convert to binary format if needed
+  bin_file, conversion_time = convert_to_binary(dataset_path, dry_run)
+  print(f"Using binary file: {bin_file}")
+  
+  # Get the maximum vertex ID
+  max_vertex_id = get_max_vertex_id(dataset_name)
+  if max_vertex_id is None:
+    print(f"Warning: Could not determine max vertex ID for {dataset_name}, skipping")
+    return None
+  
+  num_vertices = max_vertex_id + 1
+  print(f"Number of vertices: {num_vertices}")
+  
+  # Run preprocessing
+  preprocessing_success, preprocessing_time = run_preprocessing(dataset_name, bin_file, num_vertices, dry_run)
+  if not preprocessing_success:
+    print(f"Warning: Preprocessing failed for {dataset_name}, skipping")
+    return None
+  return conversion_time, preprocessing_time
+
 def run_pagerank(dataset_name, preprocessed_file, dry_run=False):
   """Run PageRank"""
   iterations = [10, 20, 30]
@@ -342,13 +382,12 @@ def run_pagerank(dataset_name, preprocessed_file, dry_run=False):
       # Create log file for this specific run
       log_file = f"{RESULTS_DIR}/{dataset_name}_pagerank_iter{iters}.log"
       iostat_log = f"{RESULTS_DIR}/{dataset_name}_pagerank_iter{iters}_iostat.log"
-      cmd_with_log = f"{cmd} >> {log_file} 2>&1"
       
       # Start I/O monitoring for this specific run
       start_iostat_monitoring(iostat_log)
       
       start_time = time.time()
-      result = os.system(cmd_with_log)
+      result = run_timestamped(cmd, log_file).returncode
       end_time = time.time()
       execution_time = end_time - start_time
       
@@ -404,13 +443,12 @@ def run_bfs(dataset_name, preprocessed_file, dry_run=False):
     # Create log file for this run
     log_file = f"{RESULTS_DIR}/{dataset_name}_bfs.log"
     iostat_log = f"{RESULTS_DIR}/{dataset_name}_bfs_iostat.log"
-    cmd_with_log = f"{cmd} >> {log_file} 2>&1"
     
     # Start I/O monitoring for this specific run
     start_iostat_monitoring(iostat_log)
     
     start_time = time.time()
-    result = os.system(cmd_with_log)
+    result = run_timestamped(cmd, log_file).returncode
     end_time = time.time()
     execution_time = end_time - start_time
     
@@ -438,13 +476,12 @@ def run_wcc(dataset_name, preprocessed_file, dry_run=False):
     # Create log file for this run
     log_file = f"{RESULTS_DIR}/{dataset_name}_wcc.log"
     iostat_log = f"{RESULTS_DIR}/{dataset_name}_wcc_iostat.log"
-    cmd_with_log = f"{cmd} >> {log_file} 2>&1"
     
     # Start I/O monitoring for this specific run
     start_iostat_monitoring(iostat_log)
     
     start_time = time.time()
-    result = os.system(cmd_with_log)
+    result = run_timestamped(cmd, log_file).returncode
     end_time = time.time()
     execution_time = end_time - start_time
     
@@ -472,13 +509,12 @@ def run_spmv(dataset_name, preprocessed_file, dry_run=False):
     # Create log file for this run
     log_file = f"{RESULTS_DIR}/{dataset_name}_spmv.log"
     iostat_log = f"{RESULTS_DIR}/{dataset_name}_spmv_iostat.log"
-    cmd_with_log = f"{cmd} >> {log_file} 2>&1"
     
     # Start I/O monitoring for this specific run
     start_iostat_monitoring(iostat_log)
     
     start_time = time.time()
-    result = os.system(cmd_with_log)
+    result = run_timestamped(cmd, log_file).returncode
     end_time = time.time()
     execution_time = end_time - start_time
     
@@ -523,8 +559,8 @@ def main(self):
     return
 
   os.chdir(SRC_DIR)
-  #run make here
-  os.system("make clean && make -j")
+  #run make here, unless the build cache already holds binaries for this source tree
+  cached_build("gridgraph", SRC_DIR, ["make clean && make -j"], BUILD_ARTIFACTS, dry_run=args.dry_run)
 
   datasets = ["dota_league","graph500_26", "graph500_28", "graph500_30", "uniform_26", "twitter_mpi","uk-2007", "com-friendster"]
   
@@ -532,36 +568,15 @@ def main(self):
   conversion_times = {}
   preprocessing_times = {}
   
-  for dataset_name in datasets:
-    print(f"Processing dataset: {dataset_name}")
-    dataset_path = f"{DATASET_DIR}/{dataset_name}/{dataset_name}"
-    
-    # Check if dataset file exists
-    if not os.path.exists(dataset_path):
-      print(f"Warning: Dataset file {dataset_path} not found, skipping")
-      continue
-    
-    # Convert to binary format if needed
-    bin_file, conversion_time = convert_to_binary(dataset_path, args.dry_run)
-    print(f"Using binary file: {bin_file}")
+  # Datasets are converted one at a time: the out-of-core benchmarks stream the .pl partitions
+  # in SRC_DIR, where the next dataset's partitions would be written, so converting ahead
+  # (as galois.py and ligra.py do with --lookahead) would compete with the benchmark's I/O
+  pipeline = ConversionPipeline(lambda dataset_name: prepare_dataset(dataset_name, args.dry_run),
+                                lookahead=0, staging_dir=SRC_DIR)
+  for dataset_name, (conversion_time, preprocessing_time) in pipeline.run(datasets):
     conversion_times[dataset_name] = conversion_time
-    
-    # Get the maximum vertex ID
-    max_vertex_id = get_max_vertex_id(dataset_name)
-    if max_vertex_id is None:
-      print(f"Warning: Could not determine max vertex ID for {dataset_name}, skipping")
-      continue
-    
-    num_vertices = max_vertex_id + 1
-    print(f"Number of vertices: {num_vertices}")
-    
-    # Run preprocessing
-    preprocessing_success, preprocessing_time = run_preprocessing(dataset_name, bin_file, num_vertices, args.dry_run)
-    if not preprocessing_success:
-      print(f"Warning: Preprocessing failed for {dataset_name}, skipping")
-      continue
     preprocessing_times[dataset_name] = preprocessing_time
-    
+
     # Run Benchmark programs
     preprocessed_file = f"{dataset_name}.pl"
     run_pagerank(dataset_name, preprocessed_file, args.dry_run)
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Segment out-of-core runs into phases and account the I/O of every phase.
+
+The iostat logs only give bandwidth over time. To know how much each
+preprocessing step or each PageRank iteration read and wrote, the system's
+own log lines have to be placed on the same time axis:
+
+    1. run_timestamped() runs a system through process_runner.run_streaming()
+       and stores every output line with its wall-clock time in <log>.ts (the
+       plain log is written as before), and
+       mark_iostat_start() records when iostat was started in <iostat log>.start
+    2. segment_phases() matches the timestamped lines against the system's
+       PHASE_MARKERS and builds two tables:
+           timeline - a 'start' marker opens a phase that lasts until the next
+                      one; these phases are disjoint and cover the whole run
+           spans    - a 'duration' marker ("... took 12.3 seconds") closes a
+                      phase that began that many seconds before the line; spans
+                      overlap the timeline (e.g. "compute" covers the iterations)
+       Byte totals add up within a table, never across the two.
+    3. phase_io() integrates the per-second iostat samples over every phase
+       (fractional overlap at the edges) into MB read/written, average and
+       peak bandwidth and average %util
+
+Usage:
+    python io_phases.py lumos /results/lumos/g500_pagerank_iter10.log /results/lumos/g500_pagerank_iter10_iostat.log --device nvme0n1
+"""
+
+import os
+import re
+import sys
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from iostat_utils import read_iostat
+from process_runner import run_streaming
+
+# (kind, regex, phase name template); groups of the regex can be used in the template.
+# For 'duration' markers the named group 'seconds' holds the phase length.
+PHASE_MARKERS = {
+    'lumos': [
+        ('start', r"Iteration\s+(\d+):\s+active\s+vertices", "iteration {0}"),
+        ('duration', r"degree\s+calculation\s+used\s+(?P<seconds>\d+\.?\d*)\s+seconds", "degree calculation"),
+        ('duration', r"(\d+)\s+iterations\s+of\s+\w+\s+took\s+(?P<seconds>\d+\.?\d*)\s+seconds", "compute"),
+    ],
+    'gridgraph': [
+        ('start', r"[Ii]teration\s+(\d+)", "iteration {0}"),
+        ('duration', r"degree\s+calculation\s+used\s+(?P<seconds>\d+\.?\d*)\s+seconds", "degree calculation"),
+        ('duration', r"(\d+)\s+iterations\s+of\s+\w+\s+took\s+(?P<seconds>\d+\.?\d*)\s+seconds", "compute"),
+    ],
+    'graphchi': [
+        ('start', r"(?i)preprocessing", "preprocessing"),
+        ('start', r"execute_sharding", "sharding"),
+        ('start', r"(?i)iteration:?\s+(\d+)", "iteration {0}"),
+    ],
+    'xstream': [
+        ('start', r"(?i)iteration\s+(\d+)", "iteration {0}"),
+    ],
+}
+
+TS_SUFFIX = ".ts"
+START_SUFFIX = ".start"
+
+
+def mark_iostat_start(iostat_log):
+    """
+    Record the wall-clock start time of an iostat capture in <iostat_log>.start.
+    """
+    with open(iostat_log + START_SUFFIX, 'w') as f:
+        f.write(f"{time.time():.6f}\n")
+
+
+def _timestamper(ts, name):
+    def stamp(line):
+        ts.write(f"{time.time():.6f}\t{name}\t{line}\n")
+    return stamp
+
+
+def run_timestamped(cmd, log_file, ts_file=None, append=True, stream_parsers=None, **streaming_kwargs):
+    """
+    Run a command with process_runner.run_streaming(), timestamping every stdout/stderr line as it arrives.
+
+    Args:
+        cmd: Command (shell string or argv list)
+        log_file: Plain log receiving stdout and stderr (as `cmd >> log 2>&1` would), or None
+        ts_file: Timestamped log (default: <log_file>.ts)
+        append: Append to the logs instead of truncating them
+        stream_parsers: Extra per-stream parsers (see run_streaming)
+        streaming_kwargs: Passed to run_streaming (e.g. cwd, timeout, watchdog, parsers)
+
+    Returns:
+        process_runner.ProcessResult
+    """
+    if ts_file is None:
+        ts_file = log_file + TS_SUFFIX
+    with open(ts_file, 'a' if append else 'w') as ts:
+        ts.write(f"{time.time():.6f}\tstart\t{cmd if isinstance(cmd, str) else ' '.join(cmd)}\n")
+        parsers = {name: [_timestamper(ts, name)] + list((stream_parsers or {}).get(name, ()))
+                   for name in ('stdout', 'stderr')}
+        result = run_streaming(cmd, log_file, append=append, stream_parsers=parsers, **streaming_kwargs)
+        ts.write(f"{time.time():.6f}\tend\t{result.returncode}\n")
+    return result
+
+
+def read_timestamped_log(ts_file):
+    """
+    Read a .ts log of the last run in it.
+
+    Returns:
+        pandas.DataFrame: columns time (epoch seconds), stream, line
+    """
+    rows = []
+    with open(ts_file, 'r', errors='replace') as f:
+        for line in f:
+            parts = line.rstrip('\n').split('\t', 2)
+            if len(parts) < 3:
+                continue
+            try:
+                rows.append((float(parts[0]), parts[1], parts[2]))
+            except ValueError:
+                continue
+    frame = pd.DataFrame(rows, columns=['time', 'stream', 'line'])
+    starts = np.flatnonzero(frame['stream'].to_numpy() == 'start')
+    if len(starts):
+        frame = frame.iloc[starts[-1]:].reset_index(drop=True)
+    return frame
+
+
+def segment_phases(lines, system, origin):
+    """
+    Turn timestamped log lines into phases.
+
+    Args:
+        lines: DataFrame from read_timestamped_log
+        system: Key of PHASE_MARKERS
+        origin: Epoch time that becomes t=0 (the iostat start)
+
+    Returns:
+        tuple: (timeline, spans), DataFrames with the columns phase, start_s, end_s (seconds
+               since origin); the timeline phases are disjoint and cover the run (a single 'run'
+               phase without start markers), the spans come from duration markers and may be empty
+    """
+    markers = [(kind, re.compile(regex), template) for kind, regex, template in PHASE_MARKERS.get(system, [])]
+    run_start = lines['time'].iloc[0] - origin if len(lines) else 0.0
+    ends = lines.loc[lines['stream'] == 'end', 'time']
+    run_end = (ends.iloc[-1] if len(ends) else lines['time'].iloc[-1]) - origin
+
+    output = lines[lines['stream'].isin(['stdout', 'stderr'])]
+    starts, spans = [], []
+    for t, text in zip(output['time'].to_numpy() - origin, output['line']):
+        for kind, regex, template in markers:
+            match = regex.search(text)
+            if not match:
+                continue
+            name = template.format(*match.groups())
+            if kind == 'start':
+                # Repeated lines for the same phase (e.g. per-thread output) keep the first start
+                if not starts or starts[-1][1] != name:
+                    starts.append((t, name))
+            else:
+                seconds = float(match.group('seconds'))
+                spans.append({'phase': name, 'start_s': max(t - seconds, run_start), 'end_s': t})
+            break
+
+    if not starts:
+        starts.append((run_start, 'run'))
+    elif starts[0][0] > run_start:
+        starts.insert(0, (run_start, 'startup'))
+    timeline = pd.DataFrame([{'phase': name, 'start_s': t, 'end_s': following[0]}
+                             for (t, name), following in zip(starts, starts[1:] + [(run_end, None)])])
+    spans = pd.DataFrame(spans, columns=['phase', 'start_s', 'end_s'])
+    return timeline, spans.sort_values('start_s', kind='stable').reset_index(drop=True)
+
+
+def phase_io(phases, iostat, device):
+    """
+    Integrate the iostat samples of one device over every phase.
+
+    Report k of iostat covers the seconds (k-1, k] after the iostat start; report 0
+    holds the averages since boot and is ignored.
+
+    Returns:
+        pandas.DataFrame: phases with duration_s, read_mb, write_mb, avg/peak bandwidth and util_pct
+    """
+    samples = iostat[(iostat['device'] == device) & (iostat['timestamp'] > 0)]
+    result = phases.copy()
+    result['duration_s'] = result['end_s'] - result['start_s']
+    if samples.empty:
+        print(f"Warning: no iostat samples for device {device}")
+        return result
+
+    interval_end = samples['timestamp'].to_numpy(dtype=np.float64)
+    interval_start = interval_end - 1.0
+    read = samples['read_mb_s'].to_numpy()
+    write = samples['write_mb_s'].to_numpy()
+    util = samples['util'].to_numpy()
+
+    # overlap[p, k] = seconds of phase p inside iostat interval k
+    start = result['start_s'].to_numpy()[:, None]
+    end = result['end_s'].to_numpy()[:, None]
+    overlap = np.clip(np.minimum(end, interval_end[None, :]) - np.maximum(start, interval_start[None, :]), 0.0, 1.0)
+    covered = overlap.sum(axis=1)
+    touched = overlap > 0
+
+    result['read_mb'] = overlap @ read
+    result['write_mb'] = overlap @ write
+    with np.errstate(invalid='ignore', divide='ignore'):
+        result['avg_read_mb_s'] = result['read_mb'] / covered
+        result['avg_write_mb_s'] = result['write_mb'] / covered
+        result['util_pct'] = (overlap @ np.nan_to_num(util)) / covered
+    result['peak_read_mb_s'] = np.where(touched, read[None, :], 0.0).max(axis=1)
+    result['peak_write_mb_s'] = np.where(touched, write[None, :], 0.0).max(axis=1)
+    return result
+
+
+def analyze_run(system, log_file, iostat_log, device):
+    """
+    Per-phase I/O accounting of one run (needs <log_file>.ts).
+
+    Returns:
+        tuple: (timeline, spans) as returned by segment_phases, with the columns of phase_io,
+               or None without timestamped lines
+    """
+    ts_file = log_file if log_file.endswith(TS_SUFFIX) else log_file + TS_SUFFIX
+    lines = read_timestamped_log(ts_file)
+    if lines.empty:
+        print(f"Warning: no timestamped lines in {ts_file}")
+        return None
+    start_file = iostat_log + START_SUFFIX
+    if os.path.exists(start_file):
+        with open(start_file, 'r') as f:
+            origin = float(f.read().strip())
+    else:
+        print(f"Warning: {start_file} not found, assuming iostat started with the process")
+        origin = lines['time'].iloc[0]
+    timeline, spans = segment_phases(lines, system, origin)
+    iostat = read_iostat(iostat_log)
+    return phase_io(timeline, iostat, device), phase_io(spans, iostat, device)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Per-phase I/O accounting of an out-of-core run')
+    parser.add_argument('system', choices=sorted(PHASE_MARKERS), help='system that produced the log')
+    parser.add_argument('log_file', help='run log (its .ts sidecar is read)')
+    parser.add_argument('iostat_log', help='iostat log captured during the run')
+    parser.add_argument('--device', required=True, help='device to account (e.g. nvme0n1)')
+    parser.add_argument('--output', help='write the timeline to this CSV file (and the spans to <name>_spans.csv)')
+    args = parser.parse_args()
+
+    result = analyze_run(args.system, args.log_file, args.iostat_log, args.device)
+    if result is None:
+        return 1
+    timeline, spans = result
+    with pd.option_context('display.max_rows', None, 'display.width', 200):
+        print("Timeline (disjoint phases):")
+        print(timeline.round(2).to_string(index=False))
+        if not spans.empty:
+            print("\nSpans (overlap the timeline):")
+            print(spans.round(2).to_string(index=False))
+    if args.output:
+        timeline.to_csv(args.output, index=False)
+        print(f"Timeline written to {args.output}")
+        if not spans.empty:
+            spans_output = f"{os.path.splitext(args.output)[0]}_spans.csv"
+            spans.to_csv(spans_output, index=False)
+            print(f"Spans written to {spans_output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""
+Shared parser for the iostat logs written by the runners.
+
+The runners record `iostat -d -x <device> 1` (or `iostat -d -x 1 | grep -v loop`)
+into *_iostat.log files. read_iostat() turns such a log into a pandas DataFrame
+with one row per (interval, device):
+
+    timestamp    - interval number (iostat prints one report per second)
+    device       - device name
+    r_s, w_s     - read / write requests per second
+    read_mb_s, write_mb_s, total_mb_s - bandwidth in MB/s
+    util         - %util (NaN if the column is missing)
+
+Columns are looked up by their header name, so both the kB/s and MB/s (-m)
+variants and the different sysstat column layouts are handled. All data rows
+are parsed by one pandas C-engine read, and the frame is cached as
+<log>.parquet next to the log (rebuilt when the log is newer). Without a
+Parquet engine (pyarrow or fastparquet) the cache is skipped.
+"""
+
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = ['timestamp', 'device', 'r_s', 'w_s', 'read_mb_s', 'write_mb_s', 'total_mb_s', 'util']
+
+# Header names of the bandwidth columns and their factor to MB/s
+READ_BANDWIDTH_COLUMNS = {'rkB/s': 1.0 / 1024, 'rMB/s': 1.0, 'rsec/s': 512.0 / (1024 * 1024)}
+WRITE_BANDWIDTH_COLUMNS = {'wkB/s': 1.0 / 1024, 'wMB/s': 1.0, 'wsec/s': 512.0 / (1024 * 1024)}
+
+_parquet_warning_printed = False
+
+
+def _empty_frame():
+    return pd.DataFrame({column: pd.Series(dtype='float64') for column in COLUMNS}).astype(
+        {'timestamp': 'int64', 'device': 'object'})
+
+
+def _bandwidth(frame, candidates):
+    for name, factor in candidates.items():
+        if name in frame.columns:
+            return pd.to_numeric(frame[name], errors='coerce').to_numpy(dtype=np.float64) * factor
+    return np.full(len(frame), np.nan)
+
+
+def _optional_column(frame, name):
+    if name in frame.columns:
+        return pd.to_numeric(frame[name], errors='coerce').to_numpy(dtype=np.float64)
+    return np.full(len(frame), np.nan)
+
+
+def parse_iostat_text(text):
+    """
+    Parse the text of an iostat log.
+
+    Args:
+        text: Content of the log
+
+    Returns:
+        pandas.DataFrame: One row per (interval, device) with the columns in COLUMNS
+    """
+    lines = pd.Series(text.splitlines(), dtype='object')
+    if lines.empty:
+        return _empty_frame()
+    stripped = lines.str.strip()
+    is_header = stripped.str.startswith('Device')
+    if not is_header.any():
+        return _empty_frame()
+
+    header = stripped[is_header].iloc[0].split()
+    header[0] = 'device'
+    # Every report starts with a header line; rows before the first one are discarded
+    interval = is_header.cumsum() - 1
+    field_counts = stripped.str.count(r'\s+') + 1
+    is_data = (~is_header) & (stripped != '') & (interval >= 0) & (field_counts == len(header))
+    if not is_data.any():
+        return _empty_frame()
+
+    frame = pd.read_csv(io.StringIO('\n'.join(stripped[is_data])), sep=r'\s+', header=None,
+                        names=header, engine='c', dtype={'device': str})
+    read_mb_s = _bandwidth(frame, READ_BANDWIDTH_COLUMNS)
+    write_mb_s = _bandwidth(frame, WRITE_BANDWIDTH_COLUMNS)
+    result = pd.DataFrame({
+        'timestamp': interval[is_data].to_numpy(dtype=np.int64),
+        'device': frame['device'].to_numpy(),
+        'r_s': _optional_column(frame, 'r/s'),
+        'w_s': _optional_column(frame, 'w/s'),
+        'read_mb_s': read_mb_s,
+        'write_mb_s': write_mb_s,
+        'total_mb_s': read_mb_s + write_mb_s,
+        'util': _optional_column(frame, '%util'),
+    })
+    return result.dropna(subset=['read_mb_s', 'write_mb_s']).reset_index(drop=True)
+
+
+def cache_path(filename):
+    return f"{filename}.parquet"
+
+
+def _read_cache(filename):
+    cached = cache_path(filename)
+    if not os.path.exists(cached) or os.path.getmtime(cached) < os.path.getmtime(filename):
+        return None
+    try:
+        return pd.read_parquet(cached)
+    except (ImportError, ValueError, OSError):
+        return None
+
+
+def _write_cache(filename, frame):
+    global _parquet_warning_printed
+    try:
+        frame.to_parquet(cache_path(filename), index=False)
+    except ImportError:
+        if not _parquet_warning_printed:
+            print("Warning: no Parquet engine (pyarrow/fastparquet) installed, iostat logs will not be cached")
+            _parquet_warning_printed = True
+    except OSError as e:
+        print(f"Warning: could not write iostat cache for {filename}: {e}")
+
+
+def read_iostat(filename, use_cache=True):
+    """
+    Read an iostat log into a DataFrame, using the Parquet cache next to it when fresh.
+
+    Args:
+        filename: Path to the iostat log
+        use_cache: Read/write <filename>.parquet
+
+    Returns:
+        pandas.DataFrame: See parse_iostat_text
+    """
+    if use_cache:
+        cached = _read_cache(filename)
+        if cached is not None:
+            return cached
+    with open(filename, 'r', errors='replace') as f:
+        frame = parse_iostat_text(f.read())
+    if use_cache:
+        _write_cache(filename, frame)
+    return frame
+
+
+def parse_iostat_log(filename):
+    """
+    Parse an iostat log file into a DataFrame of read/write bandwidth per device and second.
+    """
+    return read_iostat(filename)
+
+
+def device_series(frame, device):
+    """
+    Rows of one device ordered by timestamp.
+    """
+    return frame[frame['device'] == device].sort_values('timestamp')
@@ -6,20 +6,29 @@ import re
 import time
 import subprocess
 
-SRC_DIR = "/systems/ooc/lumos"
-TOOLS_DIR = "/systems/in-mem/lumos/toolkits"
-DATASET_DIR = "/datasets"
-RESULTS_DIR = "/results/lumos"
+# Add parent directory to path to import shared utilities
+sys.path.insert(0, os.environ.get('BENCH_SCRIPTS_DIR', '/scripts'))
+from paths import DATASET_DIR, SYSTEMS_DIR, RESULTS_ROOT
+from build_cache import cached_build
+from io_phases import run_timestamped, mark_iostat_start
+
+SRC_DIR = f"{SYSTEMS_DIR}/ooc/lumos"
+TOOLS_DIR = f"{SYSTEMS_DIR}/in-mem/lumos/toolkits"
+RESULTS_DIR = f"{RESULTS_ROOT}/lumos"
 
 REPEATS = 5
 PR_MAX_ITERS = 20
 
+# Binaries produced by `make`, restored from the build cache when the sources are unchanged
+BUILD_ARTIFACTS = ["bin"]
+
 iostat_process = None
 
 def start_iostat_monitoring(output_file):
   global iostat_process
   cmd = "iostat -d -x 1 | grep -v 'loop'"
   iostat_process = subprocess.Popen(cmd, shell=True, stdout=open(output_file, 'w'), stderr=subprocess.PIPE)
+  mark_iostat_start(output_file)
   return iostat_process
 
 def stop_iostat_monitoring():
@@ -326,13 +335,12 @@ def run_pagerank_programs(dataset_name, preprocessed_file, dry_run=False):
         # Create log file for this specific run
         log_file = f"{RESULTS_DIR}/{dataset_name}_{program}_iter{iters}.log"
         iostat_log = f"{RESULTS_DIR}/{dataset_name}_{program}_iter{iters}_iostat.log"
-        cmd_with_log = f"{cmd} >> {log_file} 2>&1"
         
         # Start I/O monitoring for this specific run
         start_iostat_monitoring(iostat_log)
         
         start_time = time.time()
-        result = os.system(cmd_with_log)
+        result = run_timestamped(cmd, log_file).returncode
         end_time = time.time()
         execution_time = end_time - start_time
         
@@ -377,8 +385,8 @@ def main(self):
     return
 
   os.chdir(SRC_DIR)
-  #run make here
-  os.system("make clean && make -j")
+  #run make here, unless the build cache already holds binaries for this source tree
+  cached_build("lumos", SRC_DIR, ["make clean && make -j"], BUILD_ARTIFACTS, dry_run=args.dry_run)
 
   datasets = ["dota_league","graph500_26", "graph500_28", "graph500_30", "uniform_26", "twitter_mpi","uk-2007", "com-friendster"]
   
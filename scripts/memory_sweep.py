@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+"""
+Find the smallest memory budget at which an out-of-core system still completes.
+
+graphchi_1by1.py runs a fixed list of memory percentages, and locating the OOM
+cliff (or the budget where runtime collapses) takes manual reruns with
+different container sizes. This driver bisects the memory limit of every
+(system, dataset, algo) down to a target resolution:
+
+    1. the prepare command runs once without a limit; it only converts the
+       dataset if the converted copy is not already there, so conversions of
+       earlier runs are reused
+    2. the run at the upper budget gives the baseline runtime
+    3. every bisection point runs in its own child cgroup (v2, or the v1
+       memory hierarchy) limited to the budget with swap disabled; a point fails if the kernel
+       OOM-killed it, it exited non-zero, it hit the timeout, or its runtime
+       exceeded collapse_factor x the baseline (thrashing)
+    4. optionally, extra log-spaced budgets between the minimum viable budget
+       and the upper budget fill in the runtime-vs-memory curve
+
+Points are written to <output_dir>/<system>/<dataset>_<algo>_sweep.csv and
+plotted (runtime vs budget, failures marked, minimum viable budget as a
+vertical line). Must run inside a container with write access to the cgroup
+filesystem (launch-container-ram-constrained.sh starts them --privileged); give
+the container a limit at least as large as the upper budget.
+
+Usage:
+    python memory_sweep.py graphchi graph500_26 pagerank --upper-mb 32000 --resolution-mb 256
+    python memory_sweep.py custom mydata bfs --run "/bin/app {dataset} {budget_mb}" --upper-mb 8000
+"""
+
+import os
+import re
+import sys
+import csv
+import time
+import json
+import signal
+import argparse
+import subprocess
+
+import numpy as np
+
+from get_mem_estimates import get_graph_size_mb
+from paths import DATASET_DIR, SYSTEMS_DIR, RESULTS_ROOT, EXTRA_SPACE_DIR, SCRIPTS_DIR
+
+CGROUP_ROOT = "/sys/fs/cgroup"
+SWEEP_CGROUP = "memory_sweep"
+OUTPUT_DIR = f"{RESULTS_ROOT}/memory_sweep"
+
+DEFAULT_RESOLUTION_MB = 256
+DEFAULT_COLLAPSE_FACTOR = 5.0
+DEFAULT_LOWER_FRACTION = 0.05
+
+# run/prepare are shell templates with the fields {dataset}, {algo}, {budget_mb},
+# {app_budget_mb}, {app_budget_bytes} and the path roots ROOT_FIELDS; the app budget is the part of the limit
+# handed to the system (the rest is left for its runtime structures and page cache).
+ROOT_FIELDS = {'dataset_dir': DATASET_DIR, 'systems_dir': SYSTEMS_DIR, 'extra_space_dir': EXTRA_SPACE_DIR,
+               'scripts_dir': SCRIPTS_DIR}
+
+PRESETS = {
+    'graphchi': {
+        'cwd': f"{SYSTEMS_DIR}/ooc/graphchi-cpp/bin/example_apps",
+        'prepare': ("mkdir -p {extra_space_dir}/graphchi_datasets && "
+                    "([ -e {extra_space_dir}/graphchi_datasets/{dataset} ] || "
+                    "python3 {scripts_dir}/staging.py {dataset_dir}/{dataset}/{dataset}.e "
+                    "{extra_space_dir}/graphchi_datasets/{dataset})"),
+        'run': ("./{algo} --filetype=edgelist --file={extra_space_dir}/graphchi_datasets/{dataset} "
+                "--membudget={app_budget_mb} --cachesize=0 --niters=10"),
+        'app_fraction': 1 / 1.75,  # same headroom as graphchi_1by1.validate_memory_budget()
+        'time_regex': r"runtime:\s+(\d+\.\d+)\s+s",
+    },
+    'xstream': {
+        'cwd': None,
+        'prepare': ("mkdir -p {extra_space_dir}/xstream_datasets && "
+                    "([ -e {extra_space_dir}/xstream_datasets/{dataset}.ini ] || "
+                    "/llama/bin/snap-to-xs1 -o {extra_space_dir}/xstream_datasets/{dataset} {dataset_dir}/{dataset}/{dataset})"),
+        'run': ("/xstream/bin/benchmark_driver -p $(nproc) -b {algo} -a -g {extra_space_dir}/xstream_datasets/{dataset} "
+                "--physical_memory {app_budget_bytes}"),
+        'app_fraction': 0.75,
+        'time_regex': r"Total\s+time:\s+(\d+\.\d+)",
+    },
+}
+
+
+def _read(path):
+    with open(path, 'r') as f:
+        return f.read().strip()
+
+
+def _write(path, value):
+    with open(path, 'w') as f:
+        f.write(value)
+
+
+def prepare_cgroups(root=CGROUP_ROOT):
+    """
+    Create the parent cgroup of the sweep points with the memory controller enabled.
+
+    On cgroup v2, controllers are only delegated to children of groups without
+    member processes, so if the memory controller is not enabled yet the
+    processes of the (container's) root group are first moved into a leaf
+    group. On cgroup v1 the group is created in the memory hierarchy.
+
+    Returns:
+        str: Path of the parent cgroup
+    """
+    if not os.path.exists(os.path.join(root, 'cgroup.controllers')):
+        if not os.path.isdir(os.path.join(root, 'memory')):
+            raise RuntimeError(f"no cgroup memory controller under {root}")
+        parent = os.path.join(root, 'memory', SWEEP_CGROUP)
+        os.makedirs(parent, exist_ok=True)
+        return parent
+    if 'memory' not in _read(os.path.join(root, 'cgroup.controllers')).split():
+        raise RuntimeError(f"memory controller not available in {root}")
+
+    if 'memory' not in _read(os.path.join(root, 'cgroup.subtree_control')).split():
+        leaf = os.path.join(root, 'sweep_driver')
+        os.makedirs(leaf, exist_ok=True)
+        for pid in _read(os.path.join(root, 'cgroup.procs')).split():
+            try:
+                _write(os.path.join(leaf, 'cgroup.procs'), pid)
+            except OSError:
+                pass  # kernel threads and exited processes cannot be moved
+        _write(os.path.join(root, 'cgroup.subtree_control'), '+memory')
+
+    parent = os.path.join(root, SWEEP_CGROUP)
+    os.makedirs(parent, exist_ok=True)
+    if 'memory' not in _read(os.path.join(parent, 'cgroup.subtree_control')).split():
+        _write(os.path.join(parent, 'cgroup.subtree_control'), '+memory')
+    return parent
+
+
+def _is_v1(cgroup):
+    return os.path.exists(os.path.join(cgroup, 'memory.limit_in_bytes'))
+
+
+def _set_limit(cgroup, budget_mb):
+    limit = str(int(budget_mb * 1024 * 1024))
+    if _is_v1(cgroup):
+        _write(os.path.join(cgroup, 'memory.limit_in_bytes'), limit)
+        # memsw (memory + swap) only exists with swap accounting enabled
+        if os.path.exists(os.path.join(cgroup, 'memory.memsw.limit_in_bytes')):
+            _write(os.path.join(cgroup, 'memory.memsw.limit_in_bytes'), limit)
+        return
+    _write(os.path.join(cgroup, 'memory.max'), limit)
+    if os.path.exists(os.path.join(cgroup, 'memory.swap.max')):
+        _write(os.path.join(cgroup, 'memory.swap.max'), '0')
+
+
+def _oom_kills(cgroup):
+    events_file = 'memory.oom_control' if _is_v1(cgroup) else 'memory.events'
+    for line in _read(os.path.join(cgroup, events_file)).splitlines():
+        key, value = line.split()
+        if key == 'oom_kill':
+            return int(value)
+    return 0
+
+
+def _peak_mb(cgroup):
+    peak_file = os.path.join(cgroup, 'memory.max_usage_in_bytes' if _is_v1(cgroup) else 'memory.peak')
+    return int(_read(peak_file)) / (1024 * 1024) if os.path.exists(peak_file) else None
+
+
+def _kill_cgroup(cgroup):
+    kill_file = os.path.join(cgroup, 'cgroup.kill')
+    if os.path.exists(kill_file):
+        _write(kill_file, '1')
+        return
+    for pid in _read(os.path.join(cgroup, 'cgroup.procs')).split():
+        try:
+            os.kill(int(pid), signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+
+def run_limited(cmd, budget_mb, parent, log_file, timeout=None, cwd=None, env=None):
+    """
+    Run a shell command in a fresh child cgroup limited to budget_mb (no swap).
+
+    Returns:
+        dict: returncode, wall_s, oom (kernel OOM kills in the group), timed_out, peak_mb (None if
+              the kernel does not report it)
+    """
+    cgroup = os.path.join(parent, f"point_{os.getpid()}_{int(time.time() * 1000)}")
+    os.makedirs(cgroup)
+    _set_limit(cgroup, budget_mb)
+
+    def enter_cgroup():
+        _write(os.path.join(cgroup, 'cgroup.procs'), str(os.getpid()))
+
+    timed_out = False
+    with open(log_file, 'w') as log:
+        start = time.time()
+        process = subprocess.Popen(cmd, shell=True, cwd=cwd, env=env, stdout=log, stderr=subprocess.STDOUT,
+                                   preexec_fn=enter_cgroup)
+        try:
+            returncode = process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            timed_out = True
+            _kill_cgroup(cgroup)
+            returncode = process.wait()
+        wall_s = time.time() - start
+
+    oom_kills = _oom_kills(cgroup)
+    peak_mb = _peak_mb(cgroup)
+    # Leftover children (daemonized helpers) would keep the group busy
+    if _read(os.path.join(cgroup, 'cgroup.procs')):
+        _kill_cgroup(cgroup)
+        time.sleep(0.5)
+    try:
+        os.rmdir(cgroup)
+    except OSError as e:
+        print(f"Warning: could not remove cgroup {cgroup}: {e}")
+    return {'returncode': returncode, 'wall_s': wall_s, 'oom': oom_kills > 0, 'timed_out': timed_out,
+            'peak_mb': peak_mb}
+
+
+class Sweep:
+    """
+    Bisection of the memory limit of one (system, dataset, algo).
+
+    Attributes:
+        points: Measured points (dicts with budget_mb, status, runtime_s, ...), in run order
+        baseline_s: Runtime at the upper budget
+    """
+
+    def __init__(self, system, dataset, algo, run_template, cwd=None, app_fraction=1.0, time_regex=None,
+                 collapse_factor=DEFAULT_COLLAPSE_FACTOR, timeout=None, output_dir=OUTPUT_DIR):
+        self.system = system
+        self.dataset = dataset
+        self.algo = algo
+        self.run_template = run_template
+        self.cwd = cwd
+        self.app_fraction = app_fraction
+        self.time_regex = re.compile(time_regex) if time_regex else None
+        self.collapse_factor = collapse_factor
+        self.timeout = timeout
+        self.out_dir = os.path.join(output_dir, system)
+        self.points = []
+        self.baseline_s = None
+        self.parent = prepare_cgroups()
+        os.makedirs(os.path.join(self.out_dir, 'logs'), exist_ok=True)
+
+    @property
+    def name(self):
+        return f"{self.dataset}_{self.algo}"
+
+    def command(self, template, budget_mb):
+        app_budget_mb = int(budget_mb * self.app_fraction)
+        return template.format(**ROOT_FIELDS, dataset=self.dataset, algo=self.algo, budget_mb=int(budget_mb),
+                               app_budget_mb=app_budget_mb, app_budget_bytes=app_budget_mb * 1024 * 1024)
+
+    def _runtime(self, log_file, wall_s):
+        if self.time_regex is None:
+            return wall_s
+        with open(log_file, 'r', errors='replace') as f:
+            matches = self.time_regex.findall(f.read())
+        return float(matches[-1]) if matches else wall_s
+
+    def measure(self, budget_mb):
+        """
+        Run one point and classify it.
+
+        Returns:
+            dict: The recorded point; status is ok, oom, error, timeout or collapsed
+        """
+        log_file = os.path.join(self.out_dir, 'logs', f"{self.name}_{int(budget_mb)}mb.log")
+        # Once the baseline is known, points far beyond the collapse threshold are cut short
+        timeout = self.timeout
+        cut_short = False
+        if self.baseline_s is not None:
+            bound = self.collapse_factor * self.baseline_s * 1.5 + 60
+            cut_short = not timeout or bound < timeout
+            timeout = min(timeout, bound) if timeout else bound
+        result = run_limited(self.command(self.run_template, budget_mb), budget_mb, self.parent, log_file,
+                             timeout, self.cwd)
+        runtime_s = self._runtime(log_file, result['wall_s'])
+        # A timed-out point was SIGKILLed by run_limited, so -9/137 only means OOM without a timeout
+        if result['timed_out']:
+            status = 'collapsed' if cut_short else 'timeout'
+        elif result['oom'] or result['returncode'] in (-9, 137):
+            status = 'oom'
+        elif result['returncode'] != 0:
+            status = 'error'
+        elif self.baseline_s is not None and runtime_s > self.collapse_factor * self.baseline_s:
+            status = 'collapsed'
+        else:
+            status = 'ok'
+        point = {'budget_mb': int(budget_mb), 'status': status, 'runtime_s': round(runtime_s, 3),
+                 'wall_s': round(result['wall_s'], 3), 'peak_mb': result['peak_mb'],
+                 'returncode': result['returncode'], 'log': log_file}
+        self.points.append(point)
+        print(f"  {self.system} {self.name} @ {int(budget_mb)} MB: {status} ({runtime_s:.2f} s)")
+        return point
+
+    def bisect(self, lower_mb, upper_mb, resolution_mb=DEFAULT_RESOLUTION_MB):
+        """
+        Bisect between lower_mb (assumed to fail) and upper_mb (must succeed).
+
+        Returns:
+            int: Minimum viable budget found, or None if the upper budget fails
+        """
+        baseline = self.measure(upper_mb)
+        if baseline['status'] != 'ok':
+            print(f"Error: {self.system} {self.name} fails at the upper budget {upper_mb} MB ({baseline['status']})")
+            return None
+        self.baseline_s = baseline['runtime_s']
+
+        low, high = lower_mb, upper_mb
+        while high - low > resolution_mb:
+            mid = (low + high) // 2
+            if self.measure(mid)['status'] == 'ok':
+                high = mid
+            else:
+                low = mid
+        return high
+
+    def fill_curve(self, min_viable_mb, upper_mb, num_points):
+        """
+        Measure extra log-spaced budgets between the minimum viable and the upper budget.
+        """
+        measured = {p['budget_mb'] for p in self.points}
+        for budget in np.geomspace(min_viable_mb, upper_mb, num_points + 2)[1:-1]:
+            if int(budget) not in measured:
+                self.measure(int(budget))
+
+    def write_results(self, min_viable_mb):
+        """
+        Write the points as CSV plus a JSON summary and plot the curve.
+
+        Returns:
+            str: Path of the CSV file
+        """
+        points = sorted(self.points, key=lambda p: p['budget_mb'])
+        csv_file = os.path.join(self.out_dir, f"{self.name}_sweep.csv")
+        with open(csv_file, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(points[0].keys()))
+            writer.writeheader()
+            writer.writerows(points)
+        with open(os.path.join(self.out_dir, f"{self.name}_sweep.json"), 'w') as f:
+            json.dump({'system': self.system, 'dataset': self.dataset, 'algo': self.algo,
+                       'min_viable_mb': min_viable_mb, 'baseline_s': self.baseline_s,
+                       'collapse_factor': self.collapse_factor, 'points': len(points)}, f, indent=2)
+        plot_sweep(points, min_viable_mb, f"{self.system}: {self.algo} on {self.dataset}",
+                   os.path.join(self.out_dir, f"{self.name}_sweep.png"))
+        return csv_file
+
+
+def plot_sweep(points, min_viable_mb, title, output_file):
+    """
+    Plot runtime vs memory budget with the failed points and the minimum viable budget marked.
+    """
+    # Imported here: the container images do not ship matplotlib, and execution_backend imports this module
+    import matplotlib
+    matplotlib.use('Agg')  # Use non-interactive backend
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(10, 6))
+    ok = [p for p in points if p['status'] == 'ok']
+    failed = [p for p in points if p['status'] != 'ok']
+    ax.plot([p['budget_mb'] for p in ok], [p['runtime_s'] for p in ok], 'o-', color='b', label='completed')
+    if failed:
+        top = max([p['runtime_s'] for p in ok] or [1.0])
+        ax.scatter([p['budget_mb'] for p in failed], [top] * len(failed), marker='x', color='r', s=60,
+                   label='failed (' + ', '.join(sorted({p['status'] for p in failed})) + ')')
+    if min_viable_mb is not None:
+        ax.axvline(min_viable_mb, color='g', linestyle='--', label=f"minimum viable: {min_viable_mb} MB")
+    ax.set_xlabel('Memory limit (MB)')
+    ax.set_ylabel('Runtime (s)')
+    ax.set_xscale('log')
+    ax.set_title(title)
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+    fig.savefig(output_file, dpi=150)
+    plt.close(fig)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bisect the memory limit of an out-of-core run down to the OOM cliff')
+    parser.add_argument('system', help=f"system preset ({', '.join(sorted(PRESETS))}) or any name with --run")
+    parser.add_argument('dataset', help='dataset name')
+    parser.add_argument('algos', nargs='+', help='algorithms (binary or benchmark names of the system)')
+    parser.add_argument('--run', help='run command template (overrides the preset)')
+    parser.add_argument('--prepare', help='prepare command template, run once without a limit (overrides the preset)')
+    parser.add_argument('--cwd', help='working directory of the commands')
+    parser.add_argument('--app-fraction', type=float, help='fraction of the limit passed as {app_budget_mb}')
+    parser.add_argument('--time-regex', help='regex whose group 1 is the runtime in the output (default: wall time)')
+    parser.add_argument('--upper-mb', type=int, help='upper budget (default: 2x the graph size on disk)')
+    parser.add_argument('--lower-mb', type=int, help=f'lower budget (default: {DEFAULT_LOWER_FRACTION:.0%} of the upper)')
+    parser.add_argument('--resolution-mb', type=int, default=DEFAULT_RESOLUTION_MB, help='stop bisecting at this width')
+    parser.add_argument('--collapse-factor', type=float, default=DEFAULT_COLLAPSE_FACTOR,
+                        help='a point slower than this factor x the baseline counts as failed')
+    parser.add_argument('--timeout', type=float, help='per-point timeout in seconds')
+    parser.add_argument('--curve-points', type=int, default=4,
+                        help='extra budgets between the minimum viable and the upper budget')
+    parser.add_argument('--output-dir', default=OUTPUT_DIR, help='directory for CSVs, plots and logs')
+    args = parser.parse_args()
+
+    preset = PRESETS.get(args.system, {})
+    run_template = args.run or preset.get('run')
+    if run_template is None:
+        parser.error(f"no preset for {args.system}, give --run")
+    prepare_template = args.prepare or preset.get('prepare')
+    cwd = args.cwd or preset.get('cwd')
+
+    upper_mb = args.upper_mb
+    if upper_mb is None:
+        try:
+            size_mb = get_graph_size_mb(args.dataset)
+        except (FileNotFoundError, ValueError):
+            size_mb = None
+        if size_mb is None:
+            parser.error(f"no graph size for {args.dataset} in memory_estimates.json, give --upper-mb")
+        upper_mb = int(2 * size_mb)
+    lower_mb = args.lower_mb if args.lower_mb is not None else int(upper_mb * DEFAULT_LOWER_FRACTION)
+
+    summary = {}
+    for algo in args.algos:
+        print(f"\n{'=' * 80}\nSweeping {args.system} {algo} on {args.dataset}: {lower_mb}-{upper_mb} MB "
+              f"(resolution {args.resolution_mb} MB)\n{'=' * 80}")
+        sweep = Sweep(args.system, args.dataset, algo, run_template, cwd,
+                      args.app_fraction or preset.get('app_fraction', 1.0), args.time_regex or preset.get('time_regex'),
+                      args.collapse_factor, args.timeout, args.output_dir)
+        if prepare_template:
+            prepare_cmd = sweep.command(prepare_template, upper_mb)
+            print(f"Preparing: {prepare_cmd}")
+            if subprocess.run(prepare_cmd, shell=True, cwd=cwd).returncode != 0:
+                print(f"Error: prepare command failed for {algo}")
+                summary[algo] = None
+                continue
+        min_viable_mb = sweep.bisect(lower_mb, upper_mb, args.resolution_mb)
+        if min_viable_mb is not None and args.curve_points > 0:
+            sweep.fill_curve(min_viable_mb, upper_mb, args.curve_points)
+        csv_file = sweep.write_results(min_viable_mb)
+        summary[algo] = min_viable_mb
+        print(f"Minimum viable budget for {algo}: {min_viable_mb} MB, points in {csv_file}")
+
+    print(f"\n{'=' * 80}")
+    for algo, min_viable_mb in summary.items():
+        print(f"{args.system} {args.dataset} {algo}: "
+              f"{f'{min_viable_mb} MB' if min_viable_mb is not None else 'no viable budget'}")
+    return 0 if all(v is not None for v in summary.values()) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+NUMA topology discovery, placement policies and numastat counters.
+
+The launch scripts used to pin every container to the hard-coded CPU list
+of node 0 of one machine, and gemini.make_numactl_prefix() always bound to
+node 0, so behaviour across sockets was never measured. This module reads
+the topology from /sys/devices/system/node and builds the numactl prefix of
+a placement policy:
+
+    single       - CPUs and memory of one node (--cpunodebind=N --membind=N)
+    interleave   - CPUs of all nodes, pages interleaved round-robin over the
+                   nodes (--interleave=all)
+    firsttouch   - CPUs of all nodes, every page on the node of the thread
+                   that touches it first (--localalloc, the kernel default)
+    multisocket  - no numactl at all; for systems with their own NUMA-aware
+                   partitioning (Gemini detects the nodes and places its
+                   partitions itself)
+
+The per-node counters of /sys/devices/system/node/node*/numastat (what the
+numastat command prints) are snapshotted around a run; the difference gives
+the NUMA hits and misses of the run. The counters are system-wide, so they
+are only meaningful when nothing else runs on the machine.
+
+Usage:
+    python numa_topology.py                        # print the topology
+    python numa_topology.py --cpulist 0            # CPU list of node 0 (for --cpuset-cpus)
+    python numa_topology.py --prefix interleave    # numactl prefix of a policy
+"""
+
+import os
+import sys
+import argparse
+
+NODE_SYSFS = "/sys/devices/system/node"
+
+PLACEMENT_POLICIES = ['single', 'interleave', 'firsttouch', 'multisocket']
+# Counters of node*/numastat, in pages
+NUMASTAT_FIELDS = ['numa_hit', 'numa_miss', 'numa_foreign', 'interleave_hit', 'local_node', 'other_node']
+
+
+def parse_cpu_list(cpu_list):
+    """
+    Parse a kernel CPU list such as "0-47,96-143" into a sorted list of CPU ids.
+    """
+    cpus = []
+    for cpu_range in cpu_list.strip().split(','):
+        if not cpu_range:
+            continue
+        if '-' in cpu_range:
+            start, end = map(int, cpu_range.split('-'))
+            cpus.extend(range(start, end + 1))
+        else:
+            cpus.append(int(cpu_range))
+    return sorted(cpus)
+
+
+def format_cpu_list(cpus):
+    """
+    Format CPU ids as a kernel CPU list ([0, 1, 2, 5] -> "0-2,5").
+    """
+    ranges = []
+    for cpu in sorted(set(cpus)):
+        if ranges and cpu == ranges[-1][1] + 1:
+            ranges[-1][1] = cpu
+        else:
+            ranges.append([cpu, cpu])
+    return ','.join(f"{start}-{end}" if start != end else f"{start}" for start, end in ranges)
+
+
+def _node_ids(sysfs):
+    return sorted(int(name[4:]) for name in os.listdir(sysfs) if name.startswith('node') and name[4:].isdigit())
+
+
+def numa_nodes(sysfs=NODE_SYSFS):
+    """
+    Discover the NUMA nodes of the machine.
+
+    Returns:
+        dict: Node id -> {'cpus': list of CPU ids, 'mem_total_mb': int or None}; nodes without
+              CPUs (memory-only nodes) are included with an empty CPU list. Without NUMA
+              information in sysfs, all CPUs are reported as node 0.
+    """
+    if not os.path.isdir(sysfs):
+        return {0: {'cpus': list(range(os.cpu_count() or 1)), 'mem_total_mb': None}}
+    nodes = {}
+    for node in _node_ids(sysfs):
+        base = os.path.join(sysfs, f"node{node}")
+        with open(os.path.join(base, 'cpulist'), 'r') as f:
+            cpus = parse_cpu_list(f.read())
+        mem_total_mb = None
+        try:
+            with open(os.path.join(base, 'meminfo'), 'r') as f:
+                for line in f:
+                    if 'MemTotal:' in line:
+                        mem_total_mb = int(line.split()[-2]) // 1024
+        except OSError:
+            pass
+        nodes[node] = {'cpus': cpus, 'mem_total_mb': mem_total_mb}
+    return nodes
+
+
+def node_of_cpus(nodes=None):
+    """
+    Map every CPU id to its NUMA node.
+    """
+    nodes = nodes if nodes is not None else numa_nodes()
+    return {cpu: node for node, info in nodes.items() for cpu in info['cpus']}
+
+
+def numactl_prefix(policy, node=0, nodes=None):
+    """
+    numactl command prefix (with a trailing space) of a placement policy.
+
+    Args:
+        policy: One of PLACEMENT_POLICIES (None or 'multisocket' give no prefix)
+        node: Node of the 'single' policy
+        nodes: Output of numa_nodes() (discovered if None)
+
+    Returns:
+        str: Prefix to put in front of a shell command
+    """
+    if policy in (None, 'multisocket'):
+        return ""
+    nodes = nodes if nodes is not None else numa_nodes()
+    cpu_nodes = ','.join(str(n) for n, info in sorted(nodes.items()) if info['cpus'])
+    if policy == 'single':
+        if node not in nodes:
+            raise ValueError(f"NUMA node {node} does not exist (nodes: {sorted(nodes)})")
+        return f"numactl --cpunodebind={node} --membind={node} "
+    if policy == 'interleave':
+        return f"numactl --cpunodebind={cpu_nodes} --interleave=all "
+    if policy == 'firsttouch':
+        return f"numactl --cpunodebind={cpu_nodes} --localalloc "
+    raise ValueError(f"unknown placement policy {policy}, expected one of {PLACEMENT_POLICIES}")
+
+
+def read_numastat(sysfs=NODE_SYSFS):
+    """
+    Snapshot of the numastat counters of every node.
+
+    Returns:
+        dict: Node id -> {counter: pages} (empty without NUMA information in sysfs)
+    """
+    counters = {}
+    if not os.path.isdir(sysfs):
+        return counters
+    for node in _node_ids(sysfs):
+        try:
+            with open(os.path.join(sysfs, f"node{node}", 'numastat'), 'r') as f:
+                counters[node] = {name: int(value) for name, value in (line.split() for line in f if line.strip())}
+        except OSError:
+            continue
+    return counters
+
+
+def numastat_delta(before, after):
+    """
+    Counters accumulated between two snapshots, summed over the nodes.
+
+    Returns:
+        dict: NUMASTAT_FIELDS -> pages
+    """
+    total = dict.fromkeys(NUMASTAT_FIELDS, 0)
+    for node, counters in after.items():
+        for name in NUMASTAT_FIELDS:
+            total[name] += counters.get(name, 0) - before.get(node, {}).get(name, 0)
+    return total
+
+
+def format_numastat(delta):
+    """
+    Log line of a numastat difference, in the style of the MemoryCounter lines.
+    """
+    return (f"NumaCounter: {delta['numa_hit']} numa_hit, {delta['numa_miss']} numa_miss, "
+            f"{delta['local_node']} local_node, {delta['other_node']} other_node, "
+            f"{delta['interleave_hit']} interleave_hit")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Show the NUMA topology and numactl placement prefixes')
+    parser.add_argument('--cpulist', type=int, metavar='NODE', help='print the CPU list of a node')
+    parser.add_argument('--all-cpus', action='store_true', help='print the CPU list of all nodes')
+    parser.add_argument('--prefix', choices=PLACEMENT_POLICIES, help='print the numactl prefix of a policy')
+    parser.add_argument('--node', type=int, default=0, help='node of the single policy')
+    args = parser.parse_args()
+
+    nodes = numa_nodes()
+    if args.cpulist is not None:
+        if args.cpulist not in nodes:
+            print(f"NUMA node {args.cpulist} does not exist (nodes: {sorted(nodes)})", file=sys.stderr)
+            return 1
+        print(format_cpu_list(nodes[args.cpulist]['cpus']))
+        return 0
+    if args.all_cpus:
+        print(format_cpu_list([cpu for info in nodes.values() for cpu in info['cpus']]))
+        return 0
+    if args.prefix:
+        print(numactl_prefix(args.prefix, args.node, nodes).strip())
+        return 0
+
+    for node, info in sorted(nodes.items()):
+        mem = f"{info['mem_total_mb']} MB" if info['mem_total_mb'] is not None else "unknown memory"
+        print(f"node {node}: CPUs {format_cpu_list(info['cpus']) or '-'}, {mem}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+Collect per-vertex outputs of the systems and diff them against the reference.
+
+The runners only keep timings; the per-vertex results (BFS depths, PageRank
+scores, component labels) are thrown away. This module:
+
+    1. knows which flags make each system dump its per-vertex output
+       (dump_args) and where the dump ends up (find_dump),
+    2. streams a dump into a compact .npy array indexed by vertex id
+       (collect_dump), chunk by chunk, so a text dump is never held in memory,
+    3. compares the array with the reference of reference_algos.py block by
+       block over memory maps (compare_output):
+           - bfs/sssp: exact (unreached vertices normalized to -1 / inf)
+           - wcc:      exact up to a permutation of the component labels
+           - pr:       |out - ref| <= atol + rtol * |ref| after normalizing both to sum 1
+
+Supported dumps (the runners diff them when started with --validate):
+    galois:   -output -outputLocation=<dir> writes "<vertex> <value>" lines to <dir>/output
+    graphchi: vertex values are kept in <graph>.<N>B.vout (raw binary, read with a memmap);
+              graphchi.py/graphchi_1by1.py check the first completed run of each benchmark
+Systems whose upstream code has no per-vertex dump (gapbs, ligra, gemini, x-stream,
+gridgraph, lumos, blaze) are listed in UNSUPPORTED_SYSTEMS.
+
+Usage:
+    python output_validation.py galois graph500_26 bfs /extra_space/outputs/galois/graph500_26_bfs --source 1234
+"""
+
+import os
+import sys
+import glob
+import json
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from paths import EXTRA_SPACE_DIR, RESULTS_ROOT
+from reference_algos import reference_path, compute_reference
+from csr_cache import CHUNK_EDGES
+
+OUTPUT_DIR = f"{EXTRA_SPACE_DIR}/outputs"
+VALIDATION_LOG = f"{RESULTS_ROOT}/validation.jsonl"
+
+# Vertices compared per block
+COMPARE_BLOCK = 1 << 24
+
+DEFAULT_RTOL = 1e-3
+DEFAULT_ATOL = 1e-9
+
+# Algorithm names used by the runners -> reference algorithm
+ALGO_ALIASES = {
+    'bfs': 'bfs',
+    'pagerank': 'pr',
+    'pagerank-pull': 'pr',
+    'pagerank_functional': 'pr',
+    'pr': 'pr',
+    'connectedcomponents': 'wcc',
+    'cc': 'wcc',
+    'wcc': 'wcc',
+    'sssp': 'sssp',
+}
+
+# Value type of each dump (graphchi stores the vertex data type directly)
+GRAPHCHI_VOUT_DTYPES = {'pr': np.float32, 'wcc': np.uint32, 'bfs': np.uint32}
+
+UNSUPPORTED_SYSTEMS = ['gapbs', 'ligra', 'gemini', 'xstream', 'gridgraph', 'lumos', 'blaze']
+
+
+def output_dir_for(system, dataset_name, algo):
+    return os.path.join(OUTPUT_DIR, system, f"{dataset_name}_{algo}")
+
+
+def dump_args(system, out_dir):
+    """
+    Extra command-line arguments that make a system write its per-vertex output.
+
+    Args:
+        system: System name
+        out_dir: Directory the dump should be written to
+
+    Returns:
+        list: Arguments to append before the positional graph argument (empty if
+              the system dumps on its own or has no dump)
+    """
+    if system == 'galois':
+        os.makedirs(out_dir, exist_ok=True)
+        return ["-output", f"-outputLocation={out_dir}"]
+    if system in UNSUPPORTED_SYSTEMS:
+        print(f"Warning: {system} has no per-vertex output dump, its results cannot be validated")
+    return []
+
+
+def find_dump(system, location):
+    """
+    Locate the dump file of a run.
+
+    Args:
+        system: System name
+        location: galois: the -outputLocation directory; graphchi: the graph file passed with --file
+
+    Returns:
+        str: Path of the dump, or None if it was not found
+    """
+    if system == 'galois':
+        path = os.path.join(location, 'output')
+        return path if os.path.exists(path) else None
+    if system == 'graphchi':
+        matches = sorted(glob.glob(f"{location}.*B.vout"))
+        return matches[0] if matches else None
+    return None
+
+
+def _new_array(out_npy, num_vertices, dtype, fill):
+    array = np.lib.format.open_memmap(out_npy, mode='w+', dtype=dtype, shape=(num_vertices,))
+    array[:] = fill
+    return array
+
+
+def stream_text_dump(dump_file, out_npy, num_vertices, dtype, fill, chunk_lines=CHUNK_EDGES):
+    """
+    Convert a text dump ("<vertex> <value>" or one value per line) into a .npy array.
+
+    Args:
+        dump_file: Text dump written by the system
+        out_npy: Output .npy path
+        num_vertices: Length of the output array
+        dtype: dtype of the values
+        fill: Value of vertices that do not appear in the dump
+
+    Returns:
+        int: Number of dump lines read
+    """
+    array = _new_array(out_npy, num_vertices, dtype, fill)
+    lines = 0
+    reader = pd.read_csv(dump_file, sep=r'\s+', header=None, comment='#', chunksize=chunk_lines, engine='c')
+    for chunk in reader:
+        if chunk.shape[1] >= 2:
+            vertices = chunk[0].to_numpy(dtype=np.int64)
+            values = pd.to_numeric(chunk[1], errors='coerce').to_numpy(dtype=np.float64)
+        else:
+            vertices = np.arange(lines, lines + len(chunk), dtype=np.int64)
+            values = pd.to_numeric(chunk[0], errors='coerce').to_numpy(dtype=np.float64)
+        keep = vertices < num_vertices
+        array[vertices[keep]] = values[keep].astype(dtype)
+        lines += len(chunk)
+    array.flush()
+    return lines
+
+
+def copy_binary_dump(dump_file, out_npy, num_vertices, dtype, fill):
+    """
+    Copy a raw binary vertex-value file (e.g. graphchi .vout) into a .npy array.
+    """
+    raw = np.memmap(dump_file, dtype=dtype, mode='r')
+    array = _new_array(out_npy, num_vertices, dtype, fill)
+    count = min(len(raw), num_vertices)
+    for start in range(0, count, COMPARE_BLOCK):
+        end = min(start + COMPARE_BLOCK, count)
+        array[start:end] = raw[start:end]
+    array.flush()
+    return count
+
+
+def collect_dump(system, dump_file, algo, num_vertices, out_npy):
+    """
+    Turn a system's dump into a .npy array of per-vertex values.
+
+    Returns:
+        str: Path of the .npy array
+    """
+    algo = ALGO_ALIASES.get(algo, algo)
+    fill = np.nan if algo == 'pr' else -1
+    os.makedirs(os.path.dirname(out_npy) or '.', exist_ok=True)
+    if system == 'graphchi':
+        copy_binary_dump(dump_file, out_npy, num_vertices, GRAPHCHI_VOUT_DTYPES.get(algo, np.float32), fill)
+    else:
+        dtype = np.float64 if algo in ('pr', 'sssp') else np.int64
+        stream_text_dump(dump_file, out_npy, num_vertices, dtype, fill)
+    return out_npy
+
+
+def _blocks(length):
+    for start in range(0, length, COMPARE_BLOCK):
+        yield start, min(start + COMPARE_BLOCK, length)
+
+
+def _result(algo, num_vertices, mismatches, **extra):
+    result = {'algo': algo, 'num_vertices': int(num_vertices), 'mismatches': int(mismatches),
+              'mismatch_rate': mismatches / num_vertices if num_vertices else 0.0,
+              'passed': mismatches == 0}
+    result.update(extra)
+    return result
+
+
+def compare_levels(output, reference):
+    """
+    Exact comparison of BFS levels; anything outside [0, num_vertices) counts as unreached.
+    """
+    n = len(reference)
+    mismatches = 0
+    for start, end in _blocks(n):
+        out = np.asarray(output[start:end], dtype=np.int64)
+        out = np.where((out < 0) | (out >= n), -1, out)
+        mismatches += int((out != reference[start:end]).sum())
+    return _result('bfs', n, mismatches)
+
+
+def compare_distances(output, reference, rtol=1e-6):
+    """
+    SSSP distances; unreached vertices (inf, negative or >= 2^31-1 sentinels) must match.
+    """
+    n = len(reference)
+    mismatches = 0
+    for start, end in _blocks(n):
+        out = np.asarray(output[start:end], dtype=np.float64)
+        out = np.where((out < 0) | (out >= np.iinfo(np.int32).max), np.inf, out)
+        ref = np.asarray(reference[start:end], dtype=np.float64)
+        both_inf = np.isinf(out) & np.isinf(ref)
+        close = np.isclose(out, ref, rtol=rtol, atol=0.0)
+        mismatches += int((~(both_inf | close)).sum())
+    return _result('sssp', n, mismatches)
+
+
+def compare_labels(output, reference):
+    """
+    Component labels, equal up to a permutation.
+
+    Every output label is replaced by the smallest vertex id carrying it (the
+    reference already uses that canonical form), then compared exactly. Labels
+    outside [0, num_vertices) are first compacted with np.unique.
+    """
+    n = len(reference)
+    labels = np.asarray(output)
+    if len(labels) and (labels.min() < 0 or labels.max() >= n):
+        _, labels = np.unique(labels, return_inverse=True)
+    smallest = np.full(n, n, dtype=np.int64)
+    for start, end in _blocks(n):
+        np.minimum.at(smallest, np.asarray(labels[start:end], dtype=np.int64),
+                      np.arange(start, end, dtype=np.int64))
+
+    mismatches = 0
+    for start, end in _blocks(n):
+        canonical = smallest[np.asarray(labels[start:end], dtype=np.int64)]
+        mismatches += int((canonical != reference[start:end]).sum())
+    num_components = int((smallest < n).sum())
+    return _result('wcc', n, mismatches, num_components=num_components)
+
+
+def compare_scores(output, reference, rtol=DEFAULT_RTOL, atol=DEFAULT_ATOL):
+    """
+    PageRank scores with tolerance; both sides are normalized to sum 1 first since
+    the systems differ in scaling (e.g. Galois residual PR does not divide by |V|).
+    """
+    n = len(reference)
+    out_sum = 0.0
+    for start, end in _blocks(n):
+        out_sum += float(np.nansum(output[start:end]))
+    ref_sum = float(np.sum(reference))
+    out_scale = 1.0 / out_sum if out_sum else 1.0
+    ref_scale = 1.0 / ref_sum if ref_sum else 1.0
+
+    mismatches = 0
+    max_abs_error = 0.0
+    l1_error = 0.0
+    for start, end in _blocks(n):
+        out = np.asarray(output[start:end], dtype=np.float64) * out_scale
+        ref = np.asarray(reference[start:end], dtype=np.float64) * ref_scale
+        error = np.abs(out - ref)
+        bad = ~(error <= atol + rtol * np.abs(ref))  # NaN (missing vertex) counts as a mismatch
+        mismatches += int(bad.sum())
+        finite = error[np.isfinite(error)]
+        if len(finite):
+            max_abs_error = max(max_abs_error, float(finite.max()))
+            l1_error += float(finite.sum())
+    return _result('pr', n, mismatches, max_abs_error=max_abs_error, l1_error=l1_error, rtol=rtol, atol=atol)
+
+
+def compare_output(output_npy, dataset_name, algo, source=None, rtol=DEFAULT_RTOL, atol=DEFAULT_ATOL):
+    """
+    Compare a collected output array with the reference (computed if missing).
+
+    Returns:
+        dict: Comparison result with mismatches, mismatch_rate and passed
+    """
+    algo = ALGO_ALIASES.get(algo, algo)
+    ref_source = source if algo in ('bfs', 'sssp') else None
+    ref_file = reference_path(dataset_name, algo, ref_source)
+    if not os.path.exists(ref_file):
+        ref_file = compute_reference(dataset_name, algo, source)
+    reference = np.load(ref_file, mmap_mode='r')
+    output = np.load(output_npy, mmap_mode='r')
+    if len(output) != len(reference):
+        print(f"Warning: output has {len(output)} vertices, reference has {len(reference)}")
+        output = output[:len(reference)]
+
+    if algo == 'bfs':
+        result = compare_levels(output, reference)
+    elif algo == 'sssp':
+        result = compare_distances(output, reference)
+    elif algo == 'wcc':
+        result = compare_labels(output, reference)
+    elif algo == 'pr':
+        result = compare_scores(output, reference, rtol, atol)
+    else:
+        raise ValueError(f"No comparison defined for {algo}")
+    result.update({'dataset': dataset_name, 'source': source, 'output': output_npy, 'reference': ref_file})
+    return result
+
+
+def validate_run(system, dataset_name, algo, location, source=None, rtol=DEFAULT_RTOL, atol=DEFAULT_ATOL,
+                 log_file=VALIDATION_LOG):
+    """
+    Collect the dump of one run, compare it with the reference and append the result to log_file.
+
+    Args:
+        system: System name
+        dataset_name: Dataset name
+        algo: Algorithm name as used by the runner
+        location: Where the run dumped its output (see find_dump)
+        source: Source vertex for bfs/sssp
+
+    Returns:
+        dict: Comparison result, or None if no dump was found
+    """
+    dump_file = find_dump(system, location)
+    if dump_file is None:
+        print(f"Warning: no {system} output dump found at {location}")
+        return None
+    ref_algo = ALGO_ALIASES.get(algo, algo)
+    ref_file = reference_path(dataset_name, ref_algo, source if ref_algo in ('bfs', 'sssp') else None)
+    if not os.path.exists(ref_file):
+        ref_file = compute_reference(dataset_name, ref_algo, source)
+    num_vertices = len(np.load(ref_file, mmap_mode='r'))
+
+    out_npy = os.path.join(output_dir_for(system, dataset_name, algo), 'output.npy')
+    collect_dump(system, dump_file, algo, num_vertices, out_npy)
+    result = compare_output(out_npy, dataset_name, algo, source, rtol, atol)
+    result['system'] = system
+
+    status = "PASS" if result['passed'] else "FAIL"
+    print(f"Validation {status}: {system} {algo} on {dataset_name}: "
+          f"{result['mismatches']}/{result['num_vertices']} mismatches ({result['mismatch_rate']:.4%})")
+    if log_file:
+        os.makedirs(os.path.dirname(log_file), exist_ok=True)
+        with open(log_file, 'a') as f:
+            f.write(json.dumps(result) + "\n")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Validate a system output dump against the reference')
+    parser.add_argument('system', help='system that produced the dump (galois, graphchi)')
+    parser.add_argument('dataset', help='dataset name (directory under /datasets)')
+    parser.add_argument('algo', help='algorithm (bfs, pagerank, connectedcomponents, sssp, ...)')
+    parser.add_argument('location', help='galois: -outputLocation directory; graphchi: graph file of the run')
+    parser.add_argument('--source', type=int, help='source vertex for bfs/sssp')
+    parser.add_argument('--rtol', type=float, default=DEFAULT_RTOL, help='relative tolerance for pagerank')
+    parser.add_argument('--atol', type=float, default=DEFAULT_ATOL, help='absolute tolerance for pagerank')
+    parser.add_argument('--log', default=VALIDATION_LOG, help='append the result to this .jsonl file')
+    args = parser.parse_args()
+
+    result = validate_run(args.system, args.dataset, args.algo, args.location, args.source,
+                          args.rtol, args.atol, args.log)
+    if result is None:
+        return 2
+    return 0 if result['passed'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -7,10 +7,15 @@ Usage:
 """
 
 import os
+import re
 import csv
 import argparse
 from pathlib import Path
 
+# Suffix of the results of a non-default NUMA placement policy (gemini.py --numa)
+NUMA_SUFFIX = re.compile(r"_numa-(?P<policy>[a-z]+)$")
+DEFAULT_NUMA_POLICY = 'single'
+
 
 def parse_csv_file(csv_path):
     """
@@ -19,6 +24,7 @@ def parse_csv_file(csv_path):
     Returns a dict with the following keys:
         - dataset: dataset name
         - algo: algorithm name
+        - numa: NUMA placement policy of the runs
         - avg_time: average execution time (seconds)
         - pre_processing_time: graph conversion + loading time (seconds)
         - memory_used: total memory used (MB)
@@ -28,7 +34,7 @@ def parse_csv_file(csv_path):
         - block_out: block output operations
     """
     # Extract dataset and algorithm from filename
-    # Format: <dataset>_<algo>.csv
+    # Format: <dataset>_<algo>[_numa-<policy>].csv
     # Examples:
     #   graph500_26_pagerank.csv -> graph500_26, pagerank
     #   graph500_26_bfs.csv -> graph500_26, bfs
@@ -36,8 +42,8 @@ def parse_csv_file(csv_path):
     #   graph500_26_sssp.csv -> graph500_26, sssp
     filename = os.path.basename(csv_path)
 
-    # Skip gemini_runs.csv (summary file with different format)
-    if filename == 'gemini_runs.csv':
+    # Skip gemini_runs[_numa-<policy>].csv (summary files with a different format)
+    if filename.startswith('gemini_runs'):
         return None
 
     # Skip non-matching files
@@ -47,6 +53,12 @@ def parse_csv_file(csv_path):
     # Remove .csv suffix
     name_part = filename[:-4]
 
+    numa = DEFAULT_NUMA_POLICY
+    numa_match = NUMA_SUFFIX.search(name_part)
+    if numa_match:
+        numa = numa_match.group('policy')
+        name_part = name_part[:numa_match.start()]
+
     # Split to get dataset and algorithm
     # Algorithm is the last part, dataset is everything before
     parts = name_part.rsplit('_', 1)
@@ -97,6 +109,7 @@ def parse_csv_file(csv_path):
     result = {
         'dataset': dataset,
         'algo': algo,
+        'numa': numa,
         'avg_time': algo_time,
         'pre_processing_time': pp_time,
         'memory_used': memory,
@@ -157,6 +170,7 @@ def main():
     fieldnames = [
         'dataset',
         'algo',
+        'numa',
         'avg_time',
         'pre_processing_time',
         'memory_used',
@@ -0,0 +1,81 @@
+"""
+Path roots of the benchmark layout.
+
+The containers bind-mount the datasets, systems, results, scratch space and
+scripts at fixed paths (/datasets, /systems, /results, /extra_space,
+/scripts). Every module takes its paths from the roots defined here, so the
+same scripts can run outside a container (execution_backend.LocalBackend)
+against any directory layout, e.g. a handful of small graphs on a dev box.
+
+The roots default to the container mounts and are overridden, in order of
+precedence, by
+
+    environment variables  BENCH_DATASET_DIR, BENCH_SYSTEMS_DIR, BENCH_RESULTS_DIR,
+                           BENCH_EXTRA_SPACE_DIR, BENCH_SCRIPTS_DIR
+    a JSON config file     named by BENCH_PATHS_CONFIG, with any of the keys of
+                           DEFAULT_ROOTS, e.g. {"datasets": "/home/me/graphs"}
+
+Roots are resolved once at import; child processes get them through
+roots_env().
+"""
+
+import os
+import json
+
+DEFAULT_ROOTS = {
+    'datasets': "/datasets",
+    'systems': "/systems",
+    'results': "/results",
+    'extra_space': "/extra_space",
+    'scripts': "/scripts",
+}
+ENV_VARS = {
+    'datasets': "BENCH_DATASET_DIR",
+    'systems': "BENCH_SYSTEMS_DIR",
+    'results': "BENCH_RESULTS_DIR",
+    'extra_space': "BENCH_EXTRA_SPACE_DIR",
+    'scripts': "BENCH_SCRIPTS_DIR",
+}
+CONFIG_ENV_VAR = "BENCH_PATHS_CONFIG"
+
+
+def load_roots(config_file=None, environ=None):
+    """
+    Resolve the path roots from the defaults, a config file and the environment.
+
+    Args:
+        config_file: JSON config file (default: the file named by BENCH_PATHS_CONFIG, if any)
+        environ: Environment to read (default: os.environ)
+
+    Returns:
+        dict: Root name (keys of DEFAULT_ROOTS) -> absolute path
+    """
+    environ = os.environ if environ is None else environ
+    roots = dict(DEFAULT_ROOTS)
+    config_file = config_file or environ.get(CONFIG_ENV_VAR)
+    if config_file:
+        with open(config_file, 'r') as f:
+            config = json.load(f)
+        unknown = set(config) - set(DEFAULT_ROOTS)
+        if unknown:
+            raise ValueError(f"unknown path roots in {config_file}: {', '.join(sorted(unknown))}")
+        roots.update(config)
+    for name, var in ENV_VARS.items():
+        if environ.get(var):
+            roots[name] = environ[var]
+    return {name: os.path.abspath(os.path.expanduser(path)) for name, path in roots.items()}
+
+
+def roots_env(roots):
+    """
+    Environment variables that hand a set of roots to a child process.
+    """
+    return {ENV_VARS[name]: path for name, path in roots.items()}
+
+
+ROOTS = load_roots()
+DATASET_DIR = ROOTS['datasets']
+SYSTEMS_DIR = ROOTS['systems']
+RESULTS_ROOT = ROOTS['results']
+EXTRA_SPACE_DIR = ROOTS['extra_space']
+SCRIPTS_DIR = ROOTS['scripts']
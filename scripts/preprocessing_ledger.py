@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+One ledger for the conversion and preprocessing steps of every system.
+
+The runners measured their conversions in different ways: /usr/bin/time -p
+"real" (Galois), its "user" time (Blaze), time.perf_counter() around a shell
+(Ligra), the tool's own log lines (Gemini "time=", X-Stream "Elapsed time")
+or a wall clock around os.system (GridGraph). run_step() runs every
+conversion command the same way and appends one record to
+<results>/preprocessing_ledger.jsonl with:
+
+    wall_s, user_s, sys_s     - wall clock and CPU times of the command and all
+                                of its descendants (wait4 rusage)
+    max_rss_mb                - peak RSS of the largest process of the command
+    read_bytes, write_bytes   - bytes read / written through syscalls (rchar, wchar)
+    disk_read_bytes,          - bytes that reached the block devices
+    disk_write_bytes            (read_bytes, write_bytes of /proc/<pid>/io)
+
+The I/O counters are read from /proc/<pid>/io of the exited, not yet reaped
+command, which includes the counters of its reaped descendants.
+
+Every step names the artifact it produces and the artifacts it reads, which
+makes the ledger a DAG per dataset, rooted at the raw edge list:
+
+    edgelist -> galois.gr -> galois.sgr / galois.tgr
+                galois.gr -> blaze.index
+    edgelist -> ligra.adj, ligra.wadj, gemini.bin, xstream.xs1
+    edgelist -> gridgraph.bin -> gridgraph.grid
+
+Steps are named <system>.<artifact>. A step that only some algorithms read
+lists them in algos (e.g. galois.tgr for pr, ligra.wadj for sssp); steps
+without algos serve every algorithm. The preprocessing cost of a system on a
+dataset for an algorithm is the wall time of the steps that algorithm needs
+plus everything they depend on, with shared steps counted once, so "time to
+first result" (that cost plus the first trial) compares fairly across systems. GraphChi shards inside its
+first run and GAPBS builds its graph in memory, so they report no steps.
+
+Usage:
+    python preprocessing_ledger.py summary                # every step, per dataset
+    python preprocessing_ledger.py ttfr --systems galois blaze
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+from dataclasses import dataclass, asdict, field
+
+from paths import RESULTS_ROOT
+from dataset_properties import PropertiesReader
+
+LEDGER_PATH = f"{RESULTS_ROOT}/preprocessing_ledger.jsonl"
+# Artifact every DAG starts from; it has no step of its own
+ROOT_ARTIFACT = "edgelist"
+# Algorithm names of the results store that are not in PropertiesReader.ALGORITHM_MAPPINGS
+EXTRA_ALGO_ALIASES = {
+    'cc': 'wcc',
+    'tc': 'triangle',
+    'triangle_counting': 'triangle',
+}
+IO_FIELDS = {'rchar': 'read_bytes', 'wchar': 'write_bytes',
+             'read_bytes': 'disk_read_bytes', 'write_bytes': 'disk_write_bytes'}
+
+
+@dataclass
+class StepRecord:
+    system: str
+    dataset: str
+    step: str
+    depends_on: list
+    cmd: str
+    algos: list = None  # canonical algorithms that read the artifact, None: every algorithm
+    returncode: int = 0
+    wall_s: float = 0.0
+    user_s: float = 0.0
+    sys_s: float = 0.0
+    max_rss_mb: float = 0.0
+    read_bytes: int = 0
+    write_bytes: int = 0
+    disk_read_bytes: int = 0
+    disk_write_bytes: int = 0
+    time: str = ''
+    output: str = field(default=None, repr=False)  # captured stdout and stderr, not written to the ledger
+
+
+def _algo_aliases():
+    aliases = dict(EXTRA_ALGO_ALIASES)
+    for mapping in PropertiesReader.ALGORITHM_MAPPINGS.values():
+        for generic, name in mapping.items():
+            aliases[generic] = generic
+            if name:
+                aliases.setdefault(name.lower(), generic)
+    return aliases
+
+
+ALGO_ALIASES = _algo_aliases()
+
+
+def canonical_algo(algo):
+    """
+    Algorithm name of the properties files for a system's algorithm name (unknown names lower-cased).
+    """
+    return ALGO_ALIASES.get(algo.lower(), algo.lower())
+
+
+def _read_io(pid):
+    counters = {}
+    try:
+        with open(f"/proc/{pid}/io", 'r') as f:
+            for line in f:
+                key, value = line.split(':')
+                if key in IO_FIELDS:
+                    counters[IO_FIELDS[key]] = int(value)
+    except OSError as e:
+        print(f"Warning: could not read the I/O counters of {pid}: {e}")
+    return counters
+
+
+def run_step(system, dataset, step, cmd, depends_on=(ROOT_ARTIFACT,), algos=None, cwd=None, env=None,
+             capture=False, check=False, ledger_path=LEDGER_PATH):
+    """
+    Run one conversion step, measure it and append it to the ledger.
+
+    Args:
+        system, dataset: Runner and dataset of the step
+        step: Artifact the step produces, <system>.<artifact> (e.g. 'galois.sgr')
+        cmd: Command (shell string or argv list)
+        depends_on: Artifacts the step reads (ROOT_ARTIFACT for the raw edge list)
+        algos: Algorithms that read the artifact (names of the properties files, e.g. 'pr'); None: every algorithm
+        cwd, env: Working directory and environment of the command
+        capture: Keep stdout and stderr in the returned record (output) instead of passing them through
+        check: Raise CalledProcessError if the command fails (the step is recorded either way)
+        ledger_path: Ledger file (None: do not record)
+
+    Returns:
+        StepRecord
+    """
+    output = tempfile.TemporaryFile() if capture else None
+    start = time.perf_counter()
+    process = subprocess.Popen(cmd, shell=isinstance(cmd, str), cwd=cwd, env=env, stdout=output,
+                               stderr=subprocess.STDOUT if capture else None)
+    # Wait without reaping, so that /proc/<pid>/io still holds the totals of the command
+    os.waitid(os.P_PID, process.pid, os.WEXITED | os.WNOWAIT)
+    wall_s = time.perf_counter() - start
+    io_counters = _read_io(process.pid)
+    _, status, usage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+
+    record = StepRecord(system, dataset, step, list(depends_on), cmd if isinstance(cmd, str) else ' '.join(map(str, cmd)),
+                        algos=sorted(canonical_algo(a) for a in algos) if algos else None, returncode=process.returncode, wall_s=round(wall_s, 3), user_s=round(usage.ru_utime, 3),
+                        sys_s=round(usage.ru_stime, 3), max_rss_mb=round(usage.ru_maxrss / 1024, 1),
+                        time=time.strftime('%Y-%m-%dT%H:%M:%S'), **io_counters)
+    if output is not None:
+        output.seek(0)
+        record.output = output.read().decode(errors='replace')
+        output.close()
+    print(f"  {step} of {dataset}: {record.wall_s:.2f} s wall, {record.user_s:.2f} s user, {record.sys_s:.2f} s sys, "
+          f"{record.max_rss_mb:.0f} MB peak, {record.read_bytes / 1e9:.2f} GB read, "
+          f"{record.write_bytes / 1e9:.2f} GB written")
+    if ledger_path:
+        append_record(record, ledger_path)
+    if check and process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, cmd, record.output)
+    return record
+
+
+def append_record(record, ledger_path=LEDGER_PATH):
+    entry = asdict(record)
+    entry.pop('output')
+    os.makedirs(os.path.dirname(os.path.abspath(ledger_path)), exist_ok=True)
+    with open(ledger_path, 'a') as f:
+        f.write(json.dumps(entry) + "\n")
+
+
+def load_ledger(ledger_path=LEDGER_PATH):
+    """
+    All ledger entries, oldest first.
+    """
+    entries = []
+    if not os.path.exists(ledger_path):
+        return entries
+    with open(ledger_path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                entries.append(json.loads(line))
+    return entries
+
+
+def latest_steps(entries):
+    """
+    The last successful run of every (dataset, step).
+
+    Returns:
+        dict: (dataset, step) -> ledger entry
+    """
+    steps = {}
+    for entry in entries:
+        if entry['returncode'] == 0:
+            steps[(entry['dataset'], entry['step'])] = entry
+    return steps
+
+
+def step_closure(steps, dataset, targets):
+    """
+    Steps needed to produce some artifacts of a dataset: the targets and their transitive
+    dependencies that have a step in the ledger (the root and unknown artifacts have none).
+    """
+    needed = set()
+    pending = list(targets)
+    while pending:
+        step = pending.pop()
+        if step in needed or (dataset, step) not in steps:
+            continue
+        needed.add(step)
+        pending.extend(steps[(dataset, step)]['depends_on'])
+    return needed
+
+
+def serves(entry, algo):
+    """
+    Whether the artifact of a ledger entry is read by an algorithm (None: any algorithm).
+    """
+    return algo is None or not entry.get('algos') or canonical_algo(algo) in entry['algos']
+
+
+def preprocessing_s(steps, system, dataset, algo=None):
+    """
+    Wall time of the steps a system needs on a dataset, shared dependencies counted once.
+
+    Args:
+        steps: latest_steps() of the ledger
+        system, dataset: Runner and dataset (the system name is matched case-insensitively)
+        algo: Only count the steps this algorithm needs (None: all steps of the system)
+
+    Returns:
+        tuple: (seconds, sorted step names)
+    """
+    system = system.lower()
+    own = [step for (d, step), entry in steps.items()
+           if d == dataset and step.startswith(f"{system}.") and serves(entry, algo)]
+    needed = step_closure(steps, dataset, own)
+    return sum(steps[(dataset, step)]['wall_s'] for step in needed), sorted(needed)
+
+
+def time_to_first_result(steps, records):
+    """
+    Preprocessing time plus the time of the first trial, per (system, dataset, algo, params).
+
+    Args:
+        steps: latest_steps() of the ledger
+        records: Per-trial records (results_store)
+
+    Returns:
+        list: dicts with system, dataset, algo, params, preprocessing_s, first_trial_s, total_s and steps
+    """
+    first = {}
+    for record in records:
+        key = (record['system'], record['dataset'], record['algo'], record['params'])
+        if key not in first or record['trial'] < first[key]['trial']:
+            first[key] = record
+    rows = []
+    for (system, dataset, algo, params), record in sorted(first.items()):
+        prep_s, needed = preprocessing_s(steps, system, dataset, algo)
+        rows.append({'system': system, 'dataset': dataset, 'algo': algo, 'params': params,
+                     'preprocessing_s': prep_s, 'first_trial_s': record['time_s'],
+                     'total_s': prep_s + record['time_s'], 'steps': needed})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inspect the preprocessing ledger')
+    parser.add_argument('--ledger', default=LEDGER_PATH, help='ledger file')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    summary_parser = subparsers.add_parser('summary', help='print the latest run of every step')
+    summary_parser.add_argument('--datasets', nargs='+', help='restrict to these datasets')
+    ttfr_parser = subparsers.add_parser('ttfr', help='print the time to first result per system, dataset and algorithm')
+    ttfr_parser.add_argument('location', nargs='?', default=RESULTS_ROOT, help='results directory or .jsonl snapshot')
+    ttfr_parser.add_argument('--systems', nargs='+', help='restrict to these systems')
+    args = parser.parse_args()
+
+    steps = latest_steps(load_ledger(args.ledger))
+    if not steps:
+        print(f"No steps in {args.ledger}")
+        return 1
+    if args.command == 'summary':
+        for (dataset, step), entry in sorted(steps.items()):
+            if args.datasets and dataset not in args.datasets:
+                continue
+            print(f"{dataset:20s} {step:16s} <- {','.join(entry['depends_on']):22s} wall={entry['wall_s']:9.2f}s "
+                  f"user={entry['user_s']:9.2f}s sys={entry['sys_s']:8.2f}s rss={entry['max_rss_mb']:8.0f}MB "
+                  f"read={entry['read_bytes'] / 1e9:7.2f}GB written={entry['write_bytes'] / 1e9:7.2f}GB")
+    else:
+        from results_store import load_campaign
+        for row in time_to_first_result(steps, load_campaign(args.location, args.systems)):
+            print(f"{row['system']:10s} {row['dataset']:20s} {row['algo']:22s} {row['params']:14s} "
+                  f"preprocessing={row['preprocessing_s']:9.2f}s first_trial={row['first_trial_s']:9.4f}s "
+                  f"total={row['total_s']:9.2f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
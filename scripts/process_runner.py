@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Run a benchmark process while streaming its output.
+
+The runners used subprocess.run(..., stdout=PIPE) and decoded the whole output
+once the process exited: long runs held all of their output in memory, a
+single non-ASCII byte crashed the decode, and nothing was visible (or in the
+log) until the process was done. run_streaming() runs the process under an
+asyncio event loop instead:
+
+    - stdout and stderr are read line by line as they arrive, decoded with
+      replacement characters, and appended to the log file in arrival order
+    - every line is handed to the parsers (callables taking one line), e.g.
+      LineCollector.feed, which keeps only the regex matches the runner needs;
+      stream_parsers only receive the lines of one stream (stdout or stderr)
+    - lines matching progress_regex emit a ProgressEvent (iteration number,
+      seconds since start) to on_progress, by default printed to the console
+    - on timeout the process group gets SIGTERM, then SIGKILL if it is still
+      alive after kill_grace_s seconds
+    - an optional watchdog.Watchdog is polled while the process runs and ends it
+      the same way once it is over its time budget or stopped making progress
+
+Usage:
+    collector = LineCollector({'trial': r"^Trial\\s+Time:\\s+(\\d+\\.\\d+)"})
+    result = run_streaming(["./pr", "-f", "g.el", "-n", "5"], "pr.log", parsers=[collector.feed],
+                           progress_regex=r"^Trial\\s+Time", timeout=3600)
+    trial_times = collector.values('trial')
+"""
+
+import os
+import re
+import time
+import signal
+import asyncio
+from dataclasses import dataclass
+
+# Seconds between SIGTERM and SIGKILL on timeout
+KILL_GRACE_S = 10
+READ_CHUNK = 1 << 16
+# Longer lines are handed to the log and the parsers in pieces
+LINE_LIMIT = 1 << 20
+
+
+@dataclass
+class ProgressEvent:
+    iteration: int
+    elapsed_s: float
+    line: str
+
+
+@dataclass
+class ProcessResult:
+    returncode: int
+    wall_s: float
+    timed_out: bool = False
+    killed: bool = False  # SIGKILL was needed after SIGTERM
+    iterations: int = 0
+    reason: str = None  # 'timeout', or the watchdog's 'budget' / 'stall'
+    watchdog: dict = None  # Watchdog.summary() at the end of the run
+
+
+class LineCollector:
+    """
+    Incremental regex parser: keeps the groups of every match per field, so that a
+    run's output never has to be held in memory to be parsed.
+    """
+
+    def __init__(self, patterns):
+        """
+        Args:
+            patterns: Field name -> regex (matched with search() against every line)
+        """
+        self.patterns = {name: re.compile(regex) for name, regex in patterns.items()}
+        self.matches = {name: [] for name in patterns}
+
+    def feed(self, line):
+        for name, regex in self.patterns.items():
+            match = regex.search(line)
+            if match:
+                self.matches[name].append(match.groups())
+
+    def values(self, name, group=0, cast=float):
+        """
+        One group of every match of a field, converted with cast.
+        """
+        return [cast(groups[group]) for groups in self.matches[name]]
+
+    def last(self, name, group=0, default=0):
+        """
+        One group of the last match of a field (as a string), or default.
+        """
+        return self.matches[name][-1][group] if self.matches[name] else default
+
+
+def print_progress(event):
+    print(f"  iteration {event.iteration} after {event.elapsed_s:.1f} s", flush=True)
+
+
+def _signal_group(process, sig):
+    try:
+        os.killpg(process.pid, sig)
+    except ProcessLookupError:
+        pass
+
+
+def _emit(raw, log, parsers, progress, state):
+    line = raw.decode(errors='replace')
+    if log is not None:
+        log.write(line)
+        log.flush()
+    line = line.rstrip('\n')
+    for parser in parsers:
+        parser(line)
+    if progress is not None and progress[0].search(line):
+        state['iterations'] += 1
+        progress[1](ProgressEvent(state['iterations'], time.time() - state['start'], line))
+
+
+async def _pump(stream, log, parsers, progress, state):
+    # Chunked reads rather than readline(), which discards its buffer on over-long lines
+    pending = b''
+    while True:
+        chunk = await stream.read(READ_CHUNK)
+        if not chunk:
+            break
+        pending += chunk
+        lines = pending.split(b'\n')
+        pending = lines.pop()
+        for raw in lines:
+            _emit(raw + b'\n', log, parsers, progress, state)
+        if len(pending) >= LINE_LIMIT:
+            _emit(pending, log, parsers, progress, state)
+            pending = b''
+    if pending:
+        _emit(pending, log, parsers, progress, state)
+
+
+async def _watch(watchdog, process):
+    while process.returncode is None:
+        await asyncio.sleep(watchdog.poll_s)
+        reason = watchdog.check()
+        if reason is not None:
+            return reason
+    return None
+
+
+async def stream_process(cmd, log_file=None, parsers=(), progress_regex=None, on_progress=None, timeout=None,
+                         kill_grace_s=KILL_GRACE_S, append=False, cwd=None, env=None, watchdog=None,
+                         stream_parsers=None):
+    """
+    Coroutine of run_streaming(); use it directly to run several processes on one event loop.
+    """
+    if watchdog is not None:
+        parsers = list(parsers) + [watchdog.on_line]
+    stream_parsers = stream_parsers or {}
+    stdout_parsers = list(parsers) + list(stream_parsers.get('stdout', ()))
+    stderr_parsers = list(parsers) + list(stream_parsers.get('stderr', ()))
+    progress = None
+    if progress_regex is not None:
+        progress = (re.compile(progress_regex), on_progress or print_progress)
+    log = open(log_file, 'a' if append else 'w') if log_file else None
+    state = {'iterations': 0, 'start': time.time()}
+    # Own session, so that the signals reach the children of a shell command as well
+    kwargs = dict(stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE, cwd=cwd, env=env,
+                  start_new_session=True)
+    try:
+        if isinstance(cmd, str):
+            process = await asyncio.create_subprocess_shell(cmd, **kwargs)
+        else:
+            process = await asyncio.create_subprocess_exec(*cmd, **kwargs)
+        pumps = [asyncio.ensure_future(_pump(process.stdout, log, stdout_parsers, progress, state)),
+                 asyncio.ensure_future(_pump(process.stderr, log, stderr_parsers, progress, state))]
+
+        reason = None
+        killed = False
+        waiter = asyncio.ensure_future(process.wait())
+        watcher = None
+        if watchdog is not None:
+            watchdog.start(process.pid)
+            watcher = asyncio.ensure_future(_watch(watchdog, process))
+        done, _ = await asyncio.wait([task for task in (waiter, watcher) if task is not None], timeout=timeout,
+                                     return_when=asyncio.FIRST_COMPLETED)
+        if waiter not in done:
+            reason = watcher.result() if watcher in done else 'timeout'
+        if watcher is not None and not watcher.done():
+            watcher.cancel()
+        timed_out = reason is not None
+        if timed_out:
+            _signal_group(process, signal.SIGTERM)
+            try:
+                await asyncio.wait_for(process.wait(), kill_grace_s)
+            except asyncio.TimeoutError:
+                killed = True
+                _signal_group(process, signal.SIGKILL)
+                await process.wait()
+        if timed_out:
+            # Leftover members of the group could keep the pipes open
+            _signal_group(process, signal.SIGKILL)
+        await asyncio.gather(*pumps)
+        if timed_out and log is not None:
+            wall_s = time.time() - state['start']
+            log.write(f"\nTimed out after {wall_s:.0f} s ({reason}){' (killed)' if killed else ''}\n")
+    finally:
+        if log is not None:
+            log.close()
+    return ProcessResult(process.returncode, time.time() - state['start'], timed_out, killed, state['iterations'],
+                         reason, watchdog.summary() if watchdog is not None else None)
+
+
+def run_streaming(cmd, log_file=None, parsers=(), progress_regex=None, on_progress=None, timeout=None,
+                  kill_grace_s=KILL_GRACE_S, append=False, cwd=None, env=None, watchdog=None, stream_parsers=None):
+    """
+    Run a command, streaming stdout and stderr to a log file and to parsers as lines arrive.
+
+    Args:
+        cmd: Command (shell string or argv list)
+        log_file: Log receiving stdout and stderr, or None
+        parsers: Callables called with every output line (without the newline)
+        progress_regex: Lines matching it count as one iteration each and emit a ProgressEvent
+        on_progress: Callable receiving the ProgressEvents (default: print_progress)
+        timeout: Seconds before the process group is terminated (None: no timeout)
+        kill_grace_s: Seconds between SIGTERM and SIGKILL on timeout
+        append: Append to the log instead of truncating it
+        cwd, env: Working directory and environment of the process
+        watchdog: watchdog.Watchdog ending the process when it is over budget or hung (None: timeout only)
+        stream_parsers: Optional dict 'stdout'/'stderr' -> callables called with the lines of that stream only
+
+    Returns:
+        ProcessResult
+    """
+    return asyncio.run(stream_process(cmd, log_file, parsers, progress_regex, on_progress, timeout,
+                                      kill_grace_s, append, cwd, env, watchdog, stream_parsers))
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Vectorized reference implementations used to validate system outputs.
+
+None of the runners check what the systems compute (Galois runs with -noverify,
+the others ignore their outputs). This module computes the expected results on
+the CSR cache (csr_cache.py) with NumPy/SciPy so that system outputs can be
+diffed against them:
+
+    - bfs:      frontier-based BFS levels (-1 = unreached)
+    - pr:       power-iteration PageRank, same iteration cap and tolerance as the runners
+    - wcc:      weakly connected component labels (smallest vertex id of the component)
+    - sssp:     delta-stepping shortest path distances (inf = unreached)
+    - triangle: total triangle count with degree-ordered edge orientation
+
+Undirected datasets store every edge once, so they are symmetrized before
+running the algorithms (as the systems do with -s / .sgr).
+
+Results are stored as .npy files under REFERENCE_DIR/<dataset>/.
+
+Usage:
+    python reference_algos.py graph500_26 bfs --source 1234
+    python reference_algos.py graph500_26 pr
+"""
+
+import os
+import sys
+import time
+import json
+import argparse
+
+import numpy as np
+from scipy.sparse import csr_matrix, triu
+from scipy.sparse.csgraph import connected_components
+
+from paths import EXTRA_SPACE_DIR
+from csr_cache import CSRGraph, load_csr, bfs_levels, gather_neighbors, DATASET_DIR
+from dataset_properties import PropertiesReader
+
+REFERENCE_DIR = f"{EXTRA_SPACE_DIR}/reference"
+
+# Same settings as the runners (gemini.py PR_MAX_ITERS, Galois -tolerance=0.0001)
+PR_MAX_ITERS = 20
+PR_TOLERANCE = 0.0001
+PR_DAMPING = 0.85
+
+# Rows of the oriented adjacency matrix processed per block when counting triangles
+TC_BLOCK_ROWS = 1 << 20
+
+
+def symmetrize(graph):
+    """
+    Return the undirected version of graph (both edge directions, duplicates removed).
+    """
+    matrix = graph.to_scipy()
+    sym = matrix.maximum(matrix.T).tocsr()
+    sym.sort_indices()
+    weights = sym.data.astype(np.float32) if graph.weights is not None else None
+    return CSRGraph(sym.indptr.astype(np.int64), sym.indices, weights)
+
+
+def load_reference_graph(dataset_name, dataset_dir=DATASET_DIR):
+    """
+    Load the CSR of a dataset, symmetrized if its properties say it is undirected.
+    """
+    graph = load_csr(dataset_name)
+    props = PropertiesReader(dataset_name, f"{dataset_dir}/{dataset_name}")
+    if props.read() is not None and not props.is_directed():
+        graph = symmetrize(graph)
+    return graph
+
+
+def bfs(graph, source):
+    """
+    BFS levels from source (see csr_cache.bfs_levels).
+    """
+    return bfs_levels(graph, source)
+
+
+def pagerank(graph, max_iters=PR_MAX_ITERS, tolerance=PR_TOLERANCE, damping=PR_DAMPING):
+    """
+    Power-iteration PageRank with uniform redistribution of dangling mass.
+
+    Stops after max_iters iterations or when the L1 change drops below tolerance.
+
+    Returns:
+        tuple: (scores normalized to sum 1 as float64 array, iterations run)
+    """
+    n = graph.num_vertices
+    out_degrees = np.asarray(graph.out_degrees(), dtype=np.float64)
+    dangling = out_degrees == 0
+    inv_degrees = np.zeros(n)
+    inv_degrees[~dangling] = 1.0 / out_degrees[~dangling]
+    matrix_t = csr_matrix((np.ones(graph.num_edges, dtype=np.float32), graph.indices, graph.indptr),
+                          shape=(n, n)).T
+
+    scores = np.full(n, 1.0 / n)
+    iterations = 0
+    for iterations in range(1, max_iters + 1):
+        contributions = matrix_t @ (scores * inv_degrees)
+        new_scores = (1.0 - damping) / n + damping * (contributions + scores[dangling].sum() / n)
+        delta = np.abs(new_scores - scores).sum()
+        scores = new_scores
+        if delta < tolerance:
+            break
+    return scores / scores.sum(), iterations
+
+
+def wcc(graph):
+    """
+    Weakly connected components.
+
+    Returns:
+        numpy.ndarray: int64 label per vertex, the smallest vertex id of its component
+    """
+    num_components, labels = connected_components(graph.to_scipy(), directed=True, connection='weak')
+    smallest = np.full(num_components, graph.num_vertices, dtype=np.int64)
+    np.minimum.at(smallest, labels, np.arange(graph.num_vertices, dtype=np.int64))
+    return smallest[labels]
+
+
+def sssp(graph, source, delta=None):
+    """
+    Delta-stepping single-source shortest paths (unit weights if unweighted).
+
+    Args:
+        graph: CSRGraph
+        source: Source vertex id
+        delta: Bucket width (default: mean edge weight)
+
+    Returns:
+        numpy.ndarray: float64 distance per vertex, inf for unreached vertices
+    """
+    n = graph.num_vertices
+    weights = np.asarray(graph.weights, dtype=np.float64) if graph.weights is not None else None
+    if delta is None:
+        delta = float(weights.mean()) if weights is not None and len(weights) else 1.0
+
+    dist = np.full(n, np.inf)
+    dist[source] = 0.0
+    settled = np.zeros(n, dtype=bool)
+
+    def relax(frontier, light):
+        positions = gather_neighbors(graph.indptr, graph.indices, frontier)
+        if len(positions) == 0:
+            return np.zeros(0, dtype=np.int64)
+        edge_weights = weights[positions] if weights is not None else np.ones(len(positions))
+        keep = edge_weights <= delta if light else edge_weights > delta
+        sources = np.repeat(frontier, np.asarray(graph.indptr[frontier + 1] - graph.indptr[frontier]))[keep]
+        targets = np.asarray(graph.indices[positions[keep]], dtype=np.int64)
+        candidates = dist[sources] + edge_weights[keep]
+        improved = candidates < dist[targets]
+        targets, candidates = targets[improved], candidates[improved]
+        if len(targets) == 0:
+            return targets
+        before = dist[targets].copy()
+        np.minimum.at(dist, targets, candidates)
+        return np.unique(targets[dist[targets] < before])
+
+    while True:
+        pending = np.flatnonzero(~settled & np.isfinite(dist))
+        if len(pending) == 0:
+            break
+        bucket_index = np.floor(dist[pending] / delta).min()
+        upper = (bucket_index + 1) * delta
+        frontier = pending[dist[pending] < upper]
+        bucket_members = [frontier]
+        # Light edges can put vertices back into the current bucket
+        while len(frontier):
+            changed = relax(frontier, light=True)
+            frontier = changed[dist[changed] < upper]
+            bucket_members.append(frontier)
+        members = np.unique(np.concatenate(bucket_members))
+        members = members[dist[members] < upper]
+        relax(members, light=False)
+        settled[members] = True
+    return dist
+
+
+def triangle_count(graph, block_rows=TC_BLOCK_ROWS):
+    """
+    Count triangles of the undirected graph with degree-ordered orientation.
+
+    Every edge is oriented from the endpoint with the lower (degree, id) to the
+    higher one, which bounds out-degrees and counts each triangle exactly once.
+
+    Returns:
+        int: Number of triangles
+    """
+    matrix = graph.to_scipy()
+    matrix = matrix.maximum(matrix.T).tocsr()
+    matrix.setdiag(0)
+    matrix.eliminate_zeros()
+    n = graph.num_vertices
+    degrees = np.diff(matrix.indptr)
+    # rank[v] = position of v in (degree, id) order; orientation goes to higher rank
+    rank = np.empty(n, dtype=np.int64)
+    rank[np.lexsort((np.arange(n), degrees))] = np.arange(n)
+    coo = matrix.tocoo()
+    keep = rank[coo.row] < rank[coo.col]
+    oriented = csr_matrix((np.ones(int(keep.sum()), dtype=np.int64), (rank[coo.row[keep]], rank[coo.col[keep]])),
+                          shape=(n, n))
+    oriented = triu(oriented, k=1, format='csr')
+
+    total = 0
+    for start in range(0, n, block_rows):
+        block = oriented[start:start + block_rows]
+        # wedges u->v->w closed by an edge u->w
+        total += int((block @ oriented).multiply(block).sum())
+    return total
+
+
+def reference_path(dataset_name, algo, source=None):
+    suffix = f"_{source}" if source is not None else ""
+    return os.path.join(REFERENCE_DIR, dataset_name, f"{algo}{suffix}.npy")
+
+
+def compute_reference(dataset_name, algo, source=None, graph=None):
+    """
+    Compute and store the reference result of one algorithm on one dataset.
+
+    Args:
+        dataset_name: Dataset name
+        algo: One of 'bfs', 'pr', 'wcc', 'sssp', 'triangle'
+        source: Source vertex for bfs/sssp (default: the properties file's bfs source)
+        graph: Optional already-loaded reference graph
+
+    Returns:
+        str: Path of the stored .npy result
+    """
+    if graph is None:
+        graph = load_reference_graph(dataset_name)
+    if algo in ('bfs', 'sssp') and source is None:
+        source = PropertiesReader(dataset_name, f"{DATASET_DIR}/{dataset_name}").get_source_vertex()
+        if source is None:
+            raise ValueError(f"No source vertex given or found in the properties of {dataset_name}")
+    if source is not None:
+        source = int(source)
+
+    start = time.perf_counter()
+    info = {}
+    if algo == 'bfs':
+        result = bfs(graph, source)
+    elif algo == 'pr':
+        result, info['iterations'] = pagerank(graph)
+    elif algo == 'wcc':
+        result = wcc(graph)
+    elif algo == 'sssp':
+        result = sssp(graph, source)
+    elif algo == 'triangle':
+        result = np.array([triangle_count(graph)], dtype=np.int64)
+    else:
+        raise ValueError(f"Unknown algorithm: {algo}")
+    elapsed = time.perf_counter() - start
+
+    path = reference_path(dataset_name, algo, source if algo in ('bfs', 'sssp') else None)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    np.save(path, result)
+    info.update({'dataset': dataset_name, 'algo': algo, 'source': source, 'seconds': round(elapsed, 3),
+                 'num_vertices': graph.num_vertices, 'num_edges': graph.num_edges})
+    with open(path[:-4] + '.json', 'w') as f:
+        json.dump(info, f, indent=2)
+    print(f"Reference {algo} for {dataset_name} computed in {elapsed:.2f}s -> {path}")
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compute reference results for output validation')
+    parser.add_argument('dataset', help='dataset name (directory under /datasets)')
+    parser.add_argument('algos', nargs='+', choices=['bfs', 'pr', 'wcc', 'sssp', 'triangle'],
+                        help='algorithms to compute')
+    parser.add_argument('--source', type=int, help='source vertex for bfs/sssp (default: from properties)')
+    args = parser.parse_args()
+
+    graph = load_reference_graph(args.dataset)
+    for algo in args.algos:
+        compute_reference(args.dataset, algo, args.source, graph)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,480 @@
+#!/usr/bin/env python3
+"""
+Generate a self-contained HTML explorer for a benchmark campaign.
+
+Instead of opening the CSVs and logs under /results/<system> and the PNGs of
+the plotting scripts one by one, this writes a single HTML file that needs no
+server and no external scripts. The data is pre-aggregated here and embedded
+as gzip-compressed, base64-encoded JSON panels:
+
+    summary    - one row per (system, dataset, algo, params): trial count and
+                 median/min/max of time, memory, page faults and block I/O
+    trials     - every per-trial record (results_store.py)
+    traces     - index of the iostat logs found under the results root
+    trace-<n>  - read/write bandwidth of one iostat log and device, downsampled
+                 with LTTB (batch_plots.py)
+
+The page decompresses a panel (DecompressionStream) the first time it is
+shown, so opening the report only decodes the summary even for campaigns with
+thousands of trials and iostat traces. The summary table and the bar chart
+(systems side by side per dataset and algorithm) can be filtered by system,
+dataset and algorithm; clicking a summary row drills down to its trials and
+to the iostat traces of the matching benchmark.
+
+Usage:
+    python results_explorer.py --results-dir /results --output /results/report.html --device nvme0n1
+    python results_explorer.py --results-dir /results/campaigns/2026-10.jsonl --output report.html
+"""
+
+import os
+import sys
+import gzip
+import glob
+import html
+import json
+import math
+import base64
+import argparse
+import statistics
+from datetime import datetime
+
+from results_store import RESULTS_ROOT, COUNTER_FIELDS, load_campaign
+from iostat_utils import read_iostat, device_series
+from batch_plots import lttb
+
+DEFAULT_MAX_POINTS = 1000
+
+# (record field, label) of the metrics shown in the summary and the chart
+METRICS = [('time_s', 'Time (s)'), ('mem_mb', 'Memory (MB)'), ('major_faults', 'Major faults'),
+           ('minor_faults', 'Minor faults'), ('block_input', 'Block input ops'),
+           ('block_output', 'Block output ops')]
+
+TRIAL_COLUMNS = ['system', 'dataset', 'algo', 'params', 'trial', 'time_s', 'mem_mb'] + COUNTER_FIELDS + ['source']
+
+
+def _json_safe(value):
+    """
+    Replace NaN and infinities (e.g. "nan" read from a CSV through float()) by None, recursively.
+    """
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: _json_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(item) for item in value]
+    return value
+
+
+def encode_panel(data):
+    """
+    Serialize a panel to base64 of gzip-compressed JSON (NaN and infinities become null).
+    """
+    raw = json.dumps(_json_safe(data), separators=(',', ':'), allow_nan=False).encode()
+    return base64.b64encode(gzip.compress(raw, compresslevel=9)).decode('ascii')
+
+
+def _round(value, digits=4):
+    return None if value is None else round(value, digits)
+
+
+def summarize(records):
+    """
+    Aggregate the per-trial records by (system, dataset, algo, params).
+
+    Returns:
+        list: One dict per group with n and <metric>_median/_min/_max for every metric in METRICS
+    """
+    groups = {}
+    for record in records:
+        key = (record['system'], record['dataset'], record['algo'], record['params'])
+        groups.setdefault(key, []).append(record)
+
+    summary = []
+    for (system, dataset, algo, params), trials in sorted(groups.items()):
+        row = {'system': system, 'dataset': dataset, 'algo': algo, 'params': params, 'n': len(trials)}
+        for field, _ in METRICS:
+            values = [t[field] for t in trials if t.get(field) is not None]
+            row[f"{field}_median"] = _round(statistics.median(values)) if values else None
+            row[f"{field}_min"] = _round(min(values)) if values else None
+            row[f"{field}_max"] = _round(max(values)) if values else None
+        summary.append(row)
+    return summary
+
+
+def collect_traces(results_dir, device, systems=None, pattern='*_iostat.log', max_points=DEFAULT_MAX_POINTS):
+    """
+    Load and downsample the iostat logs under a results root.
+
+    Returns:
+        list: One dict per log with system, name, benchmark, seconds and t/read/write lists
+    """
+    traces = []
+    if not os.path.isdir(results_dir):
+        return traces
+    for system in sorted(os.listdir(results_dir)):
+        if not os.path.isdir(os.path.join(results_dir, system)) or (systems and system not in systems):
+            continue
+        for iostat_file in sorted(glob.glob(os.path.join(results_dir, system, pattern))):
+            try:
+                frame = device_series(read_iostat(iostat_file), device)
+            except (IOError, UnicodeDecodeError) as e:
+                print(f"Warning: could not read {iostat_file}: {e}")
+                continue
+            if frame.empty:
+                continue
+            seconds = frame['timestamp'].to_numpy()
+            t, read = lttb(seconds, frame['read_mb_s'].to_numpy(), max_points)
+            t_write, write = lttb(seconds, frame['write_mb_s'].to_numpy(), max_points)
+            name = os.path.basename(iostat_file)[:-len('.log')]
+            traces.append({'system': system, 'name': name, 'benchmark': name.split('_iter')[0],
+                           'seconds': int(seconds.max() - seconds.min() + 1),
+                           'read_mb': round(float(frame['read_mb_s'].sum()), 1),
+                           'write_mb': round(float(frame['write_mb_s'].sum()), 1),
+                           't': [int(v) for v in t], 'read': [round(float(v), 2) for v in read],
+                           't_write': [int(v) for v in t_write], 'write': [round(float(v), 2) for v in write]})
+    return traces
+
+
+def match_traces(row, traces):
+    """
+    Indices of the traces belonging to a summary row (same system, benchmark naming the dataset and algo).
+    """
+    return [i for i, trace in enumerate(traces)
+            if trace['system'] == row['system'] and trace['benchmark'].startswith(row['dataset'])
+            and row['algo'] in trace['benchmark'][len(row['dataset']):]]
+
+
+def build_panels(records, traces):
+    """
+    Build the encoded panels of the report.
+
+    Returns:
+        dict: panel id -> encoded panel
+    """
+    summary = summarize(records)
+    for row in summary:
+        row['traces'] = match_traces(row, traces)
+    trials = [[record.get(c) if c != 'source' else os.path.basename(record.get('source') or '')
+               for c in TRIAL_COLUMNS] for record in records]
+
+    panels = {
+        'summary': encode_panel({'metrics': METRICS, 'rows': summary}),
+        'trials': encode_panel({'columns': TRIAL_COLUMNS, 'rows': trials}),
+        'traces': encode_panel([{k: trace[k] for k in ('system', 'name', 'benchmark', 'seconds', 'read_mb',
+                                                       'write_mb')} for trace in traces]),
+    }
+    for i, trace in enumerate(traces):
+        panels[f"trace-{i}"] = encode_panel({k: trace[k] for k in ('system', 'name', 't', 'read', 't_write',
+                                                                  'write')})
+    return panels
+
+
+def render_html(panels, title, device):
+    """
+    Assemble the report page around the encoded panels.
+    """
+    blocks = "\n".join(f'<script type="application/octet-stream" id="panel-{panel_id}">{data}</script>'
+                       for panel_id, data in panels.items())
+    return (PAGE_TEMPLATE
+            .replace('__TITLE__', html.escape(title))
+            .replace('__SUBTITLE__', html.escape(f"generated {datetime.now():%Y-%m-%d %H:%M}, "
+                                                 f"iostat device {device or 'n/a'}"))
+            .replace('__PANELS__', blocks))
+
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>__TITLE__</title>
+<style>
+body { font-family: sans-serif; margin: 1em 2em; color: #222; }
+nav button { margin-right: 0.3em; padding: 0.3em 0.8em; }
+nav button.active { font-weight: bold; }
+.filters { margin: 0.8em 0; }
+.filters label { margin-right: 1em; }
+table { border-collapse: collapse; font-size: 0.85em; margin: 0.5em 0; }
+th, td { border: 1px solid #ccc; padding: 2px 6px; text-align: right; }
+th { background: #eee; cursor: pointer; }
+td.text { text-align: left; }
+tr.clickable:hover { background: #f4f8ff; cursor: pointer; }
+.panel { display: none; }
+.panel.active { display: block; }
+.muted { color: #777; font-size: 0.85em; }
+svg text { font-size: 11px; }
+</style>
+</head>
+<body>
+<h1>__TITLE__</h1>
+<p class="muted">__SUBTITLE__</p>
+<nav>
+<button data-tab="summary" class="active">Summary</button>
+<button data-tab="trials">Trials</button>
+<button data-tab="traces">I/O traces</button>
+</nav>
+<div class="filters">
+<label>System <select id="f-system"><option value="">all</option></select></label>
+<label>Dataset <select id="f-dataset"><option value="">all</option></select></label>
+<label>Algorithm <select id="f-algo"><option value="">all</option></select></label>
+<label>Metric <select id="f-metric"></select></label>
+<label><input type="checkbox" id="f-log"> log scale</label>
+</div>
+<div id="tab-summary" class="panel active"><div id="chart"></div><div id="summary-table"></div><div id="drilldown"></div></div>
+<div id="tab-trials" class="panel"><div id="trials-table"></div></div>
+<div id="tab-traces" class="panel"><div id="traces-table"></div><div id="trace-view"></div></div>
+__PANELS__
+<script>
+"use strict";
+const cache = {};
+const COLORS = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b', '#e377c2', '#7f7f7f', '#bcbd22', '#17becf'];
+const MAX_ROWS = 1000;
+
+async function loadPanel(id) {
+  if (!(id in cache)) {
+    const b64 = document.getElementById('panel-' + id).textContent.trim();
+    const bytes = Uint8Array.from(atob(b64), c => c.charCodeAt(0));
+    const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+    cache[id] = JSON.parse(await new Response(stream).text());
+  }
+  return cache[id];
+}
+
+function el(tag, attrs, text) {
+  const node = document.createElement(tag);
+  for (const [k, v] of Object.entries(attrs || {})) node.setAttribute(k, v);
+  if (text !== undefined) node.textContent = text;
+  return node;
+}
+
+function svgEl(tag, attrs, text) {
+  const node = document.createElementNS('http://www.w3.org/2000/svg', tag);
+  for (const [k, v] of Object.entries(attrs || {})) node.setAttribute(k, v);
+  if (text !== undefined) node.textContent = text;
+  return node;
+}
+
+function fmt(v) {
+  if (v === null || v === undefined) return '';
+  if (typeof v !== 'number') return String(v);
+  return Number.isInteger(v) ? String(v) : v.toPrecision(4);
+}
+
+function filters() {
+  return {system: document.getElementById('f-system').value, dataset: document.getElementById('f-dataset').value,
+          algo: document.getElementById('f-algo').value};
+}
+
+function matches(row, f) {
+  return (!f.system || row.system === f.system) && (!f.dataset || row.dataset === f.dataset) &&
+         (!f.algo || row.algo === f.algo);
+}
+
+// Table with click-to-sort headers; rows are arrays, onRow(index) is called on click
+function table(container, columns, rows, onRow) {
+  let sortCol = -1, ascending = true;
+  function draw() {
+    container.textContent = '';
+    const t = el('table'), head = el('tr');
+    columns.forEach((c, i) => {
+      const th = el('th', {}, c + (i === sortCol ? (ascending ? ' \\u25b2' : ' \\u25bc') : ''));
+      th.onclick = () => { ascending = sortCol === i ? !ascending : true; sortCol = i; draw(); };
+      head.appendChild(th);
+    });
+    t.appendChild(head);
+    const order = rows.map((_, i) => i);
+    if (sortCol >= 0) order.sort((a, b) => {
+      const x = rows[a][sortCol], y = rows[b][sortCol];
+      if (x === y) return 0;
+      if (x === null || x === undefined) return 1;
+      if (y === null || y === undefined) return -1;
+      return (x < y ? -1 : 1) * (ascending ? 1 : -1);
+    });
+    for (const i of order.slice(0, MAX_ROWS)) {
+      const tr = el('tr', onRow ? {class: 'clickable'} : {});
+      rows[i].forEach(v => tr.appendChild(el('td', typeof v === 'number' ? {} : {class: 'text'}, fmt(v))));
+      if (onRow) tr.onclick = () => onRow(i);
+      t.appendChild(tr);
+    }
+    container.appendChild(t);
+    if (rows.length > MAX_ROWS) container.appendChild(el('p', {class: 'muted'}, `showing ${MAX_ROWS} of ${rows.length} rows, narrow the filters to see more`));
+  }
+  draw();
+}
+
+// Grouped bar chart: one group per (dataset, algo, params), one bar per system
+function barChart(container, rows, metric, label, logScale) {
+  container.textContent = '';
+  const data = rows.filter(r => r[metric + '_median'] !== null && (!logScale || r[metric + '_median'] > 0));
+  if (!data.length) { container.appendChild(el('p', {class: 'muted'}, 'no data for ' + label)); return; }
+  const systems = [...new Set(data.map(r => r.system))].sort();
+  const groups = [...new Set(data.map(r => [r.dataset, r.algo, r.params].filter(Boolean).join(' / ')))];
+  const barW = 12, gap = 16, left = 70, top = 20, h = 260;
+  const groupW = systems.length * barW + gap;
+  const width = left + groups.length * groupW + 20, height = top + h + 130;
+  const maxV = Math.max(...data.map(r => r[metric + '_max'] ?? r[metric + '_median']));
+  const minV = logScale ? Math.min(...data.map(r => r[metric + '_min'] || r[metric + '_median'])) : 0;
+  const scale = v => logScale ? (Math.log10(Math.max(v, minV)) - Math.log10(minV)) / Math.max(Math.log10(maxV) - Math.log10(minV), 1e-9)
+                              : v / maxV;
+  const y = v => top + h - h * scale(v);
+  const svg = svgEl('svg', {width, height});
+  svg.appendChild(svgEl('text', {x: 5, y: 12}, label + ' (median, whiskers min-max)'));
+  for (let k = 0; k <= 4; k++) {
+    const v = logScale ? Math.pow(10, Math.log10(minV) + k / 4 * (Math.log10(maxV) - Math.log10(minV))) : maxV * k / 4;
+    svg.appendChild(svgEl('line', {x1: left, x2: width - 10, y1: y(v), y2: y(v), stroke: '#eee'}));
+    svg.appendChild(svgEl('text', {x: left - 4, y: y(v) + 4, 'text-anchor': 'end'}, fmt(Number(v.toPrecision(3)))));
+  }
+  data.forEach(r => {
+    const g = groups.indexOf([r.dataset, r.algo, r.params].filter(Boolean).join(' / '));
+    const s = systems.indexOf(r.system);
+    const x = left + g * groupW + s * barW;
+    const v = r[metric + '_median'];
+    const bar = svgEl('rect', {x, y: y(v), width: barW - 2, height: top + h - y(v), fill: COLORS[s % COLORS.length]});
+    bar.appendChild(svgEl('title', {}, `${r.system} ${r.dataset} ${r.algo} ${r.params}: ${fmt(v)} (n=${r.n})`));
+    svg.appendChild(bar);
+    if (r[metric + '_min'] !== null && r[metric + '_max'] !== null) {
+      const cx = x + (barW - 2) / 2;
+      svg.appendChild(svgEl('line', {x1: cx, x2: cx, y1: y(r[metric + '_min']), y2: y(r[metric + '_max']), stroke: '#333'}));
+    }
+  });
+  groups.forEach((name, g) => {
+    const x = left + g * groupW + systems.length * barW / 2;
+    svg.appendChild(svgEl('text', {x, y: top + h + 10, transform: `rotate(45 ${x} ${top + h + 10})`}, name));
+  });
+  systems.forEach((s, i) => {
+    svg.appendChild(svgEl('rect', {x: width - 130, y: top + i * 14, width: 10, height: 10, fill: COLORS[i % COLORS.length]}));
+    svg.appendChild(svgEl('text', {x: width - 116, y: top + i * 14 + 9}, s));
+  });
+  container.appendChild(svg);
+}
+
+function lineChart(container, trace) {
+  const w = 900, h = 220, left = 60, top = 20;
+  const tMax = Math.max(...trace.t, ...trace.t_write, 1);
+  const vMax = Math.max(...trace.read, ...trace.write, 1);
+  const svg = svgEl('svg', {width: w + left + 20, height: h + top + 40});
+  svg.appendChild(svgEl('text', {x: 5, y: 12}, `${trace.system}: ${trace.name} (MB/s)`));
+  const path = (ts, vs) => ts.map((t, i) => `${i ? 'L' : 'M'}${(left + w * t / tMax).toFixed(1)},${(top + h - h * vs[i] / vMax).toFixed(1)}`).join('');
+  svg.appendChild(svgEl('path', {d: path(trace.t, trace.read), fill: 'none', stroke: 'blue'}));
+  svg.appendChild(svgEl('path', {d: path(trace.t_write, trace.write), fill: 'none', stroke: 'red'}));
+  svg.appendChild(svgEl('line', {x1: left, x2: left + w, y1: top + h, y2: top + h, stroke: '#333'}));
+  svg.appendChild(svgEl('text', {x: left - 4, y: top + 8, 'text-anchor': 'end'}, fmt(vMax)));
+  svg.appendChild(svgEl('text', {x: left + w, y: top + h + 15, 'text-anchor': 'end'}, `${tMax} s`));
+  svg.appendChild(svgEl('text', {x: left + 5, y: top + h + 30, fill: 'blue'}, 'read'));
+  svg.appendChild(svgEl('text', {x: left + 45, y: top + h + 30, fill: 'red'}, 'write'));
+  container.appendChild(svg);
+}
+
+async function showTraces(container, ids) {
+  for (const id of ids) lineChart(container, await loadPanel('trace-' + id));
+}
+
+async function drillDown(row) {
+  const box = document.getElementById('drilldown');
+  box.textContent = '';
+  box.appendChild(el('h3', {}, `${row.system} / ${row.dataset} / ${row.algo} ${row.params}`));
+  const trials = await loadPanel('trials');
+  const idx = ['system', 'dataset', 'algo', 'params'].map(c => trials.columns.indexOf(c));
+  const rows = trials.rows.filter(r => r[idx[0]] === row.system && r[idx[1]] === row.dataset &&
+                                       r[idx[2]] === row.algo && r[idx[3]] === row.params);
+  table(box.appendChild(el('div')), trials.columns, rows);
+  if (row.traces.length) await showTraces(box.appendChild(el('div')), row.traces);
+  else box.appendChild(el('p', {class: 'muted'}, 'no iostat traces for this benchmark'));
+  box.scrollIntoView();
+}
+
+async function renderSummary() {
+  const summary = await loadPanel('summary');
+  const f = filters(), metric = document.getElementById('f-metric').value;
+  const label = summary.metrics.find(m => m[0] === metric)[1];
+  const rows = summary.rows.filter(r => matches(r, f));
+  barChart(document.getElementById('chart'), rows, metric, label, document.getElementById('f-log').checked);
+  const columns = ['system', 'dataset', 'algo', 'params', 'n'];
+  summary.metrics.forEach(m => columns.push(m[0] + '_median'));
+  columns.push('time_s_min', 'time_s_max', 'traces');
+  table(document.getElementById('summary-table'), columns,
+        rows.map(r => columns.map(c => c === 'traces' ? r.traces.length : r[c])), i => drillDown(rows[i]));
+}
+
+async function renderTrials() {
+  const trials = await loadPanel('trials');
+  const f = filters();
+  const idx = ['system', 'dataset', 'algo'].map(c => trials.columns.indexOf(c));
+  const rows = trials.rows.filter(r => matches({system: r[idx[0]], dataset: r[idx[1]], algo: r[idx[2]]}, f));
+  table(document.getElementById('trials-table'), trials.columns, rows);
+}
+
+async function renderTraces() {
+  const traces = await loadPanel('traces');
+  const f = filters();
+  const ids = traces.map((_, i) => i).filter(i => (!f.system || traces[i].system === f.system) &&
+    (!f.dataset || traces[i].benchmark.startsWith(f.dataset)) && (!f.algo || traces[i].benchmark.includes(f.algo)));
+  const columns = ['system', 'name', 'seconds', 'read_mb', 'write_mb'];
+  table(document.getElementById('traces-table'), columns, ids.map(i => columns.map(c => traces[i][c])), async k => {
+    const view = document.getElementById('trace-view');
+    view.textContent = '';
+    await showTraces(view, [ids[k]]);
+  });
+}
+
+const RENDERERS = {summary: renderSummary, trials: renderTrials, traces: renderTraces};
+let currentTab = 'summary';
+
+function refresh() { RENDERERS[currentTab](); }
+
+async function init() {
+  const summary = await loadPanel('summary');
+  for (const field of ['system', 'dataset', 'algo']) {
+    const select = document.getElementById('f-' + field);
+    [...new Set(summary.rows.map(r => r[field]))].sort().forEach(v => select.appendChild(el('option', {value: v}, v)));
+    select.onchange = refresh;
+  }
+  const metricSelect = document.getElementById('f-metric');
+  summary.metrics.forEach(m => metricSelect.appendChild(el('option', {value: m[0]}, m[1])));
+  metricSelect.onchange = refresh;
+  document.getElementById('f-log').onchange = refresh;
+  document.querySelectorAll('nav button').forEach(button => button.onclick = () => {
+    document.querySelectorAll('nav button').forEach(b => b.classList.toggle('active', b === button));
+    document.querySelectorAll('.panel').forEach(p => p.classList.toggle('active', p.id === 'tab-' + button.dataset.tab));
+    currentTab = button.dataset.tab;
+    refresh();
+  });
+  refresh();
+}
+
+init();
+</script>
+</body>
+</html>
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a self-contained HTML explorer for a campaign')
+    parser.add_argument('--results-dir', default=RESULTS_ROOT, help='results root or .jsonl snapshot')
+    parser.add_argument('--output', required=True, help='HTML file to write')
+    parser.add_argument('--device', help='device of the iostat traces (e.g. nvme0n1); traces are skipped without it')
+    parser.add_argument('--systems', nargs='+', help='restrict to these systems')
+    parser.add_argument('--pattern', default='*_iostat.log', help='iostat file pattern')
+    parser.add_argument('--max-points', type=int, default=DEFAULT_MAX_POINTS,
+                        help='downsample iostat traces longer than this (LTTB)')
+    parser.add_argument('--title', default='Benchmark results', help='title of the report')
+    args = parser.parse_args()
+
+    records = load_campaign(args.results_dir, args.systems)
+    traces = collect_traces(args.results_dir, args.device, args.systems, args.pattern, args.max_points) \
+        if args.device else []
+    print(f"Loaded {len(records)} trials and {len(traces)} iostat traces from {args.results_dir}")
+    if not records and not traces:
+        print("Nothing to report")
+        return 1
+
+    panels = build_panels(records, traces)
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w') as f:
+        f.write(render_html(panels, args.title, args.device))
+    print(f"Report written to {args.output} ({os.path.getsize(args.output) / 1024:.0f} KB, {len(panels)} panels)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
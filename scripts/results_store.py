@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+Shared loader for per-trial benchmark results.
+
+Every runner writes its results differently: Galois and Blaze write one CSV row
+per trial, GAPBS, Ligra, Gemini and X-Stream append the raw program output to a
+log, and the OOC systems write one log per (dataset, program, iterations).
+This module walks a results root (normally /results, with one sub-directory per
+system) and flattens all of them into a single list of per-trial records so
+that analysis scripts do not need to know each system's file layout.
+
+A record is a plain dict with the keys:
+    - system: system name (directory name under the results root)
+    - dataset: dataset name
+    - algo: algorithm name as used by the system
+    - params: extra run parameters as a string (e.g. 'iters=20', 'mem=75pct'), '' if none
+    - trial: 0-based trial index within the (system, dataset, algo, params) group
+    - time_s: algorithm time of the trial in seconds
+    - mem_mb: peak memory of the trial in MB, or None if not recorded
+    - source: path of the file the record was read from
+    - major_faults, minor_faults, block_input, block_output: resource counters of
+      the trial (only present when the runner recorded them)
+    - numa_hit, numa_miss: pages allocated on the intended / another NUMA node
+      during the trial (NumaCounter lines, see numa_topology.py)
+
+A campaign can be frozen into a JSON-lines snapshot so that it can be compared
+against later campaigns after /results has been overwritten:
+
+    python results_store.py snapshot /results -o /results/campaigns/2026-10.jsonl
+
+Runs ended by their time budget or the hang detector (watchdog.py) produce no
+trial records; they are listed in <system>/timeouts.jsonl and read with
+load_timeouts().
+"""
+
+import os
+import re
+import csv
+import json
+import argparse
+from collections import defaultdict
+
+from paths import RESULTS_ROOT
+from watchdog import TIMEOUTS_FILE
+
+MEM_REGEX = re.compile(r"MemoryCounter:\s+\d+\s+MB\s+->\s+\d+\s+MB,\s+(\d+)\s+MB\s+total")
+FAULTS_REGEX = re.compile(r"MemoryCounter:\s+(\d+)\s+major\s+faults,\s+(\d+)\s+minor\s+faults")
+BLOCKIO_REGEX = re.compile(r"MemoryCounter:\s+(\d+)\s+block\s+input\s+operations,\s+(\d+)\s+block\s+output\s+operations")
+NUMA_REGEX = re.compile(r"NumaCounter:\s+(\d+)\s+numa_hit,\s+(\d+)\s+numa_miss")
+
+# Resource counter columns of the per-trial CSVs, stored under the same record keys
+COUNTER_FIELDS = ['major_faults', 'minor_faults', 'block_input', 'block_output', 'numa_hit', 'numa_miss']
+
+# Galois CSV file suffixes -> algorithm names (same table as parse_galois_results.py)
+GALOIS_ALGOS = {
+    'bfs_synctile_parallel_time': 'bfs',
+    'pagerank-pull_residual': 'pagerank',
+    'connectedcomponents_labelprop': 'cc',
+    'triangle_orderedCount': 'tc',
+    'bc_bc': 'bc',
+    'sssp_sssp': 'sssp',
+}
+
+'''
+Log-based sources. Each entry describes how to recognise a log file of a system and how
+to pull one time value per trial out of it:
+    file_regex: matched against the file name; must define the groups 'dataset' and 'algo',
+                and may define 'params'
+    time_regex: one match per trial; group 1 is the time
+    scale: factor that converts the matched time to seconds
+'''
+LOG_SOURCES = {
+    'gapbs': {
+        'file_regex': re.compile(r"^(?P<dataset>.+)_(?P<algo>[A-Za-z]+)\.log$"),
+        'time_regex': re.compile(r"^Trial\sTime:\s+(\d+\.\d+)", re.MULTILINE),
+        'scale': 1.0,
+    },
+    'ligra': {
+        'file_regex': re.compile(r"^(?P<dataset>.+)_(?P<algo>[A-Za-z]+)\.log$"),
+        'time_regex': re.compile(r"^Running\s+time\s+:\s+(\d+\.*\d+)", re.MULTILINE),
+        'scale': 1.0,
+    },
+    'gemini': {
+        'file_regex': re.compile(r"^(?P<dataset>.+)_(?P<algo>[A-Za-z]+)(?:_(?P<params>numa-[a-z]+))?\.log$"),
+        'time_regex': re.compile(r"exec_time=(\d+\.\d+)\(s\)"),
+        'scale': 1.0,
+    },
+    'xstream': {
+        'file_regex': re.compile(r"^(?P<dataset>.+)_(?P<algo>[A-Za-z_]+?)\.log$"),
+        'time_regex': re.compile(r"Total\s+time:\s+(\d+\.\d+)"),
+        'scale': 1.0,
+    },
+    'graphchi': {
+        'file_regex': re.compile(r"^(?P<dataset>.+)_(?P<algo>[a-z_]+)_(?P<params>mem\d+pct)\.out$"),
+        'time_regex': re.compile(r"runtime:\s+(\d+\.\d+)\s+s"),
+        'scale': 1.0,
+    },
+    'lumos': {
+        'file_regex': re.compile(r"^(?P<dataset>.+)_(?P<algo>pagerank(?:_gg|_delta)?)_(?P<params>iter\d+)\.log$"),
+        'time_regex': re.compile(r"\d+\s+iterations\s+of\s+pagerank\s+took\s+(\d+\.\d+)\s+seconds"),
+        'scale': 1.0,
+    },
+    'GridGraph': {
+        'file_regex': re.compile(r"^(?P<dataset>.+)_(?P<algo>pagerank|bfs|wcc|spmv)(?:_(?P<params>iter\d+))?\.log$"),
+        'time_regex': re.compile(r"(?:took|in)\s+(\d+\.\d+)\s+seconds"),
+        'scale': 1.0,
+    },
+}
+
+# Systems whose CSVs hold one row per trial with an 'algo_time(ms)' column
+CSV_SYSTEMS = ['galois', 'blaze']
+
+
+def make_record(system, dataset, algo, params, trial, time_s, mem_mb, source, counters=None):
+    """
+    Build a per-trial record dict (counters: optional dict of COUNTER_FIELDS values).
+    """
+    record = {
+        'system': system,
+        'dataset': dataset,
+        'algo': algo,
+        'params': params or '',
+        'trial': trial,
+        'time_s': time_s,
+        'mem_mb': mem_mb,
+        'source': source,
+    }
+    if counters:
+        record.update({k: v for k, v in counters.items() if v is not None})
+    return record
+
+
+def _split_galois_name(name_part):
+    """
+    Split a Galois CSV base name into (dataset, algo) using GALOIS_ALGOS.
+    """
+    for suffix, algo in GALOIS_ALGOS.items():
+        if name_part.endswith('_' + suffix):
+            return name_part[:-(len(suffix) + 1)], algo
+    return None, None
+
+
+def _split_blaze_name(name_part):
+    """
+    Split a Blaze CSV base name (<dataset>_<algo>) into (dataset, algo).
+    """
+    parts = name_part.rsplit('_', 1)
+    if len(parts) != 2:
+        return None, None
+    return parts[0], parts[1]
+
+
+def load_csv_trials(system, csv_path):
+    """
+    Read a per-trial CSV written by the Galois or Blaze runner.
+
+    Args:
+        system: 'galois' or 'blaze'
+        csv_path: Path to the CSV file
+
+    Returns:
+        list: Per-trial records (empty if the file is not a per-trial CSV)
+    """
+    name_part = os.path.basename(csv_path)[:-4]
+    if system == 'galois':
+        dataset, algo = _split_galois_name(name_part)
+    else:
+        dataset, algo = _split_blaze_name(name_part)
+    if dataset is None:
+        return []
+
+    records = []
+    # Trials are numbered per start node so that multi-source BFS runs stay separate groups
+    trial_counters = defaultdict(int)
+    with open(csv_path, 'r', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return []
+        header = [h.strip() for h in header]
+        if 'algo_time(ms)' not in header:
+            return []
+        time_idx = header.index('algo_time(ms)')
+        mem_idx = header.index('mem_used(MB)') if 'mem_used(MB)' in header else None
+        start_idx = header.index('start_node') if 'start_node' in header else None
+        counter_idx = {field: header.index(field) for field in COUNTER_FIELDS if field in header}
+        for row in reader:
+            if len(row) <= time_idx:
+                continue
+            try:
+                time_s = float(row[time_idx]) / 1000.0
+            except ValueError:
+                continue
+            mem_mb = None
+            if mem_idx is not None and len(row) > mem_idx:
+                try:
+                    mem_mb = float(row[mem_idx])
+                except ValueError:
+                    mem_mb = None
+            params = ''
+            if start_idx is not None and len(row) > start_idx:
+                params = f"start={row[start_idx].strip()}"
+            counters = {}
+            for field, idx in counter_idx.items():
+                try:
+                    counters[field] = int(float(row[idx]))
+                except (ValueError, IndexError):
+                    pass
+            trial = trial_counters[params]
+            trial_counters[params] += 1
+            records.append(make_record(system, dataset, algo, params, trial, time_s, mem_mb, str(csv_path), counters))
+    return records
+
+
+def load_log_trials(system, log_path):
+    """
+    Read all trial times from a raw program log using LOG_SOURCES.
+
+    Args:
+        system: System name (key of LOG_SOURCES)
+        log_path: Path to the log file
+
+    Returns:
+        list: Per-trial records (empty if the file name or contents do not match)
+    """
+    source = LOG_SOURCES[system]
+    match = source['file_regex'].match(os.path.basename(log_path))
+    if not match or 'iostat' in os.path.basename(log_path):
+        return []
+    groups = match.groupdict()
+
+    with open(log_path, 'r', errors='replace') as f:
+        content = f.read()
+    times = [float(m.group(1)) * source['scale'] for m in source['time_regex'].finditer(content)]
+    mems = [float(m.group(1)) for m in MEM_REGEX.finditer(content)]
+    # Counters can only be attributed per trial when every trial printed exactly one counter line
+    if len(mems) != len(times):
+        mems = [None] * len(times)
+    counters = [{} for _ in times]
+    faults = FAULTS_REGEX.findall(content)
+    if len(faults) == len(times):
+        for c, (major, minor) in zip(counters, faults):
+            c.update(major_faults=int(major), minor_faults=int(minor))
+    block_io = BLOCKIO_REGEX.findall(content)
+    if len(block_io) == len(times):
+        for c, (block_in, block_out) in zip(counters, block_io):
+            c.update(block_input=int(block_in), block_output=int(block_out))
+    numa = NUMA_REGEX.findall(content)
+    if len(numa) == len(times):
+        for c, (hit, miss) in zip(counters, numa):
+            c.update(numa_hit=int(hit), numa_miss=int(miss))
+
+    return [make_record(system, groups['dataset'], groups['algo'], groups.get('params'), trial, t, m, str(log_path), c)
+            for trial, (t, m, c) in enumerate(zip(times, mems, counters))]
+
+
+def load_results_dir(results_root=RESULTS_ROOT, systems=None):
+    """
+    Load every per-trial record found under a results root.
+
+    Args:
+        results_root: Directory containing one sub-directory per system
+        systems: Optional list of system names to restrict the scan to
+
+    Returns:
+        list: Per-trial records
+    """
+    records = []
+    if not os.path.isdir(results_root):
+        print(f"Results directory {results_root} does not exist")
+        return records
+
+    for system in sorted(os.listdir(results_root)):
+        system_dir = os.path.join(results_root, system)
+        if not os.path.isdir(system_dir) or (systems and system not in systems):
+            continue
+        for filename in sorted(os.listdir(system_dir)):
+            path = os.path.join(system_dir, filename)
+            try:
+                if system in CSV_SYSTEMS and filename.endswith('.csv'):
+                    records.extend(load_csv_trials(system, path))
+                elif system in LOG_SOURCES:
+                    records.extend(load_log_trials(system, path))
+            except (IOError, UnicodeDecodeError) as e:
+                print(f"Warning: could not read {path}: {e}")
+    return records
+
+
+def load_timeouts(results_root=RESULTS_ROOT, systems=None):
+    """
+    Load the records of the runs that were ended by their timeout or the watchdog.
+
+    Returns:
+        list: One dict per run (see watchdog.record_timeout)
+    """
+    timeouts = []
+    if not os.path.isdir(results_root):
+        return timeouts
+    for system in sorted(os.listdir(results_root)):
+        path = os.path.join(results_root, system, TIMEOUTS_FILE)
+        if (systems and system not in systems) or not os.path.isfile(path):
+            continue
+        timeouts.extend(load_snapshot(path))
+    return timeouts
+
+
+def load_snapshot(snapshot_file):
+    """
+    Load records from a JSON-lines snapshot written by save_snapshot().
+    """
+    records = []
+    with open(snapshot_file, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                records.append(json.loads(line))
+    return records
+
+
+def save_snapshot(records, snapshot_file):
+    """
+    Write records to a JSON-lines snapshot file.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(snapshot_file)), exist_ok=True)
+    with open(snapshot_file, 'w') as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+
+
+def load_campaign(location, systems=None):
+    """
+    Load a campaign from either a results directory or a JSON-lines snapshot.
+
+    Args:
+        location: Results root directory or .jsonl snapshot file
+        systems: Optional list of system names to keep
+
+    Returns:
+        list: Per-trial records
+    """
+    if os.path.isdir(location):
+        return load_results_dir(location, systems)
+    records = load_snapshot(location)
+    if systems:
+        records = [r for r in records if r['system'] in systems]
+    return records
+
+
+def group_trials(records, field='time_s'):
+    """
+    Group records by (system, dataset, algo, params).
+
+    Args:
+        records: Per-trial records
+        field: Record field to collect (default: 'time_s')
+
+    Returns:
+        dict: Mapping from (system, dataset, algo, params) to a list of values
+    """
+    groups = defaultdict(list)
+    for record in records:
+        value = record.get(field)
+        if value is None:
+            continue
+        key = (record['system'], record['dataset'], record['algo'], record['params'])
+        groups[key].append(value)
+    return dict(groups)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inspect or snapshot per-trial benchmark results')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    summary_parser = subparsers.add_parser('summary', help='print the number of trials per group')
+    summary_parser.add_argument('location', nargs='?', default=RESULTS_ROOT, help='results directory or .jsonl snapshot')
+    summary_parser.add_argument('--systems', nargs='+', help='restrict to these systems')
+
+    snapshot_parser = subparsers.add_parser('snapshot', help='freeze a results directory into a .jsonl snapshot')
+    snapshot_parser.add_argument('location', nargs='?', default=RESULTS_ROOT, help='results directory')
+    snapshot_parser.add_argument('-o', '--output', required=True, help='output .jsonl file')
+    snapshot_parser.add_argument('--systems', nargs='+', help='restrict to these systems')
+
+    args = parser.parse_args()
+    records = load_campaign(args.location, args.systems)
+    print(f"Loaded {len(records)} trials from {args.location}")
+
+    if args.command == 'snapshot':
+        save_snapshot(records, args.output)
+        print(f"Snapshot written to {args.output}")
+    else:
+        for key, times in sorted(group_trials(records).items()):
+            system, dataset, algo, params = key
+            print(f"{system:10s} {dataset:20s} {algo:22s} {params:14s} n={len(times):3d} "
+                  f"mean={sum(times) / len(times):.4f}s")
+        if os.path.isdir(args.location):
+            for timeout in load_timeouts(args.location, args.systems):
+                print(f"{timeout['system']:10s} {timeout['dataset']:20s} {timeout['algo']:22s} "
+                      f"{timeout['params']:14s} {timeout['reason']} after {timeout['wall_s']:.0f}s")
+
+
+if __name__ == '__main__':
+    main()
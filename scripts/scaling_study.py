@@ -0,0 +1,521 @@
+#!/usr/bin/env python3
+"""
+Strong- and weak-scaling studies over thread counts and RMAT graph scales.
+
+The runners use a single thread count each (galois THREADS, gapbs
+num_threads, blaze NUM_WORKERS, xstream nproc, ...). This driver runs one
+(system, algo) at a sweep of thread counts instead, setting the thread knob
+of the system directly (-t, OMP_NUM_THREADS/CILK_NWORKERS, GraphChi
+execthreads, X-Stream -p, Blaze -computeWorkers) and pinning the run with
+taskset to the CPUs it may use:
+
+    strong - one dataset, thread counts 1, 2, 4, ... up to the physical cores,
+             then all logical CPUs (hyperthreads)
+    weak   - RMAT graphs whose scale grows with log2(threads), so that the
+             edges per thread stay constant; missing graphs are generated with
+             graph_generators.py
+
+CPUs are handed out in one of two placements: 'physical' takes one
+hardware thread per core before using any sibling, 'compact' fills both
+siblings of a core first. Comparing the two at the same thread count shows
+what SMT is worth for a system. --numa adds a NUMA placement policy
+(numa_topology.py) and records the NUMA hits and misses of every trial.
+
+From the per-trial times (median per thread count) the driver computes
+
+    speedup       S(p) = T(1) / T(p)
+    efficiency    E(p) = S(p) / p           (weak scaling: T(1) / T(p))
+    Karp-Flatt    e(p) = (1/S(p) - 1/p) / (1 - 1/p), the experimentally
+                  determined serial fraction; a growing e(p) points to
+                  parallel overhead rather than a serial bottleneck
+
+and writes <output_dir>/<system>/<study>_<dataset>_<algo>_<placement>_trials.csv,
+..._metrics.csv and a plot of speedup and efficiency.
+
+Usage:
+    python scaling_study.py gapbs bfs --dataset graph500_26 --trials 3
+    python scaling_study.py galois cc --weak --base-scale 20 --edge-factor 16
+    python scaling_study.py ligra pr --dataset twitter_mpi --placement compact --threads 1 8 16 32
+"""
+
+import os
+import re
+import sys
+import csv
+import time
+import argparse
+import subprocess
+
+import numpy as np
+
+from dataset_properties import PropertiesReader, get_available_cpus
+from graph_generators import make_spec, generate_dataset
+from paths import DATASET_DIR, SYSTEMS_DIR, RESULTS_ROOT, EXTRA_SPACE_DIR, SCRIPTS_DIR
+from numa_topology import PLACEMENT_POLICIES, numa_nodes, numactl_prefix, read_numastat, numastat_delta
+
+OUTPUT_DIR = f"{RESULTS_ROOT}/scaling"
+CPU_SYSFS = "/sys/devices/system/cpu"
+
+DEFAULT_TRIALS = 3
+DEFAULT_TIMEOUT_S = 3600
+
+# run/prepare are shell templates with the fields {dataset}, {args} (the algo entry),
+# {threads}, {source}, {symmetric} (the system's flag for undirected graphs, or
+# nothing), {weighted} (its flag for weighted graphs, or nothing), {graph} (the
+# preset's graph(algo, directed), or nothing) and the path roots ROOT_FIELDS; env
+# values are templates too. time_regex matches the algorithm time of a
+# run in time_unit seconds; with several matches (iterations) their sum is used.
+ROOT_FIELDS = {'dataset_dir': DATASET_DIR, 'systems_dir': SYSTEMS_DIR, 'extra_space_dir': EXTRA_SPACE_DIR,
+               'scripts_dir': SCRIPTS_DIR}
+
+
+def galois_graph(algo, directed):
+    """
+    Graph format a Galois benchmark reads, as in galois.py: the symmetric .sgr for undirected
+    graphs, the transpose .tgr for PageRank-pull on directed graphs, the .gr otherwise.
+    """
+    if not directed:
+        return "sgr"
+    return "tgr" if algo == 'pr' else "gr"
+
+PRESETS = {
+    'gapbs': {
+        'cwd': f"{SYSTEMS_DIR}/in-mem/gapbs",
+        'prepare': "[ -e {extra_space_dir}/{dataset}.el ] || ln -s {dataset_dir}/{dataset}/{dataset}.e {extra_space_dir}/{dataset}.el",
+        'run': "./{args} -f {extra_space_dir}/{dataset}.el -n 1 {symmetric}",
+        'algos': {'bfs': "bfs -r {source}", 'pr': "pr", 'cc': "cc", 'tc': "tc", 'bc': "bc -r {source}"},
+        'env': {'OMP_NUM_THREADS': "{threads}"},
+        'symmetric_flag': "-s",
+        'time_regex': r"^Trial\s+Time:\s+(\d+\.\d+)",
+        'time_unit': 1.0,
+    },
+    'ligra': {
+        'cwd': f"{SYSTEMS_DIR}/in-mem/ligra/apps",
+        'prepare': ("[ -e {extra_space_dir}/{dataset} ] || {systems_dir}/in-mem/ligra/utils/SNAPtoAdj {symmetric} "
+                    "{dataset_dir}/{dataset}/{dataset}.e {extra_space_dir}/{dataset}"),
+        'run': "./{args} -rounds 1 {symmetric} {extra_space_dir}/{dataset}",
+        'algos': {'bfs': "BFS -r {source}", 'pr': "PageRank", 'cc': "Components", 'tc': "Triangle",
+                  'bc': "BC -r {source}"},
+        'env': {'OMP_NUM_THREADS': "{threads}", 'CILK_NWORKERS': "{threads}"},
+        'symmetric_flag': "-s",
+        'time_regex': r"^Running\s+time\s+:\s+(\d+\.*\d+)",
+        'time_unit': 1.0,
+    },
+    'galois': {
+        'cwd': None,
+        # Same conversions as galois.py prepare_dataset, in a directory of their own so
+        # that the runner's cached graphs are never shared with these runs
+        'prepare': ("mkdir -p {extra_space_dir}/scaling/galois && "
+                    "([ -e {extra_space_dir}/scaling/galois/{dataset}.gr ] || "
+                    "{systems_dir}/in-mem/Galois/build/tools/graph-convert/graph-convert -edgelist2gr {weighted} "
+                    "{dataset_dir}/{dataset}/{dataset}.e {extra_space_dir}/scaling/galois/{dataset}.gr) && "
+                    "([ {graph} = gr ] || [ -e {extra_space_dir}/scaling/galois/{dataset}.{graph} ] || "
+                    "{systems_dir}/in-mem/Galois/build/tools/graph-convert/graph-convert -gr2{graph} "
+                    "{extra_space_dir}/scaling/galois/{dataset}.gr {extra_space_dir}/scaling/galois/{dataset}.{graph})"),
+        'run': ("{systems_dir}/in-mem/Galois/build/lonestar/{args} -t={threads} -noverify "
+                "{extra_space_dir}/scaling/galois/{dataset}.{graph}"),
+        'algos': {'bfs': "bfs/bfs -algo=SyncTile -exec=PARALLEL -startNode={source}",
+                  'pr': "pagerank/pagerank-pull -tolerance=0.0001 -algo=Residual",
+                  'cc': "connectedcomponents/connectedcomponents -algo=LabelProp",
+                  'sssp': "sssp/sssp -algo=deltaStep -startNode={source}"},
+        'env': {},
+        'symmetric_flag': "",
+        'weighted_flag': "-edgeType=float64",
+        'graph': galois_graph,
+        'time_regex': r"STAT, \w+_MAIN, Time, TMAX, (\d+)",
+        'time_unit': 0.001,
+    },
+    'blaze': {
+        'cwd': None,
+        'prepare': ("[ -e {extra_space_dir}/{dataset}.gr.index ] || "
+                    "(echo 'run blaze.py once to convert {dataset}' && false)"),
+        'run': ("{systems_dir}/ooc/blaze/build/bin/{args} -computeWorkers={threads} "
+                "{extra_space_dir}/{dataset}.gr.index {extra_space_dir}/{dataset}.gr.adj.1.0"),
+        'algos': {'bfs': "bfs -startNode={source}", 'pr': "pagerank"},
+        'env': {},
+        'symmetric_flag': "",
+        'time_regex': r"STAT, \w+_MAIN, Time, TMAX, (\d+)",
+        'time_unit': 0.001,
+    },
+    'graphchi': {
+        'cwd': f"{SYSTEMS_DIR}/ooc/graphchi-cpp/bin/example_apps",
+        'prepare': ("mkdir -p {extra_space_dir}/graphchi_datasets && "
+                    "([ -e {extra_space_dir}/graphchi_datasets/{dataset} ] || "
+                    "python3 {scripts_dir}/staging.py {dataset_dir}/{dataset}/{dataset}.e "
+                    "{extra_space_dir}/graphchi_datasets/{dataset})"),
+        'run': ("./{args} --filetype=edgelist --file={extra_space_dir}/graphchi_datasets/{dataset} --niters=10 "
+                "--execthreads={threads} --loadthreads={threads} --niothreads={threads}"),
+        'algos': {'pr': "pagerank", 'cc': "connectedcomponents"},
+        'env': {},
+        'symmetric_flag': "",
+        'time_regex': r"runtime:\s+(\d+\.\d+)\s+s",
+        'time_unit': 1.0,
+    },
+    'xstream': {
+        'cwd': None,
+        'prepare': ("mkdir -p {extra_space_dir}/xstream_datasets && "
+                    "([ -e {extra_space_dir}/xstream_datasets/{dataset}.ini ] || "
+                    "/llama/bin/snap-to-xs1 -o {extra_space_dir}/xstream_datasets/{dataset} {dataset_dir}/{dataset}/{dataset})"),
+        'run': "/xstream/bin/benchmark_driver -p {threads} -a -g {extra_space_dir}/xstream_datasets/{dataset} {args}",
+        'algos': {'bfs': "-b bfs --bfs::root {source}", 'pr': "-b pagerank --pagerank::niters 10", 'cc': "-b cc",
+                  'sssp': "-b sssp --sssp::source {source}"},
+        'env': {},
+        'symmetric_flag': "",
+        'time_regex': r"TIME_IN_PC_FN\s+(\d+.\d+)\s+seconds",
+        'time_unit': 1.0,
+        # X-Stream needs the number of threads to be a power of 2
+        'power_of_two': True,
+    },
+}
+
+
+def allowed_cpus():
+    """
+    CPUs this process may run on (respects Docker's --cpuset-cpus).
+    """
+    try:
+        return sorted(os.sched_getaffinity(0))
+    except AttributeError:
+        return list(range(get_available_cpus()))
+
+
+def cpu_topology(cpus=None, sysfs=CPU_SYSFS):
+    """
+    Physical core of every allowed CPU.
+
+    Returns:
+        list: (cpu, package id, core id) tuples; CPUs without topology information
+              are treated as cores of their own
+    """
+    topology = []
+    for cpu in cpus if cpus is not None else allowed_cpus():
+        base = os.path.join(sysfs, f"cpu{cpu}", "topology")
+        try:
+            with open(os.path.join(base, "physical_package_id"), 'r') as f:
+                package = int(f.read())
+            with open(os.path.join(base, "core_id"), 'r') as f:
+                core = int(f.read())
+        except (OSError, ValueError):
+            package, core = 0, -1 - cpu
+        topology.append((cpu, package, core))
+    return topology
+
+
+def cpu_order(topology, placement='physical'):
+    """
+    Order in which CPUs are handed out to growing thread counts.
+
+    Args:
+        topology: Output of cpu_topology()
+        placement: 'physical' (one hardware thread per core first, then the siblings)
+                   or 'compact' (all siblings of a core before the next core)
+
+    Returns:
+        list: CPU ids
+    """
+    cores = {}
+    for cpu, package, core in sorted(topology):
+        cores.setdefault((package, core), []).append(cpu)
+    siblings = [cores[key] for key in sorted(cores)]
+    if placement == 'compact':
+        return [cpu for group in siblings for cpu in group]
+    if placement != 'physical':
+        raise ValueError(f"unknown placement {placement}, expected 'physical' or 'compact'")
+    depth = max(len(group) for group in siblings)
+    return [group[level] for level in range(depth) for group in siblings if level < len(group)]
+
+
+def default_thread_counts(num_physical, num_logical, power_of_two=False):
+    """
+    1, 2, 4, ... up to the physical cores, then the physical core count and all logical CPUs.
+    """
+    counts = []
+    p = 1
+    while p <= num_physical:
+        counts.append(p)
+        p *= 2
+    counts += [num_physical, num_logical]
+    if power_of_two:
+        counts = [c for c in counts if c & (c - 1) == 0]
+    return sorted(set(counts))
+
+
+def dataset_info(dataset, system, dataset_dir=DATASET_DIR):
+    """
+    Source vertex and symmetric flag of a dataset for the run templates.
+    """
+    props = PropertiesReader(dataset, f"{dataset_dir}/{dataset}", system_name=system)
+    if props.read() is None:
+        return {'source': 0, 'directed': True, 'weighted': False}
+    source = props.get_property('bfs_source') or props.get_property('sssp_source') or 0
+    return {'source': source, 'directed': props.is_directed(), 'weighted': props.is_weighted()}
+
+
+def _fields(preset, dataset, info, threads, args="", algo=None):
+    fields = {**ROOT_FIELDS, 'dataset': dataset, 'threads': threads, 'source': info['source'],
+              'symmetric': "" if info['directed'] else preset['symmetric_flag'],
+              'weighted': preset.get('weighted_flag', "") if info['weighted'] else "",
+              'graph': preset['graph'](algo, info['directed']) if 'graph' in preset else ""}
+    fields['args'] = args.format(**fields)
+    return fields
+
+
+def parse_time(output, preset):
+    matches = re.findall(preset['time_regex'], output, re.MULTILINE)
+    if not matches:
+        return None
+    return sum(float(m) for m in matches) * preset['time_unit']
+
+
+def run_point(preset, algo, dataset, info, threads, cpus, timeout_s=DEFAULT_TIMEOUT_S, dry_run=False,
+              numa_prefix=""):
+    """
+    Run one trial at a thread count, pinned to the given CPUs.
+
+    Returns:
+        dict: returncode, time_s (algorithm time parsed from the output, or None), wall_s,
+              and numa_hit/numa_miss (pages, from numastat) of the trial
+    """
+    fields = _fields(preset, dataset, info, threads, preset['algos'][algo], algo)
+    command = f"{numa_prefix}taskset -c {','.join(map(str, cpus))} {preset['run'].format(**fields)}"
+    env = dict(os.environ)
+    env.update({key: value.format(**fields) for key, value in preset['env'].items()})
+    print(f"  [{threads} threads] {command}")
+    result = {'returncode': 0, 'time_s': None, 'wall_s': None, 'numa_hit': None, 'numa_miss': None}
+    if dry_run:
+        return result
+
+    numastat_before = read_numastat()
+    start = time.time()
+    try:
+        process = subprocess.run(command, shell=True, cwd=preset['cwd'], env=env, stdout=subprocess.PIPE,
+                                 stderr=subprocess.STDOUT, universal_newlines=True, timeout=timeout_s)
+    except subprocess.TimeoutExpired:
+        print(f"  Warning: timed out after {timeout_s} s")
+        result.update(returncode=None, wall_s=time.time() - start)
+        return result
+    wall_s = time.time() - start
+    numa = numastat_delta(numastat_before, read_numastat())
+    algo_s = parse_time(process.stdout, preset)
+    if process.returncode != 0:
+        print(f"  Warning: exit code {process.returncode}")
+    elif algo_s is None:
+        print(f"  Warning: no algorithm time in the output, using the wall time")
+    result.update(returncode=process.returncode, time_s=algo_s if algo_s is not None else wall_s, wall_s=wall_s,
+                  numa_hit=numa['numa_hit'], numa_miss=numa['numa_miss'])
+    return result
+
+
+def compute_metrics(trials, weak=False):
+    """
+    Speedup, parallel efficiency and Karp-Flatt serial fraction per thread count.
+
+    Args:
+        trials: Trial rows with 'threads', 'time_s' and 'returncode'
+        weak: Weak scaling (efficiency is T(1) / T(p); no speedup or Karp-Flatt)
+
+    Returns:
+        list: One dict per thread count (sorted by threads)
+    """
+    times = {}
+    for row in trials:
+        if row['returncode'] == 0 and row['time_s'] is not None:
+            times.setdefault(int(row['threads']), []).append(float(row['time_s']))
+    if not times:
+        return []
+    base_threads = min(times)
+    base = float(np.median(times[base_threads])) * base_threads if not weak else float(np.median(times[base_threads]))
+
+    metrics = []
+    for threads in sorted(times):
+        values = np.array(times[threads])
+        median = float(np.median(values))
+        row = {'threads': threads, 'trials': len(values), 'median_s': round(median, 6),
+               'min_s': round(float(values.min()), 6), 'max_s': round(float(values.max()), 6),
+               'std_s': round(float(values.std(ddof=1)) if len(values) > 1 else 0.0, 6)}
+        if weak:
+            row['efficiency'] = round(base / median, 4)
+        else:
+            # With no 1-thread run, T(1) is extrapolated as base_threads x T(base_threads)
+            speedup = base / median
+            row['speedup'] = round(speedup, 4)
+            row['efficiency'] = round(speedup / threads, 4)
+            row['karp_flatt'] = round((1 / speedup - 1 / threads) / (1 - 1 / threads), 4) if threads > 1 else None
+        metrics.append(row)
+    return metrics
+
+
+def write_csv(path, rows):
+    if not rows:
+        return
+    fieldnames = list(rows[0].keys())
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def plot_metrics(metrics, output_file, title, weak=False):
+    """
+    Plot speedup (strong scaling) and parallel efficiency against the thread count.
+    """
+    # Imported here: the driver runs inside the container images, which do not ship matplotlib
+    import matplotlib
+    matplotlib.use('Agg')  # Use non-interactive backend
+    import matplotlib.pyplot as plt
+
+    threads = [m['threads'] for m in metrics]
+    fig, axes = plt.subplots(1, 1 if weak else 2, figsize=(6 if weak else 12, 4.5), squeeze=False)
+    axes = axes[0]
+    if not weak:
+        axes[0].plot(threads, [m['speedup'] for m in metrics], 'o-', label='measured')
+        axes[0].plot(threads, threads, 'k--', linewidth=1, label='ideal')
+        axes[0].set_xscale('log', base=2)
+        axes[0].set_yscale('log', base=2)
+        axes[0].set_xlabel('Threads')
+        axes[0].set_ylabel('Speedup')
+        axes[0].legend()
+        axes[0].grid(True, alpha=0.3)
+    ax = axes[-1]
+    ax.plot(threads, [m['efficiency'] for m in metrics], 'o-')
+    ax.axhline(1.0, color='k', linestyle='--', linewidth=1)
+    ax.set_xscale('log', base=2)
+    ax.set_ylim(0, max(1.1, max(m['efficiency'] for m in metrics) * 1.1))
+    ax.set_xlabel('Threads')
+    ax.set_ylabel('Weak-scaling efficiency' if weak else 'Parallel efficiency')
+    ax.grid(True, alpha=0.3)
+    fig.suptitle(title)
+    fig.tight_layout()
+    fig.savefig(output_file, dpi=150)
+    plt.close(fig)
+
+
+def rmat_dataset(scale, edge_factor, seed=0, dataset_dir=DATASET_DIR, workers=None):
+    """
+    Name of the RMAT dataset of a scale, generating it first if it does not exist.
+    """
+    name = f"rmat_{scale}_ef{edge_factor}"
+    if not os.path.exists(os.path.join(dataset_dir, name, f"{name}.properties")):
+        print(f"Generating {name}")
+        generate_dataset(make_spec('rmat', seed=seed, scale=scale, edge_factor=edge_factor), name, dataset_dir,
+                         workers=workers)
+    return name
+
+
+def run_study(system, algo, preset, points, placement='physical', trials=DEFAULT_TRIALS,
+              timeout_s=DEFAULT_TIMEOUT_S, dry_run=False, numa_policy=None, numa_node=0):
+    """
+    Run every (dataset, threads) point for a number of trials.
+
+    Args:
+        points: List of (dataset, scale or None, threads)
+        numa_policy: NUMA placement policy (numa_topology.PLACEMENT_POLICIES) or None;
+                     'single' only hands out CPUs of numa_node
+
+    Returns:
+        list: One row per trial
+    """
+    order = cpu_order(cpu_topology(), placement)
+    numa_prefix = numactl_prefix(numa_policy, numa_node)
+    if numa_policy == 'single':
+        node_cpus = set(numa_nodes()[numa_node]['cpus'])
+        order = [cpu for cpu in order if cpu in node_cpus]
+    prepared = {}
+    rows = []
+    for dataset, scale, threads in points:
+        if dataset not in prepared:
+            info = dataset_info(dataset, system)
+            prepare = preset['prepare'].format(**_fields(preset, dataset, info, 1, algo=algo))
+            print(f"Preparing {dataset}: {prepare}")
+            if not dry_run and subprocess.run(prepare, shell=True, cwd=preset['cwd']).returncode != 0:
+                print(f"Warning: preparing {dataset} failed, skipping it")
+                info = None
+            prepared[dataset] = info
+        info = prepared[dataset]
+        if info is None:
+            continue
+        if threads > len(order):
+            print(f"Warning: only {len(order)} CPUs available, skipping {threads} threads")
+            continue
+        cpus = order[:threads]
+        for trial in range(trials):
+            result = run_point(preset, algo, dataset, info, threads, cpus, timeout_s, dry_run, numa_prefix)
+            rows.append({'system': system, 'algo': algo, 'dataset': dataset, 'scale': scale, 'threads': threads,
+                         'placement': placement, 'numa': numa_policy or '', 'trial': trial, 'cpus': ' '.join(map(str, cpus)), **result})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Strong and weak scaling over thread counts and RMAT scales')
+    parser.add_argument('system', choices=sorted(PRESETS), help='system to run')
+    parser.add_argument('algo', help='algorithm (keys of the preset, e.g. bfs, pr, cc)')
+    parser.add_argument('--dataset', help='dataset of a strong-scaling study')
+    parser.add_argument('--weak', action='store_true', help='weak scaling over generated RMAT graphs')
+    parser.add_argument('--base-scale', type=int, default=20, help='weak: RMAT scale of the 1-thread run')
+    parser.add_argument('--edge-factor', type=int, default=16, help='weak: RMAT edge factor')
+    parser.add_argument('--seed', type=int, default=0, help='weak: seed of the generated graphs')
+    parser.add_argument('--threads', type=int, nargs='+', help='thread counts (default: powers of two '
+                        'up to the physical cores, plus the physical and logical CPU counts)')
+    parser.add_argument('--placement', choices=['physical', 'compact'], default='physical',
+                        help='hand out one hardware thread per core first, or fill SMT siblings first')
+    parser.add_argument('--numa', choices=PLACEMENT_POLICIES, help='NUMA placement policy (default: none)')
+    parser.add_argument('--numa-node', type=int, default=0, help='NUMA node of the single policy')
+    parser.add_argument('--trials', type=int, default=DEFAULT_TRIALS, help='trials per thread count')
+    parser.add_argument('--timeout', type=int, default=DEFAULT_TIMEOUT_S, help='timeout per trial in seconds')
+    parser.add_argument('--output-dir', default=OUTPUT_DIR, help='output directory')
+    parser.add_argument('-d', '--dry_run', action='store_true', help='print the commands without running them')
+    args = parser.parse_args()
+
+    preset = PRESETS[args.system]
+    if args.algo not in preset['algos']:
+        parser.error(f"{args.system} supports {', '.join(preset['algos'])}")
+    if not args.weak and not args.dataset:
+        parser.error('give --dataset for strong scaling or --weak')
+
+    topology = cpu_topology()
+    num_physical = len({(package, core) for _, package, core in topology})
+    print(f"{len(topology)} logical CPUs on {num_physical} physical cores, placement {args.placement}")
+    thread_counts = args.threads or default_thread_counts(num_physical, len(topology),
+                                                          preset.get('power_of_two', False))
+
+    if args.weak:
+        # Edges per thread stay constant: the scale grows by one for every doubling of threads
+        thread_counts = [t for t in thread_counts if t & (t - 1) == 0]
+        points = []
+        for threads in thread_counts:
+            scale = args.base_scale + threads.bit_length() - 1
+            name = f"rmat_{scale}_ef{args.edge_factor}" if args.dry_run else \
+                rmat_dataset(scale, args.edge_factor, args.seed)
+            points.append((name, scale, threads))
+        study, label = 'weak', f"rmat{args.base_scale}_ef{args.edge_factor}"
+    else:
+        points = [(args.dataset, None, threads) for threads in thread_counts]
+        study, label = 'strong', args.dataset
+
+    rows = run_study(args.system, args.algo, preset, points, args.placement, args.trials, args.timeout, args.dry_run,
+                     args.numa, args.numa_node)
+    if args.dry_run:
+        return 0
+
+    output_dir = os.path.join(args.output_dir, args.system)
+    os.makedirs(output_dir, exist_ok=True)
+    prefix = os.path.join(output_dir, f"{study}_{label}_{args.algo}_{args.placement}"
+                                      f"{'_' + args.numa if args.numa else ''}")
+    write_csv(f"{prefix}_trials.csv", rows)
+    metrics = compute_metrics(rows, args.weak)
+    if not metrics:
+        print("No successful trials")
+        return 1
+    write_csv(f"{prefix}_metrics.csv", metrics)
+    plot_metrics(metrics, f"{prefix}.png", f"{args.system} {args.algo} on {label} ({study} scaling, "
+                 f"{args.placement})", args.weak)
+
+    for m in metrics:
+        extra = "" if args.weak else f" speedup={m['speedup']} karp_flatt={m['karp_flatt']}"
+        print(f"{m['threads']:>4} threads: median {m['median_s']:.3f} s, efficiency={m['efficiency']}{extra}")
+    print(f"Results written to {prefix}_*")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
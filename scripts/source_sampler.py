@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Pick BFS/SSSP source vertices that actually reach a large part of the graph.
+
+graph_utils.bfs_random_starts() and make_bfs_starts() choose uniformly random
+vertices, so a run can start in a tiny component and finish in microseconds.
+This sampler works on the CSR cache (csr_cache.py) and:
+    1. restricts candidates to the largest weakly connected component,
+    2. stratifies the candidates by out-degree (log-spaced quantile buckets) so
+       the picked sources cover low-, medium- and high-degree vertices,
+    3. keeps a candidate only if a BFS from it reaches at least min_reach of
+       the largest component,
+and draws everything from a seeded generator so the same seed gives the same
+.bfsver file.
+
+The .bfsver file keeps the existing format (one vertex id per line, read by the
+X-Stream and Blaze runners); the parameters used are stored next to it in
+<dataset>.bfsver.json.
+
+Usage:
+    python source_sampler.py graph500_26 -k 20 --seed 42 --min-reach 0.5
+"""
+
+import os
+import sys
+import json
+import argparse
+
+import numpy as np
+from scipy.sparse.csgraph import connected_components
+
+from csr_cache import load_csr, bfs_levels, DATASET_DIR
+
+DEFAULT_NUM_SOURCES = 20
+DEFAULT_NUM_STRATA = 4
+DEFAULT_MIN_REACH = 0.5
+# Upper bound on BFS runs per requested source before giving up on a stratum
+MAX_ATTEMPTS_PER_SOURCE = 10
+
+
+def largest_wcc_mask(graph):
+    """
+    Boolean mask of the vertices in the largest weakly connected component.
+    """
+    _, labels = connected_components(graph.to_scipy(), directed=True, connection='weak')
+    sizes = np.bincount(labels)
+    return labels == np.argmax(sizes)
+
+
+def degree_strata(degrees, candidates, num_strata):
+    """
+    Split candidates into num_strata buckets of roughly equal size by log-degree.
+
+    Returns:
+        list: One array of candidate vertex ids per stratum (empty strata are dropped)
+    """
+    log_degrees = np.log2(degrees[candidates].astype(np.float64) + 1)
+    edges = np.quantile(log_degrees, np.linspace(0, 1, num_strata + 1))
+    bucket = np.clip(np.searchsorted(edges, log_degrees, side='right') - 1, 0, num_strata - 1)
+    strata = [candidates[bucket == b] for b in range(num_strata)]
+    return [s for s in strata if len(s)]
+
+
+def sample_sources(graph, k=DEFAULT_NUM_SOURCES, seed=0, num_strata=DEFAULT_NUM_STRATA,
+                   min_reach=DEFAULT_MIN_REACH):
+    """
+    Sample k well-connected source vertices stratified by out-degree.
+
+    Args:
+        graph: CSRGraph
+        k: Number of sources to return
+        seed: Seed of the random generator
+        num_strata: Number of degree strata to spread the sources over
+        min_reach: Minimum fraction of the largest WCC a source must reach by BFS
+
+    Returns:
+        tuple: (list of source ids, list of reached vertex counts)
+    """
+    rng = np.random.default_rng(seed)
+    degrees = np.asarray(graph.out_degrees())
+    in_wcc = largest_wcc_mask(graph)
+    wcc_size = int(in_wcc.sum())
+    candidates = np.flatnonzero(in_wcc & (degrees > 0))
+    if len(candidates) == 0:
+        return [], []
+
+    strata = [rng.permutation(s) for s in degree_strata(degrees, candidates, num_strata)]
+    cursors = [0] * len(strata)
+    threshold = min_reach * wcc_size
+
+    sources, reaches = [], []
+    attempts = 0
+    max_attempts = MAX_ATTEMPTS_PER_SOURCE * k
+    # Round-robin over the strata so every degree range is represented
+    while len(sources) < k and attempts < max_attempts and any(c < len(s) for c, s in zip(cursors, strata)):
+        for i, stratum in enumerate(strata):
+            if len(sources) >= k or cursors[i] >= len(stratum):
+                continue
+            vertex = int(stratum[cursors[i]])
+            cursors[i] += 1
+            attempts += 1
+            reached = int((bfs_levels(graph, vertex) >= 0).sum())
+            if reached >= threshold:
+                sources.append(vertex)
+                reaches.append(reached)
+
+    if len(sources) < k:
+        print(f"Warning: only {len(sources)} of {k} sources reach {min_reach:.0%} of the largest WCC "
+              f"({wcc_size} vertices) after {attempts} attempts")
+    return sources, reaches
+
+
+def write_bfsver(dataset_name, sources, reaches, params, dataset_dir=DATASET_DIR):
+    """
+    Write <dataset>.bfsver (one vertex per line) and its .json parameter sidecar.
+    """
+    bfsver_path = f"{dataset_dir}/{dataset_name}/{dataset_name}.bfsver"
+    with open(bfsver_path, 'w') as f:
+        for source in sources:
+            f.write(f"{source}\n")
+    with open(bfsver_path + '.json', 'w') as f:
+        json.dump(dict(params, sources=sources, reached_vertices=reaches), f, indent=2)
+    return bfsver_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sample well-connected BFS/SSSP sources into a .bfsver file')
+    parser.add_argument('dataset', help='dataset name (directory under /datasets)')
+    parser.add_argument('-k', '--num-sources', type=int, default=DEFAULT_NUM_SOURCES, help='number of sources')
+    parser.add_argument('--seed', type=int, default=0, help='random seed')
+    parser.add_argument('--strata', type=int, default=DEFAULT_NUM_STRATA, help='number of degree strata')
+    parser.add_argument('--min-reach', type=float, default=DEFAULT_MIN_REACH,
+                        help='minimum fraction of the largest WCC reached from a source')
+    parser.add_argument('--edge-file', help='explicit edge list path (default: from the properties file)')
+    args = parser.parse_args()
+
+    graph = load_csr(args.dataset, args.edge_file)
+    sources, reaches = sample_sources(graph, args.num_sources, args.seed, args.strata, args.min_reach)
+    if not sources:
+        print(f"No suitable sources found for {args.dataset}")
+        return 1
+
+    params = {'seed': args.seed, 'strata': args.strata, 'min_reach': args.min_reach,
+              'num_vertices': graph.num_vertices, 'num_edges': graph.num_edges}
+    path = write_bfsver(args.dataset, sources, reaches, params)
+    print(f"Wrote {len(sources)} sources to {path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
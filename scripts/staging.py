@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Stage dataset files into a system's scratch directory without copying them
+where possible.
+
+GAPBS copied every edge list into /extra_space only to give it the .el/.wel
+extension its loader wants, and GraphChi copied the edge list into its
+working directory; for graph500_30 those are multi-hundred-GB copies.
+stage_file() tries, in order:
+
+    reflink  - FICLONE ioctl: a copy-on-write clone sharing the source's
+               extents (btrfs, XFS with reflink=1, ...)
+    hardlink - a second name for the source inode
+    symlink  - a link to the source path
+    copy     - copy_file_range() over COPY_THREADS threads, each copying its
+               own byte range; where the kernel or the filesystem pair does not
+               support it (e.g. across filesystems before Linux 5.3 or after
+               5.19), the threads copy their ranges with pread/pwrite instead
+
+The three link methods are only tried when the source and the target
+directory are on the same filesystem; across filesystems the file is copied,
+so that a benchmark never silently reads its input from another disk. Linked
+files share their data with the dataset: consumers must treat staged files
+as read-only (GAPBS and GraphChi only read their input).
+
+record_staging() appends the time and method of a staging to
+<results>/<system>/staging_times.jsonl, apart from the preprocessing and
+conversion times the runners report.
+
+Usage:
+    python staging.py /datasets/dota_league/dota_league.e /extra_space/dota_league.el
+"""
+
+import os
+import sys
+import json
+import time
+import errno
+import fcntl
+import shutil
+import argparse
+import threading
+from dataclasses import dataclass, asdict
+
+from paths import RESULTS_ROOT
+
+STAGING_METHODS = ['reflink', 'hardlink', 'symlink', 'copy']
+LINK_METHODS = ['reflink', 'hardlink', 'symlink']
+# _IOW(0x94, 9, int) from linux/fs.h
+FICLONE = 0x40049409
+COPY_THREADS = 8
+# Largest single copy_file_range() call
+COPY_CHUNK = 1 << 30
+# Buffer of the pread/pwrite fallback
+COPY_BUFFER = 1 << 23
+# copy_file_range() errors that mean "not supported here" rather than an I/O failure
+UNSUPPORTED_ERRNOS = {errno.EXDEV, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOSYS}
+STAGING_FILE = "staging_times.jsonl"
+
+
+@dataclass
+class StagingResult:
+    src: str
+    dst: str
+    method: str
+    seconds: float
+    bytes: int
+
+
+def same_filesystem(src, dst):
+    """
+    Whether a file and the directory of a target path are on the same filesystem.
+    """
+    dst_dir = os.path.dirname(os.path.abspath(dst))
+    return os.stat(src).st_dev == os.stat(dst_dir).st_dev
+
+
+def reflink(src, dst):
+    """
+    Clone src into dst with the FICLONE ioctl (OSError where the filesystem cannot share extents).
+    """
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        try:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+        except OSError:
+            fdst.close()
+            os.remove(dst)
+            raise
+
+
+def _copy_range(src_fd, dst_fd, offset, end, errors):
+    try:
+        in_kernel = hasattr(os, 'copy_file_range')
+        while offset < end:
+            if in_kernel:
+                try:
+                    copied = os.copy_file_range(src_fd, dst_fd, min(COPY_CHUNK, end - offset), offset, offset)
+                except OSError as e:
+                    if e.errno not in UNSUPPORTED_ERRNOS:
+                        raise
+                    in_kernel = False
+                    continue
+            else:
+                data = os.pread(src_fd, min(COPY_BUFFER, end - offset), offset)
+                copied = len(data)
+                written = 0
+                while written < copied:
+                    written += os.pwrite(dst_fd, data[written:], offset + written)
+            if copied == 0:
+                raise OSError(f"unexpected end of file at byte {offset}")
+            offset += copied
+    except OSError as e:
+        errors.append(e)
+
+
+def parallel_copy(src, dst, threads=COPY_THREADS):
+    """
+    Copy src to dst with copy_file_range() (or pread/pwrite), splitting the file into one byte range per thread.
+    """
+    size = os.path.getsize(src)
+    if size == 0:
+        shutil.copyfile(src, dst)
+        return
+    src_fd = os.open(src, os.O_RDONLY)
+    dst_fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.ftruncate(dst_fd, size)
+        step = -(-size // max(1, threads))
+        errors = []
+        workers = [threading.Thread(target=_copy_range, args=(src_fd, dst_fd, start, min(start + step, size), errors))
+                   for start in range(0, size, step)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+    finally:
+        os.close(src_fd)
+        os.close(dst_fd)
+    if errors:
+        raise errors[0]
+
+
+def _stage(method, src, dst, threads):
+    if method == 'reflink':
+        reflink(src, dst)
+    elif method == 'hardlink':
+        os.link(src, dst)
+    elif method == 'symlink':
+        os.symlink(os.path.abspath(src), dst)
+    else:
+        parallel_copy(src, dst, threads)
+
+
+def stage_file(src, dst, methods=STAGING_METHODS, threads=COPY_THREADS):
+    """
+    Make the contents of src available at dst as cheaply as possible.
+
+    Args:
+        src: Source file
+        dst: Target path; an existing file there is replaced
+        methods: Methods to try, in order (subset of STAGING_METHODS); the link
+                 methods are skipped when src and dst are on different filesystems
+        threads: Threads of the copy fallback
+
+    Returns:
+        StagingResult
+    """
+    unknown = set(methods) - set(STAGING_METHODS)
+    if unknown:
+        raise ValueError(f"unknown staging methods {sorted(unknown)}, expected {STAGING_METHODS}")
+    if os.path.lexists(dst):
+        if os.path.exists(dst) and os.path.samefile(src, dst):
+            print(f"{dst} is already {src}, nothing to stage")
+            return StagingResult(src, dst, 'existing', 0.0, os.path.getsize(src))
+        os.remove(dst)
+    if not same_filesystem(src, dst):
+        methods = [method for method in methods if method not in LINK_METHODS]
+
+    start = time.time()
+    for method in methods:
+        try:
+            _stage(method, src, dst, threads)
+        except OSError as e:
+            print(f"Could not {method} {src} to {dst}: {e}")
+            if os.path.lexists(dst):
+                os.remove(dst)
+            continue
+        result = StagingResult(src, dst, method, time.time() - start, os.path.getsize(src))
+        print(f"Staged {src} at {dst} ({method}, {result.seconds:.2f} s)")
+        return result
+    raise OSError(f"could not stage {src} at {dst} with any of {list(methods)}")
+
+
+def record_staging(system, dataset, result, results_root=RESULTS_ROOT):
+    """
+    Append a staging to <results_root>/<system>/staging_times.jsonl.
+    """
+    system_dir = os.path.join(results_root, system)
+    os.makedirs(system_dir, exist_ok=True)
+    with open(os.path.join(system_dir, STAGING_FILE), 'a') as f:
+        f.write(json.dumps(dict(asdict(result), system=system, dataset=dataset,
+                                time=time.strftime('%Y-%m-%dT%H:%M:%S'))) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stage a file by reflink, hardlink, symlink or parallel copy')
+    parser.add_argument('src', help='source file')
+    parser.add_argument('dst', help='target path')
+    parser.add_argument('--methods', nargs='+', choices=STAGING_METHODS, default=STAGING_METHODS,
+                        help='methods to try, in order')
+    parser.add_argument('--threads', type=int, default=COPY_THREADS, help='threads of the copy fallback')
+    args = parser.parse_args()
+    try:
+        stage_file(args.src, args.dst, args.methods, args.threads)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,96 +1,170 @@
 #!/usr/bin/env python3
 """
-Script to update memory_estimates.json with actual disk sizes and remove unwanted fields
+Generate memory_estimates.json from the datasets under /datasets.
+
+Every dataset directory with an edge list (named in its properties file, or
+<dataset>.e) gets an entry with:
+
+    num_nodes, num_edges   - from the binary CSR cache (csr_cache.py), which
+                             streams the edge list once in chunks
+    graph_size_disk        - size of the text edge list in MB
+    graph_size_memory      - size of the binary CSR (indptr + indices [+ weights]) in MB,
+                             the in-memory footprint the memory budgets are based on
+    artifacts              - size in MB of every converted copy the runners keep
+                             (ARTIFACT_GLOBS), for systems whose artifacts exist
+    source                 - size and mtime of the edge list the counts were taken from
+
+The update is incremental: datasets whose edge list has the same size and
+mtime as recorded are not re-profiled (their artifact sizes are still
+refreshed, which only takes a stat per file). Entries without a dataset
+directory are left untouched.
+
+Usage:
+    python update_memory_estimates.py [--datasets graph500_26 twitter_mpi] [--force]
 """
 
-import json
 import os
-from pathlib import Path
-
-# Dataset name mapping (JSON key -> directory name)
-DATASET_MAPPING = {
-    "dota_league": "dota-league",
-    "graph500_23": "graph500_23",  # May not exist
-    "graph500_26": "graph500_26",
-    "graph500_28": "graph500_28",
-    "graph500_30": "graph500_30",
-    "road_asia": "road_asia",  # May not exist
-    "road_usa": "road_usa",  # May not exist
-    "livejournal": "soc-LiveJournal",
-    "orkut": "orkut",  # May not exist
-    "twitter_mpi": "twitter_mpi",
-    "uk-2007": "uk-2007",
-    "com-friendster": "com-friendster",
-    "uniform_26": "uniform_26"
+import sys
+import glob
+import json
+import argparse
+
+from paths import DATASET_DIR, EXTRA_SPACE_DIR
+from csr_cache import load_csr, find_edge_file, cache_dir_for
+from get_mem_estimates import MEMORY_ESTIMATES_PATH
+
+MB = 1024 * 1024
+
+# Converted copies of a dataset kept by the runners ({dataset} is the dataset name)
+ARTIFACT_GLOBS = {
+    'galois': [f"{EXTRA_SPACE_DIR}/galois/{{dataset}}.gr", f"{EXTRA_SPACE_DIR}/galois/{{dataset}}.sgr",
+               f"{EXTRA_SPACE_DIR}/galois/{{dataset}}.tgr"],
+    'blaze': [f"{EXTRA_SPACE_DIR}/{{dataset}}.gr.index", f"{EXTRA_SPACE_DIR}/{{dataset}}.gr.adj.*"],
+    'ligra': [f"{EXTRA_SPACE_DIR}/{{dataset}}", f"{EXTRA_SPACE_DIR}/{{dataset}}_wgh"],
+    'graphchi': [f"{EXTRA_SPACE_DIR}/graphchi_datasets/{{dataset}}", f"{EXTRA_SPACE_DIR}/graphchi_datasets/{{dataset}}.*"],
+    'xstream': [f"{EXTRA_SPACE_DIR}/xstream_datasets/{{dataset}}", f"{EXTRA_SPACE_DIR}/xstream_datasets/{{dataset}}.*"],
+    'lumos': [f"{DATASET_DIR}/{{dataset}}/{{dataset}}.bin"],
+    'gridgraph': [f"{DATASET_DIR}/{{dataset}}/{{dataset}}.bin"],
 }
 
-def get_file_size_mb(dataset_key):
-    """Get the file size in MB of the .e file for a dataset"""
-    dataset_dir = DATASET_MAPPING.get(dataset_key)
-    if not dataset_dir:
-        return None
-
-    # Check datasets path (handle symlink)
-    datasets_path = Path("/home/puneet89/flexograph-eval/datasets")
-    if datasets_path.is_symlink():
-        datasets_path = Path(os.readlink(datasets_path))
-
-    # Construct file path
-    dataset_path = datasets_path / dataset_dir
-    if not dataset_path.exists():
-        print(f"Warning: Dataset directory not found: {dataset_path}")
-        return None
-
-    # Look for the .e file
-    e_file = dataset_path / f"{dataset_dir}.e"
-    if not e_file.exists():
-        # Try alternative naming patterns
-        e_files = list(dataset_path.glob("*.e"))
-        if e_files:
-            e_file = e_files[0]  # Use the first .e file found
-        else:
-            print(f"Warning: No .e file found for {dataset_key} in {dataset_path}")
-            return None
-
-    # Get size in MB
-    size_bytes = e_file.stat().st_size
-    size_mb = size_bytes / (1024 * 1024)
-    return round(size_mb, 2)
-
-def update_json():
-    """Update the memory_estimates.json file"""
-    json_path = Path("/home/puneet89/flexograph-eval/scripts/memory_estimates.json")
-
-    # Read existing JSON
-    with open(json_path, 'r') as f:
-        data = json.load(f)
-
-    # Update each dataset entry
-    for dataset_key in data.keys():
-        entry = data[dataset_key]
-
-        # Get actual file size in MB
-        size_mb = get_file_size_mb(dataset_key)
-
-        # Remove old field and unwanted fields
-        entry.pop("graph_file_size_gb", None)
-        entry.pop("estimated_working_memory_gb", None)
-        entry.pop("rationale", None)
-        entry.pop("category", None)
-
-        # Add new field
-        if size_mb is not None:
-            entry["graph_size_disk"] = size_mb
-            print(f"{dataset_key}: {size_mb:.2f} MB")
-        else:
-            entry["graph_size_disk"] = None
-            print(f"{dataset_key}: File not found")
-
-    # Write updated JSON with nice formatting
-    with open(json_path, 'w') as f:
-        json.dump(data, f, indent=2)
-
-    print(f"\nUpdated {json_path}")
-
-if __name__ == "__main__":
-    update_json()
+
+def _path_size(path):
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(root, name))
+                   for root, _, files in os.walk(path) for name in files)
+    return os.path.getsize(path)
+
+
+def artifact_sizes(dataset_name):
+    """
+    Size in MB of the converted artifacts of a dataset, per system.
+
+    Returns:
+        dict: System -> size in MB (systems without artifacts are left out)
+    """
+    sizes = {}
+    for system, patterns in ARTIFACT_GLOBS.items():
+        paths = {p for pattern in patterns for p in glob.glob(pattern.format(dataset=glob.escape(dataset_name)))}
+        if paths:
+            sizes[system] = round(sum(_path_size(p) for p in paths) / MB, 2)
+    return sizes
+
+
+def csr_size_mb(dataset_name):
+    """
+    Size in MB of the binary CSR cache entry of a dataset.
+    """
+    cache_dir = cache_dir_for(dataset_name)
+    return round(sum(os.path.getsize(os.path.join(cache_dir, name))
+                     for name in os.listdir(cache_dir) if name.endswith('.npy')) / MB, 2)
+
+
+def list_datasets(dataset_dir=DATASET_DIR):
+    """
+    Names of the dataset directories that contain an edge list.
+    """
+    datasets = []
+    for name in sorted(os.listdir(dataset_dir)):
+        if not os.path.isdir(os.path.join(dataset_dir, name)):
+            continue
+        try:
+            if os.path.exists(find_edge_file(name, dataset_dir)):
+                datasets.append(name)
+        except (OSError, ValueError):
+            continue
+    return datasets
+
+
+def profile_entry(dataset_name, existing=None, force=False):
+    """
+    Build the estimates entry of one dataset, re-profiling only if its edge list changed.
+
+    Returns:
+        tuple: (entry dict, True if the dataset was re-profiled)
+    """
+    edge_file = find_edge_file(dataset_name)
+    stat = os.stat(edge_file)
+    source = {'file': edge_file, 'size': stat.st_size, 'mtime': int(stat.st_mtime)}
+    entry = dict(existing or {})
+    unchanged = not force and entry.get('source') == source and entry.get('num_edges') is not None
+
+    if not unchanged:
+        graph = load_csr(dataset_name, edge_file)
+        entry.update({'num_nodes': int(graph.num_vertices), 'num_edges': int(graph.num_edges),
+                      'graph_size_disk': round(stat.st_size / MB, 2),
+                      'graph_size_memory': csr_size_mb(dataset_name), 'source': source})
+    entry['artifacts'] = artifact_sizes(dataset_name)
+    return entry, not unchanged
+
+
+def update_estimates(estimates_path=MEMORY_ESTIMATES_PATH, datasets=None, force=False):
+    """
+    Update memory_estimates.json in place.
+
+    Args:
+        estimates_path: JSON file to update
+        datasets: Dataset names to update (default: every dataset under /datasets)
+        force: Re-profile even if the edge list did not change
+
+    Returns:
+        dict: The updated estimates
+    """
+    estimates = {}
+    if os.path.exists(estimates_path):
+        with open(estimates_path, 'r') as f:
+            estimates = json.load(f)
+
+    for dataset in datasets or list_datasets():
+        try:
+            entry, profiled = profile_entry(dataset, estimates.get(dataset), force)
+        except (OSError, ValueError) as e:
+            print(f"Warning: could not profile {dataset}: {e}")
+            continue
+        estimates[dataset] = entry
+        status = 'profiled' if profiled else 'unchanged'
+        print(f"{dataset}: {status}, {entry['num_nodes']} nodes, {entry['num_edges']} edges, "
+              f"disk {entry['graph_size_disk']} MB, CSR {entry['graph_size_memory']} MB, "
+              f"artifacts: {', '.join(f'{s}={mb} MB' for s, mb in entry['artifacts'].items()) or 'none'}")
+
+    # Write to a temporary file first so that concurrent readers never see a partial file
+    tmp_path = estimates_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(estimates, f, indent=2)
+    os.replace(tmp_path, estimates_path)
+    return estimates
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate memory_estimates.json from /datasets')
+    parser.add_argument('--datasets', nargs='+', help='only update these datasets')
+    parser.add_argument('--output', default=MEMORY_ESTIMATES_PATH, help='estimates file to update')
+    parser.add_argument('--force', action='store_true', help='re-profile datasets whose edge list did not change')
+    args = parser.parse_args()
+
+    estimates = update_estimates(args.output, args.datasets, args.force)
+    print(f"\nUpdated {args.output} ({len(estimates)} datasets)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
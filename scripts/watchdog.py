@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Time budgets and hang detection for benchmark runs.
+
+Runs that may never finish (Galois BC, X-Stream triangle counting) used to be
+disabled outright. A Watchdog attached to process_runner.run_streaming() ends
+a run when either
+
+    budget  - its wall time exceeds a budget predicted from similar runs: the
+              upper end of the cost model's runtime interval (cost_model.py)
+              times BUDGET_FACTOR, never below MIN_BUDGET_S; without a fitted
+              model or dataset features the caller's default applies
+    stall   - none of its progress signals moved for stall_s seconds:
+                  output - new log lines
+                  cpu    - CPU time of the process group (/proc/<pid>/stat)
+                  io     - bytes read and written by the process group (/proc/<pid>/io)
+
+The run is then terminated (SIGTERM, then SIGKILL) and record_timeout()
+appends it, with the reason and whatever metrics it printed before, to
+<results>/<system>/timeouts.jsonl, so the campaign moves on and the run is
+accounted for instead of silently missing. results_store.load_timeouts()
+reads these records back.
+"""
+
+import os
+import json
+import time
+
+from paths import RESULTS_ROOT
+
+BUDGET_FACTOR = 3.0
+MIN_BUDGET_S = 600
+DEFAULT_STALL_S = 900
+POLL_S = 5.0
+# CPU seconds per poll below which the CPU signal does not count as progress
+CPU_EPSILON_S = 0.05
+ACTIVITY_SIGNALS = ['output', 'cpu', 'io']
+TIMEOUTS_FILE = "timeouts.jsonl"
+
+
+def group_usage(pgid, proc='/proc'):
+    """
+    CPU time and I/O volume of the live processes of a process group.
+
+    Returns:
+        tuple: (cpu_s, io_bytes); io_bytes counts rchar + wchar, so reads served from
+               the page cache count as progress too
+    """
+    ticks = os.sysconf('SC_CLK_TCK')
+    cpu_s = 0.0
+    io_bytes = 0
+    for entry in os.listdir(proc):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(os.path.join(proc, entry, 'stat'), 'r') as f:
+                # The command name may contain spaces; the fields after it are fixed
+                fields = f.read().rsplit(')', 1)[1].split()
+            if int(fields[2]) != pgid:
+                continue
+            cpu_s += (int(fields[11]) + int(fields[12])) / ticks
+            with open(os.path.join(proc, entry, 'io'), 'r') as f:
+                for line in f:
+                    key, value = line.split(':')
+                    if key in ('rchar', 'wchar'):
+                        io_bytes += int(value)
+        except (OSError, IndexError, ValueError):
+            continue  # exited in the meantime, or no permission for io
+    return cpu_s, io_bytes
+
+
+def time_budget_s(system, dataset, algo, params='', trials=1, default_s=None, model=None):
+    """
+    Wall-time budget of a run from the runtimes of similar runs.
+
+    Args:
+        system, dataset, algo, params: Run as named in the results store
+        trials: Trials executed by one process
+        default_s: Budget when there is no prediction (None: no budget)
+        model: Fitted cost model (default: loaded from cost_model.MODEL_PATH)
+
+    Returns:
+        float or None: Budget in seconds
+    """
+    try:
+        # Imported here so that runs without a budget do not need numpy/scipy
+        from cost_model import load_model, predict_run
+    except ImportError:
+        return default_s
+    model = model or load_model()
+    if model is None:
+        return default_s
+    prediction = predict_run(model, system, dataset, algo, params)
+    if prediction is None or prediction.get('time_s') is None:
+        return default_s
+    return max(prediction['time_s']['high'] * trials * BUDGET_FACTOR, MIN_BUDGET_S)
+
+
+class Watchdog:
+    """
+    Decides when a run is over budget or hung; polled by process_runner.
+    """
+
+    def __init__(self, budget_s=None, stall_s=DEFAULT_STALL_S, signals=ACTIVITY_SIGNALS, poll_s=POLL_S):
+        """
+        Args:
+            budget_s: Wall-time budget in seconds (None: no budget)
+            stall_s: Seconds without progress before the run counts as hung (None: never)
+            signals: Progress signals (subset of ACTIVITY_SIGNALS); any of them moving is progress
+            poll_s: Seconds between checks
+        """
+        unknown = set(signals) - set(ACTIVITY_SIGNALS)
+        if unknown:
+            raise ValueError(f"unknown progress signals {sorted(unknown)}, expected {ACTIVITY_SIGNALS}")
+        self.budget_s = budget_s
+        self.stall_s = stall_s
+        self.signals = list(signals)
+        self.poll_s = poll_s
+        self.lines = 0
+        self.cpu_s = 0.0
+        self.io_bytes = 0
+
+    def start(self, pgid):
+        self.pgid = pgid
+        self.start_time = self.last_progress = time.time()
+        self._seen_lines = 0
+
+    def on_line(self, line):
+        self.lines += 1
+
+    def check(self):
+        """
+        Sample the progress signals.
+
+        Returns:
+            str or None: 'budget' or 'stall' if the run should be ended
+        """
+        now = time.time()
+        if self.budget_s is not None and now - self.start_time > self.budget_s:
+            return 'budget'
+        progress = 'output' in self.signals and self.lines > self._seen_lines
+        self._seen_lines = self.lines
+        if 'cpu' in self.signals or 'io' in self.signals:
+            cpu_s, io_bytes = group_usage(self.pgid)
+            progress = progress or ('cpu' in self.signals and cpu_s > self.cpu_s + CPU_EPSILON_S)
+            progress = progress or ('io' in self.signals and io_bytes > self.io_bytes)
+            # The counters of exited group members are lost; never let the totals go down
+            self.cpu_s = max(self.cpu_s, cpu_s)
+            self.io_bytes = max(self.io_bytes, io_bytes)
+        if progress:
+            self.last_progress = now
+        if self.stall_s is not None and now - self.last_progress > self.stall_s:
+            return 'stall'
+        return None
+
+    def summary(self):
+        return {'budget_s': self.budget_s, 'stall_s': self.stall_s, 'lines': self.lines,
+                'cpu_s': round(self.cpu_s, 2), 'io_bytes': self.io_bytes,
+                'idle_s': round(time.time() - self.last_progress, 1)}
+
+
+def record_timeout(system, dataset, algo, result, params='', metrics=None, results_root=RESULTS_ROOT):
+    """
+    Append a run that was ended by its timeout or watchdog to <results_root>/<system>/timeouts.jsonl.
+
+    Args:
+        system, dataset, algo, params: Run as named in the results store
+        result: process_runner.ProcessResult of the run
+        metrics: Partial metrics parsed before the run was ended (e.g. LineCollector.matches)
+    """
+    record = {
+        'system': system,
+        'dataset': dataset,
+        'algo': algo,
+        'params': params or '',
+        'reason': result.reason,
+        'wall_s': round(result.wall_s, 2),
+        'iterations': result.iterations,
+        'killed': result.killed,
+        'watchdog': result.watchdog,
+        'metrics': metrics or {},
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+    system_dir = os.path.join(results_root, system)
+    os.makedirs(system_dir, exist_ok=True)
+    with open(os.path.join(system_dir, TIMEOUTS_FILE), 'a') as f:
+        f.write(json.dumps(record) + "\n")
+    print(f"  {system} {algo} on {dataset} ended after {result.wall_s:.0f} s ({result.reason}), "
+          f"recorded in {system_dir}/{TIMEOUTS_FILE}")
+    return record
@@ -9,58 +9,12 @@ import glob
 import numpy as np
 from datetime import datetime
 from collections import defaultdict
+import sys
 
-def parse_iostat_log(filename):
-    """
-    Parse iostat log file and extract read/write bandwidth data.
-    Expected format from 'iostat -d -x 1 | grep -v loop':
-    
-    Device            r/s     rMB/s   rrqm/s  %rrqm r_await rareq-sz     w/s     wMB/s   wrqm/s  %wrqm w_await wareq-sz     d/s     dMB/s   drqm/s  %drqm d_await dareq-sz     f/s f_await  aqu-sz  %util
-    """
-    data = []
-    current_timestamp = 0  # Use sequential timestamps since iostat outputs every second
-    
-    with open(filename, 'r') as f:
-        lines = f.readlines()
-    
-    i = 0
-    while i < len(lines):
-        line = lines[i].strip()
-        
-        # Skip header lines and empty lines
-        if not line or 'Device' in line or 'Linux' in line or '_x86_64_' in line:
-            i += 1
-            continue
-        
-        # Look for device lines with stats
-        # Split by whitespace and expect at least 23 columns
-        parts = line.split()
-        if len(parts) >= 23:
-            device = parts[0]
-            try:
-                read_kb_s = float(parts[2])   # rkB/s (column 2)
-                write_kb_s = float(parts[7])  # wkB/s (column 7)
-                read_mb_s = read_kb_s / 1024  # Convert kB/s to MB/s
-                write_mb_s = write_kb_s / 1024  # Convert kB/s to MB/s
-                
-                data.append({
-                    'timestamp': current_timestamp,
-                    'device': device,
-                    'read_mb_s': read_mb_s,
-                    'write_mb_s': write_mb_s,
-                    'total_mb_s': read_mb_s + write_mb_s
-                })
-                
-            except (ValueError, IndexError):
-                pass
-        
-        # Check if this looks like the end of a time interval (empty line or new header)
-        if i + 1 < len(lines) and (not lines[i + 1].strip() or 'Device' in lines[i + 1]):
-            current_timestamp += 1
-        
-        i += 1
-    
-    return data
+# iostat_utils lives in the parent scripts directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from iostat_utils import parse_iostat_log
+from bandwidth_aggregation import aggregate_runs
 
 def group_iostat_files_by_benchmark(iostat_files):
     """
@@ -88,9 +42,8 @@ def compute_average_bandwidth(iostat_files, target_device):
     
     # Parse all files and collect data
     for file_path in iostat_files:
-        data = parse_iostat_log(file_path)
-        if data:
-            df = pd.DataFrame(data)
+        df = parse_iostat_log(file_path)
+        if not df.empty:
             device_data = df[df['device'] == target_device]
             if not device_data.empty:
                 # Add iteration identifier
@@ -137,6 +90,14 @@ def compute_average_bandwidth(iostat_files, target_device):
     
     return avg_data
 
+def _plot_columns(data, metric):
+    '''
+    x values, x label and y column of an aggregated frame, plus the band columns if present.
+    '''
+    if 'progress' in data.columns:
+        return data['progress'], 'Progress (%)', f'{metric}_median', (f'{metric}_p25', f'{metric}_p75')
+    return data['timestamp'], 'Time (seconds)', f'{metric}_mean', None
+
 def plot_bandwidth_vs_time(iostat_files, output_dir, target_device=None):
     """
     Create bandwidth vs time plots for each iostat log file.
@@ -149,13 +110,11 @@ def plot_bandwidth_vs_time(iostat_files, output_dir, target_device=None):
             continue
             
         print(f"Processing {iostat_file}")
-        data = parse_iostat_log(iostat_file)
+        df = parse_iostat_log(iostat_file)
         
-        if not data:
+        if df.empty:
             print(f"No data found in {iostat_file}")
             continue
-            
-        df = pd.DataFrame(data)
         
         # Group by device and create plots
         devices = df['device'].unique()
@@ -207,9 +166,12 @@ def plot_bandwidth_vs_time(iostat_files, output_dir, target_device=None):
             device_data.to_csv(csv_filename, index=False)
             print(f"Saved data: {csv_filename}")
 
-def plot_average_bandwidth_vs_time(iostat_files, output_dir, target_device):
+def plot_average_bandwidth_vs_time(iostat_files, output_dir, target_device, align='progress'):
     """
     Create average bandwidth vs time plots across multiple benchmark iterations.
+
+    align: 'truncate' (average per second up to the shortest run), 'progress'
+           or 'phases' (see bandwidth_aggregation.py)
     """
     os.makedirs(output_dir, exist_ok=True)
     
@@ -227,7 +189,14 @@ def plot_average_bandwidth_vs_time(iostat_files, output_dir, target_device):
         files.sort()
         
         # Compute average bandwidth
-        avg_data = compute_average_bandwidth(files, target_device)
+        if align == 'truncate':
+            avg_data = compute_average_bandwidth(files, target_device)
+        else:
+            avg_data, totals = aggregate_runs(files, target_device, align)
+            if totals is not None:
+                totals_filename = f"{output_dir}/{benchmark_name}_{target_device}_phase_totals.csv"
+                totals.to_csv(totals_filename, index=False)
+                print(f"Saved phase totals: {totals_filename}")
         
         if avg_data is None or avg_data.empty:
             print(f"No data found for device '{target_device}' in benchmark {benchmark_name}")
@@ -237,9 +206,12 @@ def plot_average_bandwidth_vs_time(iostat_files, output_dir, target_device):
         
         # Read bandwidth plot
         plt.figure(figsize=(10, 6))
-        plt.plot(avg_data['timestamp'], avg_data['read_mb_s_mean'], 
+        x, xlabel, y_column, band = _plot_columns(avg_data, 'read_mb_s')
+        plt.plot(x, avg_data[y_column], 
                  'b-', label='Average Read Bandwidth', linewidth=2)
-        plt.xlabel('Time (seconds)')
+        if band:
+            plt.fill_between(x, avg_data[band[0]], avg_data[band[1]], color='b', alpha=0.2)
+        plt.xlabel(xlabel)
         plt.ylabel('Read Bandwidth (MB/s)')
         plt.title(f'Average Read Bandwidth vs Time - {target_device} ({benchmark_name})')
         plt.legend()
@@ -254,9 +226,12 @@ def plot_average_bandwidth_vs_time(iostat_files, output_dir, target_device):
         
         # Write bandwidth plot
         plt.figure(figsize=(10, 6))
-        plt.plot(avg_data['timestamp'], avg_data['write_mb_s_mean'], 
+        x, xlabel, y_column, band = _plot_columns(avg_data, 'write_mb_s')
+        plt.plot(x, avg_data[y_column], 
                  'r-', label='Average Write Bandwidth', linewidth=2)
-        plt.xlabel('Time (seconds)')
+        if band:
+            plt.fill_between(x, avg_data[band[0]], avg_data[band[1]], color='r', alpha=0.2)
+        plt.xlabel(xlabel)
         plt.ylabel('Write Bandwidth (MB/s)')
         plt.title(f'Average Write Bandwidth vs Time - {target_device} ({benchmark_name})')
         plt.legend()
@@ -281,6 +256,8 @@ def main():
     parser.add_argument('--pattern', default='*_iostat.log', help='File pattern to match')
     parser.add_argument('--device', help='Specific device name to analyze (e.g., sda, nvme0n1). If not specified, all devices will be processed')
     parser.add_argument('--average', action='store_true', help='Compute average bandwidth across iterations (requires --device)')
+    parser.add_argument('--align', choices=['truncate', 'progress', 'phases'], default='progress',
+                        help='How iterations are aligned before averaging (default: progress)')
     
     args = parser.parse_args()
     
@@ -298,7 +275,7 @@ def main():
             print("Error: --average mode requires --device to be specified")
             return
         print(f"Computing average bandwidth for device: {args.device}")
-        plot_average_bandwidth_vs_time(iostat_files, args.output_dir, args.device)
+        plot_average_bandwidth_vs_time(iostat_files, args.output_dir, args.device, args.align)
         print(f"Average plots saved to {args.output_dir}")
     else:
         if args.device:
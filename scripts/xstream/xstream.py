@@ -3,23 +3,32 @@ import sys
 import subprocess
 import re
 import time
+import shutil
 
 # Add parent directory to path to import shared utilities
-sys.path.insert(0, '/scripts')
+sys.path.insert(0, os.environ.get('BENCH_SCRIPTS_DIR', '/scripts'))
+from paths import DATASET_DIR, RESULTS_ROOT, EXTRA_SPACE_DIR
 from dataset_properties import get_available_cpus
+from process_runner import LineCollector, run_streaming
+from watchdog import Watchdog, time_budget_s, record_timeout
+from preprocessing_ledger import run_step
 
 src_dir = "/xstream"
 app_dir = "/xstream/bin"
 llama_converter = "/llama/bin/snap-to-xs1"
-dataset_cpy = "/extra_space/xstream_datasets"
-dataset_dir = "/datasets"
-results_dir = "/results/xstream"
+dataset_cpy = f"{EXTRA_SPACE_DIR}/xstream_datasets"
+dataset_dir = DATASET_DIR
+results_dir = f"{RESULTS_ROOT}/xstream"
 mem = 1073741824 #1GB in Bytes
 pr_iters = 10
 RUNS = 5
+# Budget of a run when the cost model has no prediction; TC used to get stuck
+DEFAULT_BUDGETS_S = {"triangle_counting": 2 * 3600}
+# Seconds without output, CPU time or I/O before a run counts as hung
+STALL_S = 900
 
 datasets = ["dota_league","graph500_26", "graph500_28", "graph500_30", "uniform_26", "twitter_mpi","uk-2007", "com-friendster"]
-benchmarks = ["bfs", "sssp", "cc", "pagerank"]#, "triangle_counting"] TC does not work/gets stuck
+benchmarks = ["bfs", "sssp", "cc", "pagerank", "triangle_counting"]
 
 iostat_process = None
 
@@ -36,17 +45,19 @@ def stop_iostat_monitoring():
     iostat_process.wait()
     iostat_process = None
 
+LOG_PATTERNS = {
+  "convert_time": r'Time to convert:\s+(\d+\.*\d*)\s+seconds',
+  "setup": r'CORE::TIME::SETUP\s+(\d+.\d+)\sseconds',
+  "algo_time": r'TIME_IN_PC_FN\s+(\d+.\d+)\s+seconds',
+  "total_time": r'Total\s+time:\s+(\d+.\d+)\s+',
+  "buffer_size": r'CORE::CONFIG::BUFFER_SIZE\s+(\d+)',
+  "major_faults": r'CORE::RUSAGE::MAJFLT\s+(\d+)',
+  "minor_faults": r'CORE::RUSAGE::MINFLT\s+(\d+)',
+  "memory_total": r"MemoryCounter:\s+\d+\s+MB\s->\s+\d+\s+MB,\s+(\d+)\s+MB\s+total"
+}
+
 def parse_log(log):
-  regexes = {
-    "convert_time": re.compile(r'Time to convert:\s+(\d+\.*\d*)\s+seconds'),
-    "setup": re.compile(r'CORE::TIME::SETUP\s+(\d+.\d+)\sseconds'),
-    "algo_time": re.compile(r'TIME_IN_PC_FN\s+(\d+.\d+)\s+seconds'),
-    "total_time": re.compile(r'Total\s+time:\s+(\d+.\d+)\s+'),
-    "buffer_size": re.compile(r'CORE::CONFIG::BUFFER_SIZE\s+(\d+)'),
-    "major_faults": re.compile(r'CORE::RUSAGE::MAJFLT\s+(\d+)'),
-    "minor_faults": re.compile(r'CORE::RUSAGE::MINFLT\s+(\d+)'),
-    "memory_total": re.compile(r"MemoryCounter:\s+\d+\s+MB\s->\s+\d+\s+MB,\s+(\d+)\s+MB\s+total")
-  }
+  regexes = {key: re.compile(regex) for key, regex in LOG_PATTERNS.items()}
   #dictionary to store the extracted data
   extracted_data = {key: [] for key in regexes.keys()}
   print(extracted_data)
@@ -91,61 +102,82 @@ def make_cc_cmd(dataset):
   print(" ".join(cmd))
   return cmd
 
-# TC does not work/gets stuck. Ignoring.
-# def make_triangle_counting_cmd(dataset):
-#   cmd = [f"{app_dir}/benchmark_driver", "-p", f"{nproc}", "-b", "triangle_counting", "-a", "-g", f"{dataset_cpy}/{dataset}", "--physical_memory", f"{mem}"]
-#   print(" ".join(cmd))
-#   return cmd
+def make_triangle_counting_cmd(dataset):
+  cmd = [f"{app_dir}/benchmark_driver", "-p", f"{nproc}", "-b", "triangle_counting", "-a", "-g", f"{dataset_cpy}/{dataset}", "--physical_memory", f"{mem}"]
+  print(" ".join(cmd))
+  return cmd
+
+def run_benchmark(cmd, log, dataset, benchmark):
+  '''Run one benchmark under the watchdog, appending its output to the log.
+  Returns False if the run was over budget or hung; it is then recorded as a timeout
+  and its output is moved to <log>.partial, so that parse_log and results_store
+  never average its metric lines into the completed trials.'''
+  run_log = f"{log}.run"
+  with open(run_log, "w") as flog:
+    flog.write(f"Args: {cmd}\n")
+  collector = LineCollector(LOG_PATTERNS)
+  budget_s = time_budget_s("xstream", dataset, benchmark, default_s=DEFAULT_BUDGETS_S.get(benchmark))
+  result = run_streaming(cmd, run_log, parsers=[collector.feed], append=True, cwd=dataset_cpy,
+                         watchdog=Watchdog(budget_s, STALL_S))
+  if result.timed_out:
+    os.replace(run_log, f"{log}.partial")
+    print(f"Partial output of the timed-out run kept in {log}.partial")
+    record_timeout("xstream", dataset, benchmark, result, metrics=collector.matches)
+    return False
+  with open(run_log, "rb") as frun, open(log, "ab") as flog:
+    shutil.copyfileobj(frun, flog)
+  os.remove(run_log)
+  return True
 
 def exec_benchmarks():
   for dataset in datasets:
     #we must first use the llama converter to convert the graph to the xstream format
-    process = subprocess.run(make_convert_cmd(dataset), stderr=subprocess.PIPE)
-    print(process.stderr)
-    conv = re.search(r"Elapsed time: (\d+\.*\d*)", process.stderr.decode())
-    print(f"Conversion time: {conv.group(1)} seconds")
-    convert_time = conv.group(1)
+    step = run_step("xstream", dataset, "xstream.xs1", make_convert_cmd(dataset), capture=True)
+    print(step.output)
+    # Wall time of the ledger step, like every other system (not the converter's own "Elapsed time")
+    convert_time = f"{step.wall_s:.2f}"
+    print(f"Conversion time: {convert_time} seconds")
 
     for benchmark in benchmarks[2:] : #skip bfs and sssp for now
       cmd = globals() [f"make_{benchmark}_cmd"](dataset)
-      with open(f"{results_dir}/{dataset}_{benchmark}.log", "w") as flog:
+      log = f"{results_dir}/{dataset}_{benchmark}.log"
+      with open(log, "w") as flog:
         flog.write(f"Time to convert: {convert_time} seconds\n")
-        for i in range(0, RUNS):
-          # Start I/O monitoring for this specific run
-          iostat_log = f"{results_dir}/{dataset}_{benchmark}_iter{i}_iostat.log"
-          start_iostat_monitoring(iostat_log)
-          
-          process = subprocess.run(cmd, stderr=subprocess.PIPE, cwd=dataset_cpy)
-          
-          # Stop I/O monitoring
-          stop_iostat_monitoring()
-          
-          flog.write(f"Args: {process.args}\n")
-          flog.write(process.stderr.decode("ASCII"))
+      for i in range(0, RUNS):
+        # Start I/O monitoring for this specific run
+        iostat_log = f"{results_dir}/{dataset}_{benchmark}_iter{i}_iostat.log"
+        start_iostat_monitoring(iostat_log)
+
+        completed = run_benchmark(cmd, log, dataset, benchmark)
+
+        # Stop I/O monitoring
+        stop_iostat_monitoring()
+        if not completed:
+          break
 
     #now run bfs and sssp
     for benchmark in benchmarks[:2]:
-      bfsver_path = f"/datasets/{dataset}/{dataset}.bfsver"
+      bfsver_path = f"{DATASET_DIR}/{dataset}/{dataset}.bfsver"
       if not os.path.exists(bfsver_path):
         print("BFS vertex start file does not exist. SKIPPING BFS and SSSP")
       else:
         with open(bfsver_path, "r") as f:
           random_starts = f.read().splitlines()
-        with open (f"{results_dir}/{dataset}_{benchmark}.log", "a") as flog:
+        log = f"{results_dir}/{dataset}_{benchmark}.log"
+        with open (log, "a") as flog:
           flog.write(f"Time to convert: {convert_time} seconds\n")
-          for i, start_vertex in enumerate(random_starts):
-            # Start I/O monitoring for this specific run
-            iostat_log = f"{results_dir}/{dataset}_{benchmark}_iter{i}_iostat.log"
-            start_iostat_monitoring(iostat_log)
-            
-            cmd = globals() [f"make_{benchmark}_cmd"](dataset, start_vertex)
-            process = subprocess.run(cmd, stderr=subprocess.PIPE, cwd=dataset_cpy)
-            
-            # Stop I/O monitoring
-            stop_iostat_monitoring()
-            
-            flog.write(f"Args: {process.args}\n")
-            flog.write(process.stderr.decode("ASCII"))
+        for i, start_vertex in enumerate(random_starts):
+          # Start I/O monitoring for this specific run
+          iostat_log = f"{results_dir}/{dataset}_{benchmark}_iter{i}_iostat.log"
+          start_iostat_monitoring(iostat_log)
+
+          cmd = globals() [f"make_{benchmark}_cmd"](dataset, start_vertex)
+          completed = run_benchmark(cmd, log, dataset, benchmark)
+
+          # Stop I/O monitoring
+          stop_iostat_monitoring()
+          if not completed:
+            break
 
 def main():
   os.makedirs(dataset_cpy, exist_ok=True)
@@ -166,6 +198,9 @@ def main():
     for benchmark in benchmarks:
       extracted_data = parse_log(f"{results_dir}/{dataset}_{benchmark}.log")
       print(f"Extracting data for {dataset}_{benchmark}\n")
+      if not extracted_data['total_time']:
+        print(f"No completed run of {benchmark} on {dataset}, see {results_dir}/timeouts.jsonl")
+        continue
       with open (f"{results_dir}/{dataset}_{benchmark}.csv", "w") as f:
         f.write("convert_time, setup_time, runtime_avg(setup+algo), buffer_size, major_faults, minor_faults, memory_avg\n")
         for key,values in extracted_data.items():